@@ -472,12 +472,128 @@ OPTIONS(
 );
 
 
+-- 14. ETL WATERMARKS
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS `vochill.revrec.etl_watermarks` (
+  pipeline STRING NOT NULL OPTIONS(description="ETL pipeline name, e.g., deposits_to_cash"),
+  partition_key STRING NOT NULL OPTIONS(description="Source partition tracked, e.g., platform name"),
+
+  watermark_ts TIMESTAMP NOT NULL OPTIONS(description="Max source timestamp processed so far"),
+  rows_processed INT64 OPTIONS(description="Source rows read in the last run"),
+  keys_processed INT64 OPTIONS(description="Settlements/keys upserted in the last run"),
+
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
+)
+OPTIONS(
+  description="High-water marks for incremental ETL into cash_transactions"
+);
+
+
+-- 15. BUSINESS CALENDAR
+-- =============================================================================
+-- Date dimension built from payment_timing.yaml and the US bank holiday
+-- schedule (scripts/build_calendar.py). Join on calendar_date for payout
+-- dates instead of adding a fixed number of days.
+CREATE TABLE IF NOT EXISTS `vochill.revrec.business_calendar` (
+  calendar_date DATE NOT NULL,
+  day_of_week INT64 NOT NULL OPTIONS(description="ISO day of week, Monday=1"),
+  week_start DATE NOT NULL OPTIONS(description="Monday of the week"),
+
+  is_weekend BOOL NOT NULL,
+  is_bank_holiday BOOL NOT NULL OPTIONS(description="Federal Reserve holiday (observed date)"),
+  holiday_name STRING,
+  is_business_day BOOL NOT NULL,
+
+  previous_business_day DATE NOT NULL OPTIONS(description="Last business day before this date"),
+  next_business_day DATE NOT NULL OPTIONS(description="First business day after this date"),
+  business_day_number INT64 NOT NULL OPTIONS(description="Running count of business days; N business days later = number + N"),
+
+  -- Payout date for a settlement closing on calendar_date
+  amazon_payout_date DATE,
+  amazon_settlement_end DATE OPTIONS(description="Close of the 14-day settlement containing this date (needs settlement_anchor_date)"),
+  shopify_payout_date DATE,
+  tiktok_payout_date DATE
+)
+OPTIONS(
+  description="Business days, bank holidays and platform payout dates"
+);
+
+
+-- =============================================================================
+-- 16. VENDOR PAYMENT LAGS
+-- =============================================================================
+-- Observed invoice → payment lag percentiles per vendor, fitted from invoices
+-- and actual vendor outflows (scripts/fit_vendor_lags.py). The invoice ETL
+-- joins on vendor for percentile-based cash dates (--lag-percentile).
+CREATE TABLE IF NOT EXISTS `vochill.revrec.vendor_payment_lags` (
+  vendor STRING NOT NULL OPTIONS(description="Vendor name as it appears on invoices"),
+  vendor_key STRING OPTIONS(description="Normalized vendor name used for matching"),
+  payment_terms STRING,
+  basis STRING NOT NULL OPTIONS(description="Distribution used: vendor, terms, all or none"),
+  invoices INT64 NOT NULL OPTIONS(description="Paid invoices behind the distribution"),
+
+  p10_days INT64,
+  p25_days INT64,
+  p50_days INT64,
+  p75_days INT64,
+  p90_days INT64,
+  mean_days FLOAT64,
+
+  fitted_at TIMESTAMP NOT NULL
+)
+OPTIONS(
+  description="Empirical vendor payment lag percentiles"
+);
+
+
+-- =============================================================================
+-- 17. PLATFORM FEE DAILY
+-- =============================================================================
+-- Product sales, fees and refunds per day × platform × SKU from deposits,
+-- refunds and fees (src/forecast/fee_rates.py). Maintained incrementally
+-- from etl_watermarks; rolling 4/13/52-week fee and refund rates are window
+-- aggregates over it.
+CREATE TABLE IF NOT EXISTS `vochill.revrec.platform_fee_daily` (
+  sales_date DATE NOT NULL,
+  platform STRING NOT NULL,
+  sku STRING OPTIONS(description="NULL for charges not tied to a SKU"),
+
+  units INT64,
+  product_sales FLOAT64,
+  selling_fees FLOAT64 OPTIONS(description="Net of refund reversals (negative = charged)"),
+  fba_fees FLOAT64,
+  other_fees FLOAT64,
+  refunded_sales FLOAT64 OPTIONS(description="Refunded product sales (negative)"),
+  refunded_units INT64,
+
+  updated_at TIMESTAMP NOT NULL
+)
+PARTITION BY sales_date
+CLUSTER BY platform, sku
+OPTIONS(
+  description="Daily platform sales, fees and refunds for rolling rate estimates"
+);
+
+
 -- =============================================================================
 -- ANALYTICAL VIEWS
 -- =============================================================================
 
 -- Daily Cash Flow Summary
-CREATE OR REPLACE VIEW `vochill.revrec.v_daily_cash_flow` AS
+-- Materialized and partitioned like cash_transactions, so BigQuery refreshes
+-- only the cash_date partitions that changed since the last refresh and
+-- dashboards read the pre-aggregated rows instead of the fact table.
+-- No ORDER BY or CURRENT_DATE() (not allowed in a materialized view) -
+-- filter and sort when querying. Refresh on demand: python scripts/refresh_views.py
+CREATE OR REPLACE MATERIALIZED VIEW `vochill.revrec.v_daily_cash_flow`
+PARTITION BY cash_date
+CLUSTER BY cash_flow_section, cash_flow_category
+OPTIONS(
+  enable_refresh = true,
+  refresh_interval_minutes = 60,
+  description="Actual daily inflows, outflows and net cash flow by category (incrementally refreshed)"
+)
+AS
 SELECT
   cash_date,
   cash_flow_section,
@@ -492,11 +608,13 @@ SELECT
 
 FROM `vochill.revrec.cash_transactions`
 WHERE is_forecast = FALSE
-GROUP BY cash_date, cash_flow_section, cash_flow_category, cash_flow_subcategory
-ORDER BY cash_date DESC, cash_flow_section, cash_flow_category;
+GROUP BY cash_date, cash_flow_section, cash_flow_category, cash_flow_subcategory;
 
 
 -- Weekly Cash Flow (13-week view)
+-- Rolled up from the daily materialized view (a few rows per day), never from
+-- cash_transactions. A plain view, so the rolling window stays here; the
+-- cash_date filter prunes the daily view's partitions.
 CREATE OR REPLACE VIEW `vochill.revrec.v_weekly_cash_flow` AS
 SELECT
   DATE_TRUNC(cash_date, WEEK(MONDAY)) as week_start,
@@ -504,12 +622,11 @@ SELECT
   cash_flow_section,
   cash_flow_category,
 
-  SUM(amount) as net_cash_flow,
-  COUNT(*) as transaction_count
+  SUM(net_cash_flow) as net_cash_flow,
+  SUM(transaction_count) as transaction_count
 
-FROM `vochill.revrec.cash_transactions`
-WHERE is_forecast = FALSE
-  AND cash_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 13 WEEK)
+FROM `vochill.revrec.v_daily_cash_flow`
+WHERE cash_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 13 WEEK)
 GROUP BY week_start, week_end, cash_flow_section, cash_flow_category
 ORDER BY week_start DESC, cash_flow_section, cash_flow_category;
 
@@ -542,24 +659,10 @@ FROM latest_balances;
 
 
 -- =============================================================================
--- SEED DATA (Optional - run after tables created)
+-- SEED DATA
 -- =============================================================================
-
--- Insert default payment terms
-INSERT INTO `vochill.revrec.payment_terms` (term_id, term_name, term_category, cycle_type, settlement_period_days, settlement_lag_days, description) VALUES
-('amazon_settlement', 'Amazon Settlement', 'Revenue', 'Bi-Weekly', 14, 2, 'Amazon bi-weekly settlement cycle'),
-('shopify_payout', 'Shopify Payout', 'Revenue', 'Daily', NULL, 2, 'Shopify daily payout (weekdays)'),
-('net_30', 'Net 30', 'Expense', 'Invoice-Based', NULL, 30, 'Payment due 30 days after invoice'),
-('net_15', 'Net 15', 'Expense', 'Invoice-Based', NULL, 15, 'Payment due 15 days after invoice'),
-('net_60', 'Net 60', 'Expense', 'Invoice-Based', NULL, 60, 'Payment due 60 days after invoice'),
-('credit_card', 'Credit Card', 'Expense', 'Monthly', NULL, 30, 'Credit card payment ~30 days after charge'),
-('sba_loan_monthly', 'SBA Loan Monthly', 'Debt Service', 'Monthly', NULL, 0, 'SBA loan monthly payment on day 30');
-
--- Insert default scenarios
-INSERT INTO `vochill.revrec.scenarios` (scenario_id, scenario_name, scenario_type, description, revenue_growth_rate, expense_inflation_rate) VALUES
-('base', 'Base Case', 'Base', 'Conservative baseline forecast', 0.0, 0.03),
-('best', 'Best Case', 'Best', 'Optimistic scenario', 0.20, 0.03),
-('worst', 'Worst Case', 'Worst', 'Pessimistic scenario', -0.15, 0.05);
+-- Master rows (bank accounts, payment terms, scenarios, recurring items) live
+-- in data/seed/*.yaml and are upserted with `python scripts/seed.py`.
 
 
 -- =============================================================================
@@ -567,7 +670,7 @@ INSERT INTO `vochill.revrec.scenarios` (scenario_id, scenario_name, scenario_typ
 -- =============================================================================
 -- All financial tables created successfully
 -- Next steps:
---   1. Populate bank_accounts table with VoChill accounts
+--   1. Seed master data: python scripts/seed.py
 --   2. Load chart_of_accounts from existing CoA
 --   3. Begin ETL from deposits/orders tables into cash_transactions
 --   4. Build forecast engine to populate cash_forecast table
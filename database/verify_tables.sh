@@ -83,7 +83,7 @@ if [ ${#MISSING_TABLES[@]} -eq 0 ] && [ ${#MISSING_VIEWS[@]} -eq 0 ]; then
     echo "✅ SUCCESS: All tables and views created!"
     echo ""
     echo "Next steps:"
-    echo "  1. Populate bank_accounts: python notebooks/populate_bank_accounts.py"
+    echo "  1. Seed master data: python scripts/seed.py"
     echo "  2. Load chart_of_accounts: python notebooks/populate_chart_of_accounts.py"
     echo "  3. Test queries: python notebooks/bigquery_example.py"
     echo ""
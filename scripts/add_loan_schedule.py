@@ -1,7 +1,7 @@
 """
 Universal Loan Payment Schedule Generator
 
-Generates payment schedules for ANY type of loan and inserts into debt_schedule table:
+Generates payment schedules for ANY type of loan and merges them into debt_schedule:
 - Equipment loans
 - Balloon loans
 - Unsecured term loans
@@ -18,13 +18,14 @@ Supports:
 Usage:
     python scripts/add_loan_schedule.py --loan-type equipment --interactive
     python scripts/add_loan_schedule.py --config loans/equipment_loan_001.yaml
+
+To load every config in data/loans/ at once, use scripts/loans.py sync.
 """
 
 import sys
 import argparse
 from pathlib import Path
-from datetime import date, timedelta
-from dateutil.relativedelta import relativedelta
+from datetime import date
 import uuid
 import yaml
 
@@ -32,38 +33,7 @@ import yaml
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import BigQueryConnector
-
-
-def calculate_monthly_interest(principal, annual_rate, days_in_month=30):
-    """Calculate monthly interest using actual/360 convention"""
-    daily_rate = annual_rate / 360
-    return principal * daily_rate * days_in_month
-
-
-def calculate_monthly_pi_payment(principal, annual_rate, months_remaining):
-    """Calculate monthly P&I payment using amortization formula"""
-    if months_remaining == 0:
-        return principal
-
-    monthly_rate = annual_rate / 12
-    if monthly_rate == 0:
-        return principal / months_remaining
-
-    payment = principal * (monthly_rate * (1 + monthly_rate)**months_remaining) / \
-              ((1 + monthly_rate)**months_remaining - 1)
-    return payment
-
-
-def generate_payment_date(start_date, months_ahead, day_of_month):
-    """Generate payment date for a given month, handling month-end cases"""
-    target_date = start_date + relativedelta(months=months_ahead)
-
-    try:
-        return target_date.replace(day=day_of_month)
-    except ValueError:
-        # Month doesn't have this day, use last day of month
-        next_month = target_date.replace(day=1) + relativedelta(months=1)
-        return next_month - relativedelta(days=1)
+from src.debt import Loan, generate_schedules, sync_loans
 
 
 def interactive_loan_input():
@@ -174,6 +144,8 @@ def interactive_loan_input():
         print(f"  → Monthly: ${fixed_payment:,.2f}, Balloon: ${balloon_amount:,.2f}")
 
     print()
+    day_count = input("Interest day count (actual/360, 30/360, actual/365) [actual/360]: ").strip() or "actual/360"
+    print()
 
     return {
         'loan_id': loan_id,
@@ -190,6 +162,7 @@ def interactive_loan_input():
         'amort_months': amort_months,
         'fixed_payment': fixed_payment,
         'balloon_amount': balloon_amount,
+        'day_count': day_count,
         'structure_choice': structure_choice
     }
 
@@ -197,281 +170,41 @@ def interactive_loan_input():
 def generate_loan_schedule(config):
     """Generate payment schedule based on loan configuration"""
 
-    schedule = []
-    payment_number = 1
-    current_date = config['start_date']
-    balance = config['current_balance']
+    loan = Loan.from_config(config)
 
-    print(f"Generating payment schedule for {config['loan_name']}...")
-    print(f"  Balance: ${balance:,.2f}")
-    print(f"  Rate: {config['annual_rate']*100:.2f}%")
+    print(f"Generating payment schedule for {loan.loan_name}...")
+    print(f"  Balance: ${loan.current_balance:,.2f}")
+    print(f"  Rate: {loan.annual_rate*100:.2f}%")
     print()
 
-    # Interest-only period
-    if config['io_months'] > 0:
-        print(f"  Generating {config['io_months']} I/O payments...")
-
-        for _ in range(config['io_months']):
-            payment_date = generate_payment_date(
-                config['start_date'],
-                payment_number - 1,
-                config['payment_day']
-            )
-
-            interest = calculate_monthly_interest(balance, config['annual_rate'], 30)
-
-            schedule.append({
-                'schedule_id': str(uuid.uuid4()),
-                'loan_id': config['loan_id'],
-                'loan_name': config['loan_name'],
-                'lender': config['lender'],
-                'payment_date': payment_date.isoformat(),
-                'payment_number': payment_number,
-                'payment_amount': round(interest, 2),
-                'principal_amount': 0.00,
-                'interest_amount': round(interest, 2),
-                'fees_amount': 0.00,
-                'beginning_principal': round(balance, 2),
-                'ending_principal': round(balance, 2),
-                'interest_rate': config['annual_rate'],
-                'days_in_period': 30,
-                'is_paid': payment_date < date.today(),
-                'payment_type': 'Interest Only',
-                'is_forecast': payment_date >= date.today(),
-            })
-
-            payment_number += 1
-
-    # Principal & Interest period
-    if config['amort_months'] > 0:
-        print(f"  Generating {config['amort_months']} P&I payments...")
-
-        months_remaining = config['amort_months']
-
-        for _ in range(config['amort_months']):
-            payment_date = generate_payment_date(
-                config['start_date'],
-                payment_number - 1,
-                config['payment_day']
-            )
-
-            monthly_payment = calculate_monthly_pi_payment(
-                balance,
-                config['annual_rate'],
-                months_remaining
-            )
-
-            interest = calculate_monthly_interest(balance, config['annual_rate'], 30)
-            principal = monthly_payment - interest
-
-            # Ensure we don't overpay on last payment
-            if principal > balance:
-                principal = balance
-                monthly_payment = principal + interest
-
-            new_balance = max(0, balance - principal)
-
-            schedule.append({
-                'schedule_id': str(uuid.uuid4()),
-                'loan_id': config['loan_id'],
-                'loan_name': config['loan_name'],
-                'lender': config['lender'],
-                'payment_date': payment_date.isoformat(),
-                'payment_number': payment_number,
-                'payment_amount': round(monthly_payment, 2),
-                'principal_amount': round(principal, 2),
-                'interest_amount': round(interest, 2),
-                'fees_amount': 0.00,
-                'beginning_principal': round(balance, 2),
-                'ending_principal': round(new_balance, 2),
-                'interest_rate': config['annual_rate'],
-                'days_in_period': 30,
-                'is_paid': payment_date < date.today(),
-                'payment_type': 'Principal & Interest',
-                'is_forecast': payment_date >= date.today(),
-            })
-
-            balance = new_balance
-            months_remaining -= 1
-            payment_number += 1
-
-    # Fixed payment structure
-    elif config['fixed_payment'] is not None and config['balloon_amount'] is None:
-        print(f"  Generating fixed payments of ${config['fixed_payment']:,.2f}...")
-
-        current_date = config['start_date']
-
-        while balance > 0 and current_date <= config['maturity_date']:
-            payment_date = generate_payment_date(
-                config['start_date'],
-                payment_number - 1,
-                config['payment_day']
-            )
-
-            interest = calculate_monthly_interest(balance, config['annual_rate'], 30)
-            principal = min(config['fixed_payment'] - interest, balance)
-            monthly_payment = principal + interest
-
-            new_balance = max(0, balance - principal)
-
-            schedule.append({
-                'schedule_id': str(uuid.uuid4()),
-                'loan_id': config['loan_id'],
-                'loan_name': config['loan_name'],
-                'lender': config['lender'],
-                'payment_date': payment_date.isoformat(),
-                'payment_number': payment_number,
-                'payment_amount': round(monthly_payment, 2),
-                'principal_amount': round(principal, 2),
-                'interest_amount': round(interest, 2),
-                'fees_amount': 0.00,
-                'beginning_principal': round(balance, 2),
-                'ending_principal': round(new_balance, 2),
-                'interest_rate': config['annual_rate'],
-                'days_in_period': 30,
-                'is_paid': payment_date < date.today(),
-                'payment_type': 'Fixed Payment',
-                'is_forecast': payment_date >= date.today(),
-            })
-
-            balance = new_balance
-            payment_number += 1
-            current_date = payment_date
-
-    # Balloon payment structure
-    elif config['balloon_amount'] is not None:
-        print(f"  Generating monthly payments + balloon...")
-
-        current_date = config['start_date']
-
-        # Generate monthly payments until maturity
-        while current_date < config['maturity_date']:
-            payment_date = generate_payment_date(
-                config['start_date'],
-                payment_number - 1,
-                config['payment_day']
-            )
-
-            if payment_date >= config['maturity_date']:
-                break
-
-            interest = calculate_monthly_interest(balance, config['annual_rate'], 30)
-
-            # Fixed payment is interest + small principal
-            principal = config['fixed_payment'] - interest
-            monthly_payment = config['fixed_payment']
-
-            new_balance = max(0, balance - principal)
-
-            schedule.append({
-                'schedule_id': str(uuid.uuid4()),
-                'loan_id': config['loan_id'],
-                'loan_name': config['loan_name'],
-                'lender': config['lender'],
-                'payment_date': payment_date.isoformat(),
-                'payment_number': payment_number,
-                'payment_amount': round(monthly_payment, 2),
-                'principal_amount': round(principal, 2),
-                'interest_amount': round(interest, 2),
-                'fees_amount': 0.00,
-                'beginning_principal': round(balance, 2),
-                'ending_principal': round(new_balance, 2),
-                'interest_rate': config['annual_rate'],
-                'days_in_period': 30,
-                'is_paid': payment_date < date.today(),
-                'payment_type': 'Regular Payment',
-                'is_forecast': payment_date >= date.today(),
-            })
-
-            balance = new_balance
-            payment_number += 1
-            current_date = payment_date
-
-        # Add balloon payment
-        balloon_principal = balance
-        balloon_interest = calculate_monthly_interest(balance, config['annual_rate'], 30)
-        balloon_total = config['balloon_amount']
-
-        schedule.append({
-            'schedule_id': str(uuid.uuid4()),
-            'loan_id': config['loan_id'],
-            'loan_name': config['loan_name'],
-            'lender': config['lender'],
-            'payment_date': config['maturity_date'].isoformat(),
-            'payment_number': payment_number,
-            'payment_amount': round(balloon_total, 2),
-            'principal_amount': round(balloon_principal, 2),
-            'interest_amount': round(balloon_interest, 2),
-            'fees_amount': 0.00,
-            'beginning_principal': round(balance, 2),
-            'ending_principal': 0.00,
-            'interest_rate': config['annual_rate'],
-            'days_in_period': 30,
-            'is_paid': config['maturity_date'] < date.today(),
-            'payment_type': 'Balloon Payment',
-            'is_forecast': config['maturity_date'] >= date.today(),
-        })
+    schedule = generate_schedules([loan])
+    schedule['payment_date'] = schedule['payment_date'].dt.strftime('%Y-%m-%d')
 
+    for payment_type, count in schedule['payment_type'].value_counts(sort=False).items():
+        print(f"  {count} {payment_type} payments")
     print(f"  → Generated {len(schedule)} payments")
     print()
 
-    return schedule
+    return schedule.to_dict('records')
 
 
-def insert_schedule_to_bigquery(bq, schedule):
-    """Insert loan schedule into debt_schedule table"""
+def insert_schedule_to_bigquery(bq, config):
+    """Write the loan's schedule to debt_schedule (one MERGE, safe to re-run)"""
 
-    print(f"Inserting {len(schedule)} payments into BigQuery...")
+    print("Merging schedule into debt_schedule...")
     print()
 
-    success_count = 0
-    error_count = 0
-
-    for i, pmt in enumerate(schedule, 1):
-        if i % 12 == 0:
-            print(f"  Processed {i}/{len(schedule)} payments...")
-
-        # Build INSERT statement
-        columns = ', '.join(pmt.keys())
-
-        # Build values with proper SQL formatting
-        values = []
-        for key, value in pmt.items():
-            if value is None:
-                values.append('NULL')
-            elif isinstance(value, bool):
-                values.append('TRUE' if value else 'FALSE')
-            elif isinstance(value, (int, float)):
-                values.append(str(value))
-            else:
-                # String - escape single quotes
-                escaped = str(value).replace("'", "\\'")
-                values.append(f"'{escaped}'")
-
-        values_str = ', '.join(values)
-
-        sql = f"""
-        INSERT INTO `vochill.revrec.debt_schedule` ({columns})
-        VALUES ({values_str})
-        """
-
-        try:
-            bq.query(sql)
-            success_count += 1
-        except Exception as e:
-            error_msg = str(e)
-            if 'already exists' in error_msg.lower() or 'duplicate' in error_msg.lower():
-                success_count += 1
-            else:
-                print(f"❌ Error on payment {i}: {error_msg[:80]}")
-                error_count += 1
+    try:
+        result = sync_loans(bq, [Loan.from_config(config)])
+    except Exception as e:
+        print(f"❌ ERROR: Failed to merge schedule")
+        print(f"   {str(e)}")
+        return False
 
-    print()
-    print(f"✅ Success: {success_count}/{len(schedule)}")
-    print(f"❌ Errors:  {error_count}/{len(schedule)}")
+    print(f"✅ {result['payments']} payments synced ({result['rows_affected']} rows changed)")
     print()
 
-    return error_count == 0
+    return True
 
 
 def main():
@@ -565,7 +298,7 @@ def main():
         sys.exit(1)
 
     # Insert schedule
-    success = insert_schedule_to_bigquery(bq, schedule)
+    success = insert_schedule_to_bigquery(bq, config)
 
     print()
     print("=" * 60)
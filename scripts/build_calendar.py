@@ -0,0 +1,103 @@
+"""
+Build the business_calendar date dimension
+
+Compiles payment_timing.yaml payout rules and the US bank holiday schedule
+into one row per day (business day flags, next/previous business day and
+per-platform payout dates) and replaces the business_calendar table with a
+single load job. The settlement ETLs join this table for cash dates.
+
+Re-run after editing revenue_timing in payment_timing.yaml; the nightly
+pipeline rebuilds it before the cash_transactions loaders.
+
+Usage:
+    python scripts/build_calendar.py [--start-year 2021] [--end-year 2031] [--dry-run] [--yes]
+"""
+
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.etl.settlements import CALENDAR_TABLE
+from src.timing import BusinessCalendar
+
+
+def main():
+    this_year = date.today().year
+
+    parser = argparse.ArgumentParser(description='Build the business_calendar date dimension')
+    parser.add_argument('--start-year', type=int, default=this_year - 5, help='First year (default: 5 years back)')
+    parser.add_argument('--end-year', type=int, default=this_year + 5, help='Last year (default: 5 years ahead)')
+    parser.add_argument('--dry-run', action='store_true', help='Show the calendar only, do not load')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Business Calendar")
+    print("=" * 60)
+    print()
+
+    # Holidays one year past the range so late-December payouts roll correctly
+    calendar = BusinessCalendar(args.start_year, args.end_year + 1)
+    dim = calendar.date_dimension(f"{args.start_year}-01-01", f"{args.end_year}-12-31")
+
+    print(f"Range: {args.start_year}-01-01 → {args.end_year}-12-31 ({len(dim):,} days)")
+    print(f"Business days: {int(dim['is_business_day'].sum()):,}")
+    print(f"Bank holidays: {int(dim['is_bank_holiday'].sum()):,}")
+    print()
+
+    print("Payout rules (payment_timing.yaml):")
+    for platform, rule in calendar.rules.items():
+        days = "business days" if rule.payout_weekmask else "any day"
+        cycle = f", {rule.cycle_days}-day settlement cycle" if rule.cycle_days else ""
+        print(f"  {platform:<8} close + {rule.lag_days} days, paid on {days}{cycle}")
+        if rule.cycle_days and rule.anchor_date is None:
+            print(f"           ⚠️  No settlement_anchor_date - {platform.lower()}_settlement_end left NULL")
+    print()
+
+    print(f"Holidays in {this_year}:")
+    holidays = calendar.holidays[calendar.holidays['holiday_date'].dt.year == this_year]
+    for _, row in holidays.iterrows():
+        print(f"  {row['holiday_date']:%a %Y-%m-%d}  {row['holiday_name']}")
+    print()
+
+    if args.dry_run:
+        print("✅ DRY RUN COMPLETE - Table not loaded")
+        sys.exit(0)
+
+    if not args.yes:
+        response = input(f"Replace {CALENDAR_TABLE} with {len(dim):,} rows? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
+        print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    try:
+        job = bq.load_dataframe(dim, CALENDAR_TABLE)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to load {CALENDAR_TABLE}")
+        print(f"   {str(e)}")
+        print()
+        print("Create the table first: python scripts/create_tables.py")
+        sys.exit(1)
+
+    print(f"✅ SUCCESS: Loaded {job.output_rows:,} rows into {CALENDAR_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,23 @@
 Build 13-Week Rolling Cash Flow Forecast
 
 This script generates a 13-week forward-looking cash flow forecast by:
-1. Analyzing historical revenue trends (deposits)
+1. Projecting net revenue payouts from the SKU demand forecast (forecast,
+   forecast_override, item prices, platform fee rates and payout lags)
 2. Projecting operating expenses based on recent averages
 3. Adding recurring transactions (SBA loan, subscriptions)
-4. Adding scheduled debt payments
-5. Calculating weekly cash position and runway
+4. Adding scheduled debt payments (optionally with variable-rate loans
+   re-amortized under a rate shock, from data/loans/)
+5. Adding open purchase-order commitments (delivery + vendor terms)
+6. Optionally scheduling open vendor invoices at a percentile of each
+   vendor's observed payment lag (scripts/fit_vendor_lags.py)
+7. Calculating weekly cash position and runway
 
 Supports multiple scenarios: base (conservative), best, worst
 
 Usage:
-    python scripts/build_forecast.py [--weeks 13] [--scenario base]
+    python scripts/build_forecast.py [--weeks 13] [--scenario base] [--lag-percentile 75] [--yes]
+    python scripts/build_forecast.py --weekly-revenue 50000  # flat manual revenue instead
+    python scripts/build_forecast.py --rate-shock 0.01       # variable-rate debt at +100bp
 """
 
 import sys
@@ -25,23 +32,41 @@ import numpy as np
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.data import BigQueryConnector
+from src.data import BigQueryConnector, VendorMaster
+from src.debt import amortize, discover_loan_files, load_loans, loan_terms, schedule_frame, shifted_rates
+from src.forecast import POCommitments, RevenueProjection
+from src.forecast.fee_rates import DEFAULT_WINDOW_WEEKS, WINDOWS
+from src.timing.vendor_lags import DEFAULT_MAX_LAG_DAYS, PERCENTILES, PaymentLagModel
+
+# Actuals loaded from platform payouts. The SKU forecast projection nets
+# platform fees and refunds off revenue, so their outflows stay out of the
+# OpEx average whenever it supplies revenue.
+REVENUE_SOURCE_TABLES = ('deposits', 'refunds', 'shopify_payouts')
 
 
 def get_historical_actuals(bq, lookback_weeks=12):
-    """Get historical cash transactions for analysis"""
+    """
+    Get historical cash transactions for analysis
+
+    is_po_invoice flags invoice-paid outflows whose invoice references a PO.
+    """
 
     query = f"""
     SELECT
-      cash_date,
-      cash_flow_section,
-      cash_flow_category,
-      counterparty,
-      amount
-    FROM `vochill.revrec.cash_transactions`
-    WHERE is_forecast = FALSE
-      AND cash_date >= DATE_SUB(CURRENT_DATE(), INTERVAL {lookback_weeks} WEEK)
-    ORDER BY cash_date
+      ct.cash_date,
+      ct.cash_flow_section,
+      ct.cash_flow_category,
+      ct.counterparty,
+      ct.source_table,
+      ct.amount,
+      i.po_number IS NOT NULL as is_po_invoice
+    FROM `vochill.revrec.cash_transactions` ct
+    LEFT JOIN `vochill.revrec.invoices` i
+      ON ct.source_table = 'invoices'
+      AND CAST(i.invoice_id AS STRING) = ct.source_id
+    WHERE ct.is_forecast = FALSE
+      AND ct.cash_date >= DATE_SUB(CURRENT_DATE(), INTERVAL {lookback_weeks} WEEK)
+    ORDER BY ct.cash_date
     """
 
     return bq.query(query)
@@ -138,6 +163,7 @@ def get_debt_schedule(bq, weeks=13):
 
     query = f"""
     SELECT
+      loan_id,
       payment_date,
       loan_name,
       lender,
@@ -154,7 +180,71 @@ def get_debt_schedule(bq, weeks=13):
     return bq.query(query)
 
 
-def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
+def get_open_invoices(bq, max_lag_days=DEFAULT_MAX_LAG_DAYS):
+    """Get invoices recent enough to still be awaiting payment"""
+
+    query = f"""
+    SELECT
+      invoice_id,
+      vendor,
+      invoice_date,
+      total
+    FROM `vochill.revrec.invoices`
+    WHERE total > 0
+      AND invoice_date >= DATE_SUB(CURRENT_DATE(), INTERVAL {max_lag_days} DAY)
+    """
+
+    return bq.query(query)
+
+
+def schedule_invoice_payments(invoices, model, percentile, start_date, weeks):
+    """
+    Bucket open invoices into forecast weeks by their percentile cash date
+
+    Invoices whose cash date at the percentile is already past are treated
+    as paid. One row per week with the total due.
+    """
+
+    if len(invoices) == 0:
+        return pd.DataFrame()
+
+    cash_dates = model.cash_dates(invoices['vendor'], invoices['invoice_date'], percentile=percentile)
+    days_out = (cash_dates - np.datetime64(start_date, 'D')).astype('int64')
+
+    due = invoices.assign(week_number=days_out // 7 + 1)
+    due = due[(days_out >= 0) & (due['week_number'] <= weeks)]
+
+    weekly = due.groupby('week_number').agg(amount=('total', 'sum'), invoices=('invoice_id', 'count'))
+    return weekly.reset_index()
+
+
+def apply_rate_shock(debt_schedule, rate_shock, weeks=13):
+    """
+    Replace the payments of variable-rate loans (data/loans/ configs with a
+    rate_margin) with their schedule re-amortized at rates moved by rate_shock
+    """
+    loans, errors = load_loans(discover_loan_files())
+    for path, error in errors.items():
+        print(f"  ⚠️  {path.name}: {error}")
+    variable = [loan for loan in loans if loan.is_variable]
+    if not variable:
+        return debt_schedule, []
+
+    today = date.today()
+    terms = loan_terms(variable)
+    shocked = schedule_frame(variable, amortize(terms, rates=shifted_rates(variable, terms, rate_shock, today)))
+    shocked['payment_date'] = shocked['payment_date'].dt.date
+    horizon = today + timedelta(weeks=weeks)
+    shocked = shocked[(shocked['payment_date'] >= today) & (shocked['payment_date'] <= horizon)]
+
+    ids = [loan.loan_id for loan in variable]
+    kept = debt_schedule[~debt_schedule['loan_id'].isin(ids)]
+    combined = pd.concat([kept, shocked[debt_schedule.columns]], ignore_index=True)
+    return combined.sort_values('payment_date', kind='stable').reset_index(drop=True), ids
+
+
+def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0, lag_percentile=None,
+                             fee_window=DEFAULT_WINDOW_WEEKS, rate_shock=0.0):
     """
     Generate weekly cash flow forecast
 
@@ -162,7 +252,16 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
         bq: BigQueryConnector instance
         weeks: Number of weeks to forecast (default 13)
         scenario: 'base', 'best', or 'worst'
-        weekly_revenue: Manual weekly revenue input (default 0 - revenue calculated separately)
+        weekly_revenue: Flat weekly revenue overriding the SKU forecast
+                        projection (default 0: use the projection)
+        lag_percentile: Schedule open vendor invoices (and date PO payments)
+                        at this percentile of observed payment lags (None:
+                        open invoices covered by the OpEx average, POs
+                        paid on terms)
+        fee_window: Rolling window (weeks) of the platform fee and refund
+                    rates netted from projected revenue
+        rate_shock: Parallel shift of variable loan rates (0.01 = +100bp);
+                    their payments are re-amortized from data/loans/ configs
 
     Returns:
         DataFrame with weekly forecast
@@ -171,10 +270,41 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
     print(f"Generating {weeks}-week {scenario} scenario forecast...")
     print()
 
+    vendors = VendorMaster.load(bq)
+
+    lag_model = None
+    invoice_payments = pd.DataFrame()
+    if lag_percentile is not None:
+        print(f"Scheduling open vendor invoices (p{lag_percentile} payment lag)...")
+        try:
+            lag_model = PaymentLagModel.load(vendors=vendors)
+            invoice_payments = schedule_invoice_payments(
+                get_open_invoices(bq), lag_model, lag_percentile, date.today(), weeks
+            )
+            print(f"  Invoices: {int(invoice_payments['invoices'].sum()) if len(invoice_payments) else 0} due in horizon")
+        except FileNotFoundError as e:
+            print(f"⚠️  WARNING: {e}")
+            print("   Open invoices are not scheduled.")
+        print()
+
     # Get historical data for expense analysis only
     print("Analyzing historical expenses...")
     actuals = get_historical_actuals(bq, lookback_weeks=12)
 
+    # PO-linked invoice payments are projected from open PO lines below, and
+    # once open invoices are scheduled every invoice-paid outflow is; the
+    # rest of the vendor spend stays in the OpEx average
+    if len(actuals) > 0:
+        if lag_model is not None:
+            actuals = actuals[actuals['source_table'].ne('invoices')]
+        else:
+            actuals = actuals[~actuals['is_po_invoice'].fillna(False).astype(bool)]
+
+    # Refund and payout-fee outflows are netted in the revenue projection,
+    # which also counts payouts still pending for sales made before today
+    if weekly_revenue <= 0 and len(actuals) > 0:
+        actuals = actuals[~actuals['source_table'].isin(REVENUE_SOURCE_TABLES)]
+
     if len(actuals) == 0:
         print("⚠️  WARNING: No historical actuals found!")
         print("   Forecast will be based on recurring transactions and debt payments only.")
@@ -183,11 +313,29 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
         expense_patterns = analyze_expense_patterns(actuals)
         print(f"  Expenses: ${expense_patterns['weekly_avg']:,.0f}/week (avg)")
 
-    # Revenue is provided manually or calculated separately
+    print()
+
+    # Revenue: SKU forecast → net platform payouts, unless given manually
+    revenue_payouts = pd.DataFrame()
     if weekly_revenue > 0:
-        print(f"  Revenue: ${weekly_revenue:,.0f}/week (manual input)")
+        print(f"Revenue: ${weekly_revenue:,.0f}/week (manual input)")
     else:
-        print(f"  Revenue: $0/week (revenue calculated in separate model)")
+        print("Projecting revenue payouts from the SKU forecast...")
+        projection = RevenueProjection.load(bq, window_weeks=fee_window)
+        revenue_payouts = projection.weekly(start_date=date.today(), weeks=weeks)
+        status = projection.status()
+        print(f"  Forecast: {status['skus']} SKUs over {status['months']} months "
+              f"({status['overridden_rows']} rows overridden)")
+        if status['first_month'] is not None and status['first_month'] > date.today().replace(day=1):
+            print(f"  ⚠️  Forecast starts {status['first_month']}: payouts still pending for earlier sales "
+                  f"are missing from the first weeks")
+        if len(revenue_payouts):
+            print(f"  Net payouts: ${revenue_payouts['net'].sum() / weeks:,.0f}/week (avg), "
+                  f"after ${revenue_payouts['fees'].sum() + revenue_payouts['refunds'].sum():,.0f} fees and refunds")
+        else:
+            print("  ⚠️  No forecast revenue paid out in the horizon")
+        if status['unpriced_rows']:
+            print(f"  ⚠️  {status['unpriced_rows']} forecast rows have no sell price or forecast revenue")
     print()
 
     # Get recurring and debt
@@ -196,6 +344,34 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
     debt_schedule = get_debt_schedule(bq, weeks=weeks)
     print(f"  Recurring: {len(recurring)} items")
     print(f"  Debt payments: {len(debt_schedule)} scheduled")
+    if rate_shock:
+        before = debt_schedule['payment_amount'].sum()
+        debt_schedule, shocked_ids = apply_rate_shock(debt_schedule, rate_shock, weeks=weeks)
+        if shocked_ids:
+            print(f"  Rate shock {rate_shock:+.2%} on {', '.join(shocked_ids)}: debt service "
+                  f"${debt_schedule['payment_amount'].sum() - before:+,.0f} over the horizon")
+        else:
+            print("  ⚠️  Rate shock ignored: no variable-rate loans in data/loans/")
+    print()
+
+
+    # Open PO lines: re-pulled only when po_line_item (or pricing) changed
+    print("Projecting open purchase-order commitments...")
+    commitments = POCommitments.load(bq)
+    po_lines = commitments.project(
+        vendors,
+        lags=lag_model,
+        lag_percentile=lag_percentile or 50,
+    )
+    po_payments = commitments.weekly(po_lines, start_date=date.today(), weeks=weeks)
+    status = commitments.status()
+    print(f"  Open PO lines: {status['open_lines']} ({status['open_pos']} POs)")
+    if commitments.changes:
+        print(f"  Since last refresh: {status['receipts']} receipts ({status['units_received']:,} units), "
+              f"{status['closed_lines']} lines closed, {status['new_lines']} new")
+    unpriced = int((po_lines['price_source'] == 'unpriced').sum())
+    if unpriced:
+        print(f"  ⚠️  {unpriced} lines have no vendor price, item price or build cost")
     print()
 
     # Scenario multipliers
@@ -215,7 +391,7 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
         week_start = start_date + timedelta(weeks=week_num - 1)
         week_end = week_start + timedelta(days=6)
 
-        # Revenue forecast (from manual input)
+        # Revenue forecast (manual input; otherwise projected payouts below)
         if weekly_revenue > 0:
             weekly_revenue_forecast = weekly_revenue * factors['revenue']
 
@@ -302,6 +478,60 @@ def generate_weekly_forecast(bq, weeks=13, scenario='base', weekly_revenue=0):
                 'scenario': scenario
             })
 
+    # Add projected revenue payouts (weekly totals per platform)
+    for _, payout in revenue_payouts.iterrows():
+        week_num = int(payout['week_number'])
+        week_start = start_date + timedelta(weeks=week_num - 1)
+        week_end = week_start + timedelta(days=6)
+
+        forecast_rows.append({
+            'week_number': week_num,
+            'week_start': week_start,
+            'week_end': week_end,
+            'transaction_date': week_end,
+            'cash_flow_section': 'Operating',
+            'cash_flow_category': f"Revenue - {payout['platform']}",
+            'description': f"Week {week_num} - {payout['platform']} payouts (forecast, net of fees)",
+            'amount': payout['net'] * factors['revenue'],
+            'scenario': scenario
+        })
+
+    # Add open PO commitments (weekly totals)
+    for _, due in po_payments.iterrows():
+        week_num = int(due['week_number'])
+        week_start = start_date + timedelta(weeks=week_num - 1)
+        week_end = week_start + timedelta(days=6)
+
+        forecast_rows.append({
+            'week_number': week_num,
+            'week_start': week_start,
+            'week_end': week_end,
+            'transaction_date': week_end,
+            'cash_flow_section': 'Operating',
+            'cash_flow_category': 'COGS - Materials',
+            'description': f"Week {week_num} - PO commitments ({int(due['lines'])} lines, {int(due['pos'])} POs)",
+            'amount': -due['amount'] * factors['expenses'],
+            'scenario': scenario
+        })
+
+    # Add open vendor invoices (weekly totals)
+    for _, due in invoice_payments.iterrows():
+        week_num = int(due['week_number'])
+        week_start = start_date + timedelta(weeks=week_num - 1)
+        week_end = week_start + timedelta(days=6)
+
+        forecast_rows.append({
+            'week_number': week_num,
+            'week_start': week_start,
+            'week_end': week_end,
+            'transaction_date': week_end,
+            'cash_flow_section': 'Operating',
+            'cash_flow_category': 'COGS - Materials',
+            'description': f"Week {week_num} - Vendor invoices ({int(due['invoices'])}, p{lag_percentile} lag)",
+            'amount': -due['amount'] * factors['expenses'],
+            'scenario': scenario
+        })
+
     forecast_df = pd.DataFrame(forecast_rows)
 
     return forecast_df
@@ -344,23 +574,16 @@ def insert_forecast_to_bigquery(bq, forecast_df, scenario='base'):
     print(f"Inserting {len(forecast_df)} forecast transactions into BigQuery...")
     print()
 
-    # Delete existing forecasts for this scenario
+    # Replace this scenario's rows in one transaction: the scenarios run as
+    # concurrent DAG steps against the same cash_date partitions, and a
+    # DELETE that fails (e.g. a concurrent update conflict) must not leave
+    # the INSERT to duplicate the previous forecast
     delete_query = f"""
     DELETE FROM `vochill.revrec.cash_transactions`
     WHERE is_forecast = TRUE
       AND scenario_id = '{scenario}'
     """
 
-    try:
-        bq.query(delete_query)
-        print(f"✅ Cleared existing {scenario} forecast")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not clear existing forecast: {e}")
-
-    print()
-
-    # Build INSERT query
-    # Using server-side INSERT for efficiency
     insert_query = """
     INSERT INTO `vochill.revrec.cash_transactions` (
       transaction_id, transaction_date, cash_date, value_date,
@@ -405,14 +628,17 @@ def insert_forecast_to_bigquery(bq, forecast_df, scenario='base'):
           'forecast_engine'
         )""")
 
-    full_query = insert_query + ",\n".join(values_rows)
+    statements = [delete_query]
+    if values_rows:
+        statements.append(insert_query + ",\n".join(values_rows))
+    script = "BEGIN TRANSACTION;\n" + ";\n".join(statements) + ";\nCOMMIT TRANSACTION;"
 
     try:
-        bq.query(full_query)
-        print(f"✅ Inserted {len(forecast_df)} forecast transactions")
+        bq.execute(script)
+        print(f"✅ Replaced {scenario} forecast: {len(forecast_df)} transactions")
         return True
     except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
+        print(f"❌ ERROR: {scenario} forecast not replaced (rolled back): {str(e)}")
         return False
 
 
@@ -422,8 +648,15 @@ def main():
     parser.add_argument('--scenario', default='base', choices=['base', 'best', 'worst'],
                         help='Forecast scenario')
     parser.add_argument('--weekly-revenue', type=float, default=0,
-                        help='Manual weekly revenue input (default 0 - revenue calculated separately)')
+                        help='Flat weekly revenue instead of the SKU forecast projection (default 0: projection)')
+    parser.add_argument('--lag-percentile', type=int, choices=PERCENTILES,
+                        help='Schedule open vendor invoices at this percentile of observed payment lags')
+    parser.add_argument('--fee-window', type=int, default=DEFAULT_WINDOW_WEEKS, choices=WINDOWS,
+                        help='Weeks of platform fee/refund history netted from projected revenue (default: 13)')
+    parser.add_argument('--rate-shock', type=float, default=0.0,
+                        help='Shift variable loan rates by this much, e.g. 0.01 = +100bp (default: none)')
     parser.add_argument('--preview', action='store_true', help='Preview only, do not insert')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
 
     args = parser.parse_args()
 
@@ -448,7 +681,10 @@ def main():
         bq,
         weeks=args.weeks,
         scenario=args.scenario,
-        weekly_revenue=args.weekly_revenue
+        weekly_revenue=args.weekly_revenue,
+        lag_percentile=args.lag_percentile,
+        fee_window=args.fee_window,
+        rate_shock=args.rate_shock
     )
 
     print("=" * 60)
@@ -490,10 +726,11 @@ def main():
         sys.exit(0)
 
     # Confirm before inserting
-    response = input(f"Insert {args.scenario} scenario forecast into BigQuery? (y/n): ").strip().lower()
-    if response != 'y':
-        print("Cancelled.")
-        sys.exit(0)
+    if not args.yes:
+        response = input(f"Insert {args.scenario} scenario forecast into BigQuery? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
 
     print()
 
@@ -524,6 +761,7 @@ def main():
     else:
         print("❌ FAILED: Error occurred during insert")
         print()
+        sys.exit(1)
 
 
 if __name__ == "__main__":
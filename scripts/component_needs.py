@@ -0,0 +1,118 @@
+"""
+Component cash needs from the SKU demand forecast
+
+Explodes the forecast table's monthly SKU units through bundles and BOMs
+into purchased components, prices them from vendor-item-pricing (falling
+back to item prices) and shows the monthly purchase outflows.
+
+Inputs are cached under data/processed/forecast_inputs and re-queried only
+when bom, bom_item, bundle, forecast, item or vendor-item-pricing change.
+
+Usage:
+    python scripts/component_needs.py [--start-month YYYY-MM] [--months 12] [--csv PATH] [--refresh]
+"""
+
+import sys
+import argparse
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector, VendorMaster
+from src.forecast.bom import BOM_EDGES_SOURCE, DEMAND_SOURCE, BOMGraph, price_component_needs
+from src.forecast.pricing import ITEMS_SOURCE, PRICING_SOURCE
+from src.forecast.sources import load_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Component cash needs from the SKU demand forecast')
+    parser.add_argument('--start-month', default=date.today().strftime('%Y-%m'),
+                        help='First forecast month (YYYY-MM, default: this month)')
+    parser.add_argument('--months', type=int, default=12, help='Months to explode (default: 12)')
+    parser.add_argument('--csv', help='Write component needs to this CSV file')
+    parser.add_argument('--refresh', action='store_true', help='Re-query inputs even if unchanged')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Component Cash Needs")
+    print("=" * 60)
+    print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    sources = [BOM_EDGES_SOURCE, DEMAND_SOURCE, PRICING_SOURCE, ITEMS_SOURCE]
+    try:
+        frames, replaced = load_sources(bq, sources, refresh=args.refresh)
+        vendors = VendorMaster.load(bq)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to load inputs")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    print(f"Inputs ({len(replaced)} re-queried, {len(sources) - len(replaced)} from local copy):")
+    for name, df in frames.items():
+        print(f"  {name:<10} {len(df):,} rows")
+    print()
+
+    start = pd.Period(args.start_month, freq='M')
+    months = pd.period_range(start, periods=args.months, freq='M')
+    demand = frames['demand']
+    demand = demand[pd.to_datetime(demand['month']).dt.to_period('M').isin(months)]
+
+    try:
+        started = time.perf_counter()
+        graph = BOMGraph(frames['bom_edges'])
+        needs = graph.explode(demand)
+        priced = price_component_needs(needs, frames['pricing'], frames['items'], vendors)
+        elapsed = time.perf_counter() - started
+    except ValueError as e:
+        print(f"❌ ERROR: {str(e)}")
+        sys.exit(1)
+
+    print(f"Exploded {len(demand):,} SKU-months into {len(priced):,} component-months "
+          f"({int((graph.depth > 0).sum()):,} assemblies, max depth {int(graph.depth.max(initial=0))}) "
+          f"in {elapsed * 1000:,.0f} ms")
+    print()
+
+    if priced.empty:
+        print("No forecast demand in range.")
+        sys.exit(0)
+
+    monthly = priced.groupby('month').agg(components=('component_sku', 'nunique'), amount=('amount', 'sum'))
+    print(f"{'Month':<10} {'Components':>10} {'Purchases':>16}")
+    print("-" * 40)
+    for month, row in monthly.iterrows():
+        print(f"{pd.Timestamp(month):%Y-%m}    {int(row['components']):>10,} ${row['amount']:>14,.0f}")
+    print()
+
+    top = priced.groupby(['component_sku', 'vendor'], dropna=False)[['qty', 'amount']].sum()
+    print("Largest components:")
+    print(top.nlargest(10, 'amount').to_string())
+    print()
+
+    unpriced = priced[priced['price_source'] == 'unpriced']['component_sku'].nunique()
+    if unpriced:
+        print(f"⚠️  {unpriced} components have no vendor price, item price or build cost")
+        print()
+
+    if args.csv:
+        priced.to_csv(args.csv, index=False)
+        print(f"✅ Wrote {len(priced):,} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
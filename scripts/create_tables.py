@@ -1,171 +1,153 @@
 """
-Create BigQuery financial tables using Python
+Create and migrate BigQuery financial tables from the DDL
 
-This script reads the DDL file and executes each CREATE statement
-using the BigQueryConnector.
+Parses database/create_financial_tables.sql, reads the live dataset from
+INFORMATION_SCHEMA in one query, and runs only the statements needed to
+bring it in line: CREATE for missing tables and views, ALTER for new
+columns, defaults, descriptions, widened types and dropped NOT NULLs,
+CREATE OR REPLACE for changed views. Tables are migrated concurrently,
+views after the tables (and views) they read from.
+
+Changes BigQuery cannot make in place (narrowing a type, adding NOT NULL,
+re-partitioning) are listed but never applied.
 
 Usage:
-    python scripts/create_tables.py
+    python scripts/create_tables.py [--dry-run] [--yes] [--workers 8]
 """
 
-import os
 import sys
+import argparse
+import time
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import BigQueryConnector
+from src.data.migrate import apply_migration, live_schema, plan_migration
+from src.data.schema import DDL_FILE, load_schema
 
 
-def parse_ddl_statements(ddl_file_path):
-    """Parse DDL file into individual CREATE statements"""
-    with open(ddl_file_path, 'r') as f:
-        content = f.read()
-
-    # Split on semicolons to get statements
-    raw_statements = content.split(';')
-
-    statements = []
-    for stmt in raw_statements:
-        # Clean up the statement
-        stmt = stmt.strip()
-
-        # Skip empty statements
-        if not stmt:
-            continue
-
-        # Skip pure comment blocks
-        lines = [line.strip() for line in stmt.split('\n') if line.strip()]
-        non_comment_lines = [line for line in lines if not line.startswith('--')]
-
-        if not non_comment_lines:
-            continue
+def print_plan(plan, parse_errors):
+    for level, changes in enumerate(plan.levels(), 1):
+        print(f"Step {level}: {len(changes)} object(s) in parallel")
+        for change in changes:
+            print(f"  • {change.action.upper():<8} {change.kind.lower():<17} {change.name}")
+            for note in change.notes:
+                print(f"      - {note}")
+        print()
 
-        # Keep statements that have actual SQL
-        if any(keyword in stmt.upper() for keyword in ['CREATE', 'INSERT', 'DROP', 'ALTER']):
-            statements.append(stmt)
+    if plan.unchanged:
+        print(f"Unchanged: {len(plan.unchanged)} object(s)")
+        print()
 
-    return statements
+    for name, error in parse_errors.items():
+        print(f"⚠️  {name}: could not read live definition ({error[:100]})")
+    for warning in plan.warnings:
+        print(f"⚠️  {warning}")
+    if plan.warnings or parse_errors:
+        print()
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Create and migrate BigQuery tables from the DDL')
+    parser.add_argument('--dry-run', action='store_true', help='Show the migration plan and SQL only')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent DDL jobs')
+    args = parser.parse_args()
+
     print("=" * 60)
-    print("VoChill Financial Tables - Creation Script")
+    print("VoChill Financial Tables - Schema Migration")
     print("=" * 60)
     print()
 
-    # Path to DDL file
-    ddl_file = Path(__file__).parent.parent / 'database' / 'create_financial_tables.sql'
+    if not DDL_FILE.exists():
+        print(f"❌ ERROR: DDL file not found at {DDL_FILE}")
+        return 1
 
-    if not ddl_file.exists():
-        print(f"❌ ERROR: DDL file not found at {ddl_file}")
-        sys.exit(1)
-
-    print(f"Reading DDL from: {ddl_file.name}")
-    print()
+    try:
+        schema = load_schema()
+    except ValueError as e:
+        print(f"❌ ERROR: Cannot parse {DDL_FILE.name}")
+        print(f"   {str(e)}")
+        return 1
 
-    # Parse statements
-    statements = parse_ddl_statements(ddl_file)
-    print(f"Found {len(statements)} DDL statements to execute")
+    tables = sum(not t.is_view for t in schema.values())
+    print(f"✅ {DDL_FILE.name}: {tables} tables, {len(schema) - tables} views")
     print()
 
-    # Confirm
-    response = input("Continue with table creation? (y/n): ").strip().lower()
-    if response != 'y':
-        print("Cancelled.")
-        sys.exit(0)
-
-    print()
     print("Connecting to BigQuery...")
-
     try:
         bq = BigQueryConnector()
-        print("✅ Connected to BigQuery")
+        start = time.perf_counter()
+        live, parse_errors = live_schema(bq)
+        print(f"✅ Read {len(live) + len(parse_errors)} live objects in {time.perf_counter() - start:.1f}s")
         print()
     except Exception as e:
-        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"❌ ERROR: Failed to read the dataset schema")
         print(f"   {str(e)}")
         print()
         print("Make sure:")
         print("  1. GCP_CREDENTIALS_PATH is set in .env")
         print("  2. Service account has BigQuery permissions")
-        sys.exit(1)
+        return 1
+
+    plan = plan_migration(schema, live)
+    print_plan(plan, parse_errors)
+
+    if plan.empty:
+        print("✅ Schema up to date - nothing to apply")
+        return 0
+
+    if args.dry_run:
+        for change in plan.changes:
+            print(f"-- {change.name} ({change.action})")
+            print(change.script)
+            print()
+        print("✅ DRY RUN COMPLETE - no changes applied")
+        return 0
+
+    if not args.yes:
+        response = input(f"Apply {len(plan.changes)} change(s)? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return 0
+        print()
 
-    # Execute each statement
-    print("=" * 60)
-    print("Executing DDL Statements...")
-    print("=" * 60)
-    print()
+    start = time.perf_counter()
+    results = apply_migration(bq, plan, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
 
-    success_count = 0
-    error_count = 0
-    errors = []
-
-    for i, stmt in enumerate(statements, 1):
-        # Extract table/view name for display
-        if 'CREATE TABLE' in stmt:
-            name = stmt.split('`')[1].split('.')[-1] if '`' in stmt else f"statement_{i}"
-            type_str = "TABLE"
-        elif 'CREATE VIEW' in stmt or 'CREATE OR REPLACE VIEW' in stmt:
-            name = stmt.split('`')[1].split('.')[-1] if '`' in stmt else f"statement_{i}"
-            type_str = "VIEW"
-        elif 'INSERT INTO' in stmt:
-            name = stmt.split('`')[1].split('.')[-1] if '`' in stmt else "seed_data"
-            type_str = "INSERT"
+    for result in results:
+        if result.ok:
+            print(f"  ✅ {result.change.action:<8} {result.change.name} ({result.seconds:.1f}s)")
         else:
-            name = f"statement_{i}"
-            type_str = "SQL"
-
-        print(f"[{i}/{len(statements)}] Creating {type_str}: {name}...", end=' ')
-
-        try:
-            bq.query(stmt)
-            print("✅")
-            success_count += 1
-        except Exception as e:
-            error_msg = str(e)
-            # Check if it's "already exists" error (which is OK)
-            if 'already exists' in error_msg.lower():
-                print("⚠️  (already exists)")
-                success_count += 1
-            else:
-                print(f"❌ ERROR")
-                print(f"     {error_msg[:100]}")
-                error_count += 1
-                errors.append({
-                    'name': name,
-                    'error': error_msg
-                })
-
+            print(f"  ❌ {result.change.action:<8} {result.change.name}")
+            print(f"     {result.error[:200]}")
     print()
+
+    failed = [r for r in results if not r.ok]
     print("=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"✅ Success: {success_count}/{len(statements)}")
-    print(f"❌ Errors:  {error_count}/{len(statements)}")
-    print()
-
-    if error_count > 0:
-        print("Errors encountered:")
-        for err in errors:
-            print(f"  • {err['name']}: {err['error'][:80]}")
-        print()
-        print("⚠️  Some tables may not have been created.")
-        print("   Review errors above and check BigQuery console.")
-    else:
-        print("✅ SUCCESS: All tables and views created!")
-        print()
-        print("Next steps:")
-        print("  1. Verify tables: python scripts/verify_tables.py")
-        print("  2. View in BigQuery Console:")
-        print("     https://console.cloud.google.com/bigquery?project=vochill&ws=!1m5!1m4!4m3!1svochill!2srevrec")
-        print()
-        print("  3. Populate master data:")
-        print("     - python scripts/populate_bank_accounts.py")
-        print("     - python scripts/populate_chart_of_accounts.py")
+    print(f"✅ Applied: {len(results) - len(failed)}/{len(results)} in {elapsed:.1f}s")
+    if failed:
+        print(f"❌ Failed:  {len(failed)}/{len(results)}")
         print()
+        print("⚠️  Review errors above and re-run - completed changes are not repeated.")
+        return 1
+
+    print()
+    print("✅ SUCCESS: Schema migrated!")
+    print()
+    print("Next steps:")
+    print("  1. Verify tables: python scripts/verify_tables.py")
+    print("  2. Populate master data:")
+    print("     - python scripts/seed.py")
+    print("     - python scripts/populate_chart_of_accounts.py")
+    print()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+ETL Orchestrator: run the cash flow refresh as a dependency DAG
+
+Runs every loader into cash_transactions concurrently, then the downstream
+steps (forecast scenarios) once their inputs succeed. Failed steps are
+retried; anything downstream of a failure is skipped. Per-step output is
+written to outputs/etl_logs/.
+
+Usage:
+    python scripts/etl.py list
+    python scripts/etl.py run [--non-interactive] [--steps STEP,...] [--max-workers 4] [--retries 1]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.etl.pipeline import (
+    critical_path_seconds,
+    default_steps,
+    run_pipeline,
+    select_steps,
+    validate_steps,
+)
+
+
+def print_plan(steps):
+    """Print steps in execution order with their dependencies"""
+    by_name = {s.name: s for s in steps}
+    for name in validate_steps(steps):
+        step = by_name[name]
+        deps = f" ← {', '.join(step.depends_on)}" if step.depends_on else ""
+        print(f"  • {name:<20} {step.description}{deps}")
+    print()
+
+
+def cmd_list(args):
+    print("Pipeline steps:")
+    print()
+    print_plan(default_steps())
+    return 0
+
+
+def cmd_run(args):
+    steps = default_steps()
+    try:
+        if args.steps:
+            steps = select_steps(steps, [s.strip() for s in args.steps.split(',') if s.strip()])
+        validate_steps(steps)
+    except ValueError as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+
+    print(f"Running {len(steps)} steps (max {args.max_workers} concurrent, {args.retries} retries):")
+    print()
+    print_plan(steps)
+
+    if not args.non_interactive:
+        response = input("Run pipeline? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return 0
+        print()
+
+    def on_event(event, result):
+        stamp = time.strftime("%H:%M:%S")
+        if event == "start":
+            print(f"[{stamp}] ▶  {result.name}")
+        elif event == "success":
+            retry_note = f" after {result.attempts} attempts" if result.attempts > 1 else ""
+            print(f"[{stamp}] ✅ {result.name} ({result.seconds:,.1f}s{retry_note})")
+        elif event == "failed":
+            print(f"[{stamp}] ❌ {result.name} ({result.error}, {result.attempts} attempts) - see {result.log_path}")
+        elif event == "skipped":
+            print(f"[{stamp}] ⏭  {result.name} ({result.error})")
+
+    wall_start = time.perf_counter()
+    results = run_pipeline(steps, max_workers=args.max_workers, retries=args.retries, on_event=on_event)
+    wall = time.perf_counter() - wall_start
+
+    print()
+    print("=" * 60)
+    print("Summary")
+    print("=" * 60)
+    print(f"{'Step':<22} {'Status':<10} {'Attempts':<10} {'Seconds':>10}")
+    print("-" * 60)
+    for name in validate_steps(steps):
+        r = results[name]
+        print(f"{name:<22} {r.status:<10} {r.attempts:<10} {r.seconds:>10,.1f}")
+    print()
+
+    serial = sum(r.seconds for r in results.values())
+    print(f"Wall time:      {wall:,.1f}s")
+    print(f"Critical path:  {critical_path_seconds(steps, results):,.1f}s")
+    print(f"Serial total:   {serial:,.1f}s")
+    print()
+
+    failed = [r for r in results.values() if r.status != "success"]
+    if failed:
+        print(f"❌ FAILED: {len(failed)} step(s) did not complete")
+        return 1
+
+    print("✅ SUCCESS: Pipeline complete")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ETL Orchestrator')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='Show pipeline steps and dependencies')
+
+    run_parser = subparsers.add_parser('run', help='Run the pipeline')
+    run_parser.add_argument('--non-interactive', action='store_true',
+                            help='Do not prompt for confirmation (for cron/CI)')
+    run_parser.add_argument('--steps', help='Comma-separated steps to run (dependencies included)')
+    run_parser.add_argument('--max-workers', type=int, default=4, help='Max concurrent steps')
+    run_parser.add_argument('--retries', type=int, default=1, help='Retries per failed step')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Cash Flow - ETL Pipeline")
+    print("=" * 60)
+    print()
+
+    if args.command == 'list':
+        return cmd_list(args)
+    return cmd_run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,291 +9,102 @@ Logic:
 - Shopify: Daily payouts, 2-3 day lag
 - Net proceeds used (fees already deducted from deposits.total)
 
+Loading is incremental: each run only re-aggregates settlements with deposits
+newer than the per-platform watermark in etl_watermarks and MERGEs them, so
+re-runs never duplicate rows. A date range runs a backfill of that range.
+
 Usage:
-    python scripts/etl_deposits_to_cash.py [--start-date YYYY-MM-DD] [--end-date YYYY-MM-DD] [--platform PLATFORM]
+    python scripts/etl_deposits_to_cash.py [--platform PLATFORM] [--yes]
+    python scripts/etl_deposits_to_cash.py --start-date YYYY-MM-DD [--end-date YYYY-MM-DD]
+    python scripts/etl_deposits_to_cash.py --full-refresh
 """
 
 import sys
 import argparse
 from pathlib import Path
-from datetime import datetime, timedelta
-import uuid
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import BigQueryConnector
+from src.etl.deposits import (
+    DEFAULT_LOOKBACK_DAYS,
+    deposit_filters,
+    deposits_cash_sql,
+    merge_deposits_to_cash,
+)
+from src.etl.preview import preview_cash_transform
 
 
-def preview_deposits_to_cash(bq, start_date=None, end_date=None, platform=None):
+def preview_deposits_to_cash(bq, start_date=None, end_date=None, platform=None, sample_percent=None):
     """
-    Transform deposits into cash_transactions
+    Preview deposits → cash_transactions without downloading the result
 
     Args:
         bq: BigQueryConnector instance
         start_date: Optional start date filter (YYYY-MM-DD)
         end_date: Optional end date filter (YYYY-MM-DD)
         platform: Optional platform filter (Amazon, Shopify, etc.)
+        sample_percent: Optional TABLESAMPLE percentage for a cheaper, approximate preview
+
+    Returns:
+        Dict from preview_cash_transform (estimated_bytes, summary, sample, ...)
     """
 
-    # Build WHERE clause
-    where_conditions = []
-    if start_date:
-        where_conditions.append(f"DATE(date_time) >= '{start_date}'")
-    if end_date:
-        where_conditions.append(f"DATE(date_time) <= '{end_date}'")
-    if platform:
-        where_conditions.append(f"platform = '{platform}'")
-
-    where_clause = " AND " + " AND ".join(where_conditions) if where_conditions else ""
-
-    # Query to transform deposits
-    # Group by settlement_id and platform to get settlement-level cash flows
-    query = f"""
-    WITH deposit_settlements AS (
-      SELECT
-        platform,
-        settlement_id,
-        MIN(DATE(date_time)) as settlement_start,
-        MAX(DATE(date_time)) as settlement_end,
-
-        -- Calculate cash date based on platform timing
-        CASE
-          -- Amazon: settlement_end + 2 days
-          WHEN platform = 'Amazon' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-
-          -- Shopify: settlement_end + 2 days (daily payouts)
-          WHEN platform = 'Shopify' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-
-          -- TikTok: assume similar to Shopify
-          WHEN platform = 'TikTok' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-
-          -- Default: same as transaction date
-          ELSE MAX(DATE(date_time))
-        END as cash_date,
-
-        -- Sum up all amounts in the settlement
-        SUM(product_sales) as gross_product_sales,
-        SUM(shipping_credits) as gross_shipping,
-        SUM(gift_wrap_credits) as gross_gift_wrap,
-        SUM(promotional_rebates) as promotional_rebates,
-        SUM(marketplace_tax) as taxes_collected,
-        SUM(selling_fees) as platform_fees,
-        SUM(fba_fees) as fulfillment_fees,
-        SUM(other_transaction_fees) as other_fees,
-
-        -- NET PROCEEDS (what actually hit the bank)
-        SUM(total) as net_cash_received,
-
-        COUNT(DISTINCT order_id) as order_count,
-        SUM(quantity) as units_sold
-
-      FROM `vochill.revrec.deposits`
-      WHERE 1=1 {where_clause}
-      GROUP BY platform, settlement_id
-      HAVING SUM(total) != 0  -- Exclude zero settlements
+    # Same transform the MERGE uses, grouped by settlement_id and platform
+    query = deposits_cash_sql(
+        where=deposit_filters(start_date, end_date, platform),
+        sample_percent=sample_percent,
     )
 
-    SELECT
-      -- Generate transaction_id
-      GENERATE_UUID() as transaction_id,
-
-      -- Dates
-      settlement_end as transaction_date,
-      cash_date,
-      cash_date as value_date,
-
-      -- Source tracking
-      'deposits' as source_system,
-      CAST(settlement_id AS STRING) as source_id,
-      'deposits' as source_table,
-
-      -- Account (deposits typically go to checking)
-      'frost_checking' as bank_account_id,
-      'VoChill Checking' as bank_account_name,
-
-      -- Cash flow classification
-      'Operating' as cash_flow_section,
-      CASE
-        WHEN platform = 'Amazon' THEN 'Revenue - Amazon'
-        WHEN platform = 'Shopify' THEN 'Revenue - Shopify'
-        WHEN platform = 'TikTok' THEN 'Revenue - TikTok'
-        ELSE CONCAT('Revenue - ', platform)
-      END as cash_flow_category,
-      'Ecommerce Revenue' as cash_flow_subcategory,
-
-      -- Amount (NET PROCEEDS - what actually hit the bank)
-      net_cash_received as amount,
-      'USD' as currency,
-
-      -- Counterparty
-      platform as counterparty,
-      'Platform' as counterparty_type,
-
-      -- Description
-      CONCAT(
-        platform, ' Settlement ', settlement_id,
-        ' (', order_count, ' orders, ', units_sold, ' units)'
-      ) as description,
-
-      CONCAT(
-        'Gross: $', ROUND(gross_product_sales, 2),
-        ', Fees: $', ROUND(ABS(platform_fees + fulfillment_fees + other_fees), 2),
-        ', Net: $', ROUND(net_cash_received, 2)
-      ) as notes,
-
-      -- Metadata
-      FALSE as is_forecast,
-      FALSE as is_recurring,
-      CAST(NULL AS STRING) as recurring_id,
-      CAST(NULL AS STRING) as scenario_id,
-
-      -- Tags
-      [platform, 'ecommerce', 'revenue'] as tags,
-
-      -- Audit
-      CURRENT_TIMESTAMP() as created_at,
-      CURRENT_TIMESTAMP() as updated_at,
-      'etl_deposits' as created_by
-
-    FROM deposit_settlements
-    ORDER BY cash_date DESC, platform
-    """
-
-    print("Executing transformation query...")
+    print("Executing dry run, server-side summary and sample...")
     print()
 
-    results = bq.query(query)
-
-    return results
+    return preview_cash_transform(
+        bq,
+        query,
+        group_by='counterparty',
+        sample_columns=['cash_date', 'counterparty', 'amount', 'description'],
+    )
 
 
-def insert_deposits_to_cash(bq, start_date=None, end_date=None, platform=None):
-    """
-    Insert transformed deposits directly into cash_transactions using server-side INSERT INTO ... SELECT
-    This is much faster and avoids type conversion issues
+def insert_deposits_to_cash(bq, start_date=None, end_date=None, platform=None,
+                            full_refresh=False, lookback_days=DEFAULT_LOOKBACK_DAYS):
     """
+    Upsert settlement-level deposits into cash_transactions with a server-side MERGE.
 
-    # Build WHERE clause
-    where_conditions = []
-    if start_date:
-        where_conditions.append(f"DATE(date_time) >= '{start_date}'")
-    if end_date:
-        where_conditions.append(f"DATE(date_time) <= '{end_date}'")
-    if platform:
-        where_conditions.append(f"platform = '{platform}'")
-
-    where_clause = " AND " + " AND ".join(where_conditions) if where_conditions else ""
-
-    # Server-side INSERT INTO ... SELECT
-    insert_query = f"""
-    INSERT INTO `vochill.revrec.cash_transactions` (
-      transaction_id, transaction_date, cash_date, value_date,
-      source_system, source_id, source_table,
-      bank_account_id, bank_account_name,
-      cash_flow_section, cash_flow_category, cash_flow_subcategory,
-      amount, currency,
-      counterparty, counterparty_type,
-      description, notes,
-      is_forecast, is_recurring, recurring_id, scenario_id,
-      tags,
-      created_at, updated_at, created_by
-    )
-
-    WITH deposit_settlements AS (
-      SELECT
-        platform,
-        settlement_id,
-        MIN(DATE(date_time)) as settlement_start,
-        MAX(DATE(date_time)) as settlement_end,
-
-        -- Calculate cash date based on platform timing
-        CASE
-          WHEN platform = 'Amazon' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-          WHEN platform = 'Shopify' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-          WHEN platform = 'TikTok' THEN DATE_ADD(MAX(DATE(date_time)), INTERVAL 2 DAY)
-          ELSE MAX(DATE(date_time))
-        END as cash_date,
-
-        SUM(product_sales) as gross_product_sales,
-        SUM(shipping_credits) as gross_shipping,
-        SUM(selling_fees) as platform_fees,
-        SUM(fba_fees) as fulfillment_fees,
-        SUM(other_transaction_fees) as other_fees,
-        SUM(total) as net_cash_received,
-
-        COUNT(DISTINCT order_id) as order_count,
-        SUM(quantity) as units_sold
-
-      FROM `vochill.revrec.deposits`
-      WHERE 1=1 {where_clause}
-      GROUP BY platform, settlement_id
-      HAVING SUM(total) != 0
-    )
-
-    SELECT
-      GENERATE_UUID() as transaction_id,
-      settlement_end as transaction_date,
-      cash_date,
-      cash_date as value_date,
-
-      'deposits' as source_system,
-      CAST(settlement_id AS STRING) as source_id,
-      'deposits' as source_table,
-
-      'frost_checking' as bank_account_id,
-      'VoChill Checking' as bank_account_name,
-
-      'Operating' as cash_flow_section,
-      CASE
-        WHEN platform = 'Amazon' THEN 'Revenue - Amazon'
-        WHEN platform = 'Shopify' THEN 'Revenue - Shopify'
-        WHEN platform = 'TikTok' THEN 'Revenue - TikTok'
-        ELSE CONCAT('Revenue - ', platform)
-      END as cash_flow_category,
-      'Ecommerce Revenue' as cash_flow_subcategory,
-
-      net_cash_received as amount,
-      'USD' as currency,
-
-      platform as counterparty,
-      'Platform' as counterparty_type,
-
-      CONCAT(
-        platform, ' Settlement ', settlement_id,
-        ' (', order_count, ' orders, ', units_sold, ' units)'
-      ) as description,
-
-      CONCAT(
-        'Gross: $', ROUND(gross_product_sales, 2),
-        ', Fees: $', ROUND(ABS(platform_fees + fulfillment_fees + other_fees), 2),
-        ', Net: $', ROUND(net_cash_received, 2)
-      ) as notes,
-
-      FALSE as is_forecast,
-      FALSE as is_recurring,
-      CAST(NULL AS STRING) as recurring_id,
-      CAST(NULL AS STRING) as scenario_id,
-
-      [platform, 'ecommerce', 'revenue'] as tags,
-
-      CURRENT_TIMESTAMP() as created_at,
-      CURRENT_TIMESTAMP() as updated_at,
-      'etl_deposits' as created_by
-
-    FROM deposit_settlements
+    Without a date range only settlements with deposits past the per-platform
+    watermark are re-aggregated, so runtime and bytes scanned follow new data.
     """
 
-    print("Executing server-side INSERT INTO ... SELECT...")
+    if start_date or end_date:
+        print("Executing backfill MERGE for the requested date range...")
+    elif full_refresh:
+        print("Executing full refresh (rebuilding all deposit settlements)...")
+    else:
+        print("Executing incremental MERGE since last watermark...")
     print()
 
     try:
-        result = bq.query(insert_query)
-        return True
+        result = merge_deposits_to_cash(
+            bq,
+            start_date=start_date,
+            end_date=end_date,
+            platform=platform,
+            full_refresh=full_refresh,
+            lookback_days=lookback_days,
+        )
     except Exception as e:
         print(f"❌ ERROR: {str(e)}")
         return False
 
+    if result['settlements'] is not None:
+        print(f"  Settlements touched: {result['settlements']:,}")
+    print(f"  Rows inserted/updated: {result['rows_affected']:,}")
+    print(f"  Bytes processed: {result['bytes_processed'] / 1024**2:,.1f} MB")
+
+    return True
+
 
 def main():
     parser = argparse.ArgumentParser(description='ETL: Deposits → Cash Transactions')
@@ -301,6 +112,13 @@ def main():
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
     parser.add_argument('--platform', help='Platform filter (Amazon, Shopify, etc.)')
     parser.add_argument('--dry-run', action='store_true', help='Preview only, do not insert')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    parser.add_argument('--sample-percent', type=float,
+                        help='With --dry-run: read only this %% of deposits (TABLESAMPLE) for a faster preview')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore watermarks, delete and rebuild all deposit settlements')
+    parser.add_argument('--lookback-days', type=int, default=DEFAULT_LOOKBACK_DAYS,
+                        help='Max days a settlement can span (re-aggregation window)')
 
     args = parser.parse_args()
 
@@ -337,42 +155,39 @@ def main():
 
     # Preview transformation
     if args.dry_run:
-        print("Preview mode - querying sample data...")
+        print("Preview mode - estimating and summarising server-side...")
         try:
-            df = preview_deposits_to_cash(
+            preview = preview_deposits_to_cash(
                 bq,
                 start_date=args.start_date,
                 end_date=args.end_date,
-                platform=args.platform
+                platform=args.platform,
+                sample_percent=args.sample_percent
             )
 
-            print(f"✅ Preview complete: {len(df)} cash transactions would be generated")
+            print(f"✅ Preview complete: {preview['transactions']} cash transactions would be generated")
+            print(f"   Transform scans {preview['estimated_bytes'] / 1024**2:,.1f} MB (dry run)")
+            if args.sample_percent:
+                print(f"   ⚠️  Based on a {args.sample_percent}% TABLESAMPLE - totals are approximate")
             print()
 
-            if len(df) == 0:
+            if preview['transactions'] == 0:
                 print("No records found matching criteria.")
                 sys.exit(0)
 
             # Show summary
             print("Summary by platform:")
-            try:
-                summary = df.groupby('counterparty').agg({
-                    'amount': ['count', 'sum']
-                })
-                print(summary)
-            except Exception as e:
-                print(f"  (Unable to generate summary: {e})")
+            print(preview['summary'].set_index('counterparty').to_string())
             print()
 
             # Show total revenue
-            print(f"Total revenue: ${df['amount'].sum():,.2f}")
-            print(f"Transactions: {len(df)}")
+            print(f"Total revenue: ${preview['total_amount']:,.2f}")
+            print(f"Transactions: {preview['transactions']}")
             print()
 
             # Show sample records
-            print("Sample records (first 5):")
-            sample_cols = [col for col in ['cash_date', 'counterparty', 'amount', 'description'] if col in df.columns]
-            print(df[sample_cols].head(5).to_string())
+            print("Sample records (most recent 5):")
+            print(preview['sample'].to_string())
             print()
 
         except Exception as e:
@@ -386,10 +201,11 @@ def main():
         sys.exit(0)
 
     # Confirm before inserting
-    response = input(f"Insert revenue transactions into cash_transactions? (y/n): ").strip().lower()
-    if response != 'y':
-        print("Cancelled.")
-        sys.exit(0)
+    if not args.yes:
+        response = input(f"Insert revenue transactions into cash_transactions? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
 
     print()
 
@@ -398,7 +214,9 @@ def main():
         bq,
         start_date=args.start_date,
         end_date=args.end_date,
-        platform=args.platform
+        platform=args.platform,
+        full_refresh=args.full_refresh,
+        lookback_days=args.lookback_days
     )
 
     print()
@@ -407,7 +225,7 @@ def main():
     print("=" * 60)
 
     if success:
-        print("✅ SUCCESS: All revenue transactions loaded!")
+        print("✅ SUCCESS: Revenue transactions up to date!")
         print()
         print("Verify with this query:")
         print("  SELECT cash_date, cash_flow_category, COUNT(*) as count,")
@@ -429,6 +247,7 @@ def main():
         print()
         print("Check the error message above for details")
         print()
+        sys.exit(1)
 
 
 if __name__ == "__main__":
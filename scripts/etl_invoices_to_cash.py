@@ -8,10 +8,13 @@ Logic:
 - Join with vendors table to get payment terms
 - Calculate cash_date: invoice_date + payment_days (from vendor terms)
 - Default to Net 30 if no terms specified
+- Optionally (--lag-percentile) use observed payment lags from
+  vendor_payment_lags (scripts/fit_vendor_lags.py) instead of stated terms
 - Map to COGS category (can be refined later)
+- Loaded with a MERGE keyed on invoice_id, so re-runs update rather than duplicate
 
 Usage:
-    python scripts/etl_invoices_to_cash.py [--start-date YYYY-MM-DD] [--end-date YYYY-MM-DD] [--dry-run]
+    python scripts/etl_invoices_to_cash.py [--start-date YYYY-MM-DD] [--end-date YYYY-MM-DD] [--lag-percentile 50] [--dry-run] [--yes]
 """
 
 import sys
@@ -22,192 +25,64 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import BigQueryConnector
+from src.etl.invoices import invoice_filters, invoices_cash_sql, merge_invoices_to_cash
+from src.etl.preview import preview_cash_transform
+from src.timing.vendor_lags import PERCENTILES
 
 
-def preview_invoices_to_cash(bq, start_date=None, end_date=None):
-    """Preview the transformation without inserting"""
-
-    # Build WHERE clause
-    where_conditions = []
-    if start_date:
-        where_conditions.append(f"i.invoice_date >= '{start_date}'")
-    if end_date:
-        where_conditions.append(f"i.invoice_date <= '{end_date}'")
-
-    where_clause = " AND " + " AND ".join(where_conditions) if where_conditions else ""
-
-    query = f"""
-    WITH invoice_payments AS (
-      SELECT
-        i.invoice_id,
-        i.vendor,
-        i.invoice_date,
-        i.invoice_number,
-        i.po_number,
-        i.subtotal,
-        i.sales_tax,
-        i.total,
-
-        -- Get vendor payment terms
-        v.Terms as payment_terms,
-        COALESCE(v.`Actual Days`, v.`Request Days`, 30) as payment_days,
-
-        -- Calculate cash date: invoice_date + payment_days
-        DATE_ADD(i.invoice_date, INTERVAL COALESCE(v.`Actual Days`, v.`Request Days`, 30) DAY) as cash_date
-
-      FROM `vochill.revrec.invoices` i
-      LEFT JOIN `vochill.revrec.vendors` v
-        ON i.vendor = v.Name
-      WHERE 1=1 {where_clause}
-        AND i.invoice_date IS NOT NULL  -- Exclude records with no date
-    )
+def preview_invoices_to_cash(bq, start_date=None, end_date=None, sample_percent=None, lag_percentile=None):
+    """Preview the transformation without inserting or downloading it"""
 
-    SELECT
-      invoice_date as transaction_date,
-      cash_date,
-      vendor as counterparty,
-      payment_terms,
-      payment_days,
-      -total as amount,  -- Negative for cash outflow
-      COUNT(*) OVER() as total_count,
-      SUM(total) OVER() as total_amount
-    FROM invoice_payments
-    WHERE total > 0  -- Exclude credits/reversals
-    ORDER BY cash_date DESC
-    """
+    # Same transform the MERGE uses
+    query = invoices_cash_sql(
+        where=invoice_filters(start_date, end_date),
+        sample_percent=sample_percent,
+        lag_percentile=lag_percentile,
+    )
 
-    print("Executing preview query...")
+    print("Executing dry run, server-side summary and sample...")
     print()
 
-    results = bq.query(query)
-    return results
-
-
-def insert_invoices_to_cash(bq, start_date=None, end_date=None):
-    """
-    Insert transformed invoices directly into cash_transactions using server-side INSERT
-    """
-
-    # Build WHERE clause
-    where_conditions = []
-    if start_date:
-        where_conditions.append(f"i.invoice_date >= '{start_date}'")
-    if end_date:
-        where_conditions.append(f"i.invoice_date <= '{end_date}'")
-
-    where_clause = " AND " + " AND ".join(where_conditions) if where_conditions else ""
-
-    # Server-side INSERT INTO ... SELECT
-    insert_query = f"""
-    INSERT INTO `vochill.revrec.cash_transactions` (
-      transaction_id, transaction_date, cash_date, value_date,
-      source_system, source_id, source_table,
-      bank_account_id, bank_account_name,
-      cash_flow_section, cash_flow_category, cash_flow_subcategory,
-      amount, currency,
-      counterparty, counterparty_type,
-      description, notes,
-      is_forecast, is_recurring, recurring_id, scenario_id,
-      tags,
-      created_at, updated_at, created_by
-    )
-
-    WITH invoice_payments AS (
-      SELECT
-        i.invoice_id,
-        i.vendor,
-        i.invoice_date,
-        i.invoice_number,
-        i.po_number,
-        i.subtotal,
-        i.sales_tax,
-        i.total,
-
-        -- Get vendor payment terms
-        v.Terms as payment_terms,
-        COALESCE(v.`Actual Days`, v.`Request Days`, 30) as payment_days,
-
-        -- Calculate cash date: invoice_date + payment_days
-        DATE_ADD(i.invoice_date, INTERVAL COALESCE(v.`Actual Days`, v.`Request Days`, 30) DAY) as cash_date
-
-      FROM `vochill.revrec.invoices` i
-      LEFT JOIN `vochill.revrec.vendors` v
-        ON i.vendor = v.Name
-      WHERE 1=1 {where_clause}
-        AND i.total > 0  -- Exclude credits/reversals
-        AND i.invoice_date IS NOT NULL  -- Exclude records with no date
-        AND i.invoice_id IS NOT NULL  -- Exclude records with no ID
+    return preview_cash_transform(
+        bq,
+        query,
+        group_by='counterparty',
+        sample_columns=['transaction_date', 'cash_date', 'counterparty', 'notes', 'amount'],
     )
 
-    SELECT
-      GENERATE_UUID() as transaction_id,
-
-      invoice_date as transaction_date,
-      cash_date,
-      cash_date as value_date,
-
-      'invoices' as source_system,
-      invoice_id as source_id,
-      'invoices' as source_table,
-
-      'frost_checking' as bank_account_id,
-      'VoChill Checking' as bank_account_name,
-
-      'Operating' as cash_flow_section,
 
-      -- Default to COGS - Materials (can be refined with chart of accounts mapping)
-      'COGS - Materials' as cash_flow_category,
-      'Vendor Payments' as cash_flow_subcategory,
-
-      -- NEGATIVE amount (cash outflow)
-      -total as amount,
-      'USD' as currency,
-
-      vendor as counterparty,
-      'Vendor' as counterparty_type,
-
-      CONCAT(
-        'Invoice ', invoice_number,
-        CASE WHEN po_number IS NOT NULL THEN CONCAT(' (PO: ', po_number, ')') ELSE '' END
-      ) as description,
-
-      CONCAT(
-        'Payment terms: ', COALESCE(payment_terms, 'Net 30'),
-        ', Due: ', CAST(cash_date AS STRING),
-        ', Subtotal: $', ROUND(subtotal, 2),
-        ', Tax: $', ROUND(sales_tax, 2)
-      ) as notes,
-
-      FALSE as is_forecast,
-      FALSE as is_recurring,
-      CAST(NULL AS STRING) as recurring_id,
-      CAST(NULL AS STRING) as scenario_id,
-
-      ['vendor', 'expense', 'cogs'] as tags,
-
-      CURRENT_TIMESTAMP() as created_at,
-      CURRENT_TIMESTAMP() as updated_at,
-      'etl_invoices' as created_by
-
-    FROM invoice_payments
+def insert_invoices_to_cash(bq, start_date=None, end_date=None, lag_percentile=None):
+    """
+    Upsert transformed invoices into cash_transactions using a server-side MERGE
     """
 
-    print("Executing server-side INSERT INTO ... SELECT...")
+    print("Executing server-side MERGE...")
     print()
 
     try:
-        result = bq.query(insert_query)
-        return True
+        result = merge_invoices_to_cash(
+            bq, start_date=start_date, end_date=end_date, lag_percentile=lag_percentile
+        )
     except Exception as e:
         print(f"❌ ERROR: {str(e)}")
         return False
 
+    print(f"  Rows inserted/updated: {result['rows_affected']:,}")
+    print(f"  Bytes processed: {result['bytes_processed'] / 1024**2:,.1f} MB")
+
+    return True
+
 
 def main():
     parser = argparse.ArgumentParser(description='ETL: Invoices → Cash Transactions')
     parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--lag-percentile', type=int, choices=PERCENTILES,
+                        help='Date payments at this percentile of observed vendor lags instead of stated terms')
     parser.add_argument('--dry-run', action='store_true', help='Preview only, do not insert')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    parser.add_argument('--sample-percent', type=float,
+                        help='With --dry-run: read only this %% of invoices (TABLESAMPLE) for a faster preview')
 
     args = parser.parse_args()
 
@@ -225,6 +100,10 @@ def main():
             print(f"  End date: {args.end_date}")
         print()
 
+    if args.lag_percentile is not None:
+        print(f"Cash dates: p{args.lag_percentile} of observed vendor payment lags (fallback: stated terms)")
+        print()
+
     if args.dry_run:
         print("⚠️  DRY RUN MODE - No data will be inserted")
         print()
@@ -242,41 +121,39 @@ def main():
 
     # Preview transformation
     if args.dry_run:
-        print("Preview mode - querying sample data...")
+        print("Preview mode - estimating and summarising server-side...")
         try:
-            df = preview_invoices_to_cash(
+            preview = preview_invoices_to_cash(
                 bq,
                 start_date=args.start_date,
-                end_date=args.end_date
+                end_date=args.end_date,
+                sample_percent=args.sample_percent,
+                lag_percentile=args.lag_percentile
             )
 
-            print(f"✅ Preview complete: {len(df)} vendor payments would be generated")
+            print(f"✅ Preview complete: {preview['transactions']} vendor payments would be generated")
+            print(f"   Transform scans {preview['estimated_bytes'] / 1024**2:,.1f} MB (dry run)")
+            if args.sample_percent:
+                print(f"   ⚠️  Based on a {args.sample_percent}% TABLESAMPLE - totals are approximate")
             print()
 
-            if len(df) == 0:
+            if preview['transactions'] == 0:
                 print("No records found matching criteria.")
                 sys.exit(0)
 
-            # Show summary
+            # Show summary (server-side, sorted by largest outflow)
             print("Summary by vendor (top 10):")
-            try:
-                summary = df.groupby('counterparty').agg({
-                    'amount': ['count', 'sum']
-                }).sort_values(('amount', 'sum')).head(10)
-                print(summary)
-            except Exception as e:
-                print(f"  (Unable to generate summary: {e})")
+            print(preview['summary'].head(10).set_index('counterparty').to_string())
             print()
 
             # Show totals
-            print(f"Total payments: ${abs(df['amount'].sum()):,.2f}")
-            print(f"Transactions: {len(df)}")
+            print(f"Total payments: ${abs(preview['total_amount']):,.2f}")
+            print(f"Transactions: {preview['transactions']}")
             print()
 
             # Show sample records
-            print("Sample records (first 5):")
-            sample_cols = [col for col in ['transaction_date', 'cash_date', 'counterparty', 'payment_terms', 'amount'] if col in df.columns]
-            print(df[sample_cols].head(5).to_string())
+            print("Sample records (most recent 5):")
+            print(preview['sample'].to_string())
             print()
 
         except Exception as e:
@@ -290,10 +167,11 @@ def main():
         sys.exit(0)
 
     # Confirm before inserting
-    response = input(f"Insert vendor payment transactions into cash_transactions? (y/n): ").strip().lower()
-    if response != 'y':
-        print("Cancelled.")
-        sys.exit(0)
+    if not args.yes:
+        response = input(f"Insert vendor payment transactions into cash_transactions? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
 
     print()
 
@@ -301,7 +179,8 @@ def main():
     success = insert_invoices_to_cash(
         bq,
         start_date=args.start_date,
-        end_date=args.end_date
+        end_date=args.end_date,
+        lag_percentile=args.lag_percentile
     )
 
     print()
@@ -331,6 +210,7 @@ def main():
         print()
         print("Check the error message above for details")
         print()
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+"""
+ETL: Transform refunds → cash_transactions
+
+This script reads from the refunds table (Amazon/Shopify customer refunds)
+and loads one cash outflow per platform settlement, dated with the same
+payout lag as deposits (payment_timing.yaml).
+
+Logic:
+- Refunds are netted out of the settlement payout they belong to
+- Amount is the net refund impact (refund + shipping refund - fee reversals)
+- Category: Revenue - Refunds (Contra-Revenue)
+
+Loading is incremental: each run only re-aggregates settlements with refunds
+newer than the per-platform watermark in etl_watermarks and MERGEs them, so
+re-runs never duplicate rows. A date range runs a backfill of that range.
+
+Usage:
+    python scripts/etl_refunds_to_cash.py [--platform PLATFORM] [--yes]
+    python scripts/etl_refunds_to_cash.py --start-date YYYY-MM-DD [--end-date YYYY-MM-DD]
+    python scripts/etl_refunds_to_cash.py --full-refresh
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.etl.refunds import (
+    DEFAULT_LOOKBACK_DAYS,
+    merge_refunds_to_cash,
+    refund_filters,
+    refunds_cash_sql,
+)
+from src.etl.preview import preview_cash_transform
+
+
+def preview_refunds_to_cash(bq, start_date=None, end_date=None, platform=None, sample_percent=None):
+    """
+    Preview refunds → cash_transactions without downloading the result
+
+    Args:
+        bq: BigQueryConnector instance
+        start_date: Optional start date filter (YYYY-MM-DD)
+        end_date: Optional end date filter (YYYY-MM-DD)
+        platform: Optional platform filter (Amazon, Shopify, etc.)
+        sample_percent: Optional TABLESAMPLE percentage for a cheaper, approximate preview
+
+    Returns:
+        Dict from preview_cash_transform (estimated_bytes, summary, sample, ...)
+    """
+
+    # Same transform the MERGE uses, grouped by settlement_id and platform
+    query = refunds_cash_sql(
+        where=refund_filters(start_date, end_date, platform),
+        sample_percent=sample_percent,
+    )
+
+    print("Executing dry run, server-side summary and sample...")
+    print()
+
+    return preview_cash_transform(
+        bq,
+        query,
+        group_by='counterparty',
+        sample_columns=['cash_date', 'counterparty', 'amount', 'description'],
+    )
+
+
+def insert_refunds_to_cash(bq, start_date=None, end_date=None, platform=None,
+                            full_refresh=False, lookback_days=DEFAULT_LOOKBACK_DAYS):
+    """
+    Upsert settlement-level refunds into cash_transactions with a server-side MERGE.
+
+    Without a date range only settlements with refunds past the per-platform
+    watermark are re-aggregated, so runtime and bytes scanned follow new data.
+    """
+
+    if start_date or end_date:
+        print("Executing backfill MERGE for the requested date range...")
+    elif full_refresh:
+        print("Executing full refresh (rebuilding all refund settlements)...")
+    else:
+        print("Executing incremental MERGE since last watermark...")
+    print()
+
+    try:
+        result = merge_refunds_to_cash(
+            bq,
+            start_date=start_date,
+            end_date=end_date,
+            platform=platform,
+            full_refresh=full_refresh,
+            lookback_days=lookback_days,
+        )
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        return False
+
+    if result['settlements'] is not None:
+        print(f"  Settlements touched: {result['settlements']:,}")
+    print(f"  Rows inserted/updated: {result['rows_affected']:,}")
+    print(f"  Bytes processed: {result['bytes_processed'] / 1024**2:,.1f} MB")
+
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ETL: Refunds → Cash Transactions')
+    parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--platform', help='Platform filter (Amazon, Shopify, etc.)')
+    parser.add_argument('--dry-run', action='store_true', help='Preview only, do not insert')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    parser.add_argument('--sample-percent', type=float,
+                        help='With --dry-run: read only this %% of refunds (TABLESAMPLE) for a faster preview')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore watermarks, delete and rebuild all refund settlements')
+    parser.add_argument('--lookback-days', type=int, default=DEFAULT_LOOKBACK_DAYS,
+                        help='Max days a settlement can span (re-aggregation window)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ETL: Refunds → Cash Transactions")
+    print("=" * 60)
+    print()
+
+    # Display filters
+    if args.start_date or args.end_date or args.platform:
+        print("Filters:")
+        if args.start_date:
+            print(f"  Start date: {args.start_date}")
+        if args.end_date:
+            print(f"  End date: {args.end_date}")
+        if args.platform:
+            print(f"  Platform: {args.platform}")
+        print()
+
+    if args.dry_run:
+        print("⚠️  DRY RUN MODE - No data will be inserted")
+        print()
+
+    # Connect to BigQuery
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    # Preview transformation
+    if args.dry_run:
+        print("Preview mode - estimating and summarising server-side...")
+        try:
+            preview = preview_refunds_to_cash(
+                bq,
+                start_date=args.start_date,
+                end_date=args.end_date,
+                platform=args.platform,
+                sample_percent=args.sample_percent
+            )
+
+            print(f"✅ Preview complete: {preview['transactions']} refund settlements would be generated")
+            print(f"   Transform scans {preview['estimated_bytes'] / 1024**2:,.1f} MB (dry run)")
+            if args.sample_percent:
+                print(f"   ⚠️  Based on a {args.sample_percent}% TABLESAMPLE - totals are approximate")
+            print()
+
+            if preview['transactions'] == 0:
+                print("No records found matching criteria.")
+                sys.exit(0)
+
+            # Show summary
+            print("Summary by platform:")
+            print(preview['summary'].set_index('counterparty').to_string())
+            print()
+
+            # Show total revenue
+            print(f"Total refunds: ${abs(preview['total_amount']):,.2f}")
+            print(f"Transactions: {preview['transactions']}")
+            print()
+
+            # Show sample records
+            print("Sample records (most recent 5):")
+            print(preview['sample'].to_string())
+            print()
+
+        except Exception as e:
+            print(f"❌ ERROR: Preview failed")
+            print(f"   {str(e)}")
+            sys.exit(1)
+
+        print("✅ DRY RUN COMPLETE - No data inserted")
+        print()
+        print("To insert data, run without --dry-run flag")
+        sys.exit(0)
+
+    # Confirm before inserting
+    if not args.yes:
+        response = input(f"Insert refund transactions into cash_transactions? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
+
+    print()
+
+    # Insert into cash_transactions (server-side)
+    success = insert_refunds_to_cash(
+        bq,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        platform=args.platform,
+        full_refresh=args.full_refresh,
+        lookback_days=args.lookback_days
+    )
+
+    print()
+    print("=" * 60)
+    print("Summary")
+    print("=" * 60)
+
+    if success:
+        print("✅ SUCCESS: Refund transactions up to date!")
+        print()
+        print("Verify with this query:")
+        print("  SELECT cash_date, counterparty, COUNT(*) as count,")
+        print("         SUM(amount) as total_refunds")
+        print("  FROM `vochill.revrec.cash_transactions`")
+        print("  WHERE source_table = 'refunds'")
+        print("  GROUP BY cash_date, counterparty")
+        print("  ORDER BY cash_date DESC")
+        print("  LIMIT 20;")
+        print()
+        print("Next steps:")
+        print("  1. View cash_transactions: SELECT * FROM `vochill.revrec.cash_transactions` LIMIT 100")
+        print("  2. Build forecast: python scripts/build_forecast.py")
+        print()
+    else:
+        print("❌ FAILED: Error occurred during insert")
+        print()
+        print("Check the error message above for details")
+        print()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
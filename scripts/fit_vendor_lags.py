@@ -0,0 +1,135 @@
+"""
+Fit empirical vendor payment lags
+
+Matches every invoice to the actual vendor outflow that paid it (as-of joins
+on vendor + amount, then vendor alone for batch payments), computes lag
+percentiles per vendor and per payment-terms bucket, and stores the lookup
+table locally and in BigQuery (vendor_payment_lags).
+
+The invoice ETL and the forecast use it with --lag-percentile:
+    python scripts/etl_invoices_to_cash.py --lag-percentile 50
+    python scripts/build_forecast.py --lag-percentile 75
+
+Usage:
+    python scripts/fit_vendor_lags.py [--since YYYY-MM-DD] [--min-invoices 5] [--max-lag-days 180] [--dry-run] [--yes]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector, VendorMaster
+from src.timing.vendor_lags import (
+    DEFAULT_MAX_LAG_DAYS,
+    DEFAULT_MIN_INVOICES,
+    LAG_CACHE_PATH,
+    LAG_TABLE,
+    PaymentLagModel,
+    fit_lag_distributions,
+    load_payment_history,
+    match_invoice_payments,
+    percentile_column,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit empirical vendor payment lags')
+    parser.add_argument('--since', help='Only use invoices and payments from this date (YYYY-MM-DD)')
+    parser.add_argument('--min-invoices', type=int, default=DEFAULT_MIN_INVOICES,
+                        help=f'Paid invoices a vendor needs for its own distribution (default: {DEFAULT_MIN_INVOICES})')
+    parser.add_argument('--max-lag-days', type=int, default=DEFAULT_MAX_LAG_DAYS,
+                        help=f'Ignore payments later than this after an invoice (default: {DEFAULT_MAX_LAG_DAYS})')
+    parser.add_argument('--dry-run', action='store_true', help='Fit and show the table only, do not save or load')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Vendor Payment Lags")
+    print("=" * 60)
+    print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    print("Loading invoices and vendor payments...")
+    try:
+        vendors = VendorMaster.load(bq)
+        history = load_payment_history(bq, since=args.since)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to load payment history")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    invoices, payments = history['invoices'], history['payments']
+    print(f"  Invoices: {len(invoices):,}")
+    print(f"  Payments: {len(payments):,}")
+    print()
+
+    if len(invoices) == 0:
+        print("No invoices found.")
+        sys.exit(0)
+
+    started = time.perf_counter()
+    matched = match_invoice_payments(invoices, payments, vendors, max_lag_days=args.max_lag_days)
+    lookup = fit_lag_distributions(matched, vendors, min_invoices=args.min_invoices)
+    elapsed = time.perf_counter() - started
+
+    counts = matched['matched_on'].value_counts()
+    unmatched = len(matched) - int(counts.sum())
+    print(f"Matched in {elapsed:.1f}s:")
+    print(f"  By vendor + amount: {int(counts.get('amount', 0)):,}")
+    print(f"  By vendor (batch):  {int(counts.get('vendor', 0)):,}")
+    print(f"  Unpaid/unmatched:   {unmatched:,}")
+    print()
+
+    print("Distribution used per vendor:")
+    for basis, n in lookup['basis'].value_counts().items():
+        print(f"  {basis:<8} {n:,}")
+    print()
+
+    columns = ['vendor', 'payment_terms', 'basis', 'invoices',
+               percentile_column(50), percentile_column(75), percentile_column(90)]
+    print("Largest vendors by paid invoices:")
+    print(lookup.nlargest(10, 'invoices')[columns].to_string(index=False))
+    print()
+
+    if args.dry_run:
+        print("✅ DRY RUN COMPLETE - Lookup table not saved")
+        sys.exit(0)
+
+    if not args.yes:
+        response = input(f"Replace {LAG_TABLE} with {len(lookup):,} vendors? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
+        print()
+
+    PaymentLagModel(lookup, vendors).save()
+    print(f"✅ Saved local copy: {LAG_CACHE_PATH}")
+
+    try:
+        job = bq.load_dataframe(lookup, LAG_TABLE)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to load {LAG_TABLE}")
+        print(f"   {str(e)}")
+        print()
+        print("Create the table first: python scripts/create_tables.py")
+        sys.exit(1)
+
+    print(f"✅ SUCCESS: Loaded {job.output_rows:,} rows into {LAG_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Ingest: Amazon settlement flat files → deposits-shaped Parquet
+
+Streams each settlement report in blocks, reconciles the line items to the
+settlement header total and (optionally) writes one Parquet file per
+settlement with the `deposits` schema.
+
+Usage:
+    python scripts/ingest_amazon_settlement.py FILE [FILE ...] [--output DIR] [--block-size-mb 16]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ingest import DEPOSITS_SCHEMA, iter_settlement_batches, read_settlement_header, summarize_settlement
+
+
+def write_settlement_parquet(path, output_dir, block_size):
+    """Stream one report into output_dir/<settlement_id>.parquet"""
+    header = read_settlement_header(path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{header.settlement_id}.parquet"
+
+    with pq.ParquetWriter(output_path, DEPOSITS_SCHEMA) as writer:
+        for batch in iter_settlement_batches(path, block_size):
+            writer.write_batch(batch)
+
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest: Amazon settlement flat files')
+    parser.add_argument('files', nargs='+', help='Settlement report files (tab-separated)')
+    parser.add_argument('--output', help='Write deposits-shaped Parquet files to this directory')
+    parser.add_argument('--block-size-mb', type=int, default=16, help='Block size read per batch (MB)')
+
+    args = parser.parse_args()
+    block_size = args.block_size_mb * 1024**2
+
+    print("=" * 60)
+    print("Ingest: Amazon Settlement Reports")
+    print("=" * 60)
+    print()
+
+    failures = 0
+    for file in args.files:
+        path = Path(file)
+        print(f"{path.name}:")
+        start = time.perf_counter()
+        try:
+            summary = summarize_settlement(path, block_size)
+        except Exception as e:
+            print(f"  ❌ ERROR: {str(e)}")
+            print()
+            failures += 1
+            continue
+
+        header = summary['header']
+        size_mb = path.stat().st_size / 1024**2
+        seconds = time.perf_counter() - start
+        print(f"  Settlement: {header.settlement_id} "
+              f"({header.start_date:%Y-%m-%d} → {header.end_date:%Y-%m-%d}, deposit {header.deposit_date:%Y-%m-%d})")
+        print(f"  Line items: {summary['rows']:,} ({size_mb:,.1f} MB in {seconds:,.2f}s)")
+        for type_value, amount in sorted(summary['by_type'].items(), key=lambda kv: -kv[1]):
+            print(f"    {type_value:<15} ${amount:>12,.2f}")
+        print(f"  Header total:    ${header.total_amount:>12,.2f} {header.currency}")
+        print(f"  Line item total: ${summary['line_item_total']:>12,.2f}")
+
+        if summary['difference'] != 0:
+            print(f"  ❌ Does not reconcile (difference ${summary['difference']:,.2f})")
+            print()
+            failures += 1
+            continue
+        print("  ✅ Reconciled")
+
+        if args.output:
+            output_path = write_settlement_parquet(path, Path(args.output), block_size)
+            print(f"  Wrote {output_path}")
+        print()
+
+    if failures:
+        print(f"❌ FAILED: {failures} of {len(args.files)} file(s)")
+        sys.exit(1)
+
+    print(f"✅ SUCCESS: {len(args.files)} file(s) ingested")
+
+
+if __name__ == "__main__":
+    main()
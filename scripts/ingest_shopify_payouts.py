@@ -0,0 +1,110 @@
+"""
+Ingest: Shopify payout reports → cash_transactions
+
+Parses Shopify payout exports (one row per charge/refund) in parallel,
+aggregates them to one cash event per Payout ID on its Payout Date and
+optionally upserts those rows into cash_transactions.
+
+Payout rows use source_table 'shopify_payouts'. --load replaces the Shopify
+deposits rows paid out over the same dates in one transaction, and
+deposits_to_cash skips Shopify settlements over the dates payout reports
+cover, so Shopify revenue is never counted from both sources.
+
+Usage:
+    python scripts/ingest_shopify_payouts.py FILE [FILE ...] [--include-pending] [--output FILE.csv] [--load] [--yes]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.etl.cash import merge_cash_rows
+from src.etl.deposits import shopify_deposits_condition
+from src.ingest.shopify_payouts import payouts_to_cash_transactions, read_payout_reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest: Shopify payout reports')
+    parser.add_argument('files', nargs='+', help='Shopify payout report CSVs')
+    parser.add_argument('--include-pending', action='store_true',
+                        help='Include payouts that are not yet paid (scheduled payout date)')
+    parser.add_argument('--max-workers', type=int, help='Files parsed in parallel (default: CPU count)')
+    parser.add_argument('--output', help='Write cash_transactions rows to this CSV')
+    parser.add_argument('--load', action='store_true', help='Upsert rows into cash_transactions')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Ingest: Shopify Payout Reports")
+    print("=" * 60)
+    print()
+
+    start = time.perf_counter()
+    try:
+        payouts = read_payout_reports(
+            args.files,
+            include_pending=args.include_pending,
+            max_workers=args.max_workers
+        )
+    except Exception as e:
+        print(f"❌ ERROR: Failed to parse payout reports")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    print(f"Parsed {len(args.files)} file(s) in {time.perf_counter() - start:,.2f}s")
+    print()
+
+    if payouts.empty:
+        print("No payouts found.")
+        sys.exit(0)
+
+    print("Payouts:")
+    print(payouts[['payout_date', 'payout_id', 'payout_status', 'charges', 'refunds',
+                   'gross', 'fees', 'net']].to_string(index=False))
+    print()
+    print(f"Total net: ${payouts['net'].sum():,.2f} across {len(payouts)} payouts")
+    print()
+
+    rows = payouts_to_cash_transactions(payouts)
+
+    if args.output:
+        rows.to_csv(args.output, index=False)
+        print(f"Wrote {len(rows)} cash_transactions rows to {args.output}")
+        print()
+
+    if not args.load:
+        print("To load into cash_transactions, run with --load")
+        sys.exit(0)
+
+    first_payout, last_payout = rows['cash_date'].min(), rows['cash_date'].max()
+    print(f"Shopify deposits rows paid out {first_payout} to {last_payout} will be replaced by these payouts")
+    print()
+
+    # Confirm before loading
+    if not args.yes:
+        response = input(f"Upsert {len(rows)} Shopify payouts into cash_transactions? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
+        print()
+
+    try:
+        bq = BigQueryConnector()
+        affected = merge_cash_rows(
+            bq, rows, replace_where=shopify_deposits_condition(first_payout, last_payout)
+        )
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        sys.exit(1)
+
+    print(f"✅ SUCCESS: {affected:,} rows inserted/updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Local Parquet lake: sync BigQuery tables to data/raw and data/processed
+
+Only partitions (platform × month) whose content changed in BigQuery are
+downloaded; everything else is left in place.
+
+Usage:
+    python scripts/lake.py status
+    python scripts/lake.py sync [--tables deposits,refunds] [--since YYYY-MM] [--full]
+    python scripts/lake.py vendors [--refresh]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.data.lake import LAKE_TABLES, LocalLake
+from src.data.vendors import VendorMaster
+
+
+def cmd_status(lake, args):
+    print(f"{'Table':<20} {'Zone':<10} {'Partitions':>10} {'Rows':>12} {'MB':>8}  Last sync")
+    print("-" * 90)
+    for name, table in LAKE_TABLES.items():
+        manifest = lake.manifest(name)
+        parts = manifest["partitions"].values()
+        rows = sum(p["rows"] for p in parts)
+        mb = sum(p["bytes"] for p in parts) / 1024**2
+        print(f"{name:<20} {table.zone:<10} {len(parts):>10} {rows:>12,} {mb:>8,.1f}  "
+              f"{manifest.get('synced_at', 'never')}")
+    return 0
+
+
+def cmd_sync(lake, args):
+    names = [t.strip() for t in args.tables.split(',')] if args.tables else list(LAKE_TABLES)
+    unknown = [n for n in names if n not in LAKE_TABLES]
+    if unknown:
+        print(f"❌ ERROR: Unknown tables: {unknown} (available: {', '.join(LAKE_TABLES)})")
+        return 1
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        return 1
+
+    failures = 0
+    for name in names:
+        start = time.perf_counter()
+        try:
+            result = lake.sync(bq, name, since_month=args.since, full=args.full)
+        except Exception as e:
+            print(f"❌ {name}: {str(e)}")
+            failures += 1
+            continue
+
+        print(f"✅ {name}: {result['pulled']} of {result['checked']} partitions pulled "
+              f"({result['rows']:,} rows), {result['removed']} removed "
+              f"in {time.perf_counter() - start:,.1f}s")
+
+    print()
+    if failures:
+        print(f"❌ FAILED: {failures} table(s) did not sync")
+        return 1
+
+    print(f"✅ SUCCESS: Lake up to date at {lake.root}")
+    return 0
+
+
+def cmd_vendors(lake, args):
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        return 1
+
+    try:
+        vendors = VendorMaster.load(bq, refresh=args.refresh)
+    except Exception as e:
+        print(f"❌ vendors: {str(e)}")
+        return 1
+
+    status = vendors.status()
+    print(f"✅ vendors: {status['rows']:,} vendors ({status['normalized_names']:,} distinct names), "
+          f"table modified {status['modified']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Parquet lake')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help='Show synced tables from their manifests')
+
+    sync_parser = subparsers.add_parser('sync', help='Sync changed partitions from BigQuery')
+    sync_parser.add_argument('--tables', help='Comma-separated tables (default: all)')
+    sync_parser.add_argument('--since', help='Only check partitions from this month on (YYYY-MM)')
+    sync_parser.add_argument('--full', action='store_true', help='Re-download every partition')
+
+    vendors_parser = subparsers.add_parser('vendors', help='Refresh the vendor master if the table changed')
+    vendors_parser.add_argument('--refresh', action='store_true', help='Re-download even if unchanged')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Cash Flow - Local Lake")
+    print("=" * 60)
+    print()
+
+    lake = LocalLake()
+    if args.command == 'status':
+        return cmd_status(lake, args)
+    if args.command == 'vendors':
+        return cmd_vendors(lake, args)
+    return cmd_sync(lake, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
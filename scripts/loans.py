@@ -0,0 +1,331 @@
+"""
+Loan portfolio: validate loan configs and sync their schedules
+
+Every YAML under data/loans/ (except example_* templates) is one loan. All
+schedules are generated in one vectorized pass, diffed against the last sync
+(data/processed/loan_sync), and only new or changed rows are written to
+debt_schedule with a single MERGE. A run where nothing changed makes no
+warehouse job.
+
+Usage:
+    python scripts/loans.py list [--dir data/loans] [--include-examples]
+    python scripts/loans.py sync [--dir data/loans] [--full] [--dry-run] [--yes]
+    python scripts/loans.py rates [--paths 1000] [--volatility 0.01] [--shock 0.01] [--weeks 13]
+    python scripts/loans.py whatif LOAN_ID [--prepay 5000,10000] [--buyout] [--refinance 0.08:60] [--date 2026-12-01]
+"""
+
+import sys
+import argparse
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.debt import (
+    LoanWhatIf,
+    RatePaths,
+    amortize_paths,
+    debt_service_summary,
+    discover_loan_files,
+    generate_schedules,
+    load_loans,
+    loan_rates,
+    loan_terms,
+    plan_sync,
+    sync_loans,
+    weekly_debt_service,
+)
+from src.debt.amortization import STRUCTURES
+from src.debt.sync import LOANS_DIR
+
+
+def load_portfolio(args):
+    """Discover and validate configs; prints errors and returns (loans, schedule) or None"""
+    paths = discover_loan_files(Path(args.dir), include_examples=args.include_examples)
+    if not paths:
+        print(f"❌ ERROR: No loan configs found in {args.dir}")
+        return None
+
+    loans, errors = load_loans(paths)
+    for path, error in errors.items():
+        print(f"❌ {path.name}: {error}")
+    if errors:
+        print()
+        print(f"❌ FAILED: {len(errors)} of {len(paths)} loan config(s) are invalid")
+        return None
+
+    start = time.perf_counter()
+    schedule = generate_schedules(loans)
+    print(f"✅ {len(loans)} loans validated, {len(schedule):,} payments generated "
+          f"in {(time.perf_counter() - start) * 1000:,.0f} ms")
+    print()
+    return loans, schedule
+
+
+def print_portfolio(loans, schedule):
+    upcoming = schedule[schedule['is_forecast']].groupby('loan_id').agg(
+        payments=('payment_number', 'size'),
+        next_date=('payment_date', 'min'),
+        remaining=('payment_amount', 'sum'),
+    )
+
+    print(f"{'Loan':<28} {'Lender':<24} {'Structure':<10} {'Balance':>12} {'Rate':>7} "
+          f"{'Left':>5} {'Next':>10} {'Remaining':>13}")
+    print("-" * 118)
+    for loan in loans:
+        row = upcoming.loc[loan.loan_id] if loan.loan_id in upcoming.index else None
+        next_date = f"{row['next_date']:%Y-%m-%d}" if row is not None else "-"
+        print(f"{loan.loan_id[:28]:<28} {loan.lender[:24]:<24} {STRUCTURES[loan.structure]:<10} "
+              f"${loan.current_balance:>11,.2f} {loan.annual_rate:>7.2%} "
+              f"{int(row['payments']) if row is not None else 0:>5} {next_date:>10} "
+              f"${row['remaining'] if row is not None else 0:>12,.2f}")
+    print()
+
+
+def cmd_list(args):
+    portfolio = load_portfolio(args)
+    if portfolio is None:
+        return 1
+
+    print_portfolio(*portfolio)
+    return 0
+
+
+def print_plan(plan):
+    rows = plan.changes.groupby('loan_id').size()
+    for loan_id in plan.replaced:
+        print(f"  {loan_id:<28} replace  {rows.get(loan_id, 0):>4} rows (new or changed config)")
+    for loan_id in plan.updated:
+        print(f"  {loan_id:<28} update   {rows.get(loan_id, 0):>4} rows")
+    for loan_id in plan.skipped:
+        print(f"  {loan_id:<28} unchanged")
+    print()
+
+
+def cmd_sync(args):
+    portfolio = load_portfolio(args)
+    if portfolio is None:
+        return 1
+
+    loans, _ = portfolio
+    plan = plan_sync(loans, full=args.full)
+    print_portfolio(loans, plan.schedule)
+    print_plan(plan)
+
+    if plan.empty:
+        print("✅ debt_schedule already up to date")
+        return 0
+
+    if args.dry_run:
+        print("✅ DRY RUN COMPLETE - debt_schedule not changed")
+        return 0
+
+    if not args.yes:
+        response = input(f"Merge {len(plan.changes):,} rows into debt_schedule? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return 0
+        print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        return 1
+
+    try:
+        result = sync_loans(bq, loans, plan=plan)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to merge debt_schedule")
+        print(f"   {str(e)}")
+        return 1
+
+    print(f"✅ SUCCESS: {result['payments']:,} rows merged for {result['replaced'] + result['updated']} loans, "
+          f"{result['skipped']} unchanged ({result['rows_affected']:,} rows changed, "
+          f"{result['bytes_processed'] / 1024**2:,.1f} MB processed)")
+    return 0
+
+
+def cmd_rates(args):
+    portfolio = load_portfolio(args)
+    if portfolio is None:
+        return 1
+
+    loans, _ = portfolio
+    variable = [loan for loan in loans if loan.is_variable]
+    if not variable:
+        print("⚠️  No variable-rate loans (rate_index + rate_margin) - debt service does not depend on rates")
+        return 0
+
+    today = date.today()
+    index = variable[0].index_rate(today)
+    for loan in variable:
+        print(f"  {loan.loan_id}: {loan.rate_index or 'index'} {loan.index_rate(today):.2%} "
+              f"+ {loan.rate_margin:.2%}")
+    print()
+
+    start = time.perf_counter()
+    terms = loan_terms(loans)
+    months = int(terms['periods'].max(initial=0)) + 1
+    base = amortize_paths(terms, loan_rates(loans, terms, RatePaths.flat(index, today, months)))
+    paths = RatePaths.simulate(index, today, months, n_paths=args.paths, volatility=args.volatility,
+                               drift=args.drift, seed=args.seed).shifted(args.shock)
+    schedule = amortize_paths(terms, loan_rates(loans, terms, paths))
+    weekly = weekly_debt_service(schedule, today, args.weeks)
+    elapsed = time.perf_counter() - start
+
+    summary = debt_service_summary(weekly, today)
+    summary['base'] = weekly_debt_service(base, today, args.weeks)[0]
+    print(f"✅ {args.paths:,} rate paths × {len(loans)} loans amortized in {elapsed:,.2f}s "
+          f"(volatility {args.volatility:.2%}/yr, shock {args.shock:+.2%})")
+    print()
+
+    print(f"{'Week':>4} {'Start':>10} {'Flat':>12} {'Mean':>12} {'P5':>12} {'P50':>12} {'P95':>12}")
+    print("-" * 80)
+    for _, row in summary.iterrows():
+        print(f"{row['week_number']:>4} {row['week_start']:%Y-%m-%d} ${row['base']:>11,.2f} ${row['mean']:>11,.2f} "
+              f"${row['p5']:>11,.2f} ${row['p50']:>11,.2f} ${row['p95']:>11,.2f}")
+    print("-" * 80)
+
+    totals = weekly.sum(axis=1)
+    p5, p50, p95 = np.percentile(totals, [5, 50, 95])
+    print(f"{'Total':>15} ${summary['base'].sum():>11,.2f} ${totals.mean():>11,.2f} "
+          f"${p5:>11,.2f} ${p50:>11,.2f} ${p95:>11,.2f}")
+    return 0
+
+
+def print_whatif(title, result, columns):
+    """One line per alternative plus its cash impact over the forecast weeks"""
+    summary = result.summary
+    print(title)
+    print(f"  {'Alternative':<34} {'Interest saved':>15} {'Costs':>11} {'Net':>12} {'Paid off':>10} {'13-wk cash':>12}")
+    print("  " + "-" * 100)
+    for i, row in summary.iterrows():
+        label = ", ".join(fmt.format(row[col]) for col, fmt in columns)
+        paid_off = f"{row['final_payment']:%Y-%m-%d}" if not np.isnat(np.datetime64(row['final_payment'])) else "-"
+        print(f"  {label[:34]:<34} ${row['interest_saved']:>14,.2f} ${row['costs']:>10,.2f} "
+              f"${row['net_savings']:>11,.2f} {paid_off:>10} ${result.weekly[i].sum():>11,.2f}")
+    print()
+
+
+def cmd_whatif(args):
+    portfolio = load_portfolio(args)
+    if portfolio is None:
+        return 1
+
+    loans, _ = portfolio
+    loan = next((loan for loan in loans if loan.loan_id == args.loan_id), None)
+    if loan is None:
+        print(f"❌ ERROR: Unknown loan {args.loan_id} (loans: {', '.join(l.loan_id for l in loans)})")
+        return 1
+
+    today = date.today()
+    when = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else today
+    whatif = LoanWhatIf(loan, as_of=today, weeks=args.weeks)
+    print(f"  {loan.loan_id}: ${whatif.base_interest:,.2f} interest over {len(whatif.payment_dates)} remaining payments")
+    print()
+
+    start = time.perf_counter()
+    results = []
+    try:
+        if args.prepay:
+            amounts = [float(a) for a in args.prepay.split(',')]
+            results.append(("Prepayment" + (" (recast)" if args.recast else ""),
+                            whatif.prepay(amounts, when, recast=args.recast),
+                            [('prepaid', '${:,.0f}'), ('date', 'on {:%Y-%m-%d}')]))
+        if args.buyout:
+            dates = whatif.payment_dates[whatif.payment_dates >= np.datetime64(when, 'D')][:args.buyout]
+            results.append(("Early buyout",
+                            whatif.buyout(dates),
+                            [('date', '{:%Y-%m-%d}'), ('premium_rate', '+{:.1%}'), ('payoff', '${:,.0f}')]))
+        for refinance in args.refinance or []:
+            rate, months = refinance.split(':')
+            results.append((f"Refinance at {float(rate):.2%} over {months} months",
+                            whatif.refinance(when, float(rate), int(months), fees=args.fees),
+                            [('date', '{:%Y-%m-%d}'), ('new_payment', '${:,.2f}/mo')]))
+    except ValueError as e:
+        print(f"❌ ERROR: {str(e)}")
+        return 1
+
+    if not results:
+        print("⚠️  Nothing to evaluate - pass --prepay, --buyout and/or --refinance")
+        return 0
+
+    count = sum(len(result.summary) for _, result, _ in results)
+    print(f"✅ {count} alternatives evaluated in {(time.perf_counter() - start) * 1000:,.0f} ms "
+          f"(cash impact over {args.weeks} weeks, + = more cash than the current schedule)")
+    print()
+    for title, result, columns in results:
+        print_whatif(title, result, columns)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Loan portfolio schedules')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--dir', default=str(LOANS_DIR), help='Loan config directory (default: data/loans)')
+    common.add_argument('--include-examples', action='store_true', help='Also load example_*.yaml templates')
+
+    subparsers.add_parser('list', parents=[common], help='Validate configs and show the portfolio')
+
+    sync_parser = subparsers.add_parser('sync', parents=[common],
+                                        help='Write changed loan schedule rows to debt_schedule in one MERGE')
+    sync_parser.add_argument('--full', action='store_true',
+                             help='Ignore the last-sync memo and replace every loan')
+    sync_parser.add_argument('--dry-run', action='store_true', help='Validate and preview only')
+    sync_parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+
+    rates_parser = subparsers.add_parser('rates', parents=[common],
+                                         help='Weekly debt-service distribution over simulated index paths')
+    rates_parser.add_argument('--paths', type=int, default=1000, help='Number of simulated rate paths')
+    rates_parser.add_argument('--volatility', type=float, default=0.01,
+                              help='Annual volatility of the index (0.01 = 100bp)')
+    rates_parser.add_argument('--drift', type=float, default=0.0, help='Annual drift of the index')
+    rates_parser.add_argument('--shock', type=float, default=0.0,
+                              help='Parallel shift of every path (0.01 = +100bp)')
+    rates_parser.add_argument('--weeks', type=int, default=13, help='Forecast weeks to report')
+    rates_parser.add_argument('--seed', type=int, help='Random seed (reproducible paths)')
+
+    whatif_parser = subparsers.add_parser('whatif', parents=[common],
+                                          help='Interest saved and weekly cash impact of prepaying, buying out or refinancing')
+    whatif_parser.add_argument('loan_id', help='Loan to evaluate')
+    whatif_parser.add_argument('--date', help='Prepayment / refinance date, YYYY-MM-DD (default: today)')
+    whatif_parser.add_argument('--prepay', help='Comma-separated extra principal amounts')
+    whatif_parser.add_argument('--recast', action='store_true',
+                               help='Re-amortize the payment after prepaying (default: same payment, finish early)')
+    whatif_parser.add_argument('--buyout', type=int, nargs='?', const=12, default=0,
+                               help='Early buyout on each of the next N payment dates from --date (default: 12)')
+    whatif_parser.add_argument('--refinance', action='append', metavar='RATE:MONTHS',
+                               help='New amortizing loan, e.g. 0.08:60 (repeatable)')
+    whatif_parser.add_argument('--fees', type=float, default=0.0, help='Refinance closing costs paid in cash')
+    whatif_parser.add_argument('--weeks', type=int, default=13, help='Forecast weeks for the cash impact')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Cash Flow - Loan Schedules")
+    print("=" * 60)
+    print()
+
+    if args.command == 'list':
+        return cmd_list(args)
+    if args.command == 'rates':
+        return cmd_rates(args)
+    if args.command == 'whatif':
+        return cmd_whatif(args)
+    return cmd_sync(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Refresh platform fee and refund rates
+
+Updates platform_fee_daily from the deposits, refunds and fees partitions
+added since the last run (etl_watermarks), then re-queries the rolling
+4/13/52-week rate table into the local forecast cache and shows it.
+
+Usage:
+    python scripts/refresh_fee_rates.py [--window 13] [--dry-run] [--yes]
+    python scripts/refresh_fee_rates.py --full-refresh
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.forecast.fee_rates import (
+    DEFAULT_MIN_SKU_SALES,
+    DEFAULT_WINDOW_WEEKS,
+    WINDOWS,
+    FeeRates,
+    plan_fee_increment,
+    refresh_fee_daily,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh rolling platform fee and refund rates')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW_WEEKS, choices=WINDOWS,
+                        help='Window (weeks) to display (default: 13)')
+    parser.add_argument('--min-sku-sales', type=float, default=DEFAULT_MIN_SKU_SALES,
+                        help='Product sales a SKU needs in the window for its own rate')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore watermarks and rebuild platform_fee_daily from all history')
+    parser.add_argument('--dry-run', action='store_true', help='Show new rows per source table only')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Platform Fee & Refund Rates")
+    print("=" * 60)
+    print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    if args.dry_run:
+        plan = plan_fee_increment(bq, full_refresh=args.full_refresh)
+        if plan.empty:
+            print("No new deposits, refunds or fees rows since the last refresh.")
+            sys.exit(0)
+
+        print("New rows since the last refresh:")
+        print(plan[['partition_key', 'rows_processed', 'keys_processed', 'first_date', 'watermark_ts']]
+              .rename(columns={'partition_key': 'table', 'keys_processed': 'days'}).to_string(index=False))
+        print()
+        print("✅ DRY RUN COMPLETE - platform_fee_daily not changed")
+        sys.exit(0)
+
+    if not args.yes:
+        action = "Rebuild" if args.full_refresh else "Update"
+        response = input(f"{action} platform_fee_daily? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            sys.exit(0)
+        print()
+
+    try:
+        result = refresh_fee_daily(bq, full_refresh=args.full_refresh)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to update platform_fee_daily")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    if result['rows_affected'] == 0 and result['mode'] == 'incremental':
+        print("✅ platform_fee_daily already up to date")
+    else:
+        since = f"from {result['start_date']}" if result['start_date'] else "all history"
+        print(f"✅ platform_fee_daily: {result['rows_affected']:,} rows merged ({since})")
+        print(f"   Bytes processed: {result['bytes_processed'] / 1024**2:,.1f} MB")
+    print()
+
+    try:
+        rates = FeeRates.load(bq)
+    except Exception as e:
+        print(f"❌ ERROR: Failed to load rates")
+        print(f"   {str(e)}")
+        sys.exit(1)
+
+    if rates.as_of_date is None:
+        print("⚠️  platform_fee_daily is empty - forecasts will assume no fees or refunds")
+        sys.exit(0)
+
+    table = rates.rates(args.window, min_sku_sales=args.min_sku_sales)
+    platform_rates = table[table['sku'].isna()].set_index('platform')
+
+    print(f"{args.window}-week rates as of {rates.as_of_date:%Y-%m-%d}:")
+    print(f"{'Platform':<12} {'Sales':>14} {'Selling':>8} {'FBA':>8} {'Other':>8} {'Fees':>8} {'Refunds':>8}")
+    print("-" * 72)
+    for platform, row in platform_rates.iterrows():
+        print(f"{platform:<12} ${row['product_sales']:>13,.0f} "
+              f"{row['selling_fee_rate']:>8.1%} {row['fba_fee_rate']:>8.1%} {row['other_fee_rate']:>8.1%} "
+              f"{row['fee_rate']:>8.1%} {row['refund_rate']:>8.1%}")
+    print()
+    print(f"SKU-specific rates: {int(table['sku'].notna().sum()):,} "
+          f"(SKUs with at least ${args.min_sku_sales:,.0f} of sales in the window)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Refresh materialized views (v_daily_cash_flow) after the ETL
+
+Shows, for each materialized view in database/create_financial_tables.sql,
+its last refresh, size and the base-table partitions modified since its
+refresh watermark, then refreshes the stale ones. A refresh recomputes only
+those partitions; the report lists what was recomputed, the bytes scanned
+and the new watermark.
+
+Usage:
+    python scripts/refresh_views.py [VIEW ...] [--force] [--dry-run] [--yes]
+"""
+
+import sys
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.data.materialized import materialized_views, refresh_materialized_views, view_status
+from src.data.schema import DDL_FILE, load_schema
+
+
+def _bytes(value) -> str:
+    if value is None or pd.isna(value):
+        return "-"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f"{value:,.0f} {unit}"
+        value /= 1024
+    return f"{value:,.1f} TB"
+
+
+def _time(value) -> str:
+    return f"{pd.Timestamp(value):%Y-%m-%d %H:%M}" if pd.notna(value) else "never"
+
+
+def _stale(row) -> str:
+    partitions = int(row['stale_partitions']) if pd.notna(row['stale_partitions']) else 0
+    if not partitions:
+        return "up to date"
+    span = row['first_stale_partition']
+    if pd.notna(row['last_stale_partition']) and row['last_stale_partition'] != span:
+        span = f"{span}..{row['last_stale_partition']}"
+    rows = int(row['stale_rows']) if pd.notna(row['stale_rows']) else 0
+    return f"{partitions} partition(s) of {row['base_tables']} ({span}, {rows:,} rows)"
+
+
+def print_status(status):
+    print(f"   {'View':<22} {'Rows':>10} {'Size':>10} {'Last refresh':>17}  Changed since refresh")
+    print("-" * 100)
+    for _, row in status.iterrows():
+        if not row['is_present']:
+            print(f"❌ {row['table_name']:<22} MISSING")
+            continue
+        rows = f"{int(row['total_rows']):,}" if pd.notna(row['total_rows']) else "-"
+        print(f"   {row['table_name']:<22} {rows:>10} {_bytes(row['total_logical_bytes']):>10} "
+              f"{_time(row['last_refresh_time']):>17}  {_stale(row)}")
+        if pd.notna(row['last_refresh_error']):
+            print(f"   ⚠️  last refresh failed: {row['last_refresh_error'][:150]}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh materialized views from changed partitions')
+    parser.add_argument('views', nargs='*', help='Views to refresh (default: all materialized views)')
+    parser.add_argument('--force', action='store_true', help='Refresh even when no base partition changed')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be recomputed only')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Materialized Views - Refresh")
+    print("=" * 60)
+    print()
+
+    try:
+        views = materialized_views(load_schema())
+    except ValueError as e:
+        print(f"❌ ERROR: Cannot parse {DDL_FILE.name}")
+        print(f"   {str(e)}")
+        return 1
+
+    if args.views:
+        unknown = sorted(set(args.views) - {view.name for view in views})
+        if unknown:
+            print(f"❌ ERROR: Not a materialized view in {DDL_FILE.name}: {', '.join(unknown)}")
+            return 1
+        views = [view for view in views if view.name in args.views]
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        status = view_status(bq, views)
+        print(f"✅ Read refresh state of {len(views)} materialized view(s)")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to read INFORMATION_SCHEMA")
+        print(f"   {str(e)}")
+        return 1
+
+    print_status(status)
+
+    missing = status.loc[~status['is_present'].astype(bool), 'table_name'].tolist()
+    if missing:
+        print(f"❌ Missing: {', '.join(missing)} - run python scripts/create_tables.py")
+        return 1
+
+    stale = set(status.loc[status['stale_partitions'].fillna(0) > 0, 'table_name'])
+    targets = [view for view in views if args.force or view.name in stale]
+    if not targets:
+        print("✅ All materialized views up to date - nothing to refresh")
+        return 0
+
+    if args.dry_run:
+        print(f"Would refresh: {', '.join(view.name for view in targets)}")
+        print()
+        print("✅ DRY RUN COMPLETE - no views refreshed")
+        return 0
+
+    if not args.yes:
+        response = input(f"Refresh {len(targets)} materialized view(s)? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return 0
+        print()
+
+    before = status.set_index('table_name')
+    start = time.perf_counter()
+    results = refresh_materialized_views(bq, targets)
+    elapsed = time.perf_counter() - start
+
+    try:
+        after = view_status(bq, targets).set_index('table_name')
+    except Exception as e:
+        print(f"⚠️  Refreshed, but could not re-read refresh state: {str(e)[:150]}")
+        after = None
+
+    for result in results:
+        if not result.ok:
+            print(f"  ❌ {result.name}")
+            print(f"     {result.error[:200]}")
+            continue
+        print(f"  ✅ {result.name} ({result.seconds:.1f}s, {_bytes(result.bytes_processed)} processed)")
+        print(f"     recomputed: {_stale(before.loc[result.name])}")
+        if after is not None and result.name in after.index:
+            print(f"     watermark:  {_time(before.loc[result.name, 'refresh_watermark'])} → "
+                  f"{_time(after.loc[result.name, 'refresh_watermark'])}")
+            if after.loc[result.name, 'stale_partitions'] > 0:
+                print(f"     ⚠️  still stale: {_stale(after.loc[result.name])} (modified during the refresh)")
+    print()
+
+    failed = [r for r in results if not r.ok]
+    print("=" * 60)
+    print("Summary")
+    print("=" * 60)
+    print(f"✅ Refreshed: {len(results) - len(failed)}/{len(results)} in {elapsed:.1f}s, "
+          f"{_bytes(sum(r.bytes_processed or 0 for r in results))} processed")
+    if failed:
+        print(f"❌ Failed:    {len(failed)}/{len(results)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
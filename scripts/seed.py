@@ -0,0 +1,120 @@
+"""
+Seed master data tables from data/seed/*.yaml
+
+Each YAML file holds the rows of one table (bank_accounts, payment_terms,
+recurring_transactions, scenarios). Rows are validated against
+database/create_financial_tables.sql and upserted with one parameterized
+MERGE per table on the file's key, so seeding is one job per table and safe
+to re-run: unchanged rows are not touched.
+
+Usage:
+    python scripts/seed.py [TABLE ...] [--dir data/seed] [--dry-run] [--yes]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data import BigQueryConnector
+from src.data.schema import DDL_FILE, load_schema
+from src.data.seed import SEED_DIR, discover_seed_files, load_seeds, merge_seed_sql, seed_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed master data tables from YAML')
+    parser.add_argument('tables', nargs='*', help='Only seed these tables (default: every seed file)')
+    parser.add_argument('--dir', default=str(SEED_DIR), help='Seed directory (default: data/seed)')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and preview only (print the MERGE SQL)')
+    parser.add_argument('--yes', action='store_true', help='Skip confirmation prompt (non-interactive)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VoChill Cash Flow - Seed Master Data")
+    print("=" * 60)
+    print()
+
+    try:
+        schema = load_schema()
+    except (OSError, ValueError) as e:
+        print(f"❌ ERROR: Cannot parse {DDL_FILE.name}")
+        print(f"   {str(e)}")
+        return 1
+
+    paths = discover_seed_files(Path(args.dir))
+    if not paths:
+        print(f"❌ ERROR: No seed files found in {args.dir}")
+        return 1
+
+    seeds, errors = load_seeds(paths, schema)
+    for path, error in errors.items():
+        print(f"❌ {path.name}: {error}")
+    if errors:
+        print()
+        print(f"❌ FAILED: {len(errors)} of {len(paths)} seed file(s) are invalid")
+        return 1
+
+    if args.tables:
+        unknown = sorted(set(args.tables) - {seed.name for seed in seeds})
+        if unknown:
+            print(f"❌ ERROR: No seed file for {', '.join(unknown)}")
+            return 1
+        seeds = [seed for seed in seeds if seed.name in args.tables]
+
+    print(f"✅ {len(seeds)} seed file(s) validated against {DDL_FILE.name}")
+    print()
+    for seed in seeds:
+        print(f"  • {seed.name:<24} {len(seed.rows):>4} rows  key: {', '.join(seed.key):<16} ({seed.path.name})")
+    print()
+
+    if args.dry_run:
+        for seed in seeds:
+            print(f"-- {seed.name}")
+            print(merge_seed_sql(seed))
+        print("✅ DRY RUN COMPLETE - no tables changed")
+        return 0
+
+    if not args.yes:
+        response = input(f"Merge {sum(len(s.rows) for s in seeds)} rows into {len(seeds)} table(s)? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Cancelled.")
+            return 0
+        print()
+
+    print("Connecting to BigQuery...")
+    try:
+        bq = BigQueryConnector()
+        print("✅ Connected")
+        print()
+    except Exception as e:
+        print(f"❌ ERROR: Failed to connect to BigQuery")
+        print(f"   {str(e)}")
+        return 1
+
+    failed = 0
+    for seed in seeds:
+        print(f"  {seed.name}...", end=' ')
+        try:
+            job = seed_table(bq, seed)
+        except Exception as e:
+            print("❌")
+            print(f"     Error: {str(e)[:200]}")
+            failed += 1
+            continue
+
+        changed = (job.num_dml_affected_rows or 0) if job is not None else 0
+        print(f"✅ {len(seed.rows)} rows, {changed} inserted or updated")
+
+    print()
+    if failed:
+        print(f"❌ FAILED: {failed} of {len(seeds)} table(s) not seeded. Review errors above.")
+        return 1
+
+    print(f"✅ SUCCESS: {len(seeds)} table(s) seeded ({len(seeds)} jobs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
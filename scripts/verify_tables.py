@@ -1,161 +1,138 @@
 """
-Verify that all financial tables were created successfully in BigQuery
+Verify financial tables: existence, sizes, partitions and clustering
+
+One INFORMATION_SCHEMA query (TABLES, PARTITIONS, COLUMNS, TABLE_STORAGE)
+returns, for every table and view in database/create_financial_tables.sql,
+whether it exists, its row count, bytes, partition count, last-modified time
+and clustering. Drift from the DDL, NULL partitions, over-partitioned tables
+and unseeded master tables are flagged.
 
 Usage:
-    python scripts/verify_tables.py
+    python scripts/verify_tables.py [--csv outputs/table_health.csv]
 """
 
 import sys
+import argparse
+import time
 from pathlib import Path
 
+import pandas as pd
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data import BigQueryConnector
+from src.data.health import health_issues, table_health
+from src.data.schema import DDL_FILE, load_schema
+from src.data.seed import discover_seed_files, load_seeds
+
+
+def _bytes(value) -> str:
+    if pd.isna(value):
+        return "-"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f"{value:,.0f} {unit}"
+        value /= 1024
+    return f"{value:,.1f} TB"
+
+
+def _count(value) -> str:
+    return "-" if pd.isna(value) else f"{int(value):,}"
+
+
+def print_health(health, schema):
+    print(f"   {'Object':<26} {'Type':<9} {'Rows':>12} {'Logical':>10} {'Physical':>10} "
+          f"{'Parts':>6} {'Last modified':>17}  Clustering")
+    print("-" * 120)
+    for _, row in health.iterrows():
+        table = schema.get(row['table_name'])
+        if not row['is_present']:
+            print(f"❌ {row['table_name']:<26} {'MISSING':<9}")
+            continue
+        icon = "✅" if table is not None else "⚠️ "
+        kind = {'BASE TABLE': 'table', 'VIEW': 'view', 'MATERIALIZED VIEW': 'mat view'}.get(
+            row['table_type'], str(row['table_type']).lower())
+        modified = f"{pd.Timestamp(row['last_modified']):%Y-%m-%d %H:%M}" if pd.notna(row['last_modified']) else "-"
+        clustering = row['clustering'] if pd.notna(row['clustering']) else ""
+        print(f"{icon} {row['table_name']:<26} {kind:<9} {_count(row['total_rows']):>12} "
+              f"{_bytes(row['total_logical_bytes']):>10} {_bytes(row['total_physical_bytes']):>10} "
+              f"{_count(row['partitions']):>6} {modified:>17}  {clustering}")
+    print()
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Verify BigQuery tables against the DDL')
+    parser.add_argument('--csv', help='Also write the health table to this CSV file')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("VoChill Financial Tables - Verification")
     print("=" * 60)
     print()
 
-    # Expected tables and views
-    expected_tables = [
-        'bank_accounts',
-        'chart_of_accounts',
-        'payment_terms',
-        'cash_transactions',
-        'cash_balances',
-        'debt_schedule',
-        'cash_forecast',
-        'gl_transactions',
-        'recurring_transactions',
-        'capex_plan',
-        'budget',
-        'scenarios',
-        'forecast_assumptions',
-    ]
-
-    expected_views = [
-        'v_daily_cash_flow',
-        'v_weekly_cash_flow',
-        'v_cash_position',
-    ]
-
-    print("Connecting to BigQuery...")
-
     try:
-        bq = BigQueryConnector()
-        print("✅ Connected")
-        print()
-    except Exception as e:
-        print(f"❌ ERROR: Failed to connect to BigQuery")
+        schema = load_schema()
+    except ValueError as e:
+        print(f"❌ ERROR: Cannot parse {DDL_FILE.name}")
         print(f"   {str(e)}")
-        sys.exit(1)
+        return 1
 
-    # Get list of tables
-    print("Fetching table list from vochill.revrec...")
+    seeds, _ = load_seeds(discover_seed_files(), schema)
+    seed_rows = {seed.name: len(seed.rows) for seed in seeds}
 
+    print("Connecting to BigQuery...")
     try:
-        tables = bq.get_available_tables()
-        print(f"Found {len(tables)} objects in dataset")
+        bq = BigQueryConnector()
+        start = time.perf_counter()
+        health = table_health(bq, schema)
+        print(f"✅ Table health read in {time.perf_counter() - start:.1f}s (1 query)")
         print()
     except Exception as e:
-        print(f"❌ ERROR: Failed to list tables")
+        print(f"❌ ERROR: Failed to read INFORMATION_SCHEMA")
         print(f"   {str(e)}")
-        sys.exit(1)
-
-    # Check tables
-    print("Checking TABLES:")
-    print("-" * 60)
-
-    found_tables = []
-    missing_tables = []
+        return 1
 
-    for table_name in expected_tables:
-        if table_name in tables:
-            found_tables.append(table_name)
-            print(f"✅ {table_name}")
-        else:
-            missing_tables.append(table_name)
-            print(f"❌ {table_name} - MISSING")
+    print_health(health, schema)
 
-    print()
-    print("Checking VIEWS:")
-    print("-" * 60)
+    if args.csv:
+        Path(args.csv).parent.mkdir(parents=True, exist_ok=True)
+        health.to_csv(args.csv, index=False)
+        print(f"✅ Wrote {args.csv}")
+        print()
 
-    found_views = []
-    missing_views = []
+    expected = health[health['table_name'].isin(list(schema))]
+    tables = expected[expected['expected_type'] == 'TABLE']
+    views = expected[expected['expected_type'] != 'TABLE']
+    missing = expected[~expected['is_present'].astype(bool)]
 
-    for view_name in expected_views:
-        if view_name in tables:
-            found_views.append(view_name)
-            print(f"✅ {view_name}")
-        else:
-            missing_views.append(view_name)
-            print(f"❌ {view_name} - MISSING")
+    issues = health_issues(health, schema, seed_rows)
 
-    print()
     print("=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"Tables: {len(found_tables)}/{len(expected_tables)} created")
-    print(f"Views:  {len(found_views)}/{len(expected_views)} created")
+    print(f"Tables: {int(tables['is_present'].sum())}/{len(tables)} present, "
+          f"{int(tables['total_rows'].fillna(0).sum()):,} rows, {_bytes(tables['total_logical_bytes'].fillna(0).sum())}")
+    print(f"Views:  {int(views['is_present'].sum())}/{len(views)} present")
     print()
 
-    if not missing_tables and not missing_views:
-        print("✅ SUCCESS: All tables and views created!")
-        print()
-        print("Next steps:")
-        print("  1. Test queries: python notebooks/bigquery_example.py")
-        print("  2. Populate data:")
-        print("     - python scripts/populate_bank_accounts.py")
-        print("     - python scripts/populate_chart_of_accounts.py")
+    if issues:
+        print(f"⚠️  {len(issues)} finding(s):")
+        for issue in issues:
+            print(f"  - {issue}")
         print()
 
-        # Check seed data
-        print("Checking seed data...")
+    if not missing.empty:
+        print("❌ FAILED: Some tables/views are missing")
         print()
-
-        try:
-            # Check payment_terms
-            payment_terms = bq.query("SELECT COUNT(*) as count FROM `vochill.revrec.payment_terms`")
-            pt_count = payment_terms.iloc[0]['count']
-            print(f"  payment_terms: {pt_count} rows {'✅' if pt_count >= 7 else '⚠️  (expected 7)'}")
-
-            # Check scenarios
-            scenarios = bq.query("SELECT COUNT(*) as count FROM `vochill.revrec.scenarios`")
-            sc_count = scenarios.iloc[0]['count']
-            print(f"  scenarios: {sc_count} rows {'✅' if sc_count >= 3 else '⚠️  (expected 3)'}")
-            print()
-        except Exception as e:
-            print(f"  ⚠️  Could not check seed data: {e}")
-            print()
-
-        return 0
-    else:
-        print("⚠️  WARNING: Some tables/views are missing")
-        print()
-
-        if missing_tables:
-            print("Missing tables:")
-            for table in missing_tables:
-                print(f"  - {table}")
-            print()
-
-        if missing_views:
-            print("Missing views:")
-            for view in missing_views:
-                print(f"  - {view}")
-            print()
-
         print("To fix:")
         print("  Re-run: python scripts/create_tables.py")
         print()
-
         return 1
 
+    print("✅ SUCCESS: All tables and views present")
+    return 0
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 import yaml
 from dotenv import load_dotenv
 
@@ -33,9 +33,16 @@ class Config:
         self.bigquery_dataset = os.getenv("BIGQUERY_DATASET", "revrec")
         self.bigquery_location = os.getenv("BIGQUERY_LOCATION", "US")
 
-        # Load configuration files
-        self.cash_flow_categories = self._load_yaml(CONFIG_DIR / "cash_flow_categories.yaml")
-        self.payment_timing = self._load_yaml(CONFIG_DIR / "payment_timing.yaml")
+        # Parsed configuration files, keyed by path: (mtime, contents)
+        self._yaml_cache: Dict[Path, Tuple[Optional[float], Dict[str, Any]]] = {}
+
+    @property
+    def cash_flow_categories(self) -> Dict[str, Any]:
+        return self.load_yaml(CONFIG_DIR / "cash_flow_categories.yaml")
+
+    @property
+    def payment_timing(self) -> Dict[str, Any]:
+        return self.load_yaml(CONFIG_DIR / "payment_timing.yaml")
 
     @staticmethod
     def _load_yaml(file_path: Path) -> Dict[str, Any]:
@@ -46,6 +53,24 @@ class Config:
         with open(file_path, 'r') as f:
             return yaml.safe_load(f) or {}
 
+    @staticmethod
+    def file_mtime(file_path: Path) -> Optional[float]:
+        """Modification time of a file (None if it does not exist)"""
+        try:
+            return file_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def load_yaml(self, file_path: Path) -> Dict[str, Any]:
+        """Load a YAML configuration file, re-reading it only when it changes on disk"""
+        mtime = self.file_mtime(file_path)
+        cached = self._yaml_cache.get(file_path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, self._load_yaml(file_path))
+            self._yaml_cache[file_path] = cached
+
+        return cached[1]
+
     def get_bigquery_table(self, table_name: str) -> str:
         """Get fully qualified BigQuery table name"""
         return f"{self.gcp_project_id}.{self.bigquery_dataset}.{table_name}"
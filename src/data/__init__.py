@@ -1,5 +1,7 @@
 """Data access layer for VoChill cash flow system"""
 
 from .bigquery_connector import BigQueryConnector
+from .lake import LocalLake
+from .vendors import VendorMaster
 
-__all__ = ["BigQueryConnector"]
+__all__ = ["BigQueryConnector", "LocalLake", "VendorMaster"]
@@ -1,9 +1,11 @@
 """BigQuery connector for VoChill cash flow system"""
 
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import pandas as pd
+import pyarrow as pa
 from google.cloud import bigquery
 from google.oauth2 import service_account
 from google.api_core import retry
@@ -88,6 +90,104 @@ class BigQueryConnector:
 
         return df
 
+    def query_arrow(self, sql: str) -> pa.Table:
+        """
+        Execute a SQL query and return results as an Arrow table.
+
+        Skips the pandas conversion, for results that are written straight
+        to Parquet.
+
+        Args:
+            sql: SQL query string
+
+        Returns:
+            pyarrow Table with query results
+        """
+        query_job = self.client.query(sql)
+
+        return query_job.to_arrow()
+
+    def dry_run(self, sql: str) -> int:
+        """
+        Validate a query and estimate its cost without running it.
+
+        Args:
+            sql: SQL query string
+
+        Returns:
+            Number of bytes the query would process
+
+        Example:
+            >>> bq = BigQueryConnector()
+            >>> bq.dry_run("SELECT total FROM deposits") / 1024**2  # MB
+        """
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        query_job = self.client.query(sql, job_config=job_config)
+
+        return query_job.total_bytes_processed or 0
+
+    def execute(self, sql: str, query_parameters: Optional[List[Any]] = None) -> bigquery.QueryJob:
+        """
+        Execute a DML/DDL statement or multi-statement script and wait for it.
+
+        Unlike query(), no result set is downloaded. The finished job is
+        returned so callers can report affected rows and bytes processed.
+
+        Args:
+            sql: SQL statement or script
+            query_parameters: Optional typed parameters (ScalarQueryParameter,
+                              ArrayQueryParameter, ...) referenced as @name
+
+        Returns:
+            Completed QueryJob
+
+        Example:
+            >>> bq = BigQueryConnector()
+            >>> job = bq.execute("DELETE FROM cash_transactions WHERE is_forecast")
+            >>> job.num_dml_affected_rows
+        """
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters or [])
+        query_job = self.client.query(sql, job_config=job_config)
+        query_job.result()
+
+        return query_job
+
+    def load_dataframe(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        write_disposition: str = "WRITE_TRUNCATE",
+    ) -> bigquery.LoadJob:
+        """
+        Load a DataFrame into an existing table with a single load job.
+
+        Load jobs are free and atomic, so small derived tables are rebuilt
+        this way rather than with INSERT statements.
+
+        Args:
+            df: Rows to load (columns named as in the table)
+            table_name: Table in the dataset
+            write_disposition: WRITE_TRUNCATE (replace) or WRITE_APPEND
+
+        Returns:
+            Completed LoadJob
+
+        Example:
+            >>> bq = BigQueryConnector()
+            >>> job = bq.load_dataframe(df, "business_calendar")
+            >>> job.output_rows
+        """
+        table_ref = f"{self.project_id}.{self.dataset}.{table_name}"
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=write_disposition,
+            # Keep the table's DDL (descriptions, partitioning) on truncate
+            schema=self.client.get_table(table_ref).schema,
+        )
+        load_job = self.client.load_table_from_dataframe(df, table_ref, job_config=job_config)
+        load_job.result()
+
+        return load_job
+
     def get_table_data(
         self,
         table_name: str,
@@ -311,6 +411,46 @@ class BigQueryConnector:
             order_by="month, sku"
         )
 
+    def get_cash_flow(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        grain: str = "day",
+    ) -> pd.DataFrame:
+        """
+        Fetch actual cash flow by category from the pre-aggregated views.
+
+        Reads v_daily_cash_flow (a materialized view partitioned by cash_date)
+        or the v_weekly_cash_flow roll-up of it - never cash_transactions.
+
+        Args:
+            start_date: Start date filter (YYYY-MM-DD)
+            end_date: End date filter (YYYY-MM-DD)
+            grain: "day" or "week" (weeks start on Monday and cover the last
+                   13 weeks only; filters apply to week_start)
+
+        Returns:
+            DataFrame with inflows, outflows, net cash flow and transaction
+            counts per date (or week) and category, most recent first
+        """
+        if grain not in ("day", "week"):
+            raise ValueError(f"grain must be 'day' or 'week', got {grain!r}")
+        date_column = "cash_date" if grain == "day" else "week_start"
+        conditions = []
+
+        if start_date:
+            conditions.append(f"{date_column} >= '{start_date}'")
+        if end_date:
+            conditions.append(f"{date_column} <= '{end_date}'")
+
+        where_clause = " AND ".join(conditions) if conditions else None
+
+        return self.get_table_data(
+            f"v_{'daily' if grain == 'day' else 'weekly'}_cash_flow",
+            where=where_clause,
+            order_by=f"{date_column} DESC, cash_flow_section, cash_flow_category"
+        )
+
     def get_vendors(self) -> pd.DataFrame:
         """
         Fetch vendor master data with payment terms.
@@ -447,6 +587,23 @@ class BigQueryConnector:
         tables = self.client.list_tables(f"{self.project_id}.{self.dataset}")
         return [table.table_id for table in tables]
 
+    def get_table_modified(self, table_name: str) -> datetime:
+        """
+        Last time a table's data or schema changed (table metadata, no query cost).
+
+        Args:
+            table_name: Name of the table
+
+        Returns:
+            Timezone-aware datetime
+
+        Example:
+            >>> bq = BigQueryConnector()
+            >>> bq.get_table_modified("vendors")
+        """
+        table_ref = f"{self.project_id}.{self.dataset}.{table_name}"
+        return self.client.get_table(table_ref).modified
+
     def get_table_schema(self, table_name: str) -> List[Dict[str, str]]:
         """
         Get schema information for a table.
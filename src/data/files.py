@@ -0,0 +1,63 @@
+"""
+Local cache files shared between concurrent processes
+
+The ETL DAG runs the forecast scenarios as parallel processes that read and
+refresh the same local caches. Writes go to a temp file unique to the writer
+and are renamed into place, and a cache directory's check-query-save cycle
+runs under an exclusive lock, so one process refreshes a stale copy and the
+others wait and reuse it.
+
+    >>> with cache_lock(cache_dir):
+    ...     atomic_write(cache_dir / "vendors.parquet", lambda p: df.to_parquet(p, index=False))
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, unique temp files still apply
+    fcntl = None
+
+
+LOCK_FILE = ".lock"
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    """
+    Write a file through a unique temp file in the same directory, then
+    rename it over path, so readers never see a half-written copy and
+    concurrent writers never share a temp file.
+
+    Args:
+        path: Final file
+        write: Called with the temp path to write to
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(Path(tmp))
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def cache_lock(cache_dir: Path) -> Iterator[None]:
+    """Exclusive lock on a cache directory, held across processes until exit"""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / LOCK_FILE, "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
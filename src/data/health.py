@@ -0,0 +1,207 @@
+"""
+Table health from INFORMATION_SCHEMA
+
+One query joins the DDL's expected objects with INFORMATION_SCHEMA.TABLES,
+PARTITIONS, COLUMNS (partitioning and clustering columns) and the region's
+TABLE_STORAGE, returning per table or view: existence and type, row count,
+logical/physical bytes, partition count and range, rows in the NULL
+partition, last-modified time and clustering - in a single round-trip.
+
+health_issues() turns that into findings: missing objects, partitioning or
+clustering that drifted from the DDL (tables created before a CLUSTER BY was
+added are never re-clustered), NULL-partition rows, over-partitioned tables
+and seeded tables with fewer rows than their seed file.
+
+    >>> health = table_health(bq, load_schema())
+    >>> health_issues(health, load_schema())
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import string_literal
+from .schema import Table
+
+
+# Partitions smaller than this on average are too small for partition
+# pruning to pay off - coarser (monthly) partitioning or clustering alone
+# scans less
+SMALL_PARTITION_BYTES = 10 * 1024**2
+MIN_PARTITIONS_TO_FLAG = 100
+
+SPECIAL_PARTITIONS = "('__NULL__', '__UNPARTITIONED__', '__STREAMING_UNPARTITIONED__')"
+
+
+def table_health_sql(schema: Dict[str, Table]) -> str:
+    """Health query over the DDL's tables and views plus anything else in the dataset"""
+    dataset = f"`{config.gcp_project_id}.{config.bigquery_dataset}`"
+    region = f"`region-{config.bigquery_location.lower()}`"
+    expected = ",\n        ".join(
+        f"STRUCT({string_literal(name)} AS table_name, {string_literal(table.kind)} AS expected_type)"
+        for name, table in schema.items()
+    )
+
+    return f"""
+    WITH expected AS (
+      SELECT * FROM UNNEST([
+        {expected}
+      ])
+    ),
+    objects AS (
+      SELECT table_name, table_type, creation_time
+      FROM {dataset}.INFORMATION_SCHEMA.TABLES
+    ),
+    partitions AS (
+      SELECT
+        table_name,
+        COUNTIF(partition_id NOT IN {SPECIAL_PARTITIONS}) AS partitions,
+        MIN(IF(partition_id NOT IN {SPECIAL_PARTITIONS}, partition_id, NULL)) AS first_partition,
+        MAX(IF(partition_id NOT IN {SPECIAL_PARTITIONS}, partition_id, NULL)) AS last_partition,
+        SUM(IF(partition_id = '__NULL__', total_rows, 0)) AS null_partition_rows,
+        MAX(last_modified_time) AS last_modified
+      FROM {dataset}.INFORMATION_SCHEMA.PARTITIONS
+      GROUP BY table_name
+    ),
+    layout AS (
+      SELECT
+        table_name,
+        MAX(IF(is_partitioning_column = 'YES', column_name, NULL)) AS partition_column,
+        STRING_AGG(
+          IF(clustering_ordinal_position IS NOT NULL, column_name, NULL), ', '
+          ORDER BY clustering_ordinal_position
+        ) AS clustering
+      FROM {dataset}.INFORMATION_SCHEMA.COLUMNS
+      GROUP BY table_name
+    ),
+    storage AS (
+      SELECT
+        table_name,
+        total_rows,
+        total_logical_bytes,
+        active_logical_bytes,
+        long_term_logical_bytes,
+        total_physical_bytes
+      FROM {region}.INFORMATION_SCHEMA.TABLE_STORAGE
+      WHERE project_id = {string_literal(config.gcp_project_id)}
+        AND table_schema = {string_literal(config.bigquery_dataset)}
+        AND NOT deleted
+    )
+    SELECT
+      table_name,
+      e.expected_type,
+      o.table_type,
+      o.table_name IS NOT NULL AS is_present,
+      o.creation_time,
+      s.total_rows,
+      s.total_logical_bytes,
+      s.active_logical_bytes,
+      s.long_term_logical_bytes,
+      s.total_physical_bytes,
+      p.partitions,
+      p.first_partition,
+      p.last_partition,
+      p.null_partition_rows,
+      p.last_modified,
+      l.partition_column,
+      l.clustering
+    FROM expected e
+    FULL OUTER JOIN objects o USING (table_name)
+    LEFT JOIN partitions p USING (table_name)
+    LEFT JOIN layout l USING (table_name)
+    LEFT JOIN storage s USING (table_name)
+    """
+
+
+def table_health(bq, schema: Dict[str, Table]) -> pd.DataFrame:
+    """
+    Health of every expected table and view (and unexpected objects) in one query.
+
+    Args:
+        bq: BigQueryConnector instance
+        schema: Tables and views from the DDL (load_schema)
+
+    Returns:
+        One row per object, in DDL order with unexpected objects last
+    """
+    health = bq.query(table_health_sql(schema))
+    order = {name: i for i, name in enumerate(schema)}
+    health = health.assign(_order=health['table_name'].map(order).fillna(len(order)))
+    return health.sort_values(['_order', 'table_name']).drop(columns='_order').reset_index(drop=True)
+
+
+def _text(value) -> str:
+    return str(value) if value is not None and pd.notna(value) else ''
+
+
+def _partition_column(partition_by: Optional[str]) -> Optional[str]:
+    """Column a PARTITION BY expression partitions on (cash_date, DATE(ts), DATE_TRUNC(d, MONTH))"""
+    if not partition_by:
+        return None
+    inner = partition_by.split('(', 1)[-1] if '(' in partition_by else partition_by
+    return inner.split(',')[0].strip(' )').lower() or None
+
+
+def health_issues(
+    health: pd.DataFrame,
+    schema: Dict[str, Table],
+    seed_rows: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """
+    Findings from table_health().
+
+    Args:
+        health: Result of table_health
+        schema: Tables and views from the DDL
+        seed_rows: Rows per seeded table (from data/seed), to flag tables
+                   that were never seeded
+
+    Returns:
+        One message per finding (empty when healthy)
+    """
+    issues = []
+    kinds = {'BASE TABLE': 'TABLE'}
+
+    for _, row in health.iterrows():
+        name = row['table_name']
+        table = schema.get(name)
+        if table is None:
+            issues.append(f"{name}: {str(row['table_type']).lower()} is not in the DDL")
+            continue
+        if not row['is_present']:
+            issues.append(f"{name}: missing {table.kind.lower()} (run scripts/create_tables.py)")
+            continue
+
+        live_kind = kinds.get(row['table_type'], row['table_type'])
+        if live_kind != table.kind:
+            issues.append(f"{name}: is a {str(live_kind).lower()}, DDL defines a {table.kind.lower()}")
+        if table.is_view and table.kind == 'VIEW':
+            continue
+
+        live_clustering = [c.strip() for c in _text(row['clustering']).split(',') if c.strip()]
+        if [c.lower() for c in live_clustering] != [c.lower() for c in table.cluster_by]:
+            issues.append(f"{name}: clustered by {', '.join(live_clustering) or 'nothing'}, DDL says "
+                          f"{', '.join(table.cluster_by) or 'nothing'} - recreate the table to re-cluster")
+
+        wanted_partition = _partition_column(table.partition_by)
+        live_partition = _text(row['partition_column']).lower() or None
+        if wanted_partition != live_partition:
+            issues.append(f"{name}: partitioned by {live_partition or 'nothing'}, DDL says {wanted_partition or 'nothing'}")
+
+        if pd.notna(row['null_partition_rows']) and row['null_partition_rows'] > 0:
+            issues.append(f"{name}: {int(row['null_partition_rows']):,} rows in the NULL partition "
+                          f"(NULL {live_partition}) - scanned by every query")
+
+        partitions = row['partitions'] if pd.notna(row['partitions']) else 0
+        logical = row['total_logical_bytes'] if pd.notna(row['total_logical_bytes']) else 0
+        if partitions >= MIN_PARTITIONS_TO_FLAG and logical / partitions < SMALL_PARTITION_BYTES:
+            issues.append(f"{name}: {int(partitions):,} partitions averaging {logical / partitions / 1024:,.0f} KB "
+                          f"- consider monthly partitioning (clustering does the pruning at this size)")
+
+        if seed_rows and name in seed_rows:
+            rows = int(row['total_rows']) if pd.notna(row['total_rows']) else 0
+            if rows < seed_rows[name]:
+                issues.append(f"{name}: {rows} rows, seed file has {seed_rows[name]} (run scripts/seed.py)")
+
+    return issues
@@ -0,0 +1,313 @@
+"""
+Local Parquet lake for VoChill source and derived tables
+
+Tables are mirrored from BigQuery into Hive-partitioned Parquet under
+data/raw (source tables) and data/processed (derived tables):
+
+    data/raw/deposits/platform=Amazon/month=2026-02/part-0.parquet
+
+Each table directory has a _manifest.json recording, per partition, the row
+count and a content fingerprint computed server-side. A sync compares those
+fingerprints with BigQuery and only downloads partitions that changed, so a
+nightly sync moves one or two months of data instead of the whole table.
+"""
+
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from ..config import DATA_DIR, config
+from ..sql import string_literal
+
+
+MANIFEST_FILE = "_manifest.json"
+
+# Directory name for NULL partition values (pyarrow's Hive default)
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("platform", pa.string()), ("month", pa.string())]),
+    flavor="hive",
+)
+
+
+@dataclass
+class LakeTable:
+    """How a BigQuery table is partitioned in the lake"""
+
+    name: str
+    zone: str  # raw or processed
+    platform_sql: str  # Expression for the platform partition key
+    date_sql: str  # Expression for the date the month key is taken from
+
+
+LAKE_TABLES = {
+    t.name: t for t in [
+        LakeTable("deposits", "raw", "platform", "DATE(date_time)"),
+        LakeTable("orders", "raw", "platform", "DATE(date_time)"),
+        LakeTable("fees", "raw", "platform", "DATE(date_time)"),
+        LakeTable("refunds", "raw", "platform", "DATE(date_time)"),
+        LakeTable("cash_transactions", "processed", "source_system", "cash_date"),
+    ]
+}
+
+
+def _partition_key(platform: Optional[str], month: Optional[str]) -> str:
+    """Relative directory of a partition, e.g. platform=Amazon/month=2026-02"""
+    platform = platform if platform is not None and not pd.isna(platform) else NULL_PARTITION
+    month = month if month is not None and not pd.isna(month) else NULL_PARTITION
+    return f"platform={platform}/month={month}"
+
+
+def _prune_filters(table: LakeTable, partitions: pd.DataFrame) -> List[str]:
+    """
+    Date range and platform conditions covering a batch of partitions.
+
+    The partition-key IN list is an expression BigQuery cannot prune on;
+    these plain predicates on the date and platform columns let it skip
+    every table partition (and cluster) outside the batch.
+    """
+    conditions = []
+
+    months = partitions["month"].dropna()
+    if len(months):
+        date_range = (f"{table.date_sql} BETWEEN DATE('{months.min()}-01') "
+                      f"AND LAST_DAY(DATE('{months.max()}-01'))")
+        if partitions["month"].isna().any():
+            date_range = f"({date_range} OR {table.date_sql} IS NULL)"
+        conditions.append(date_range)
+    else:
+        conditions.append(f"{table.date_sql} IS NULL")
+
+    platforms = partitions["platform"].dropna().unique()
+    if len(platforms):
+        in_list = f"{table.platform_sql} IN ({', '.join(string_literal(p) for p in sorted(platforms))})"
+        if partitions["platform"].isna().any():
+            in_list = f"({in_list} OR {table.platform_sql} IS NULL)"
+        conditions.append(in_list)
+    else:
+        conditions.append(f"{table.platform_sql} IS NULL")
+
+    return conditions
+
+
+class LocalLake:
+    """
+    Hive-partitioned Parquet mirror of BigQuery tables.
+
+    Example:
+        >>> lake = LocalLake()
+        >>> lake.sync(bq, "deposits")
+        >>> df = lake.read("deposits", columns=["date_time", "total"],
+        ...                platforms=["Amazon"], start_month="2026-01")
+    """
+
+    def __init__(self, root: Path = DATA_DIR):
+        self.root = Path(root)
+
+    def table_path(self, name: str) -> Path:
+        """Directory of a lake table"""
+        table = LAKE_TABLES[name]
+        return self.root / table.zone / name
+
+    def manifest(self, name: str) -> Dict[str, Any]:
+        """Load a table's manifest (empty if never synced)"""
+        path = self.table_path(name) / MANIFEST_FILE
+        if not path.exists():
+            return {"table": name, "partitions": {}}
+
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, name: str, manifest: Dict[str, Any]) -> None:
+        path = self.table_path(name) / MANIFEST_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{MANIFEST_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+    def remote_partitions(self, bq, name: str, since_month: Optional[str] = None) -> pd.DataFrame:
+        """
+        Row count and content fingerprint per partition, computed in BigQuery.
+
+        Returns:
+            DataFrame with platform, month, row_count, fingerprint
+        """
+        table = LAKE_TABLES[name]
+        since_clause = f"WHERE {table.date_sql} >= DATE('{since_month}-01')" if since_month else ""
+
+        return bq.query(f"""
+        SELECT
+          platform,
+          month,
+          COUNT(*) as row_count,
+          -- Order-independent hash of every row in the partition. Each copy of
+          -- a repeated row is hashed with its ordinal, so duplicates do not
+          -- cancel out in the XOR.
+          CAST(BIT_XOR(FARM_FINGERPRINT(CONCAT(row_json, '#', CAST(copy AS STRING)))) AS STRING) as fingerprint
+        FROM (
+          SELECT
+            {table.platform_sql} as platform,
+            FORMAT_DATE('%Y-%m', {table.date_sql}) as month,
+            TO_JSON_STRING(t) as row_json,
+            ROW_NUMBER() OVER (PARTITION BY TO_JSON_STRING(t)) as copy
+          FROM `{config.get_bigquery_table(name)}` t
+          {since_clause}
+        )
+        GROUP BY platform, month
+        """)
+
+    def _pull(self, bq, name: str, partitions: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """Download the given partitions in one query and write them as Parquet"""
+        table = LAKE_TABLES[name]
+        keys = ", ".join(
+            f"'{_partition_key(p, m)}'" for p, m in zip(partitions["platform"], partitions["month"])
+        )
+        partition_sql = (
+            f"CONCAT('platform=', IFNULL({table.platform_sql}, '{NULL_PARTITION}'), "
+            f"'/month=', IFNULL(FORMAT_DATE('%Y-%m', {table.date_sql}), '{NULL_PARTITION}'))"
+        )
+        data = bq.query_arrow(f"""
+        SELECT *, {partition_sql} as _lake_partition
+        FROM `{config.get_bigquery_table(name)}` t
+        WHERE {' AND '.join(_prune_filters(table, partitions))}
+          AND {partition_sql} IN ({keys})
+        """)
+
+        written = {}
+        key_column = data.column("_lake_partition")
+        data = data.drop_columns(["_lake_partition"])
+        # Plain strings everywhere so file columns match the partition schema
+        data = data.cast(pa.schema([
+            f.with_type(pa.string()) if pa.types.is_large_string(f.type) else f
+            for f in data.schema
+        ]))
+        for key in partitions.apply(lambda r: _partition_key(r["platform"], r["month"]), axis=1):
+            part = data.filter(pc.equal(key_column, key))
+            part_dir = self.table_path(name) / key
+            part_dir.mkdir(parents=True, exist_ok=True)
+
+            # Write then rename so readers never see a half-written file
+            tmp = part_dir / ".part-0.parquet.tmp"
+            pq.write_table(part, tmp)
+            os.replace(tmp, part_dir / "part-0.parquet")
+            written[key] = {"rows": part.num_rows, "bytes": (part_dir / "part-0.parquet").stat().st_size}
+
+        return written
+
+    def sync(
+        self,
+        bq,
+        name: str,
+        since_month: Optional[str] = None,
+        full: bool = False,
+        partitions_per_query: int = 12,
+    ) -> Dict[str, int]:
+        """
+        Bring a lake table up to date with BigQuery.
+
+        Args:
+            bq: BigQueryConnector instance
+            name: Table in LAKE_TABLES
+            since_month: Only check partitions from this month (YYYY-MM) on
+            full: Re-download every partition regardless of fingerprint
+            partitions_per_query: Partitions downloaded per query
+
+        Returns:
+            Dict with checked, pulled, removed, unchanged partition counts and rows pulled
+        """
+        manifest = self.manifest(name)
+        local = manifest["partitions"]
+        remote = self.remote_partitions(bq, name, since_month)
+        remote["key"] = [_partition_key(p, m) for p, m in zip(remote["platform"], remote["month"])]
+
+        changed = remote[[
+            full or key not in local or local[key]["fingerprint"] != fp or local[key]["rows"] != rows
+            for key, fp, rows in zip(remote["key"], remote["fingerprint"], remote["row_count"])
+        ]]
+
+        rows_pulled = 0
+        synced_at = datetime.now(timezone.utc).isoformat()
+        for start in range(0, len(changed), partitions_per_query):
+            batch = changed.iloc[start:start + partitions_per_query]
+            written = self._pull(bq, name, batch)
+            for key, fp in zip(batch["key"], batch["fingerprint"]):
+                local[key] = {**written[key], "fingerprint": fp, "synced_at": synced_at}
+                rows_pulled += written[key]["rows"]
+            # Save as we go so an interrupted sync resumes where it stopped
+            self._save_manifest(name, manifest)
+
+        # Partitions that disappeared upstream (within the checked range)
+        remote_keys = set(remote["key"])
+        removed = [
+            key for key in local
+            if key not in remote_keys
+            and (since_month is None or key.split("month=")[1] == NULL_PARTITION or key.split("month=")[1] >= since_month)
+        ]
+        for key in removed:
+            shutil.rmtree(self.table_path(name) / key, ignore_errors=True)
+            del local[key]
+
+        manifest["synced_at"] = synced_at
+        self._save_manifest(name, manifest)
+
+        return {
+            'checked': len(remote),
+            'pulled': len(changed),
+            'removed': len(removed),
+            'unchanged': len(remote) - len(changed),
+            'rows': rows_pulled,
+        }
+
+    def dataset(self, name: str) -> ds.Dataset:
+        """Arrow dataset over a lake table (platform and month are partition columns)"""
+        return ds.dataset(self.table_path(name), format="parquet", partitioning=PARTITIONING)
+
+    def read(
+        self,
+        name: str,
+        columns: Optional[List[str]] = None,
+        platforms: Optional[List[str]] = None,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Read a lake table, opening only the matching partitions and columns.
+
+        Args:
+            name: Table in LAKE_TABLES
+            columns: Columns to read (default: all)
+            platforms: Only these platforms
+            start_month: First month to include (YYYY-MM)
+            end_month: Last month to include (YYYY-MM)
+
+        Returns:
+            pandas DataFrame
+        """
+        if not self.table_path(name).exists():
+            raise FileNotFoundError(f"Lake table '{name}' has not been synced")
+
+        conditions = []
+        if platforms:
+            conditions.append(ds.field("platform").isin(platforms))
+        if start_month:
+            conditions.append(ds.field("month") >= start_month)
+        if end_month:
+            conditions.append(ds.field("month") <= end_month)
+
+        filter_expr = None
+        for condition in conditions:
+            filter_expr = condition if filter_expr is None else filter_expr & condition
+
+        return self.dataset(name).to_table(columns=columns, filter=filter_expr).to_pandas()
@@ -0,0 +1,169 @@
+"""
+Materialized view refresh and staleness
+
+Materialized views in the DDL (v_daily_cash_flow) are partitioned like the
+table they aggregate, so a refresh recomputes only the partitions modified
+since the view's refresh watermark. BigQuery refreshes them on its own
+schedule (enable_refresh); refresh_materialized_views() forces it right
+after the ETL so dashboards never pay for the delta.
+
+view_status() reads, in one query, each view's last refresh and watermark,
+its size, and the base-table partitions modified after the watermark - what
+the next refresh will recompute.
+
+    >>> views = materialized_views(load_schema())
+    >>> view_status(bq, views)
+    >>> results = refresh_materialized_views(bq, views)
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import string_literal
+from .health import SPECIAL_PARTITIONS
+from .schema import Table
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of refreshing one materialized view"""
+
+    name: str
+    seconds: float
+    bytes_processed: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def materialized_views(schema: Dict[str, Table]) -> List[Table]:
+    """Materialized views in the DDL, in file order"""
+    return [table for table in schema.values() if table.kind == 'MATERIALIZED VIEW']
+
+
+def view_status_sql(views: List[Table]) -> str:
+    """Refresh state and stale base partitions of the given materialized views"""
+    dataset = f"`{config.gcp_project_id}.{config.bigquery_dataset}`"
+    bases = ",\n        ".join(
+        f"STRUCT({string_literal(view.name)} AS table_name, {string_literal(base)} AS base_table)"
+        for view in views
+        for base in view.depends_on
+    )
+
+    return f"""
+    WITH bases AS (
+      SELECT * FROM UNNEST([
+        {bases}
+      ])
+    ),
+    refreshes AS (
+      SELECT
+        table_name,
+        last_refresh_time,
+        refresh_watermark,
+        last_refresh_status.message AS last_refresh_error
+      FROM {dataset}.INFORMATION_SCHEMA.MATERIALIZED_VIEWS
+    ),
+    sizes AS (
+      SELECT table_name, SUM(total_rows) AS total_rows, SUM(total_logical_bytes) AS total_logical_bytes
+      FROM {dataset}.INFORMATION_SCHEMA.PARTITIONS
+      GROUP BY table_name
+    ),
+    base_partitions AS (
+      SELECT
+        b.table_name,
+        b.base_table,
+        p.partition_id,
+        p.total_rows,
+        p.partition_id IS NOT NULL
+          AND (r.refresh_watermark IS NULL OR p.last_modified_time > r.refresh_watermark) AS is_stale
+      FROM bases b
+      LEFT JOIN refreshes r USING (table_name)
+      LEFT JOIN {dataset}.INFORMATION_SCHEMA.PARTITIONS p ON p.table_name = b.base_table
+    ),
+    stale AS (
+      SELECT
+        table_name,
+        STRING_AGG(DISTINCT base_table, ', ') AS base_tables,
+        COUNTIF(is_stale) AS stale_partitions,
+        MIN(IF(is_stale AND partition_id NOT IN {SPECIAL_PARTITIONS}, partition_id, NULL)) AS first_stale_partition,
+        MAX(IF(is_stale AND partition_id NOT IN {SPECIAL_PARTITIONS}, partition_id, NULL)) AS last_stale_partition,
+        SUM(IF(is_stale, total_rows, 0)) AS stale_rows
+      FROM base_partitions
+      GROUP BY table_name
+    )
+    SELECT
+      table_name,
+      st.base_tables,
+      r.table_name IS NOT NULL AS is_present,
+      r.last_refresh_time,
+      r.refresh_watermark,
+      r.last_refresh_error,
+      z.total_rows,
+      z.total_logical_bytes,
+      st.stale_partitions,
+      st.first_stale_partition,
+      st.last_stale_partition,
+      st.stale_rows
+    FROM stale st
+    LEFT JOIN refreshes r USING (table_name)
+    LEFT JOIN sizes z USING (table_name)
+    """
+
+
+def view_status(bq, views: List[Table]) -> pd.DataFrame:
+    """
+    Refresh state of materialized views and what their next refresh recomputes.
+
+    Args:
+        bq: BigQueryConnector instance
+        views: Materialized views (materialized_views)
+
+    Returns:
+        One row per view, in the given order: last_refresh_time,
+        refresh_watermark, size, and the count/range/rows of base-table
+        partitions modified after the watermark
+    """
+    if not views:
+        return pd.DataFrame()
+    status = bq.query(view_status_sql(views))
+    order = {view.name: i for i, view in enumerate(views)}
+    return (status.assign(_order=status['table_name'].map(order))
+            .sort_values('_order').drop(columns='_order').reset_index(drop=True))
+
+
+def refresh_materialized_views(bq, views: List[Table], max_workers: int = 4) -> List[RefreshResult]:
+    """
+    Refresh materialized views now (BQ.REFRESH_MATERIALIZED_VIEW), concurrently.
+
+    Only partitions modified since each view's watermark are recomputed;
+    an up-to-date view costs nothing.
+
+    Args:
+        bq: BigQueryConnector instance
+        views: Materialized views to refresh
+        max_workers: Concurrent refresh jobs
+
+    Returns:
+        One RefreshResult per view, in the given order
+    """
+    def run(view: Table) -> RefreshResult:
+        start = time.perf_counter()
+        target = string_literal(config.get_bigquery_table(view.name))
+        try:
+            job = bq.execute(f"CALL BQ.REFRESH_MATERIALIZED_VIEW({target})")
+        except Exception as e:
+            return RefreshResult(view.name, time.perf_counter() - start, error=str(e))
+        return RefreshResult(view.name, time.perf_counter() - start, getattr(job, 'total_bytes_processed', None))
+
+    if not views:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, views))
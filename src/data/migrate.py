@@ -0,0 +1,331 @@
+"""
+Schema migrations from the DDL file
+
+The live dataset is read in one INFORMATION_SCHEMA.TABLES query; each
+object's `ddl` column is parsed with the same parser as
+database/create_financial_tables.sql, so both sides are compared as Table
+objects. plan_migration() emits only what differs:
+
+- missing tables are created; new columns added (ALTER TABLE ADD COLUMN),
+  with their default, description, widened type or dropped NOT NULL applied
+  in place (ALTER COLUMN)
+- views whose query changed are replaced, as are materialized views whose
+  partitioning or clustering changed; a view that became a materialized
+  view (or back) is dropped and re-created
+- anything BigQuery cannot alter in place - narrowing a type, adding NOT
+  NULL, partitioning or clustering changes, objects no longer in the DDL -
+  is reported, never applied
+
+apply_migration() runs every table's statements concurrently (one script
+job per table), then the views level by level in dependency order.
+
+    >>> plan = plan_migration(load_schema(), live_schema(bq)[0])
+    >>> results = apply_migration(bq, plan)
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..config import config
+from .schema import Column, Table, normalize_type, parse_statement, split_statements
+
+
+# In-place type changes BigQuery allows (ALTER COLUMN SET DATA TYPE)
+WIDENING = {
+    ('INT64', 'NUMERIC'),
+    ('INT64', 'BIGNUMERIC'),
+    ('INT64', 'FLOAT64'),
+    ('NUMERIC', 'BIGNUMERIC'),
+    ('NUMERIC', 'FLOAT64'),
+}
+
+_QUOTED = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""")
+
+
+@dataclass
+class Change:
+    """Statements bringing one table or view in line with the DDL"""
+
+    name: str
+    kind: str
+    action: str  # create, alter or replace
+    statements: List[str]
+    notes: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+
+    @property
+    def script(self) -> str:
+        return ";\n".join(self.statements) + ";"
+
+
+@dataclass
+class MigrationPlan:
+    """Changes to apply, in DDL order, and differences left for a person"""
+
+    changes: List[Change] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not self.changes
+
+    def levels(self) -> List[List[Change]]:
+        """
+        Changes grouped for execution: all tables first, then views whose
+        changed dependencies are in earlier groups.
+        """
+        level: Dict[str, int] = {}
+        by_name = {change.name: change for change in self.changes}
+
+        def depth(change: Change, visiting: Tuple[str, ...] = ()) -> int:
+            if change.name not in level:
+                if change.kind == 'TABLE' or change.name in visiting:
+                    level[change.name] = 0
+                else:
+                    deps = [by_name[d] for d in change.depends_on if d in by_name]
+                    level[change.name] = 1 + max(
+                        (depth(d, visiting + (change.name,)) for d in deps), default=0
+                    )
+            return level[change.name]
+
+        groups: Dict[int, List[Change]] = {}
+        for change in self.changes:
+            groups.setdefault(depth(change), []).append(change)
+        return [groups[k] for k in sorted(groups)]
+
+
+@dataclass
+class MigrationResult:
+    """Outcome of one change"""
+
+    change: Change
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL text without comments, with whitespace collapsed and unquoted text upper-cased"""
+    text = " ".join(split_statements(sql))
+    parts = []
+    for segment in _QUOTED.split(text):
+        if segment[:1] in ("'", '"', '`'):
+            parts.append(segment)
+        else:
+            segment = re.sub(r'\s+', ' ', segment).upper()
+            parts.append(re.sub(r'\s*([(),])\s*', r'\1', segment))
+    return ''.join(parts).strip()
+
+
+def live_schema(bq) -> Tuple[Dict[str, Table], Dict[str, str]]:
+    """
+    Tables and views in the dataset, parsed from INFORMATION_SCHEMA (one query).
+
+    Returns:
+        (tables, errors): parsed objects by name, and a message per object
+        whose DDL could not be parsed
+    """
+    df = bq.query(f"""
+    SELECT table_name, table_type, ddl
+    FROM `{config.gcp_project_id}.{config.bigquery_dataset}`.INFORMATION_SCHEMA.TABLES
+    ORDER BY table_name
+    """)
+
+    tables, errors = {}, {}
+    for _, row in df.iterrows():
+        try:
+            statement = split_statements(row['ddl'])[0]
+            tables[row['table_name']] = parse_statement(statement)
+        except (ValueError, IndexError) as e:
+            errors[row['table_name']] = f"{row['table_type']}: {e}"
+    return tables, errors
+
+
+def _string(value: str) -> str:
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _column_sql(column: Column) -> str:
+    """Column definition for ADD COLUMN (always nullable, default set separately)"""
+    options = f" OPTIONS(description={_string(column.description)})" if column.description else ""
+    return f"{column.name} {column.type}{options}"
+
+
+def _same_default(a: Optional[str], b: Optional[str]) -> bool:
+    def norm(value):
+        return None if value is None or normalize_sql(value) == 'NULL' else normalize_sql(value)
+    return norm(a) == norm(b)
+
+
+def _alter_table(wanted: Table, live: Table, plan: MigrationPlan) -> Optional[Change]:
+    target = f"`{config.get_bigquery_table(wanted.name)}`"
+    statements, notes = [], []
+    live_columns = {c.name: c for c in live.columns}
+
+    for column in wanted.columns:
+        current = live_columns.get(column.name)
+        if current is None:
+            statements.append(f"ALTER TABLE {target} ADD COLUMN IF NOT EXISTS {_column_sql(column)}")
+            if column.default is not None:
+                statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} SET DEFAULT {column.default}")
+            notes.append(f"add column {column.name} {column.type}")
+            if not column.nullable:
+                plan.warnings.append(f"{wanted.name}.{column.name}: added as NULLABLE "
+                                     f"(BigQuery cannot add a NOT NULL column to an existing table)")
+            continue
+
+        wanted_type, live_type = normalize_type(column.type), normalize_type(current.type)
+        if wanted_type != live_type:
+            if (live_type, wanted_type) in WIDENING:
+                statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} SET DATA TYPE {wanted_type}")
+                notes.append(f"{column.name}: {live_type} → {wanted_type}")
+            else:
+                plan.warnings.append(f"{wanted.name}.{column.name}: type {live_type} → {wanted_type} "
+                                     f"cannot be changed in place (rebuild the table)")
+
+        if column.nullable and not current.nullable:
+            statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} DROP NOT NULL")
+            notes.append(f"{column.name}: drop NOT NULL")
+        elif not column.nullable and current.nullable:
+            plan.warnings.append(f"{wanted.name}.{column.name}: NOT NULL cannot be added in place")
+
+        if not _same_default(column.default, current.default):
+            if column.default is None:
+                statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} DROP DEFAULT")
+                notes.append(f"{column.name}: drop default")
+            else:
+                statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} SET DEFAULT {column.default}")
+                notes.append(f"{column.name}: default {column.default}")
+
+        if column.description != current.description:
+            statements.append(f"ALTER TABLE {target} ALTER COLUMN {column.name} "
+                              f"SET OPTIONS(description={_string(column.description)})")
+            notes.append(f"{column.name}: description")
+
+    wanted_names = {c.name for c in wanted.columns}
+    for name in live_columns:
+        if name not in wanted_names:
+            plan.warnings.append(f"{wanted.name}.{name}: not in the DDL (left in place - drop it manually if intended)")
+
+    if normalize_sql(wanted.partition_by or '') != normalize_sql(live.partition_by or ''):
+        plan.warnings.append(f"{wanted.name}: partitioning {live.partition_by or 'none'} → "
+                             f"{wanted.partition_by or 'none'} requires a rebuild")
+    if [c.lower() for c in wanted.cluster_by] != [c.lower() for c in live.cluster_by]:
+        plan.warnings.append(f"{wanted.name}: clustering {', '.join(live.cluster_by) or 'none'} → "
+                             f"{', '.join(wanted.cluster_by) or 'none'} requires a rebuild")
+
+    if wanted.description != live.description:
+        statements.append(f"ALTER TABLE {target} SET OPTIONS(description={_string(wanted.description)})")
+        notes.append("table description")
+
+    if not statements:
+        return None
+    return Change(wanted.name, 'TABLE', 'alter', statements, notes)
+
+
+def _create_or_replace(view: Table) -> str:
+    """The view's DDL statement as CREATE OR REPLACE"""
+    return re.sub(r'^CREATE\s+(?:OR\s+REPLACE\s+)?', 'CREATE OR REPLACE ', view.sql, count=1, flags=re.IGNORECASE)
+
+
+def _layout_changed(wanted: Table, live: Table) -> bool:
+    """Whether a materialized view's partitioning or clustering differs (it is rebuilt from its query)"""
+    return (normalize_sql(wanted.partition_by or '') != normalize_sql(live.partition_by or '')
+            or [c.lower() for c in wanted.cluster_by] != [c.lower() for c in live.cluster_by])
+
+
+def plan_migration(schema: Dict[str, Table], live: Dict[str, Table]) -> MigrationPlan:
+    """
+    Statements that bring the live dataset in line with the DDL.
+
+    Args:
+        schema: Tables and views from the DDL (load_schema)
+        live: Tables and views in the dataset (live_schema)
+
+    Returns:
+        MigrationPlan; empty when the dataset already matches
+    """
+    plan = MigrationPlan()
+
+    for name, wanted in schema.items():
+        current = live.get(name)
+
+        if not wanted.is_view:
+            if current is None:
+                plan.changes.append(Change(name, 'TABLE', 'create', [wanted.sql], ["new table"]))
+            elif current.is_view:
+                plan.warnings.append(f"{name}: is a {current.kind.lower()} in the dataset but a table in the DDL")
+            else:
+                change = _alter_table(wanted, current, plan)
+                if change is None:
+                    plan.unchanged.append(name)
+                else:
+                    plan.changes.append(change)
+            continue
+
+        if current is None:
+            action, statements, notes = 'create', [_create_or_replace(wanted)], [f"new {wanted.kind.lower()}"]
+        elif current.kind != wanted.kind:
+            action = 'replace'
+            statements = [f"DROP {current.kind} IF EXISTS `{config.get_bigquery_table(name)}`", _create_or_replace(wanted)]
+            notes = [f"{current.kind.lower()} → {wanted.kind.lower()}"]
+        elif normalize_sql(current.query or '') != normalize_sql(wanted.query or ''):
+            action, statements, notes = 'replace', [_create_or_replace(wanted)], ["query changed"]
+        elif _layout_changed(wanted, current):
+            action, statements, notes = 'replace', [_create_or_replace(wanted)], ["partitioning/clustering changed"]
+        else:
+            plan.unchanged.append(name)
+            continue
+        plan.changes.append(Change(name, wanted.kind, action, statements, notes, depends_on=wanted.depends_on))
+
+    for name, current in live.items():
+        if name not in schema and current.is_view:
+            plan.warnings.append(f"{name}: {current.kind.lower()} not in the DDL (left in place)")
+
+    return plan
+
+
+def apply_migration(bq, plan: MigrationPlan, max_workers: int = 8) -> List[MigrationResult]:
+    """
+    Run a plan: each level's changes concurrently, one script job each.
+
+    A view is skipped (with an error) when a change it depends on failed.
+
+    Args:
+        bq: BigQueryConnector instance
+        plan: Plan from plan_migration
+        max_workers: Concurrent jobs
+
+    Returns:
+        One MigrationResult per change, in execution order
+    """
+    results: List[MigrationResult] = []
+    failed: set = set()
+
+    def run(change: Change) -> MigrationResult:
+        blocked = [d for d in change.depends_on if d in failed]
+        if blocked:
+            return MigrationResult(change, 0.0, f"skipped: {', '.join(blocked)} failed")
+        start = time.perf_counter()
+        try:
+            bq.execute(change.script)
+        except Exception as e:
+            return MigrationResult(change, time.perf_counter() - start, str(e))
+        return MigrationResult(change, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for level in plan.levels():
+            for result in pool.map(run, level):
+                results.append(result)
+                if not result.ok:
+                    failed.add(result.change.name)
+
+    return results
@@ -0,0 +1,365 @@
+"""
+Warehouse schema parsed from database/create_financial_tables.sql
+
+The DDL file is the single definition of every table and view. parse_ddl()
+turns it into Table objects (columns with type, nullability, default and
+description; partitioning and clustering; view dependencies) so loaders can
+validate rows against it instead of repeating column lists in Python.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..config import PROJECT_ROOT
+
+
+DDL_FILE = PROJECT_ROOT / "database" / "create_financial_tables.sql"
+
+# Type aliases accepted by BigQuery, normalized to one spelling
+TYPE_ALIASES = {
+    'BOOLEAN': 'BOOL',
+    'INTEGER': 'INT64',
+    'INT': 'INT64',
+    'BIGINT': 'INT64',
+    'FLOAT': 'FLOAT64',
+    'DECIMAL': 'NUMERIC',
+}
+
+_CREATE = re.compile(
+    r"^CREATE\s+(?:OR\s+REPLACE\s+)?(TABLE|VIEW|MATERIALIZED\s+VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?`([^`]+)`",
+    re.IGNORECASE,
+)
+_COLUMN = re.compile(
+    r"^(\w+)\s+(.+?)(\s+NOT\s+NULL)?(?:\s+DEFAULT\s+(.+?))?(?:\s+OPTIONS\s*\((.*)\))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DESCRIPTION = re.compile(r'description\s*=\s*"((?:[^"\\]|\\.)*)"', re.IGNORECASE | re.DOTALL)
+_REFERENCE = re.compile(r"`([\w-]+)\.(\w+)\.(\w+)`")
+
+
+@dataclass
+class Column:
+    """One column of a table"""
+
+    name: str
+    type: str
+    nullable: bool = True
+    default: Optional[str] = None
+    description: str = ""
+
+    @property
+    def is_array(self) -> bool:
+        return self.type.startswith('ARRAY<')
+
+    @property
+    def element_type(self) -> str:
+        """Scalar type of the column (element type of an ARRAY)"""
+        return self.type[len('ARRAY<'):-1] if self.is_array else self.type
+
+    @property
+    def has_literal_default(self) -> bool:
+        return self.default is not None and _literal_default(self.default) is not _NOT_LITERAL
+
+    @property
+    def default_value(self) -> Any:
+        """Python value of a literal DEFAULT (None for no default or an expression)"""
+        if self.default is None:
+            return None
+        value = _literal_default(self.default)
+        return None if value is _NOT_LITERAL else value
+
+
+@dataclass
+class Table:
+    """A table or view from the DDL"""
+
+    name: str
+    kind: str = 'TABLE'
+    columns: List[Column] = field(default_factory=list)
+    partition_by: Optional[str] = None
+    cluster_by: List[str] = field(default_factory=list)
+    description: str = ""
+    query: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+    sql: str = ""
+
+    @property
+    def is_view(self) -> bool:
+        return self.kind != 'TABLE'
+
+    def column(self, name: str) -> Optional[Column]:
+        return next((c for c in self.columns if c.name == name), None)
+
+
+_NOT_LITERAL = object()
+
+
+def _literal_default(expression: str) -> Any:
+    """Python value of a literal DEFAULT expression, or _NOT_LITERAL"""
+    text = expression.strip()
+    if text.upper() in ('TRUE', 'FALSE'):
+        return text.upper() == 'TRUE'
+    if text.upper() == 'NULL':
+        return None
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return _NOT_LITERAL
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script into statements on top-level semicolons, dropping
+    `--` comments (quotes and backticks are respected).
+    """
+    statements, current = [], []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == '\\':
+                current.append(sql[i + 1:i + 2])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            current.append(char)
+        elif sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append(''.join(current).strip())
+    return [s for s in statements if s]
+
+
+def _split_top_level(text: str, separator: str = ',') -> List[str]:
+    """Split on separators outside (), <> and quotes"""
+    parts, current, depth, quote = [], [], 0, None
+    for char in text:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"`":
+            quote = char
+        elif char in '(<':
+            depth += 1
+        elif char in ')>':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return [p for p in parts if p]
+
+
+def _matching_paren(text: str, start: int) -> int:
+    """Index of the ')' closing the '(' at start"""
+    depth, quote = 0, None
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"`":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced parentheses: {text[start:start + 60]}...")
+
+
+def normalize_type(type_: str) -> str:
+    """Canonical spelling of a column type (BOOLEAN → BOOL, ARRAY<INTEGER> → ARRAY<INT64>)"""
+    type_ = re.sub(r'\s+', '', type_.upper())
+    array = re.fullmatch(r'ARRAY<(.+)>', type_)
+    if array:
+        return f"ARRAY<{normalize_type(array.group(1))}>"
+    base = re.sub(r'\(.*\)$', '', type_)
+    return TYPE_ALIASES.get(base, base)
+
+
+def _parse_column(definition: str) -> Column:
+    match = _COLUMN.match(definition.strip())
+    if not match:
+        raise ValueError(f"Cannot parse column: {definition!r}")
+    name, type_, not_null, default, options = match.groups()
+    description = _DESCRIPTION.search(options or '')
+    return Column(
+        name=name,
+        type=normalize_type(type_),
+        nullable=not not_null,
+        default=default.strip() if default else None,
+        description=description.group(1) if description else "",
+    )
+
+
+def _query_start(text: str) -> int:
+    """Index of the top-level AS that starts a view's query"""
+    depth, quote = 0, None
+    for i, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"`":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif (depth == 0 and char in 'aA' and (i == 0 or not text[i - 1].isalnum() and text[i - 1] != '_')
+              and re.match(r'AS\b', text[i:], re.IGNORECASE)):
+            return i
+    raise ValueError(f"View without AS: {text[:60]!r}...")
+
+
+def _layout(tail: str) -> Dict[str, Any]:
+    """Partitioning, clustering and description from the clauses after a column list or view name"""
+    partition = re.search(r'PARTITION\s+BY\s+(.+?)(?=\s+CLUSTER\s+BY|\s+OPTIONS|\s*$)', tail, re.IGNORECASE | re.DOTALL)
+    cluster = re.search(r'CLUSTER\s+BY\s+(.+?)(?=\s+OPTIONS|\s*$)', tail, re.IGNORECASE | re.DOTALL)
+    description = _DESCRIPTION.search(tail)
+    return {
+        'partition_by': partition.group(1).strip() if partition else None,
+        'cluster_by': [c.strip() for c in cluster.group(1).split(',')] if cluster else [],
+        'description': description.group(1) if description else "",
+    }
+
+
+def parse_statement(statement: str) -> Table:
+    """Parse one CREATE TABLE/VIEW/MATERIALIZED VIEW statement"""
+    match = _CREATE.match(statement)
+    if not match:
+        raise ValueError(f"Unsupported DDL statement (only CREATE TABLE/VIEW): {statement[:60]!r}...")
+    kind = re.sub(r'\s+', ' ', match.group(1).upper())
+    name = match.group(2).split('.')[-1]
+    rest = statement[match.end():]
+
+    if kind != 'TABLE':
+        start = _query_start(rest)
+        query = rest[start + 2:].strip()
+        depends_on = list(dict.fromkeys(ref[2] for ref in _REFERENCE.findall(query)))
+        return Table(name=name, kind=kind, query=query, depends_on=depends_on, sql=statement,
+                     **_layout(rest[:start].strip()))
+
+    open_paren = rest.index('(')
+    close_paren = _matching_paren(rest, open_paren)
+    columns = [_parse_column(c) for c in _split_top_level(rest[open_paren + 1:close_paren])]
+    return Table(name=name, columns=columns, sql=statement, **_layout(rest[close_paren + 1:]))
+
+
+def parse_ddl(sql: str) -> Dict[str, Table]:
+    """
+    Parse a DDL script into tables and views, keyed by name (file order).
+
+    Raises:
+        ValueError: On statements other than CREATE TABLE/VIEW, or
+                    unparseable column definitions
+    """
+    tables = {}
+    for statement in split_statements(sql):
+        table = parse_statement(statement)
+        tables[table.name] = table
+    return tables
+
+
+def load_schema(path: Path = DDL_FILE) -> Dict[str, Table]:
+    """Tables and views defined in the DDL file"""
+    return parse_ddl(Path(path).read_text())
+
+
+def coerce_value(value: Any, type_: str) -> Any:
+    """
+    Convert a YAML/Python value to the Python type BigQuery expects for a
+    scalar column type.
+
+    Raises:
+        ValueError: If the value does not fit the type
+    """
+    if value is None:
+        return None
+    if type_ == 'STRING':
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"expected a string, got {type(value).__name__}")
+        return str(value)
+    if type_ == 'BOOL':
+        if not isinstance(value, bool):
+            raise ValueError(f"expected true/false, got {value!r}")
+        return value
+    if type_ == 'INT64':
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or int(value) != value:
+            raise ValueError(f"expected an integer, got {value!r}")
+        return int(value)
+    if type_ in ('FLOAT64', 'NUMERIC', 'BIGNUMERIC'):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"expected a number, got {value!r}")
+        return float(value)
+    if type_ == 'DATE':
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value))
+        except ValueError:
+            raise ValueError(f"expected a date (YYYY-MM-DD), got {value!r}")
+    if type_ in ('TIMESTAMP', 'DATETIME'):
+        try:
+            return pd.Timestamp(value).to_pydatetime()
+        except (ValueError, TypeError):
+            raise ValueError(f"expected a timestamp, got {value!r}")
+    raise ValueError(f"unsupported column type {type_}")
+
+
+def validate_row(table: Table, row: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Check one row against a table's columns.
+
+    Unknown columns, values of the wrong type and missing NOT NULL values
+    without a DEFAULT are errors. Values are coerced to the column types.
+
+    Returns:
+        (coerced row, errors)
+    """
+    errors = [f"unknown column '{name}'" for name in row if table.column(name) is None]
+    coerced = {}
+    for column in table.columns:
+        if column.name not in row:
+            if not column.nullable and column.default is None:
+                errors.append(f"'{column.name}' is required")
+            continue
+        value = row[column.name]
+        try:
+            if column.is_array:
+                if value is not None and not isinstance(value, list):
+                    raise ValueError(f"expected a list, got {value!r}")
+                value = [coerce_value(v, column.element_type) for v in value or []]
+            else:
+                value = coerce_value(value, column.type)
+        except ValueError as e:
+            errors.append(f"'{column.name}': {e}")
+            continue
+        if value is None and not column.nullable:
+            errors.append(f"'{column.name}' cannot be null")
+        coerced[column.name] = value
+    return coerced, errors
@@ -0,0 +1,231 @@
+"""
+Seed master data from YAML
+
+Each file under data/seed/ holds the rows of one table:
+
+    table: bank_accounts
+    key: [account_id]
+    rows:
+      - account_id: frost_checking
+        account_name: VoChill Checking
+        ...
+
+Rows are validated against the table's DDL (src.data.schema) and written
+with one parameterized MERGE per table: the rows travel as a single
+ARRAY<STRUCT> query parameter, so values are never spliced into SQL text.
+New keys are inserted, rows whose values differ are updated (updated_at is
+bumped), and identical rows are left alone - re-running a seed is safe and
+changes nothing. Rows in the table without a seed entry are kept.
+
+    >>> seeds, errors = load_seeds(discover_seed_files())
+    >>> job = seed_table(bq, seeds[0])
+    >>> job.num_dml_affected_rows
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+from google.cloud import bigquery
+
+from ..config import DATA_DIR, config
+from .schema import Column, Table, load_schema, validate_row
+
+
+SEED_DIR = DATA_DIR / "seed"
+
+
+@dataclass
+class SeedTable:
+    """Validated seed rows for one table"""
+
+    table: Table
+    key: List[str]
+    columns: List[Column]
+    rows: List[Dict[str, Any]]
+    path: Path
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+
+def discover_seed_files(directory: Path = SEED_DIR) -> List[Path]:
+    """Seed files under a directory, in name order"""
+    return sorted(p for pattern in ('*.yaml', '*.yml') for p in Path(directory).glob(pattern))
+
+
+def load_seed(path: Path, schema: Dict[str, Table]) -> SeedTable:
+    """
+    Parse and validate one seed file.
+
+    Every row is checked against the table's columns (unknown columns,
+    types, NOT NULL). Columns a row leaves out take their literal DDL
+    default, or NULL.
+
+    Args:
+        path: Seed YAML file
+        schema: Tables from the DDL (load_schema)
+
+    Returns:
+        SeedTable with coerced rows
+
+    Raises:
+        ValueError: Listing every problem found in the file
+    """
+    with open(path, 'r') as f:
+        seed = yaml.safe_load(f) or {}
+
+    name = seed.get('table') or Path(path).stem
+    table = schema.get(name)
+    if table is None or table.is_view:
+        raise ValueError(f"'{name}' is not a table in the DDL")
+
+    key = seed.get('key') or []
+    key = [key] if isinstance(key, str) else list(key)
+    if not key:
+        raise ValueError("needs a key (column or list of columns to match rows on)")
+    missing = [k for k in key if table.column(k) is None]
+    if missing:
+        raise ValueError(f"key column(s) not in {name}: {', '.join(missing)}")
+
+    rows, errors, seen = [], [], {}
+    for i, row in enumerate(seed.get('rows') or [], 1):
+        if not isinstance(row, dict):
+            errors.append(f"row {i}: expected a mapping of column: value")
+            continue
+        coerced, row_errors = validate_row(table, row)
+        label = f"row {i} ({', '.join(str(row.get(k)) for k in key)})"
+        errors.extend(f"{label}: {e}" for e in row_errors)
+
+        row_key = tuple(coerced.get(k) for k in key)
+        if any(v is None for v in row_key):
+            errors.append(f"{label}: key cannot be null")
+        elif row_key in seen:
+            errors.append(f"{label}: duplicate key (also row {seen[row_key]})")
+        else:
+            seen[row_key] = i
+        rows.append(coerced)
+
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    present = {column for row in rows for column in row}
+    columns = [c for c in table.columns if c.name in present or c.name in key]
+    rows = [
+        {c.name: row.get(c.name, c.default_value) for c in columns}
+        for row in rows
+    ]
+    return SeedTable(table=table, key=key, columns=columns, rows=rows, path=Path(path))
+
+
+def load_seeds(
+    paths: Sequence[Path],
+    schema: Optional[Dict[str, Table]] = None,
+) -> Tuple[List[SeedTable], Dict[Path, str]]:
+    """
+    Parse and validate seed files.
+
+    Args:
+        paths: Seed YAML files, one table each
+        schema: Tables from the DDL (default: database/create_financial_tables.sql)
+
+    Returns:
+        (seeds, errors): valid seeds in file order, and an error message per
+        file that failed. A table seeded by more than one file is an error
+        for every file after the first.
+    """
+    schema = schema if schema is not None else load_schema()
+    seeds: List[SeedTable] = []
+    errors: Dict[Path, str] = {}
+    seen: Dict[str, Path] = {}
+
+    for path in paths:
+        try:
+            seed = load_seed(path, schema)
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            errors[path] = str(e)
+            continue
+
+        if seed.name in seen:
+            errors[path] = f"table '{seed.name}' is already seeded by {seen[seed.name].name}"
+            continue
+        seen[seed.name] = path
+        seeds.append(seed)
+
+    return seeds, errors
+
+
+def _compare(column: Column) -> str:
+    """Predicate true when target and source values differ (NULL-safe)"""
+    if column.is_array:
+        return f"TO_JSON_STRING(T.{column.name}) IS DISTINCT FROM TO_JSON_STRING(S.{column.name})"
+    return f"T.{column.name} IS DISTINCT FROM S.{column.name}"
+
+
+def merge_seed_sql(seed: SeedTable) -> str:
+    """
+    MERGE of the @rows parameter into the seed's table on its key.
+
+    Matched rows are updated only when a value differs; updated_at (when the
+    table has one and the seed does not set it) is bumped on update.
+    created_at and other omitted columns take their DDL defaults on insert.
+    """
+    names = [c.name for c in seed.columns]
+    values = [c for c in seed.columns if c.name not in seed.key]
+
+    on = " AND ".join(f"T.{k} = S.{k}" for k in seed.key)
+    assignments = [f"{c.name} = S.{c.name}" for c in values]
+    if seed.table.column('updated_at') is not None and 'updated_at' not in names:
+        assignments.append("updated_at = CURRENT_TIMESTAMP()")
+
+    matched = ""
+    if values:
+        changed = " OR ".join(_compare(c) for c in values)
+        set_clause = ",\n      ".join(assignments)
+        matched = f"""
+    WHEN MATCHED AND ({changed}) THEN UPDATE SET
+      {set_clause}"""
+
+    return f"""
+    MERGE `{config.get_bigquery_table(seed.name)}` T
+    USING UNNEST(@rows) S
+    ON {on}{matched}
+    WHEN NOT MATCHED THEN INSERT
+      ({', '.join(names)})
+    VALUES
+      ({', '.join(f'S.{n}' for n in names)})
+    """
+
+
+def _parameter(column: Column, value: Any):
+    if column.is_array:
+        return bigquery.ArrayQueryParameter(column.name, column.element_type, value or [])
+    return bigquery.ScalarQueryParameter(column.name, column.type, value)
+
+
+def seed_parameters(seed: SeedTable) -> list:
+    """The seed's rows as one ARRAY<STRUCT> query parameter named rows"""
+    structs = [
+        bigquery.StructQueryParameter(None, *[_parameter(c, row[c.name]) for c in seed.columns])
+        for row in seed.rows
+    ]
+    return [bigquery.ArrayQueryParameter('rows', 'STRUCT', structs)]
+
+
+def seed_table(bq, seed: SeedTable) -> Optional[bigquery.QueryJob]:
+    """
+    Upsert a seed's rows with one parameterized MERGE.
+
+    Args:
+        bq: BigQueryConnector instance
+        seed: Validated seed (load_seeds)
+
+    Returns:
+        Completed QueryJob (num_dml_affected_rows = rows inserted or
+        changed), or None when the seed has no rows
+    """
+    if not seed.rows:
+        return None
+    return bq.execute(merge_seed_sql(seed), query_parameters=seed_parameters(seed))
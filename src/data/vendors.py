@@ -0,0 +1,262 @@
+"""
+Local vendor master for payment-terms lookups
+
+The vendors table is small and changes rarely, but every invoice and PO
+transform used to re-join it. VendorMaster keeps a local Parquet copy under
+data/processed/vendors, refreshed only when the table's last-modified time
+in BigQuery changes, and resolves vendor names to terms in bulk:
+
+    >>> vendors = VendorMaster.load(bq)
+    >>> terms = vendors.terms(invoices["vendor"])
+    >>> invoices["cash_date"] = vendors.cash_dates(invoices["vendor"], invoices["invoice_date"])
+
+Names are matched exactly first, then on a normalized form ("ACME Supply,
+Inc." == "Acme Supply") through a hashed index, then optionally by fuzzy
+similarity for the few names still unmatched.
+"""
+
+import difflib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import PROCESSED_DATA_DIR, config
+from .files import atomic_write, cache_lock
+
+
+VENDOR_CACHE_DIR = PROCESSED_DATA_DIR / "vendors"
+CACHE_FILE = "vendors.parquet"
+MANIFEST_FILE = "_manifest.json"
+
+# Payment days when a vendor has neither Actual Days nor Request Days (Net 30)
+DEFAULT_PAYMENT_DAYS = 30
+
+# Similarity (0-1) a fuzzy match needs; below this a name stays unmatched
+DEFAULT_FUZZY_CUTOFF = 0.9
+
+# Words dropped when normalizing vendor names
+_LEGAL_SUFFIXES = r"\b(?:the|inc|incorporated|llc|ltd|limited|co|corp|corporation|company|lp|llp|pllc)\b"
+
+Names = Union[Iterable[str], pd.Series]
+
+
+def vendor_payment_days_sql(alias: str = "v") -> str:
+    """Payment days for a joined vendors row (same rule as VendorMaster)"""
+    return f"COALESCE({alias}.`Actual Days`, {alias}.`Request Days`, {DEFAULT_PAYMENT_DAYS})"
+
+
+def normalize_vendor_names(names: Names) -> pd.Series:
+    """
+    Canonical form of vendor names for matching.
+
+    Lowercase, accents stripped, '&' → 'and', punctuation removed, legal
+    suffixes (Inc, LLC, Co, ...) dropped and whitespace collapsed. Empty
+    results become NA.
+    """
+    s = pd.Series(names, dtype="string")
+    s = s.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").astype("string")
+    s = (
+        s.str.lower()
+        .str.replace("&", " and ", regex=False)
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.replace(_LEGAL_SUFFIXES, " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    return s.mask(s == "")
+
+
+def _hash_names(names: pd.Series) -> np.ndarray:
+    return pd.util.hash_array(names.fillna("").to_numpy(dtype=object))
+
+
+class VendorMaster:
+    """
+    In-memory vendor dimension with a hashed name index.
+
+    Example:
+        >>> vendors = VendorMaster.load(bq)
+        >>> vendors.payment_days(["Acme Supply Inc", "Unknown Co"])
+        array([32, 30])
+    """
+
+    def __init__(self, vendors: pd.DataFrame, modified: Optional[str] = None):
+        """
+        Args:
+            vendors: Rows of the vendors table (Name, Terms, Actual Days, ...)
+            modified: Table last-modified time the rows were read at
+        """
+        self.vendors = vendors.reset_index(drop=True)
+        self.modified = modified
+
+        names = self.vendors["Name"].astype("string")
+        self.normalized = normalize_vendor_names(names)
+
+        # First vendor wins when several share a name or normalized form
+        self._exact, self._exact_pos = self._first_positions(pd.Index(names))
+        self._hashed, self._hashed_pos = self._first_positions(pd.Index(_hash_names(self.normalized)))
+        self._keys = sorted(set(self.normalized.dropna()))
+
+        days = self.vendors.reindex(columns=["Actual Days", "Request Days"]).apply(pd.to_numeric, errors="coerce")
+        self._payment_days = (
+            days["Actual Days"].fillna(days["Request Days"]).fillna(DEFAULT_PAYMENT_DAYS).astype("int64").to_numpy()
+        )
+
+    @classmethod
+    def load(cls, bq=None, cache_dir: Path = VENDOR_CACHE_DIR, refresh: bool = False) -> "VendorMaster":
+        """
+        Load the vendor master, refreshing the local copy only if it is stale.
+
+        Args:
+            bq: BigQueryConnector; without one the local copy is used as-is
+            cache_dir: Directory of the local copy
+            refresh: Download even if the table has not changed
+
+        Raises:
+            FileNotFoundError: No local copy and no connector to build one
+        """
+        cache_dir = Path(cache_dir)
+        manifest_path = cache_dir / MANIFEST_FILE
+
+        # Concurrent forecast runs: one refreshes, the others wait and reuse it
+        with cache_lock(cache_dir):
+            manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+            if bq is not None:
+                modified = bq.get_table_modified("vendors").isoformat()
+                if refresh or manifest.get("modified") != modified or not (cache_dir / CACHE_FILE).exists():
+                    vendors = bq.query(f"SELECT * FROM `{config.get_bigquery_table('vendors')}`")
+                    cls._save(cache_dir, vendors, modified)
+                    return cls(vendors, modified)
+
+            if not (cache_dir / CACHE_FILE).exists():
+                raise FileNotFoundError(f"No vendor cache at {cache_dir}; load once with a BigQuery connector")
+
+            return cls(pd.read_parquet(cache_dir / CACHE_FILE), manifest.get("modified"))
+
+    @staticmethod
+    def _save(cache_dir: Path, vendors: pd.DataFrame, modified: str) -> None:
+        atomic_write(cache_dir / CACHE_FILE, lambda path: vendors.to_parquet(path, index=False))
+
+        manifest = {
+            "table": "vendors",
+            "modified": modified,
+            "rows": len(vendors),
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+        }
+        atomic_write(cache_dir / MANIFEST_FILE, lambda path: path.write_text(json.dumps(manifest, indent=2)))
+
+    def resolve(self, names: Names, fuzzy_cutoff: Optional[float] = DEFAULT_FUZZY_CUTOFF) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Match names to vendor rows.
+
+        Each distinct name is resolved once: exact, then normalized (hashed
+        index), then fuzzy (difflib ratio >= fuzzy_cutoff; None disables).
+
+        Returns:
+            (positions, matched_by): row position in self.vendors per name
+            (-1 when unmatched) and 'exact', 'normalized', 'fuzzy' or None
+        """
+        codes, uniques = pd.factorize(pd.Series(names, dtype="string"))
+        uniques = pd.Series(uniques, dtype="string")
+
+        pos = self._lookup(self._exact, self._exact_pos, uniques.fillna("").to_numpy(dtype=object))
+        how = np.where(pos >= 0, "exact", None).astype(object)
+
+        missing = pos < 0
+        normalized = normalize_vendor_names(uniques[missing])
+        found = self._lookup(self._hashed, self._hashed_pos, _hash_names(normalized))
+        found[normalized.isna().to_numpy()] = -1
+        pos[missing] = found
+        how[np.flatnonzero(missing)[found >= 0]] = "normalized"
+
+        if fuzzy_cutoff is not None:
+            for i in np.flatnonzero(pos < 0):
+                key = normalize_vendor_names([uniques[i]])[0]
+                if pd.isna(key):
+                    continue
+                close = difflib.get_close_matches(key, self._keys, n=1, cutoff=fuzzy_cutoff)
+                if close:
+                    pos[i] = self._lookup(self._hashed, self._hashed_pos, _hash_names(pd.Series(close)))[0]
+                    how[i] = "fuzzy"
+
+        positions = np.where(codes >= 0, pos[codes], -1)
+        matched_by = np.where(codes >= 0, how[codes], None)
+        return positions, matched_by
+
+    @staticmethod
+    def _first_positions(keys: pd.Index) -> Tuple[pd.Index, np.ndarray]:
+        first = ~keys.duplicated()
+        return keys[first], np.flatnonzero(first)
+
+    @staticmethod
+    def _lookup(index: pd.Index, positions: np.ndarray, values: np.ndarray) -> np.ndarray:
+        found = index.get_indexer(values)
+        if not len(positions):
+            return found
+        return np.where(found >= 0, positions[found], -1)
+
+    def terms(self, names: Names, fuzzy_cutoff: Optional[float] = DEFAULT_FUZZY_CUTOFF) -> pd.DataFrame:
+        """
+        Vendor, terms and payment days for each name (row-aligned).
+
+        Unmatched names get DEFAULT_PAYMENT_DAYS, like the SQL LEFT JOIN.
+
+        Returns:
+            DataFrame with vendor_id, vendor_name, payment_terms, payment_days, matched_by
+        """
+        pos, matched_by = self.resolve(names, fuzzy_cutoff=fuzzy_cutoff)
+        matched = pos >= 0
+        if self.vendors.empty:
+            matched = np.zeros(len(pos), dtype=bool)
+            vendors = self.vendors.reindex(range(len(pos)))
+            payment_days = np.full(len(pos), DEFAULT_PAYMENT_DAYS)
+        else:
+            take = np.where(matched, pos, 0)
+            vendors = self.vendors.take(take).reset_index(drop=True)
+            payment_days = np.where(matched, self._payment_days[take], DEFAULT_PAYMENT_DAYS)
+
+        def column(name: str) -> pd.Series:
+            if name not in vendors:
+                return pd.Series(pd.NA, index=range(len(pos)))
+            return vendors[name].where(matched)
+
+        return pd.DataFrame({
+            "vendor_id": column("Id"),
+            "vendor_name": column("Name"),
+            "payment_terms": column("Terms"),
+            "payment_days": payment_days,
+            "matched_by": matched_by,
+        })
+
+    def payment_days(self, names: Names, fuzzy_cutoff: Optional[float] = DEFAULT_FUZZY_CUTOFF) -> np.ndarray:
+        """Days from invoice to payment for each name"""
+        return self.terms(names, fuzzy_cutoff=fuzzy_cutoff)["payment_days"].to_numpy()
+
+    def cash_dates(
+        self,
+        names: Names,
+        invoice_dates: Iterable,
+        fuzzy_cutoff: Optional[float] = DEFAULT_FUZZY_CUTOFF,
+    ) -> np.ndarray:
+        """
+        invoice_date + vendor payment days, as datetime64[D].
+
+        Calendar days only: the invoice ETL and PaymentLagModel.cash_dates
+        also roll the date to a business day through the timing rules
+        (src/timing/rules.py), which build on this module.
+        """
+        days = np.asarray(pd.to_datetime(pd.Series(invoice_dates)), dtype="datetime64[D]")
+        return days + self.payment_days(names, fuzzy_cutoff=fuzzy_cutoff).astype("timedelta64[D]")
+
+    def status(self) -> Dict[str, object]:
+        """Row count, distinct normalized names and source table modified time"""
+        return {
+            "rows": len(self.vendors),
+            "normalized_names": len(self._keys),
+            "modified": self.modified,
+        }
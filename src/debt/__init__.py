@@ -0,0 +1,34 @@
+"""Debt schedules: vectorized amortization of the loan portfolio"""
+
+from .amortization import Loan, amortize, generate_schedules, loan_terms, schedule_frame
+from .rates import (
+    RatePaths,
+    amortize_paths,
+    debt_service_summary,
+    loan_rates,
+    shifted_rates,
+    weekly_debt_service,
+)
+from .sync import SyncPlan, discover_loan_files, load_loans, plan_sync, sync_loans
+from .whatif import LoanWhatIf, WhatIfResult
+
+__all__ = [
+    "Loan",
+    "amortize",
+    "generate_schedules",
+    "loan_terms",
+    "schedule_frame",
+    "RatePaths",
+    "amortize_paths",
+    "loan_rates",
+    "shifted_rates",
+    "weekly_debt_service",
+    "debt_service_summary",
+    "discover_loan_files",
+    "load_loans",
+    "plan_sync",
+    "sync_loans",
+    "SyncPlan",
+    "LoanWhatIf",
+    "WhatIfResult",
+]
@@ -0,0 +1,489 @@
+"""
+Vectorized amortization engine
+
+Every loan in the portfolio is amortized at once. Loan terms are a
+structured array (one record per loan) and the schedule is a loan × period
+structured array; the engine steps through periods, each step computing
+interest, principal and balances for all loans with array arithmetic.
+Schedules become a DataFrame only at the edge (schedule_frame).
+
+Structures, chosen from the config as add_loan_schedule.py always has:
+- amortizing: io_months of interest-only payments, then amort_months of
+  principal & interest (a level payment, set when P&I starts and
+  re-amortized over the remaining months whenever the rate changes)
+- fixed: fixed_payment each month until paid off or maturity
+- balloon: fixed_payment each month before maturity, then the remaining
+  balance plus interest at maturity
+
+Interest accrues between consecutive payment dates under each loan's
+day-count convention (actual/360 by default, 30/360 or actual/365), so
+days_in_period is the real period length and short months cost less
+interest. Level payments are sized on the average month under the
+convention, and the final P&I payment absorbs what is left over.
+
+    >>> loans = [Loan.from_config(c) for c in configs]
+    >>> terms = loan_terms(loans)
+    >>> schedule = amortize(terms)                    # loans × periods
+    >>> schedule = amortize(terms, rates=terms['annual_rate'][:, None] + 0.01)
+    >>> df = schedule_frame(loans, schedule)
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+AMORTIZING, FIXED, BALLOON = 0, 1, 2
+STRUCTURES = ('amortizing', 'fixed', 'balloon')
+
+INTEREST_ONLY, PRINCIPAL_AND_INTEREST, FIXED_PAYMENT, REGULAR_PAYMENT, BALLOON_PAYMENT = range(5)
+PAYMENT_TYPES = ('Interest Only', 'Principal & Interest', 'Fixed Payment', 'Regular Payment', 'Balloon Payment')
+
+ACTUAL_360, THIRTY_360, ACTUAL_365 = range(3)
+DAY_COUNTS = ('actual/360', '30/360', 'actual/365')
+YEAR_BASIS = np.array([360, 360, 365])
+# Average days per monthly period, used to size level payments
+MONTH_DAYS = np.array([365.25 / 12, 30, 365.25 / 12])
+
+LOAN_DTYPE = np.dtype([
+    ('balance', 'f8'),
+    ('annual_rate', 'f8'),
+    ('start_date', 'M8[D]'),
+    ('maturity_date', 'M8[D]'),
+    ('payment_day', 'i8'),
+    ('structure', 'i8'),
+    ('io_months', 'i8'),
+    ('amort_months', 'i8'),
+    ('fixed_payment', 'f8'),
+    ('day_count', 'i8'),
+    ('periods', 'i8'),
+])
+
+SCHEDULE_DTYPE = np.dtype([
+    ('payment_number', 'i8'),
+    ('payment_date', 'M8[D]'),
+    ('payment_type', 'i8'),
+    ('interest_rate', 'f8'),
+    ('days_in_period', 'i8'),
+    ('beginning_principal', 'f8'),
+    ('payment_amount', 'f8'),
+    ('principal_amount', 'f8'),
+    ('interest_amount', 'f8'),
+    ('extra_principal', 'f8'),
+    ('ending_principal', 'f8'),
+    ('active', '?'),
+])
+
+SCHEDULE_COLUMNS = [
+    'schedule_id', 'loan_id', 'loan_name', 'lender', 'payment_date', 'payment_number',
+    'payment_amount', 'principal_amount', 'interest_amount', 'fees_amount',
+    'beginning_principal', 'ending_principal', 'interest_rate', 'days_in_period',
+    'is_paid', 'payment_type', 'is_forecast',
+]
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+@dataclass
+class Loan:
+    """
+    One loan config (data/loans/*.yaml or add_loan_schedule.py --interactive)
+
+    A variable-rate loan has a rate_margin over its rate_index (e.g. Prime +
+    2.25%); rate_steps are index levels by effective date, and annual_rate
+    is the all-in rate before the first step. buyout_premium maps months
+    remaining (at least) to the early-buyout premium over the balance.
+    """
+
+    loan_id: str
+    loan_name: str
+    lender: str
+    current_balance: float
+    annual_rate: float
+    payment_day: int
+    start_date: date
+    maturity_date: date
+    loan_type: str = ""
+    original_amount: Optional[float] = None
+    io_months: int = 0
+    amort_months: int = 0
+    fixed_payment: Optional[float] = None
+    balloon_amount: Optional[float] = None
+    day_count: str = DAY_COUNTS[ACTUAL_360]
+    rate_index: str = ""
+    rate_margin: Optional[float] = None
+    rate_steps: Tuple[Tuple[date, float], ...] = ()
+    buyout_premium: Tuple[Tuple[int, float], ...] = ()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Loan":
+        """
+        Loan from a config dict; dates may be ISO strings or dates.
+
+        Raises:
+            ValueError: If a required field is missing or the terms are inconsistent
+        """
+        required = ('loan_id', 'loan_name', 'lender', 'current_balance', 'annual_rate',
+                    'payment_day', 'start_date', 'maturity_date')
+        missing = [f for f in required if config.get(f) in (None, "")]
+        if missing:
+            raise ValueError(f"Missing loan fields: {', '.join(missing)}")
+
+        loan = cls(
+            loan_id=str(config['loan_id']),
+            loan_name=str(config['loan_name']),
+            lender=str(config['lender']),
+            current_balance=float(config['current_balance']),
+            annual_rate=float(config['annual_rate']),
+            payment_day=int(config['payment_day']),
+            start_date=_as_date(config['start_date']),
+            maturity_date=_as_date(config['maturity_date']),
+            loan_type=str(config.get('loan_type') or ""),
+            original_amount=float(config['original_amount']) if config.get('original_amount') is not None else None,
+            io_months=int(config.get('io_months') or 0),
+            amort_months=int(config.get('amort_months') or 0),
+            fixed_payment=float(config['fixed_payment']) if config.get('fixed_payment') is not None else None,
+            balloon_amount=float(config['balloon_amount']) if config.get('balloon_amount') is not None else None,
+            day_count=str(config.get('day_count') or DAY_COUNTS[ACTUAL_360]).lower(),
+            rate_index=str(config.get('rate_index') or ""),
+            rate_margin=float(config['rate_margin']) if config.get('rate_margin') is not None else None,
+            rate_steps=tuple(sorted(
+                (_as_date(effective), float(level)) for effective, level in (config.get('rate_steps') or {}).items()
+            )),
+            buyout_premium=tuple(sorted(
+                (int(months), float(premium)) for months, premium in (config.get('buyout_premium') or {}).items()
+            )),
+        )
+        if loan.day_count not in DAY_COUNTS:
+            raise ValueError(f"{loan.loan_id}: day_count must be one of {', '.join(DAY_COUNTS)}")
+        if loan.rate_index and loan.rate_margin is None:
+            raise ValueError(f"{loan.loan_id}: a rate_index loan needs a rate_margin")
+        if not 1 <= loan.payment_day <= 31:
+            raise ValueError(f"{loan.loan_id}: payment_day must be between 1 and 31")
+        if loan.maturity_date <= loan.start_date:
+            raise ValueError(f"{loan.loan_id}: maturity_date must be after start_date")
+        if loan.current_balance < 0 or loan.annual_rate < 0 or min(loan.io_months, loan.amort_months) < 0:
+            raise ValueError(f"{loan.loan_id}: balance, rate and term months cannot be negative")
+        loan.structure  # validates the payment structure
+        return loan
+
+    @property
+    def is_variable(self) -> bool:
+        """Rate floats with an index (rate_index + rate_margin)"""
+        return self.rate_margin is not None
+
+    def index_rate(self, on: Optional[date] = None) -> float:
+        """
+        Index level in effect on a date (default today): the latest rate_steps
+        level on or before it, else annual_rate less the margin.
+        """
+        on = on or date.today()
+        levels = [level for effective, level in self.rate_steps if effective <= on]
+        return levels[-1] if levels else self.annual_rate - (self.rate_margin or 0.0)
+
+    @property
+    def config_hash(self) -> str:
+        """MD5 of the loan terms; changes whenever the schedule inputs do"""
+        terms = json.dumps(asdict(self), sort_keys=True, default=str)
+        return hashlib.md5(terms.encode()).hexdigest()
+
+    @property
+    def structure(self) -> int:
+        """AMORTIZING, FIXED or BALLOON"""
+        if self.io_months > 0 or self.amort_months > 0:
+            return AMORTIZING
+        if self.fixed_payment is None:
+            raise ValueError(f"{self.loan_id}: needs io_months/amort_months or a fixed_payment")
+        return BALLOON if self.balloon_amount is not None else FIXED
+
+
+def _payment_dates(start: np.ndarray, payment_day: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """payment_day of the month `months` after start (month end if shorter)"""
+    month = start.astype('M8[M]') + months.astype('timedelta64[M]')
+    first = month.astype('M8[D]')
+    month_len = ((month + 1).astype('M8[D]') - first).astype('int64')
+    return first + (np.minimum(payment_day, month_len) - 1).astype('timedelta64[D]')
+
+
+def _ymd(dates: np.ndarray):
+    """Year, month (1-12) and day arrays of a datetime64[D] array"""
+    years = dates.astype('M8[Y]')
+    months = dates.astype('M8[M]')
+    return (
+        years.astype('int64') + 1970,
+        (months - years.astype('M8[M]')).astype('int64') + 1,
+        (dates - months.astype('M8[D]')).astype('int64') + 1,
+    )
+
+
+def period_days(start: np.ndarray, end: np.ndarray, day_count: np.ndarray) -> np.ndarray:
+    """
+    Days of interest from start to end under each day-count convention.
+
+    Actual conventions count calendar days; 30/360 (bond basis) counts
+    30-day months, with day 31 read as 30 (and an end day of 31 as 30 when
+    the start day is 30 or 31).
+    """
+    actual = (end - start).astype('int64')
+    y1, m1, d1 = _ymd(start)
+    y2, m2, d2 = _ymd(end)
+    d1 = np.minimum(d1, 30)
+    d2 = np.where(d1 == 30, np.minimum(d2, 30), d2)
+    thirty = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+    return np.where(day_count == THIRTY_360, thirty, actual)
+
+
+def loan_terms(loans: Sequence[Loan]) -> np.ndarray:
+    """
+    Structured array of loan terms (LOAN_DTYPE), one record per loan.
+
+    periods is the number of scheduled payments: io + amort months, or every
+    payment date up to maturity (fixed), or before maturity plus the balloon.
+    """
+    terms = np.zeros(len(loans), dtype=LOAN_DTYPE)
+    if not loans:
+        return terms
+
+    terms['balance'] = [l.current_balance for l in loans]
+    terms['annual_rate'] = [l.annual_rate for l in loans]
+    terms['start_date'] = [np.datetime64(l.start_date, 'D') for l in loans]
+    terms['maturity_date'] = [np.datetime64(l.maturity_date, 'D') for l in loans]
+    terms['payment_day'] = [l.payment_day for l in loans]
+    terms['structure'] = [l.structure for l in loans]
+    terms['io_months'] = [l.io_months for l in loans]
+    terms['amort_months'] = [l.amort_months for l in loans]
+    terms['fixed_payment'] = [l.fixed_payment if l.fixed_payment is not None else np.nan for l in loans]
+    terms['day_count'] = [DAY_COUNTS.index(l.day_count) for l in loans]
+
+    # Payment dates up to the maturity month
+    months_to_maturity = (
+        terms['maturity_date'].astype('M8[M]') - terms['start_date'].astype('M8[M]')
+    ).astype('int64')
+    last = _payment_dates(terms['start_date'], terms['payment_day'], months_to_maturity)
+    through_maturity = months_to_maturity + (last <= terms['maturity_date'])
+    before_maturity = months_to_maturity + (last < terms['maturity_date'])
+
+    terms['periods'] = np.select(
+        [terms['structure'] == AMORTIZING, terms['structure'] == FIXED],
+        [terms['io_months'] + terms['amort_months'], through_maturity],
+        default=before_maturity + 1,
+    )
+    return terms
+
+
+def period_dates(terms: np.ndarray, n_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Accrual start and payment date of every period, (loans, n_periods) each.
+
+    Each period accrues from the previous payment date (the first from one
+    month before the first payment); a balloon's last payment is on the
+    maturity date.
+    """
+    period = np.arange(n_periods)
+    dates = _payment_dates(
+        terms['start_date'][:, None], terms['payment_day'][:, None], np.arange(-1, n_periods)[None, :]
+    )
+    last = period[None, :] == (terms['periods'] - 1)[:, None]
+    balloon = (terms['structure'] == BALLOON)[:, None]
+    dates[:, 1:] = np.where(balloon & last, terms['maturity_date'][:, None], dates[:, 1:])
+    return dates[:, :-1], dates[:, 1:]
+
+
+def _annuity_payment(balance: np.ndarray, monthly_rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Level payment that retires balance over months at monthly_rate"""
+    months = np.maximum(months, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = balance * monthly_rate / (1 - (1 + monthly_rate) ** -months.astype('float64'))
+    return np.where(monthly_rate == 0, balance / months, payment)
+
+
+def amortize(
+    terms: np.ndarray,
+    rates: Optional[np.ndarray] = None,
+    extra: Optional[np.ndarray] = None,
+    recast: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Payment schedules for all loans at once.
+
+    Args:
+        terms: Loan terms (loan_terms)
+        rates: Annual rate per loan and period, broadcastable to
+               (loans, periods) - e.g. a rate path per loan. Default: each
+               loan's annual_rate throughout.
+        extra: Additional principal paid with each payment, broadcastable
+               to (loans, periods); capped at the balance left (np.inf pays
+               the loan off). Default: none.
+        recast: Per loan, re-amortize the level P&I payment after an extra
+                payment (default: keep the payment and finish early)
+
+    Returns:
+        (loans, max periods) SCHEDULE_DTYPE array; active is False past
+        each loan's last payment (and for a fixed-payment loan once repaid)
+    """
+    n_loans = len(terms)
+    n_periods = int(terms['periods'].max(initial=0))
+    schedule = np.zeros((n_loans, n_periods), dtype=SCHEDULE_DTYPE)
+    if n_periods == 0:
+        return schedule
+
+    rate = np.broadcast_to(
+        terms['annual_rate'][:, None] if rates is None else np.asarray(rates, dtype='float64'),
+        (n_loans, n_periods),
+    )
+
+    extra = np.broadcast_to(0.0 if extra is None else np.asarray(extra, dtype='float64'), (n_loans, n_periods))
+    recast = np.broadcast_to(False if recast is None else np.asarray(recast, dtype=bool), (n_loans,))
+
+    starts, dates = period_dates(terms, n_periods)
+    days = period_days(starts, dates, terms['day_count'][:, None])
+    structure = terms['structure']
+    year_basis = YEAR_BASIS[terms['day_count']]
+    month_fraction = MONTH_DAYS[terms['day_count']] / year_basis
+
+    io_months = terms['io_months']
+    total_months = io_months + terms['amort_months']
+    fixed = np.nan_to_num(terms['fixed_payment'])
+    balance = terms['balance'].astype('float64').copy()
+    level = np.zeros(n_loans)
+
+    for p in range(n_periods):
+        is_last = p == terms['periods'] - 1
+        interest = balance * rate[:, p] * days[:, p] / year_basis
+
+        payment_type = np.select(
+            [
+                (structure == AMORTIZING) & (p < io_months),
+                structure == AMORTIZING,
+                structure == FIXED,
+                is_last,
+            ],
+            [INTEREST_ONLY, PRINCIPAL_AND_INTEREST, FIXED_PAYMENT, BALLOON_PAYMENT],
+            default=REGULAR_PAYMENT,
+        )
+        # Level P&I payment: set when amortization starts, re-set on rate changes
+        reset = p <= io_months
+        if p:
+            reset |= ~np.isclose(rate[:, p], rate[:, p - 1], rtol=0, atol=1e-9)
+            reset |= recast & (extra[:, p - 1] > 0)
+        level = np.where(reset, _annuity_payment(balance, rate[:, p] * month_fraction, total_months - p), level)
+        final = p == total_months - 1
+        principal = np.select(
+            [
+                payment_type == INTEREST_ONLY,
+                payment_type == PRINCIPAL_AND_INTEREST,
+                payment_type == FIXED_PAYMENT,
+                payment_type == BALLOON_PAYMENT,
+            ],
+            [
+                np.zeros(n_loans),
+                np.where(final, balance, np.minimum(level - interest, balance)),
+                np.minimum(fixed - interest, balance),
+                balance,
+            ],
+            default=np.minimum(fixed - interest, balance),
+        )
+        prepaid = np.minimum(extra[:, p], np.maximum(balance - principal, 0))
+        principal = principal + prepaid
+        ending = np.maximum(balance - principal, 0)
+
+        # Fixed-payment loans stop once repaid
+        active = (p < terms['periods']) & ((structure != FIXED) | (balance > 0))
+
+        row = schedule[:, p]
+        row['payment_number'] = p + 1
+        row['payment_date'] = dates[:, p]
+        row['payment_type'] = payment_type
+        row['interest_rate'] = rate[:, p]
+        row['days_in_period'] = days[:, p]
+        row['beginning_principal'] = balance
+        row['payment_amount'] = principal + interest
+        row['principal_amount'] = principal
+        row['interest_amount'] = interest
+        row['extra_principal'] = prepaid
+        row['ending_principal'] = ending
+        row['active'] = active
+
+        balance = np.where(active, ending, balance)
+
+    return schedule
+
+
+def schedule_ids(loan_ids: Sequence[str], payment_numbers: Sequence[int]) -> list:
+    """
+    Deterministic debt_schedule row ids: MD5('debt_schedule:' || loan_id ||
+    ':' || payment_number), so regenerating a schedule updates rows in place.
+    """
+    return [
+        hashlib.md5(f"debt_schedule:{loan_id}:{number}".encode()).hexdigest()
+        for loan_id, number in zip(loan_ids, payment_numbers)
+    ]
+
+
+def schedule_frame(loans: Sequence[Loan], schedule: np.ndarray, as_of: Optional[date] = None) -> pd.DataFrame:
+    """
+    debt_schedule rows for the active payments of an amortize() result.
+
+    Args:
+        loans: Loans in the order of the terms array
+        schedule: amortize() output
+        as_of: Payments before this date are paid, the rest forecast (default: today)
+
+    Returns:
+        DataFrame with SCHEDULE_COLUMNS, amounts rounded to cents
+    """
+    as_of = np.datetime64(as_of or date.today(), 'D')
+    loan_idx, period_idx = np.nonzero(schedule['active'])
+    rows = schedule[loan_idx, period_idx]
+
+    def loan_field(name: str) -> np.ndarray:
+        return np.array([getattr(l, name) for l in loans], dtype=object)[loan_idx]
+
+    frame = pd.DataFrame({
+        'schedule_id': schedule_ids(loan_field('loan_id'), rows['payment_number']),
+        'loan_id': loan_field('loan_id'),
+        'loan_name': loan_field('loan_name'),
+        'lender': loan_field('lender'),
+        'payment_date': rows['payment_date'],
+        'payment_number': rows['payment_number'],
+        'payment_amount': rows['payment_amount'].round(2),
+        'principal_amount': rows['principal_amount'].round(2),
+        'interest_amount': rows['interest_amount'].round(2),
+        'fees_amount': 0.0,
+        'beginning_principal': rows['beginning_principal'].round(2),
+        'ending_principal': rows['ending_principal'].round(2),
+        'interest_rate': rows['interest_rate'],
+        'days_in_period': rows['days_in_period'],
+        'is_paid': rows['payment_date'] < as_of,
+        'payment_type': np.asarray(PAYMENT_TYPES, dtype=object)[rows['payment_type']],
+        'is_forecast': rows['payment_date'] >= as_of,
+    })
+    return frame[SCHEDULE_COLUMNS]
+
+
+def scheduled_rates(loans: Sequence[Loan], terms: np.ndarray) -> np.ndarray:
+    """
+    Annual rate per loan and period from the configs: annual_rate, then for
+    variable loans each rate_steps level plus the margin from the first
+    period accruing on or after its effective date.
+    """
+    n_periods = int(terms['periods'].max(initial=0))
+    rates = np.repeat(terms['annual_rate'][:, None], n_periods, axis=1)
+    starts, _ = period_dates(terms, n_periods)
+    for i, loan in enumerate(loans):
+        for effective, level in loan.rate_steps:
+            rates[i, starts[i] >= np.datetime64(effective, 'D')] = level + (loan.rate_margin or 0.0)
+    return rates
+
+
+def generate_schedules(loans: Sequence[Loan], as_of: Optional[date] = None) -> pd.DataFrame:
+    """Schedules for many loans: loan_terms → amortize (configured rates) → schedule_frame"""
+    terms = loan_terms(loans)
+    return schedule_frame(loans, amortize(terms, rates=scheduled_rates(loans, terms)), as_of=as_of)
@@ -0,0 +1,175 @@
+"""
+Index rate paths and debt-service distributions
+
+A RatePaths holds one or many monthly paths of an index (e.g. Prime): flat,
+stepped, or simulated. loan_rates() maps them onto every variable-rate
+loan's periods (index + margin, from the path's first month on), and
+amortize_paths() runs the amortization engine for all paths at once, with
+the level P&I payment re-amortized after each reset. weekly_debt_service()
+then buckets payments into forecast weeks, one row per path.
+
+    >>> paths = RatePaths.simulate(0.0750, start=date.today(), months=84, n_paths=1000, seed=7)
+    >>> terms = loan_terms(loans)
+    >>> schedule = amortize_paths(terms, loan_rates(loans, terms, paths))
+    >>> weekly = weekly_debt_service(schedule, start_date=date.today(), weeks=13)
+    >>> debt_service_summary(weekly, start_date=date.today())
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .amortization import Loan, amortize, period_dates, scheduled_rates
+
+
+# Prime moves with the Fed funds target, in quarter points
+RATE_STEP = 0.0025
+
+
+@dataclass
+class RatePaths:
+    """Index rate paths by calendar month: values[path, month] from start_month"""
+
+    start_month: np.datetime64
+    values: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def flat(cls, rate: float, start: date, months: int) -> "RatePaths":
+        """One path holding rate throughout"""
+        return cls(np.datetime64(start, 'M'), np.full((1, months), float(rate)))
+
+    @classmethod
+    def stepped(cls, rate: float, steps: Dict[date, float], start: date, months: int) -> "RatePaths":
+        """One path starting at rate and moving to each step's level from its month on"""
+        start_month = np.datetime64(start, 'M')
+        values = np.full((1, months), float(rate))
+        for effective, level in sorted(steps.items()):
+            offset = int((np.datetime64(effective, 'M') - start_month).astype('int64'))
+            values[0, max(offset, 0):] = level
+        return cls(start_month, values)
+
+    @classmethod
+    def simulate(
+        cls,
+        rate: float,
+        start: date,
+        months: int,
+        n_paths: int = 1000,
+        volatility: float = 0.01,
+        drift: float = 0.0,
+        step: float = RATE_STEP,
+        floor: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> "RatePaths":
+        """
+        Random-walk paths from rate: monthly normal shocks with the given
+        annual volatility and drift, rounded to step (quarter-point moves)
+        and floored.
+        """
+        rng = np.random.default_rng(seed)
+        shocks = rng.normal(drift / 12, volatility / np.sqrt(12), size=(n_paths, months))
+        shocks[:, 0] = 0.0
+        walk = rate + np.cumsum(shocks, axis=1)
+        values = np.maximum(np.round(walk / step) * step, floor)
+        return cls(np.datetime64(start, 'M'), values)
+
+    def shifted(self, shock: float) -> "RatePaths":
+        """Paths moved by a parallel shock (e.g. +0.01 for +100bp)"""
+        return RatePaths(self.start_month, self.values + shock)
+
+    def at(self, dates: np.ndarray) -> np.ndarray:
+        """
+        Index level on each date for every path: (paths, *dates.shape).
+        Dates before the first month take its level, after the last month
+        the last level.
+        """
+        offset = (np.asarray(dates).astype('M8[M]') - self.start_month).astype('int64')
+        return self.values[:, np.clip(offset, 0, self.values.shape[1] - 1)]
+
+
+def loan_rates(loans: Sequence[Loan], terms: np.ndarray, paths: RatePaths) -> np.ndarray:
+    """
+    Annual rate per path, loan and period: (paths, loans, periods).
+
+    Variable-rate loans pay the path's index plus their margin for periods
+    accruing from the path's first month on, and their configured rates
+    (scheduled_rates) before that. Fixed-rate loans keep their configured
+    rates on every path.
+    """
+    base = scheduled_rates(loans, terms)
+    starts, _ = period_dates(terms, base.shape[1])
+    margin = np.array([loan.rate_margin if loan.is_variable else np.nan for loan in loans])
+
+    on_path = ~np.isnan(margin)[:, None] & (starts >= paths.start_month.astype('M8[D]'))
+    return np.where(on_path, paths.at(starts) + np.nan_to_num(margin)[:, None], base)
+
+
+def shifted_rates(loans: Sequence[Loan], terms: np.ndarray, shock: float, start: date) -> np.ndarray:
+    """
+    Configured rates (scheduled_rates) with every variable-rate loan moved by
+    a parallel shock for periods accruing from start on: (loans, periods).
+    """
+    base = scheduled_rates(loans, terms)
+    starts, _ = period_dates(terms, base.shape[1])
+    variable = np.array([loan.is_variable for loan in loans], dtype=bool)[:, None]
+    return np.where(variable & (starts >= np.datetime64(start, 'D')), base + shock, base)
+
+
+def amortize_paths(terms: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """
+    Amortize every loan under every rate path in one engine pass.
+
+    Args:
+        terms: Loan terms (loan_terms)
+        rates: (paths, loans, periods) annual rates (loan_rates)
+
+    Returns:
+        (paths, loans, periods) SCHEDULE_DTYPE array
+    """
+    n_paths, n_loans, n_periods = rates.shape
+    schedule = amortize(np.tile(terms, n_paths), rates.reshape(n_paths * n_loans, n_periods))
+    return schedule.reshape(n_paths, n_loans, -1)
+
+
+def weekly_debt_service(schedule: np.ndarray, start_date: date, weeks: int = 13) -> np.ndarray:
+    """
+    Debt service per path and forecast week: (paths, weeks).
+
+    Week 1 starts on start_date; payments on or after start_date are counted.
+    """
+    n_paths = schedule.shape[0]
+    days = (schedule['payment_date'] - np.datetime64(start_date, 'D')).astype('int64')
+    week = days // 7
+    keep = schedule['active'] & (days >= 0) & (week < weeks)
+
+    path = np.broadcast_to(np.arange(n_paths).reshape((-1,) + (1,) * (schedule.ndim - 1)), schedule.shape)
+    totals = np.bincount(
+        (path * weeks + week)[keep],
+        weights=schedule['payment_amount'][keep],
+        minlength=n_paths * weeks,
+    )
+    return totals.reshape(n_paths, weeks)
+
+
+def debt_service_summary(
+    weekly: np.ndarray,
+    start_date: date,
+    percentiles: Sequence[int] = (5, 50, 95),
+) -> pd.DataFrame:
+    """Distribution of weekly debt service across paths: mean and percentiles per week"""
+    weeks = weekly.shape[1]
+    summary = pd.DataFrame({
+        'week_number': np.arange(1, weeks + 1),
+        'week_start': pd.Timestamp(start_date) + pd.to_timedelta(7 * np.arange(weeks), unit='D'),
+        'mean': weekly.mean(axis=0),
+    })
+    for pct, values in zip(percentiles, np.percentile(weekly, percentiles, axis=0)):
+        summary[f'p{pct}'] = values
+    return summary
@@ -0,0 +1,330 @@
+"""
+Sync loan configs to debt_schedule
+
+Every loan YAML under data/loans/ is validated, the whole portfolio is
+amortized in one vectorized pass, and only what changed since the last sync
+is written to debt_schedule, in a single MERGE on the deterministic
+schedule_id (loan_id + payment_number).
+
+A local memo (data/processed/loan_sync) keeps each loan's config hash and a
+hash of every payment row as last synced:
+- new loans, and loans whose config hash changed, are replaced: all their
+  rows are merged and any other rows of the loan (a shortened term, or
+  random-id rows from older loads) are deleted
+- other loans send only the rows whose hash changed, e.g. is_paid flips
+- loans with no changed rows are skipped, and when nothing changed no
+  warehouse job runs at all
+
+Loans without a config are left alone.
+
+    >>> loans, errors = load_loans(discover_loan_files())
+    >>> plan = plan_sync(loans)
+    >>> result = sync_loans(bq, loans, plan=plan)
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..config import DATA_DIR, PROCESSED_DATA_DIR, config
+from ..sql import string_literal
+from .amortization import SCHEDULE_COLUMNS, Loan, generate_schedules
+
+
+LOANS_DIR = DATA_DIR / "loans"
+SCHEDULE_TABLE = "debt_schedule"
+SYNC_DIR = PROCESSED_DATA_DIR / "loan_sync"
+MANIFEST_FILE = "_manifest.json"
+ROWS_FILE = "synced_rows.parquet"
+
+SCHEDULE_TYPES = {
+    'schedule_id': 'STRING',
+    'loan_id': 'STRING',
+    'loan_name': 'STRING',
+    'lender': 'STRING',
+    'payment_date': 'DATE',
+    'payment_number': 'INT64',
+    'payment_amount': 'FLOAT64',
+    'principal_amount': 'FLOAT64',
+    'interest_amount': 'FLOAT64',
+    'fees_amount': 'FLOAT64',
+    'beginning_principal': 'FLOAT64',
+    'ending_principal': 'FLOAT64',
+    'interest_rate': 'FLOAT64',
+    'days_in_period': 'INT64',
+    'is_paid': 'BOOL',
+    'payment_type': 'STRING',
+    'is_forecast': 'BOOL',
+}
+
+# Kept on update; actual_payment_date/amount are not schedule columns and
+# are never touched either
+_KEY_COLUMNS = ('schedule_id', 'loan_id', 'payment_number')
+
+
+@dataclass
+class SyncPlan:
+    """What a sync will write, from diffing the schedule against the memo"""
+
+    schedule: pd.DataFrame
+    row_hashes: np.ndarray
+    config_hashes: Dict[str, str]
+    changes: pd.DataFrame
+    replaced: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return self.changes.empty and not self.replaced
+
+
+def discover_loan_files(directory: Path = LOANS_DIR, include_examples: bool = False) -> List[Path]:
+    """
+    Loan config files under a directory (recursive).
+
+    example_*.yaml templates are skipped unless include_examples is set.
+    """
+    paths = sorted(p for pattern in ('*.yaml', '*.yml') for p in Path(directory).rglob(pattern))
+    if not include_examples:
+        paths = [p for p in paths if not p.name.startswith('example_')]
+    return paths
+
+
+def load_loans(paths: Sequence[Path]) -> Tuple[List[Loan], Dict[Path, str]]:
+    """
+    Parse and validate loan configs.
+
+    Args:
+        paths: YAML files, one loan each
+
+    Returns:
+        (loans, errors): valid loans in file order, and an error message per
+        file that failed to parse or validate. A loan_id used by more than
+        one file is an error for every file after the first.
+    """
+    loans: List[Loan] = []
+    errors: Dict[Path, str] = {}
+    seen: Dict[str, Path] = {}
+
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                loan_config = yaml.safe_load(f)
+            if not isinstance(loan_config, dict):
+                raise ValueError("not a loan config (expected a mapping)")
+            loan = Loan.from_config(loan_config)
+        except (OSError, yaml.YAMLError, ValueError, TypeError) as e:
+            errors[path] = str(e)
+            continue
+
+        if loan.loan_id in seen:
+            errors[path] = f"loan_id '{loan.loan_id}' already defined in {seen[loan.loan_id].name}"
+            continue
+
+        seen[loan.loan_id] = path
+        loans.append(loan)
+
+    return loans, errors
+
+
+def _literals(frame: pd.DataFrame) -> pd.Series:
+    """One SQL tuple per schedule row, in SCHEDULE_COLUMNS order"""
+    columns = []
+    for column, sql_type in SCHEDULE_TYPES.items():
+        values = frame[column]
+        if sql_type == 'STRING':
+            rendered = values.map(string_literal)
+        elif sql_type == 'DATE':
+            rendered = "DATE('" + pd.to_datetime(values).dt.strftime('%Y-%m-%d') + "')"
+        elif sql_type == 'BOOL':
+            rendered = pd.Series(np.where(values.to_numpy(dtype=bool), 'TRUE', 'FALSE'), index=frame.index)
+        else:
+            rendered = values.astype(str)
+        columns.append(rendered)
+
+    return '(' + pd.concat(columns, axis=1).agg(', '.join, axis=1) + ')'
+
+
+def row_hashes(schedule: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of every schedule row (all SCHEDULE_COLUMNS, vectorized)"""
+    return pd.util.hash_pandas_object(schedule[SCHEDULE_COLUMNS], index=False).to_numpy()
+
+
+def _read_memo(sync_dir: Path) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    manifest_path = sync_dir / MANIFEST_FILE
+    rows_path = sync_dir / ROWS_FILE
+    if not (manifest_path.exists() and rows_path.exists()):
+        return {}, pd.DataFrame({
+            'loan_id': pd.Series(dtype=str),
+            'payment_number': pd.Series(dtype='int64'),
+            'row_hash': pd.Series(dtype='int64'),
+        })
+    return json.loads(manifest_path.read_text()), pd.read_parquet(rows_path)
+
+
+def _write_memo(sync_dir: Path, plan: SyncPlan) -> None:
+    """Record the plan's loans as synced (other loans' entries are kept)"""
+    manifest, rows = _read_memo(sync_dir)
+    synced_at = datetime.now(timezone.utc).isoformat()
+    for loan_id, digest in plan.config_hashes.items():
+        manifest[loan_id] = {'config_hash': digest, 'synced_at': synced_at}
+
+    current = pd.DataFrame({
+        'loan_id': plan.schedule['loan_id'].astype(str),
+        'payment_number': plan.schedule['payment_number'].astype('int64'),
+        'row_hash': plan.row_hashes.view('int64'),
+    })
+    rows = pd.concat([rows[~rows['loan_id'].isin(list(plan.config_hashes))], current], ignore_index=True)
+
+    # Write then rename so an interrupted sync leaves the previous memo intact
+    sync_dir.mkdir(parents=True, exist_ok=True)
+    tmp = sync_dir / f".{ROWS_FILE}.tmp"
+    rows.to_parquet(tmp, index=False)
+    os.replace(tmp, sync_dir / ROWS_FILE)
+    tmp = sync_dir / f".{MANIFEST_FILE}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, sync_dir / MANIFEST_FILE)
+
+
+def plan_sync(
+    loans: Sequence[Loan],
+    as_of: Optional[date] = None,
+    sync_dir: Path = SYNC_DIR,
+    full: bool = False,
+) -> SyncPlan:
+    """
+    Generate all schedules and diff them against the last sync.
+
+    Args:
+        loans: Validated loans (load_loans)
+        as_of: Payments before this date are marked paid (default: today)
+        sync_dir: Directory of the sync memo
+        full: Ignore the memo and replace every loan
+
+    Returns:
+        SyncPlan: changes holds the rows to merge; replaced lists loans
+        written in full (new or changed config), updated those with only
+        changed rows, skipped those with nothing to write
+    """
+    schedule = generate_schedules(loans, as_of=as_of)
+    hashes = row_hashes(schedule)
+    config_hashes = {loan.loan_id: loan.config_hash for loan in loans}
+
+    manifest, memo = ({}, None) if full else _read_memo(Path(sync_dir))
+    replaced = [
+        loan_id for loan_id, digest in config_hashes.items()
+        if manifest.get(loan_id, {}).get('config_hash') != digest
+    ]
+
+    if memo is None:
+        changed = np.ones(len(schedule), dtype=bool)
+    else:
+        previous = pd.MultiIndex.from_frame(memo[['loan_id', 'payment_number']]).get_indexer(
+            pd.MultiIndex.from_arrays([schedule['loan_id'].astype(str), schedule['payment_number'].astype('int64')])
+        )
+        memo_hashes = np.append(memo['row_hash'].to_numpy(dtype='int64'), 0)
+        changed = (previous == -1) | (memo_hashes[previous] != hashes.view('int64'))
+    changed |= schedule['loan_id'].isin(replaced).to_numpy()
+
+    changes = schedule[changed]
+    touched = set(changes['loan_id'])
+    return SyncPlan(
+        schedule=schedule,
+        row_hashes=hashes,
+        config_hashes=config_hashes,
+        changes=changes,
+        replaced=replaced,
+        updated=[loan_id for loan_id in config_hashes if loan_id in touched and loan_id not in replaced],
+        skipped=[loan_id for loan_id in config_hashes if loan_id not in touched and loan_id not in replaced],
+    )
+
+
+def merge_schedule_sql(rows: pd.DataFrame, replaced: Sequence[str] = ()) -> str:
+    """
+    MERGE of schedule rows (SCHEDULE_COLUMNS) into debt_schedule.
+
+    Rows are passed inline as a typed ARRAY<STRUCT> (about 250 bytes per
+    payment, far below BigQuery's query size limit for a loan portfolio).
+    Rows of the replaced loans that are not in rows are deleted.
+    """
+    struct_type = ", ".join(f"{column} {sql_type}" for column, sql_type in SCHEDULE_TYPES.items())
+    values_list = ",\n      ".join(_literals(rows))
+    updates = ",\n      ".join(
+        f"{column} = S.{column}" for column in SCHEDULE_COLUMNS if column not in _KEY_COLUMNS
+    )
+    columns = ", ".join(SCHEDULE_COLUMNS)
+    values = ", ".join(f"S.{column}" for column in SCHEDULE_COLUMNS)
+    delete = ""
+    if replaced:
+        ids = ", ".join(string_literal(loan_id) for loan_id in replaced)
+        delete = f"\n    WHEN NOT MATCHED BY SOURCE AND T.loan_id IN ({ids}) THEN DELETE"
+
+    return f"""
+    MERGE `{config.get_bigquery_table(SCHEDULE_TABLE)}` T
+    USING UNNEST(ARRAY<STRUCT<{struct_type}>>[
+      {values_list}
+    ]) S
+    ON T.schedule_id = S.schedule_id
+    WHEN MATCHED THEN UPDATE SET
+      {updates},
+      updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+      ({columns}, created_at, updated_at)
+    VALUES
+      ({values}, CURRENT_TIMESTAMP(), CURRENT_TIMESTAMP()){delete}
+    """
+
+
+def sync_loans(
+    bq,
+    loans: Sequence[Loan],
+    plan: Optional[SyncPlan] = None,
+    as_of: Optional[date] = None,
+    sync_dir: Path = SYNC_DIR,
+    full: bool = False,
+) -> Dict[str, object]:
+    """
+    Write what changed in the loans' schedules to debt_schedule in one MERGE.
+
+    Args:
+        bq: BigQueryConnector instance
+        loans: Validated loans (load_loans)
+        plan: plan_sync(loans) if already built
+        as_of: Payments before this date are marked paid (default: today)
+        sync_dir: Directory of the sync memo, updated after the MERGE
+        full: Ignore the memo and replace every loan
+
+    Returns:
+        Dict with loans, payments (rows merged), replaced, updated, skipped
+        (loan counts), rows_affected and bytes_processed. No job runs when
+        nothing changed.
+    """
+    if plan is None:
+        plan = plan_sync(loans, as_of=as_of, sync_dir=sync_dir, full=full)
+
+    result = {
+        'loans': len(loans),
+        'payments': len(plan.changes),
+        'replaced': len(plan.replaced),
+        'updated': len(plan.updated),
+        'skipped': len(plan.skipped),
+        'rows_affected': 0,
+        'bytes_processed': 0,
+    }
+    if plan.empty:
+        return result
+
+    job = bq.execute(merge_schedule_sql(plan.changes, plan.replaced))
+    _write_memo(Path(sync_dir), plan)
+
+    result['rows_affected'] = job.num_dml_affected_rows or 0
+    result['bytes_processed'] = job.total_bytes_processed or 0
+    return result
@@ -0,0 +1,263 @@
+"""
+Loan what-if analysis: prepayment, refinance and early buyout
+
+LoanWhatIf holds one loan's baseline schedule; each method takes arrays of
+alternatives (amounts, dates, rates, terms - broadcast against each other)
+and evaluates all of them in one amortization pass. Every result has, per
+alternative, the interest paid and saved against the baseline, costs
+(buyout premium, refinance fees) and the cash impact per forecast week
+(positive = more cash kept that week than under the baseline).
+
+Extra payments are made with the first scheduled payment on or after the
+requested date.
+
+    >>> whatif = LoanWhatIf(loan, as_of=date.today(), weeks=13)
+    >>> whatif.prepay(amounts=[5000, 10000, 25000], dates=date(2026, 12, 1)).summary
+    >>> whatif.buyout(dates=whatif.payment_dates[:12]).summary
+    >>> whatif.refinance(dates=date(2027, 1, 1), rates=[0.08, 0.085], amort_months=60, fees=1500)
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .amortization import AMORTIZING, LOAN_DTYPE, Loan, _payment_dates, amortize, loan_terms, scheduled_rates
+from .rates import weekly_debt_service
+
+
+ArrayLike = Union[float, int, date, Sequence, np.ndarray]
+
+
+@dataclass
+class WhatIfResult:
+    """Alternatives compared with the baseline schedule"""
+
+    summary: pd.DataFrame
+    weekly: np.ndarray
+    start_date: date
+
+    def weekly_frame(self) -> pd.DataFrame:
+        """Cash impact in long form: alternative, week_number, week_start, cash_impact"""
+        n_alternatives, weeks = self.weekly.shape
+        return pd.DataFrame({
+            'alternative': np.repeat(np.arange(n_alternatives), weeks),
+            'week_number': np.tile(np.arange(1, weeks + 1), n_alternatives),
+            'week_start': np.tile(
+                pd.Timestamp(self.start_date) + pd.to_timedelta(7 * np.arange(weeks), unit='D'), n_alternatives
+            ),
+            'cash_impact': self.weekly.ravel(),
+        })
+
+
+def premium_rates(months_remaining: np.ndarray, tiers: Sequence[Tuple[int, float]]) -> np.ndarray:
+    """Buyout premium per alternative: the tier with the most months remaining not above it"""
+    if not tiers:
+        return np.zeros(len(months_remaining))
+    months, premiums = np.array(sorted(tiers)).T
+    tier = np.searchsorted(months, months_remaining, side='right') - 1
+    return np.where(tier >= 0, premiums[np.maximum(tier, 0)], 0.0)
+
+
+class LoanWhatIf:
+    """Prepayment, refinance and buyout alternatives for one loan"""
+
+    def __init__(self, loan: Loan, as_of: Optional[date] = None, weeks: int = 13):
+        self.loan = loan
+        self.as_of = as_of or date.today()
+        self.weeks = weeks
+
+        self.terms = loan_terms([loan])
+        self.rates = scheduled_rates([loan], self.terms)
+        self.baseline = amortize(self.terms, self.rates)[0]
+
+        self._from = self.baseline['active'] & (self.baseline['payment_date'] >= np.datetime64(self.as_of, 'D'))
+        self.base_interest = float(self.baseline['interest_amount'][self._from].sum())
+        self.base_cash = float(self.baseline['payment_amount'][self._from].sum())
+        self.base_weekly = weekly_debt_service(self.baseline[None], self.as_of, weeks)[0]
+
+    @property
+    def payment_dates(self) -> np.ndarray:
+        """Remaining scheduled payment dates (from as_of)"""
+        return self.baseline['payment_date'][self._from]
+
+    def _periods(self, dates: np.ndarray) -> np.ndarray:
+        """Index of the first remaining payment on or after each date"""
+        dates = np.asarray(dates, dtype='M8[D]')
+        remaining = np.flatnonzero(self._from)
+        if remaining.size == 0:
+            raise ValueError(f"{self.loan.loan_id}: no payments left after {self.as_of}")
+        position = np.searchsorted(self.baseline['payment_date'][remaining], dates, side='left')
+        if (position >= remaining.size).any():
+            raise ValueError(f"{self.loan.loan_id}: dates after the last payment ({self.payment_dates[-1]})")
+        return remaining[position]
+
+    def _run(self, periods: np.ndarray, amounts: np.ndarray, recast: np.ndarray) -> np.ndarray:
+        n = len(periods)
+        extra = np.zeros((n, len(self.baseline)))
+        extra[np.arange(n), periods] = amounts
+        return amortize(np.repeat(self.terms, n), np.repeat(self.rates, n, axis=0), extra=extra, recast=recast)
+
+    def _one_off(self, dates: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+        """(alternatives, weeks) buckets of one payment per alternative"""
+        days = (dates - np.datetime64(self.as_of, 'D')).astype('int64')
+        week = days // 7
+        keep = (days >= 0) & (week < self.weeks)
+        weekly = np.zeros((len(dates), self.weeks))
+        weekly[np.flatnonzero(keep), week[keep]] = amounts[keep]
+        return weekly
+
+    def _result(
+        self,
+        parameters: pd.DataFrame,
+        schedules: Sequence[np.ndarray],
+        one_off_dates: np.ndarray,
+        one_off_amounts: np.ndarray,
+        costs: np.ndarray,
+    ) -> WhatIfResult:
+        """Compare alternatives (each a sum of schedules plus one payment) with the baseline"""
+        start = np.datetime64(self.as_of, 'D')
+        interest = np.zeros(len(parameters))
+        cash = one_off_amounts.astype('float64').copy()
+        weekly = self._one_off(one_off_dates, one_off_amounts)
+        last = np.full(len(parameters), np.iinfo('int64').min)
+
+        for schedule in schedules:
+            paid = schedule['active'] & (schedule['payment_date'] >= start)
+            interest += np.where(paid, schedule['interest_amount'], 0).sum(axis=1)
+            cash += np.where(paid, schedule['payment_amount'], 0).sum(axis=1)
+            weekly += weekly_debt_service(schedule, self.as_of, self.weeks)
+            paying = paid & (schedule['payment_amount'] > 0.005)
+            dates = np.where(paying, schedule['payment_date'].astype('int64'), np.iinfo('int64').min)
+            last = np.maximum(last, dates.max(axis=1))
+
+        summary = parameters.reset_index(drop=True).assign(
+            interest=interest,
+            interest_saved=self.base_interest - interest,
+            costs=costs,
+            net_savings=self.base_interest - interest - costs,
+            cash_paid=cash,
+            final_payment=last.astype('M8[D]'),
+        )
+        return WhatIfResult(summary=summary, weekly=self.base_weekly - weekly, start_date=self.as_of)
+
+    def prepay(self, amounts: ArrayLike, dates: ArrayLike, recast: bool = False) -> WhatIfResult:
+        """
+        Extra principal payments.
+
+        Args:
+            amounts: Prepayment per alternative
+            dates: Prepayment date per alternative (broadcast with amounts)
+            recast: Re-amortize the P&I payment afterwards instead of keeping
+                    it and finishing early
+
+        Returns:
+            WhatIfResult with amount, date, recast and prepaid (the amount
+            applied - capped at the balance) per alternative
+        """
+        amounts, dates = np.broadcast_arrays(np.asarray(amounts, dtype='float64'), np.asarray(dates, dtype='M8[D]'))
+        amounts, dates = amounts.ravel(), dates.ravel()
+        periods = self._periods(dates)
+
+        schedule = self._run(periods, amounts, np.full(len(amounts), recast))
+        parameters = pd.DataFrame({
+            'amount': amounts,
+            'date': dates,
+            'recast': recast,
+            'prepaid': schedule['extra_principal'][np.arange(len(amounts)), periods],
+        })
+        empty = np.zeros(len(amounts))
+        return self._result(parameters, [schedule], dates, empty, empty)
+
+    def buyout(self, dates: ArrayLike, premium: Optional[Union[float, Sequence[Tuple[int, float]]]] = None) -> WhatIfResult:
+        """
+        Early buyout: the balance plus a premium paid with the payment on or
+        after each date.
+
+        Args:
+            dates: Buyout date per alternative
+            premium: Premium rate, or (months remaining, rate) tiers.
+                     Default: the loan's buyout_premium (none if unset).
+
+        Returns:
+            WhatIfResult with date, months_remaining, premium_rate and payoff
+        """
+        dates = np.atleast_1d(np.asarray(dates, dtype='M8[D]')).ravel()
+        periods = self._periods(dates)
+        schedule = self._run(periods, np.full(len(dates), np.inf), np.zeros(len(dates), dtype=bool))
+
+        payoff = schedule['extra_principal'][np.arange(len(dates)), periods]
+        months_remaining = self.terms['periods'][0] - periods - 1
+        if premium is None:
+            premium = self.loan.buyout_premium
+        rate = (np.full(len(dates), float(premium)) if np.isscalar(premium)
+                else premium_rates(months_remaining, premium))
+        costs = payoff * rate
+
+        parameters = pd.DataFrame({
+            'date': schedule['payment_date'][np.arange(len(dates)), periods],
+            'months_remaining': months_remaining,
+            'premium_rate': rate,
+            'payoff': payoff,
+        })
+        return self._result(parameters, [schedule], parameters['date'].to_numpy('M8[D]'), costs, costs)
+
+    def refinance(
+        self,
+        dates: ArrayLike,
+        rates: ArrayLike,
+        amort_months: ArrayLike,
+        fees: ArrayLike = 0.0,
+    ) -> WhatIfResult:
+        """
+        Pay the loan off from a new amortizing loan.
+
+        The new loan takes over the balance left after the payment on or
+        after each date; its first payment is due one month later, on the
+        same payment day and day count. Fees are paid in cash at closing.
+
+        Args:
+            dates: Refinance date per alternative
+            rates: New annual rate
+            amort_months: New amortization term
+            fees: Closing costs paid in cash
+
+        Returns:
+            WhatIfResult with date, rate, amort_months, fees and the new
+            loan's level payment per alternative
+        """
+        dates, rates, amort_months, fees = (a.ravel() for a in np.broadcast_arrays(
+            np.asarray(dates, dtype='M8[D]'), np.asarray(rates, dtype='float64'),
+            np.asarray(amort_months, dtype='int64'), np.asarray(fees, dtype='float64'),
+        ))
+        n = len(dates)
+        periods = self._periods(dates)
+        old = self._run(periods, np.full(n, np.inf), np.zeros(n, dtype=bool))
+        closing = old['payment_date'][np.arange(n), periods]
+        payoff = old['extra_principal'][np.arange(n), periods]
+
+        new_terms = np.zeros(n, dtype=LOAN_DTYPE)
+        new_terms['balance'] = payoff
+        new_terms['annual_rate'] = rates
+        new_terms['payment_day'] = self.terms['payment_day'][0]
+        new_terms['start_date'] = _payment_dates(closing, new_terms['payment_day'], np.ones(n, dtype='int64'))
+        new_terms['maturity_date'] = _payment_dates(closing, new_terms['payment_day'], amort_months)
+        new_terms['structure'] = AMORTIZING
+        new_terms['amort_months'] = amort_months
+        new_terms['fixed_payment'] = np.nan
+        new_terms['day_count'] = self.terms['day_count'][0]
+        new_terms['periods'] = amort_months
+        new = amortize(new_terms)
+
+        parameters = pd.DataFrame({
+            'date': closing,
+            'rate': rates,
+            'amort_months': amort_months,
+            'fees': fees,
+            'payoff': payoff,
+            'new_payment': new['payment_amount'][:, 0] if new.shape[1] else 0.0,
+        })
+        # The new loan's proceeds fund the payoff; only the fees are cash at closing
+        return self._result(parameters, [old, new], closing, fees - payoff, fees)
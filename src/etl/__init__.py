@@ -0,0 +1,17 @@
+"""ETL pipelines that load source tables into cash_transactions"""
+
+from .deposits import merge_deposits_to_cash
+from .invoices import merge_invoices_to_cash
+from .preview import preview_cash_transform
+from .refunds import merge_refunds_to_cash
+from .watermarks import get_watermarks, set_watermarks, reset_watermarks
+
+__all__ = [
+    "merge_deposits_to_cash",
+    "merge_invoices_to_cash",
+    "merge_refunds_to_cash",
+    "preview_cash_transform",
+    "get_watermarks",
+    "set_watermarks",
+    "reset_watermarks",
+]
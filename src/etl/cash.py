@@ -0,0 +1,181 @@
+"""Shared cash_transactions target definition for ETL pipelines"""
+
+from typing import Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import date_literal, string_literal, timestamp_literal
+
+
+CASH_TRANSACTIONS_TABLE = "cash_transactions"
+
+# Column order of every ETL SELECT that feeds cash_transactions
+CASH_TRANSACTION_COLUMNS = [
+    'transaction_id', 'transaction_date', 'cash_date', 'value_date',
+    'source_system', 'source_id', 'source_table',
+    'bank_account_id', 'bank_account_name',
+    'cash_flow_section', 'cash_flow_category', 'cash_flow_subcategory',
+    'amount', 'currency',
+    'counterparty', 'counterparty_type',
+    'description', 'notes',
+    'is_forecast', 'is_recurring', 'recurring_id', 'scenario_id',
+    'tags',
+    'created_at', 'updated_at', 'created_by',
+]
+
+# BigQuery types of the non-STRING columns (for typed literals)
+_COLUMN_TYPES = {
+    'transaction_date': 'DATE',
+    'cash_date': 'DATE',
+    'value_date': 'DATE',
+    'amount': 'FLOAT64',
+    'is_forecast': 'BOOL',
+    'is_recurring': 'BOOL',
+    'tags': 'ARRAY<STRING>',
+    'created_at': 'TIMESTAMP',
+    'updated_at': 'TIMESTAMP',
+}
+
+# Columns preserved from the original row when a source record is re-processed
+_IMMUTABLE_COLUMNS = {'transaction_id', 'created_at', 'created_by'}
+
+
+def merge_cash_transactions_sql(
+    source_sql: str,
+    cash_date_floor: Optional[str] = None,
+) -> str:
+    """
+    Build a MERGE that upserts ETL rows into cash_transactions.
+
+    Rows are matched on (source_table, source_id, counterparty), so re-running
+    a pipeline over the same source records updates them in place instead of
+    inserting duplicates.
+
+    Args:
+        source_sql: SELECT returning CASH_TRANSACTION_COLUMNS
+        cash_date_floor: Optional YYYY-MM-DD lower bound on the target's
+                         cash_date, used to prune cash_transactions partitions
+                         when every affected row is known to be newer
+
+    Returns:
+        MERGE statement
+    """
+    floor_clause = f"AND T.cash_date >= {date_literal(cash_date_floor)}" if cash_date_floor else ""
+
+    update_sets = ",\n      ".join(
+        f"{col} = S.{col}" for col in CASH_TRANSACTION_COLUMNS
+        if col not in _IMMUTABLE_COLUMNS
+    )
+    insert_cols = ", ".join(CASH_TRANSACTION_COLUMNS)
+    insert_vals = ", ".join(f"S.{col}" for col in CASH_TRANSACTION_COLUMNS)
+
+    return f"""
+    MERGE `{config.get_bigquery_table(CASH_TRANSACTIONS_TABLE)}` T
+    USING (
+    {source_sql}
+    ) S
+    ON T.source_table = S.source_table
+      AND T.source_id = S.source_id
+      AND T.counterparty IS NOT DISTINCT FROM S.counterparty
+      AND T.is_forecast = FALSE
+      {floor_clause}
+    WHEN MATCHED THEN UPDATE SET
+      {update_sets}
+    WHEN NOT MATCHED BY TARGET THEN INSERT ({insert_cols})
+    VALUES ({insert_vals})
+    """
+
+
+def _literal(value, bq_type: str) -> str:
+    """Typed literal for one cash_transactions value"""
+    if bq_type == 'ARRAY<STRING>':
+        values = list(value) if value is not None else []
+        return "[" + ", ".join(string_literal(v) for v in values) + "]"
+    if value is None or pd.isna(value):
+        return f"CAST(NULL AS {bq_type})"
+    if bq_type == 'DATE':
+        return date_literal(value)
+    if bq_type == 'TIMESTAMP':
+        return timestamp_literal(value)
+    if bq_type == 'FLOAT64':
+        return repr(float(value))
+    if bq_type == 'BOOL':
+        return 'TRUE' if value else 'FALSE'
+
+    return string_literal(value)
+
+
+def cash_rows_sql(rows: pd.DataFrame) -> str:
+    """
+    Render locally built cash_transactions rows as a SELECT.
+
+    Args:
+        rows: DataFrame with CASH_TRANSACTION_COLUMNS
+
+    Returns:
+        SELECT over UNNEST([STRUCT(...)]) usable as a MERGE source
+    """
+    structs = []
+    for record in rows[CASH_TRANSACTION_COLUMNS].to_dict('records'):
+        fields = ", ".join(
+            f"{_literal(record[col], _COLUMN_TYPES.get(col, 'STRING'))} AS {col}"
+            for col in CASH_TRANSACTION_COLUMNS
+        )
+        structs.append(f"STRUCT({fields})")
+    structs_sql = ",\n      ".join(structs)
+
+    return f"""
+    SELECT * FROM UNNEST([
+      {structs_sql}
+    ])
+    """
+
+
+def script_dml_rows(bq, job, statement_type: str) -> int:
+    """Rows changed by the statement_type statements of a multi-statement script job"""
+    return sum(
+        child.num_dml_affected_rows or 0
+        for child in bq.client.list_jobs(parent_job=job)
+        if child.statement_type == statement_type
+    )
+
+
+def merge_cash_rows(
+    bq,
+    rows: pd.DataFrame,
+    batch_size: int = 500,
+    replace_where: Optional[str] = None,
+) -> int:
+    """
+    Upsert locally built rows (e.g. from a parsed report) into cash_transactions.
+
+    Args:
+        bq: BigQueryConnector instance
+        rows: DataFrame with CASH_TRANSACTION_COLUMNS
+        batch_size: Rows per MERGE (keeps each statement well under the query size limit)
+        replace_where: Condition on cash_transactions rows the upsert
+                       supersedes; they are deleted and all batches merged
+                       in one transaction
+
+    Returns:
+        Rows inserted or updated
+    """
+    merges = [
+        merge_cash_transactions_sql(
+            cash_rows_sql(batch),
+            cash_date_floor=batch['cash_date'].min(),
+        )
+        for batch in (rows.iloc[start:start + batch_size] for start in range(0, len(rows), batch_size))
+    ]
+
+    if replace_where:
+        delete = f"DELETE FROM `{config.get_bigquery_table(CASH_TRANSACTIONS_TABLE)}`\n    WHERE {replace_where}"
+        job = bq.execute("BEGIN TRANSACTION;\n" + ";\n".join([delete] + merges) + ";\nCOMMIT TRANSACTION;")
+        return script_dml_rows(bq, job, 'MERGE')
+
+    affected = 0
+    for merge_sql in merges:
+        affected += bq.execute(merge_sql).num_dml_affected_rows or 0
+
+    return affected
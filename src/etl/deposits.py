@@ -0,0 +1,225 @@
+"""
+Deposits → cash_transactions transform
+
+One cash transaction per (platform, settlement_id). The same SELECT backs
+previews, backfills and the incremental nightly load, so they cannot drift.
+
+Incremental runs only look at deposits newer than the per-platform watermark
+in etl_watermarks, re-aggregate the settlements those rows belong to (so a
+still-open settlement is refreshed as new lines arrive), and MERGE the result
+(see settlements.py, shared with refunds).
+
+Shopify settlements whose cash date falls within the loaded Shopify payout
+reports (source_table 'shopify_payouts') are skipped, so the two sources
+never both count the same Shopify revenue.
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import date_literal
+from .cash import CASH_TRANSACTIONS_TABLE
+from .settlements import (
+    DEFAULT_LOOKBACK_DAYS,
+    merge_settlements_to_cash,
+    payout_calendar_join,
+    payout_date_sql,
+    plan_settlement_increment,
+    settlement_filters,
+)
+
+
+PIPELINE = "deposits_to_cash"
+
+# Shopify payouts loaded from payout reports (scripts/ingest_shopify_payouts.py).
+# Over the cash dates they cover they replace the Shopify deposits rows.
+SHOPIFY_PAYOUTS_TABLE = "shopify_payouts"
+
+# Conditions over the deposits table
+deposit_filters = settlement_filters
+
+
+def deposits_cash_sql(
+    where: Optional[List[str]] = None,
+    settlements_sql: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+) -> str:
+    """
+    SELECT producing cash_transactions rows from deposits settlements.
+
+    Args:
+        where: Conditions on the deposits rows to aggregate
+        settlements_sql: Optional query returning (platform, settlement_id);
+                         only those settlements are aggregated
+        sample_percent: Optional TABLESAMPLE percentage of deposits to read
+                        (previews only - sampled settlements are partial)
+
+    Returns:
+        SQL returning CASH_TRANSACTION_COLUMNS, one row per settlement
+    """
+    where_clause = " AND ".join(where) if where else "TRUE"
+    settlements_join = (
+        f"JOIN ({settlements_sql}) changed USING (platform, settlement_id)"
+        if settlements_sql else ""
+    )
+    sample_clause = f"TABLESAMPLE SYSTEM ({sample_percent} PERCENT)" if sample_percent else ""
+
+    return f"""
+    WITH deposit_settlements AS (
+      SELECT
+        platform,
+        settlement_id,
+        MIN(DATE(date_time)) as settlement_start,
+        MAX(DATE(date_time)) as settlement_end,
+
+        SUM(product_sales) as gross_product_sales,
+        SUM(shipping_credits) as gross_shipping,
+        SUM(selling_fees) as platform_fees,
+        SUM(fba_fees) as fulfillment_fees,
+        SUM(other_transaction_fees) as other_fees,
+
+        -- NET PROCEEDS (what actually hit the bank)
+        SUM(total) as net_cash_received,
+
+        COUNT(DISTINCT order_id) as order_count,
+        SUM(quantity) as units_sold
+
+      FROM `{config.get_bigquery_table('deposits')}` {sample_clause}
+      {settlements_join}
+      WHERE {where_clause}
+      GROUP BY platform, settlement_id
+      HAVING SUM(total) != 0  -- Exclude zero settlements
+    ),
+
+    deposit_payouts AS (
+      -- Calculate cash date based on platform timing
+      SELECT
+        s.*,
+        {payout_date_sql('s.settlement_end', calendar_alias='cal')} as cash_date
+      FROM deposit_settlements s
+      {payout_calendar_join('s.settlement_end')}
+    ),
+
+    payout_report_coverage AS (
+      SELECT MIN(cash_date) as first_payout, MAX(cash_date) as last_payout
+      FROM `{config.get_bigquery_table(CASH_TRANSACTIONS_TABLE)}`
+      WHERE source_table = '{SHOPIFY_PAYOUTS_TABLE}'
+        AND is_forecast = FALSE
+    )
+
+    SELECT
+      -- Deterministic id so re-processing a settlement updates it in place
+      TO_HEX(MD5(CONCAT('deposits:', platform, ':', CAST(settlement_id AS STRING)))) as transaction_id,
+
+      settlement_end as transaction_date,
+      cash_date,
+      cash_date as value_date,
+
+      'deposits' as source_system,
+      CAST(settlement_id AS STRING) as source_id,
+      'deposits' as source_table,
+
+      'frost_checking' as bank_account_id,
+      'VoChill Checking' as bank_account_name,
+
+      'Operating' as cash_flow_section,
+      CASE
+        WHEN platform = 'Amazon' THEN 'Revenue - Amazon'
+        WHEN platform = 'Shopify' THEN 'Revenue - Shopify'
+        WHEN platform = 'TikTok' THEN 'Revenue - TikTok'
+        ELSE CONCAT('Revenue - ', platform)
+      END as cash_flow_category,
+      'Ecommerce Revenue' as cash_flow_subcategory,
+
+      net_cash_received as amount,
+      'USD' as currency,
+
+      platform as counterparty,
+      'Platform' as counterparty_type,
+
+      CONCAT(
+        platform, ' Settlement ', settlement_id,
+        ' (', order_count, ' orders, ', units_sold, ' units)'
+      ) as description,
+
+      CONCAT(
+        'Gross: $', ROUND(gross_product_sales, 2),
+        ', Fees: $', ROUND(ABS(platform_fees + fulfillment_fees + other_fees), 2),
+        ', Net: $', ROUND(net_cash_received, 2)
+      ) as notes,
+
+      FALSE as is_forecast,
+      FALSE as is_recurring,
+      CAST(NULL AS STRING) as recurring_id,
+      CAST(NULL AS STRING) as scenario_id,
+
+      [platform, 'ecommerce', 'revenue'] as tags,
+
+      CURRENT_TIMESTAMP() as created_at,
+      CURRENT_TIMESTAMP() as updated_at,
+      'etl_deposits' as created_by
+
+    FROM deposit_payouts
+    CROSS JOIN payout_report_coverage c
+    -- Shopify settlements paid out while payout reports are loaded are already counted
+    WHERE platform != 'Shopify'
+      OR c.first_payout IS NULL
+      OR cash_date NOT BETWEEN c.first_payout AND c.last_payout
+    """
+
+
+def shopify_deposits_condition(first_payout, last_payout) -> str:
+    """
+    cash_transactions rows of Shopify deposits paid out between two dates,
+    superseded by payout report rows for the same period.
+    """
+    return f"""source_table = 'deposits'
+      AND counterparty = 'Shopify'
+      AND is_forecast = FALSE
+      AND cash_date BETWEEN {date_literal(first_payout)} AND {date_literal(last_payout)}"""
+
+
+def plan_deposits_increment(
+    bq,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+) -> pd.DataFrame:
+    """Find which platforms have new deposits (see plan_settlement_increment)"""
+    return plan_settlement_increment(bq, 'deposits', PIPELINE, platform=platform, full_refresh=full_refresh)
+
+
+def merge_deposits_to_cash(
+    bq,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+) -> Dict[str, object]:
+    """
+    Upsert settlement-level deposits into cash_transactions.
+
+    Incremental by default; see merge_settlements_to_cash for the backfill
+    and full refresh modes.
+
+    Args:
+        bq: BigQueryConnector instance
+        start_date: Optional backfill start (YYYY-MM-DD)
+        end_date: Optional backfill end (YYYY-MM-DD)
+        platform: Optional platform filter
+        full_refresh: Ignore watermarks and rebuild all deposits rows
+        lookback_days: Max days a settlement can span before its newest row
+
+    Returns:
+        Dict with mode, settlements, rows_affected, bytes_processed
+    """
+    return merge_settlements_to_cash(
+        bq, 'deposits', PIPELINE, deposits_cash_sql,
+        start_date=start_date,
+        end_date=end_date,
+        platform=platform,
+        full_refresh=full_refresh,
+        lookback_days=lookback_days,
+    )
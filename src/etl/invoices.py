@@ -0,0 +1,179 @@
+"""
+Invoices → cash_transactions transform
+
+One cash outflow per vendor invoice, dated invoice_date + vendor payment days
+(Net 30 when the vendor has no terms) rolled forward to a business day - the
+timing engine's day-count rule (TimingRules.days_sql) over business_calendar.
+With a lag percentile the days come from the fitted vendor_payment_lags table
+instead, falling back to the terms. Preview and load share this SELECT.
+"""
+
+from typing import Dict, List, Optional
+
+from ..config import config
+from ..data.vendors import vendor_payment_days_sql
+from ..timing.rules import timing_rules
+from ..timing.vendor_lags import LAG_TABLE, percentile_column
+from .cash import merge_cash_transactions_sql
+from .settlements import payout_calendar_join
+
+
+def invoice_filters(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[str]:
+    """Build WHERE conditions over the invoices table (alias i)"""
+    conditions = []
+    if start_date:
+        conditions.append(f"i.invoice_date >= '{start_date}'")
+    if end_date:
+        conditions.append(f"i.invoice_date <= '{end_date}'")
+
+    return conditions
+
+
+def invoices_cash_sql(
+    where: Optional[List[str]] = None,
+    sample_percent: Optional[float] = None,
+    lag_percentile: Optional[int] = None,
+) -> str:
+    """
+    SELECT producing cash_transactions rows from vendor invoices.
+
+    Args:
+        where: Extra conditions on invoices (alias i)
+        sample_percent: Optional TABLESAMPLE percentage of invoices to read
+        lag_percentile: Date payments at this percentile of the vendor's
+                        observed payment lag (vendor_payment_lags) instead of
+                        its stated terms, e.g. 75 for a conservative forecast
+
+    Returns:
+        SQL returning CASH_TRANSACTION_COLUMNS, one row per invoice
+    """
+    conditions = [
+        "i.total > 0",  # Exclude credits/reversals
+        "i.invoice_date IS NOT NULL",  # Exclude records with no date
+        "i.invoice_id IS NOT NULL",  # Exclude records with no ID
+    ] + (where or [])
+    sample_clause = f"TABLESAMPLE SYSTEM ({sample_percent} PERCENT)" if sample_percent else ""
+
+    payment_days = vendor_payment_days_sql('v')
+    lag_join = ""
+    if lag_percentile is not None:
+        payment_days = f"COALESCE(l.{percentile_column(lag_percentile)}, {payment_days})"
+        lag_join = f"""LEFT JOIN `{config.get_bigquery_table(LAG_TABLE)}` l
+        ON i.vendor = l.vendor"""
+    due_date = f"DATE_ADD(i.invoice_date, INTERVAL {payment_days} DAY)"
+
+    return f"""
+    WITH invoice_payments AS (
+      SELECT
+        i.invoice_id,
+        i.vendor,
+        i.invoice_date,
+        i.invoice_number,
+        i.po_number,
+        i.subtotal,
+        i.sales_tax,
+        i.total,
+
+        -- Get vendor payment terms
+        v.Terms as payment_terms,
+        {payment_days} as payment_days,
+
+        -- Cash date: invoice_date + payment_days, next business day
+        {timing_rules().days_sql('i.invoice_date', payment_days, 'cal')} as cash_date
+
+      FROM `{config.get_bigquery_table('invoices')}` i {sample_clause}
+      LEFT JOIN `{config.get_bigquery_table('vendors')}` v
+        ON i.vendor = v.Name
+      {lag_join}
+      {payout_calendar_join(due_date, 'cal')}
+      WHERE {' AND '.join(conditions)}
+    )
+
+    SELECT
+      -- Deterministic id so re-running the load updates invoices in place
+      TO_HEX(MD5(CONCAT('invoices:', invoice_id))) as transaction_id,
+
+      invoice_date as transaction_date,
+      cash_date,
+      cash_date as value_date,
+
+      'invoices' as source_system,
+      invoice_id as source_id,
+      'invoices' as source_table,
+
+      'frost_checking' as bank_account_id,
+      'VoChill Checking' as bank_account_name,
+
+      'Operating' as cash_flow_section,
+
+      -- Default to COGS - Materials (can be refined with chart of accounts mapping)
+      'COGS - Materials' as cash_flow_category,
+      'Vendor Payments' as cash_flow_subcategory,
+
+      -- NEGATIVE amount (cash outflow)
+      -total as amount,
+      'USD' as currency,
+
+      vendor as counterparty,
+      'Vendor' as counterparty_type,
+
+      CONCAT(
+        'Invoice ', invoice_number,
+        CASE WHEN po_number IS NOT NULL THEN CONCAT(' (PO: ', po_number, ')') ELSE '' END
+      ) as description,
+
+      CONCAT(
+        'Payment terms: ', COALESCE(payment_terms, 'Net 30'),
+        ', Due: ', CAST(cash_date AS STRING),
+        ', Subtotal: $', ROUND(subtotal, 2),
+        ', Tax: $', ROUND(sales_tax, 2)
+      ) as notes,
+
+      FALSE as is_forecast,
+      FALSE as is_recurring,
+      CAST(NULL AS STRING) as recurring_id,
+      CAST(NULL AS STRING) as scenario_id,
+
+      ['vendor', 'expense', 'cogs'] as tags,
+
+      CURRENT_TIMESTAMP() as created_at,
+      CURRENT_TIMESTAMP() as updated_at,
+      'etl_invoices' as created_by
+
+    FROM invoice_payments
+    """
+
+
+def merge_invoices_to_cash(
+    bq,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    lag_percentile: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Upsert vendor invoices into cash_transactions.
+
+    Args:
+        bq: BigQueryConnector instance
+        start_date: Optional invoice_date start (YYYY-MM-DD)
+        end_date: Optional invoice_date end (YYYY-MM-DD)
+        lag_percentile: Optional observed-lag percentile (see invoices_cash_sql)
+
+    Returns:
+        Dict with rows_affected and bytes_processed
+    """
+    source_sql = invoices_cash_sql(
+        where=invoice_filters(start_date, end_date),
+        lag_percentile=lag_percentile,
+    )
+
+    # cash_date >= invoice_date, so a start date also bounds the target partitions
+    job = bq.execute(merge_cash_transactions_sql(source_sql, cash_date_floor=start_date))
+
+    return {
+        'rows_affected': job.num_dml_affected_rows or 0,
+        'bytes_processed': job.total_bytes_processed or 0,
+    }
@@ -0,0 +1,239 @@
+"""
+Dependency-aware ETL runner
+
+Steps are declared as a DAG and run as subprocesses of the existing scripts,
+so each keeps its own BigQuery client and output. A step starts as soon as
+everything it depends on has succeeded, which bounds wall time by the
+critical path instead of the sum of all steps.
+"""
+
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..config import PROJECT_ROOT, OUTPUT_DIR
+
+
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+LOG_DIR = OUTPUT_DIR / "etl_logs"
+
+
+@dataclass
+class Step:
+    """One node of the ETL DAG"""
+
+    name: str
+    command: List[str]
+    depends_on: List[str] = field(default_factory=list)
+    description: str = ""
+
+
+@dataclass
+class StepResult:
+    """Outcome of running a step"""
+
+    name: str
+    status: str  # success, failed, skipped
+    attempts: int = 0
+    seconds: float = 0.0
+    log_path: Optional[Path] = None
+    error: str = ""
+
+
+def _script(name: str, *args: str) -> List[str]:
+    """Command line for a script in scripts/, always non-interactive"""
+    return [sys.executable, str(SCRIPTS_DIR / name), *args, "--yes"]
+
+
+def default_steps() -> List[Step]:
+    """
+    Nightly refresh DAG: source tables → cash_transactions → forecast →
+    materialized cash flow views.
+
+    Source tables (deposits, refunds, invoices, ...) are loaded upstream, so the DAG
+    starts at the cash_transactions loaders, which are independent of each
+    other and run concurrently. They first need the business calendar their
+    payout and due dates are joined from.
+    """
+    cash_steps = ["deposits_to_cash", "refunds_to_cash", "invoices_to_cash"]
+
+    return [
+        Step("business_calendar", _script("build_calendar.py"),
+             description="Business days and payout dates (payment_timing.yaml)"),
+        Step("deposits_to_cash", _script("etl_deposits_to_cash.py"),
+             depends_on=["business_calendar"],
+             description="Deposits → cash_transactions (incremental)"),
+        Step("refunds_to_cash", _script("etl_refunds_to_cash.py"),
+             depends_on=["business_calendar"],
+             description="Refunds → cash_transactions (incremental)"),
+        Step("invoices_to_cash", _script("etl_invoices_to_cash.py"),
+             depends_on=["business_calendar"],
+             description="Invoices → cash_transactions"),
+        Step("fee_rates", _script("refresh_fee_rates.py"),
+             description="Rolling platform fee/refund rates (incremental)"),
+        Step("loans", _script("loans.py", "sync"),
+             description="data/loans/*.yaml → debt_schedule (one MERGE)"),
+        *[
+            Step(f"forecast_{scenario}", _script("build_forecast.py", "--scenario", scenario),
+                 depends_on=[*cash_steps, "fee_rates", "loans"],
+                 description=f"13-week forecast ({scenario} scenario)")
+            for scenario in ("base", "best", "worst")
+        ],
+        Step("cash_flow_views", _script("refresh_views.py"),
+             depends_on=[f"forecast_{scenario}" for scenario in ("base", "best", "worst")],
+             description="Refresh v_daily_cash_flow (changed cash_date partitions only)"),
+    ]
+
+
+def validate_steps(steps: List[Step]) -> List[str]:
+    """
+    Check the DAG and return step names in a valid topological order.
+
+    Raises:
+        ValueError: On unknown dependencies, duplicate names or cycles
+    """
+    by_name = {s.name: s for s in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Duplicate step names in pipeline")
+
+    for step in steps:
+        unknown = [d for d in step.depends_on if d not in by_name]
+        if unknown:
+            raise ValueError(f"Step '{step.name}' depends on unknown steps: {unknown}")
+
+    order = []
+    indegree = {s.name: len(s.depends_on) for s in steps}
+    ready = [name for name, deg in indegree.items() if deg == 0]
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for step in steps:
+            if name in step.depends_on:
+                indegree[step.name] -= 1
+                if indegree[step.name] == 0:
+                    ready.append(step.name)
+
+    if len(order) != len(steps):
+        cycle = sorted(set(by_name) - set(order))
+        raise ValueError(f"Dependency cycle between steps: {cycle}")
+
+    return order
+
+
+def select_steps(steps: List[Step], names: List[str]) -> List[Step]:
+    """Restrict the DAG to the named steps plus everything they depend on"""
+    by_name = {s.name: s for s in steps}
+    missing = [n for n in names if n not in by_name]
+    if missing:
+        raise ValueError(f"Unknown steps: {missing}")
+
+    keep = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in keep:
+            keep.add(name)
+            pending.extend(by_name[name].depends_on)
+
+    return [s for s in steps if s.name in keep]
+
+
+def _run_step(step: Step, retries: int, run_id: str) -> StepResult:
+    """Run one step, retrying with exponential backoff. Output goes to a log file."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{run_id}_{step.name}.log"
+
+    start = time.perf_counter()
+    error = ""
+    for attempt in range(1, retries + 2):
+        with open(log_path, "a") as log:
+            log.write(f"\n===== attempt {attempt}: {' '.join(step.command)}\n")
+            log.flush()
+            proc = subprocess.run(
+                step.command,
+                cwd=PROJECT_ROOT,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+
+        if proc.returncode == 0:
+            return StepResult(step.name, "success", attempt, time.perf_counter() - start, log_path)
+
+        error = f"exit code {proc.returncode}"
+        if attempt <= retries:
+            time.sleep(2 ** (attempt - 1))
+
+    return StepResult(step.name, "failed", retries + 1, time.perf_counter() - start, log_path, error)
+
+
+def run_pipeline(
+    steps: List[Step],
+    max_workers: int = 4,
+    retries: int = 1,
+    on_event: Optional[Callable[[str, StepResult], None]] = None,
+) -> Dict[str, StepResult]:
+    """
+    Execute a DAG of steps concurrently.
+
+    Args:
+        steps: Steps to run (dependencies must be included)
+        max_workers: Max steps running at once
+        retries: Extra attempts per failed step
+        on_event: Optional callback(event, result) with event in
+                  {"start", "success", "failed", "skipped"}
+
+    Returns:
+        Dict of step name -> StepResult
+    """
+    validate_steps(steps)
+    run_id = time.strftime("%Y%m%d_%H%M%S")
+    notify = on_event or (lambda event, result: None)
+
+    results: Dict[str, StepResult] = {}
+    pending = {s.name: s for s in steps}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Skip anything downstream of a failure
+            for name, step in list(pending.items()):
+                failed = [d for d in step.depends_on
+                          if d in results and results[d].status != "success"]
+                if failed:
+                    results[name] = StepResult(name, "skipped", error=f"upstream failed: {failed}")
+                    notify("skipped", results[name])
+                    del pending[name]
+
+            # Launch every step whose dependencies have all succeeded
+            for name, step in list(pending.items()):
+                if all(d in results and results[d].status == "success" for d in step.depends_on):
+                    notify("start", StepResult(name, "running"))
+                    running[pool.submit(_run_step, step, retries, run_id)] = name
+                    del pending[name]
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                notify(results[name].status, results[name])
+
+    return results
+
+
+def critical_path_seconds(steps: List[Step], results: Dict[str, StepResult]) -> float:
+    """Longest chain of step durations through the DAG (the floor on wall time)"""
+    finish = {}
+    by_name = {s.name: s for s in steps}
+    for name in validate_steps(steps):
+        upstream = max((finish[d] for d in by_name[name].depends_on), default=0.0)
+        finish[name] = upstream + (results[name].seconds if name in results else 0.0)
+
+    return max(finish.values(), default=0.0)
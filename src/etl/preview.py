@@ -0,0 +1,63 @@
+"""
+Cheap previews of ETL transforms
+
+A preview never downloads the transformed table. It dry-runs the transform
+for a cost estimate, computes the summary server-side and pulls only a few
+sample rows, all from the same SELECT the load uses.
+"""
+
+from typing import Any, Dict, List
+
+
+def preview_cash_transform(
+    bq,
+    source_sql: str,
+    group_by: str = "counterparty",
+    sample_columns: List[str] = None,
+    sample_size: int = 5,
+) -> Dict[str, Any]:
+    """
+    Preview a cash_transactions transform.
+
+    Args:
+        bq: BigQueryConnector instance
+        source_sql: Transform SELECT (returns cash_transactions columns)
+        group_by: Column to summarise by
+        sample_columns: Columns to return for sample rows
+        sample_size: Number of sample rows (most recent cash_date first)
+
+    Returns:
+        Dict with:
+            estimated_bytes: bytes the full transform would scan
+            summary: DataFrame of group_by, count, amount
+            sample: DataFrame with sample_size rows
+            transactions: total rows the load would write
+            total_amount: sum of amount across all rows
+    """
+    estimated_bytes = bq.dry_run(source_sql)
+
+    summary = bq.query(f"""
+    SELECT
+      {group_by},
+      COUNT(*) as count,
+      SUM(amount) as amount
+    FROM ({source_sql})
+    GROUP BY {group_by}
+    ORDER BY amount
+    """)
+
+    columns = ", ".join(sample_columns) if sample_columns else "*"
+    sample = bq.query(f"""
+    SELECT {columns}
+    FROM ({source_sql})
+    ORDER BY cash_date DESC
+    LIMIT {int(sample_size)}
+    """)
+
+    return {
+        'estimated_bytes': estimated_bytes,
+        'summary': summary,
+        'sample': sample,
+        'transactions': int(summary['count'].sum()) if len(summary) else 0,
+        'total_amount': float(summary['amount'].sum()) if len(summary) else 0.0,
+    }
@@ -0,0 +1,186 @@
+"""
+Refunds → cash_transactions transform
+
+One cash outflow per (platform, settlement_id): the customer refunds netted
+out of that settlement's payout, dated with the same platform payout lag as
+deposits. Loaded incrementally from the per-platform watermark, like
+deposits (see settlements.py).
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ..config import config
+from .settlements import (
+    DEFAULT_LOOKBACK_DAYS,
+    merge_settlements_to_cash,
+    payout_calendar_join,
+    payout_date_sql,
+    plan_settlement_increment,
+    settlement_filters,
+)
+
+
+PIPELINE = "refunds_to_cash"
+
+# Conditions over the refunds table
+refund_filters = settlement_filters
+
+
+def refunds_cash_sql(
+    where: Optional[List[str]] = None,
+    settlements_sql: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+) -> str:
+    """
+    SELECT producing cash_transactions rows from refunds settlements.
+
+    Args:
+        where: Conditions on the refunds rows to aggregate
+        settlements_sql: Optional query returning (platform, settlement_id);
+                         only those settlements are aggregated
+        sample_percent: Optional TABLESAMPLE percentage of refunds to read
+                        (previews only - sampled settlements are partial)
+
+    Returns:
+        SQL returning CASH_TRANSACTION_COLUMNS, one row per settlement
+    """
+    where_clause = " AND ".join(where) if where else "TRUE"
+    settlements_join = (
+        f"JOIN ({settlements_sql}) changed USING (platform, settlement_id)"
+        if settlements_sql else ""
+    )
+    sample_clause = f"TABLESAMPLE SYSTEM ({sample_percent} PERCENT)" if sample_percent else ""
+
+    return f"""
+    WITH refund_settlements AS (
+      SELECT
+        platform,
+        settlement_id,
+        MAX(DATE(date_time)) as settlement_end,
+
+        -- Refund components (typically negative values)
+        SUM(product_sales) as refund_amount,
+        SUM(shipping_credits) as shipping_refund,
+
+        -- Fee reversals (credit back on refunds)
+        SUM(IFNULL(selling_fees, 0) + IFNULL(fba_fees, 0)) as fee_reversals,
+
+        -- Net impact on cash (includes fee reversals)
+        SUM(total) as net_cash_impact,
+
+        COUNT(DISTINCT order_id) as refund_count,
+        SUM(ABS(quantity)) as units_refunded
+
+      FROM `{config.get_bigquery_table('refunds')}` {sample_clause}
+      {settlements_join}
+      WHERE {where_clause}
+      GROUP BY platform, settlement_id
+      HAVING SUM(total) != 0  -- Exclude zero settlements
+    ),
+
+    refund_payouts AS (
+      -- Refunds leave with the settlement payout they are netted from
+      SELECT
+        s.*,
+        {payout_date_sql('s.settlement_end', calendar_alias='cal')} as cash_date
+      FROM refund_settlements s
+      {payout_calendar_join('s.settlement_end')}
+    )
+
+    SELECT
+      -- Deterministic id so re-processing a settlement updates it in place
+      TO_HEX(MD5(CONCAT('refunds:', platform, ':', CAST(settlement_id AS STRING)))) as transaction_id,
+
+      settlement_end as transaction_date,
+      cash_date,
+      cash_date as value_date,
+
+      'refunds' as source_system,
+      CAST(settlement_id AS STRING) as source_id,
+      'refunds' as source_table,
+
+      'frost_checking' as bank_account_id,
+      'VoChill Checking' as bank_account_name,
+
+      'Operating' as cash_flow_section,
+      'Revenue - Refunds' as cash_flow_category,
+      'Contra-Revenue' as cash_flow_subcategory,
+
+      -- NEGATIVE amount (cash outflow)
+      net_cash_impact as amount,
+      'USD' as currency,
+
+      platform as counterparty,
+      'Platform' as counterparty_type,
+
+      CONCAT(
+        platform, ' Refunds - Settlement ', settlement_id,
+        ' (', refund_count, ' orders, ', units_refunded, ' units)'
+      ) as description,
+
+      CONCAT(
+        'Refunded: $', ROUND(ABS(refund_amount), 2),
+        ', Shipping: $', ROUND(ABS(shipping_refund), 2),
+        ', Fee reversals: $', ROUND(fee_reversals, 2),
+        ', Net: $', ROUND(net_cash_impact, 2)
+      ) as notes,
+
+      FALSE as is_forecast,
+      FALSE as is_recurring,
+      CAST(NULL AS STRING) as recurring_id,
+      CAST(NULL AS STRING) as scenario_id,
+
+      [platform, 'ecommerce', 'refunds'] as tags,
+
+      CURRENT_TIMESTAMP() as created_at,
+      CURRENT_TIMESTAMP() as updated_at,
+      'etl_refunds' as created_by
+
+    FROM refund_payouts
+    """
+
+
+def plan_refunds_increment(
+    bq,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+) -> pd.DataFrame:
+    """Find which platforms have new refunds (see plan_settlement_increment)"""
+    return plan_settlement_increment(bq, 'refunds', PIPELINE, platform=platform, full_refresh=full_refresh)
+
+
+def merge_refunds_to_cash(
+    bq,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+) -> Dict[str, object]:
+    """
+    Upsert settlement-level refunds into cash_transactions.
+
+    Incremental by default; see merge_settlements_to_cash for the backfill
+    and full refresh modes.
+
+    Args:
+        bq: BigQueryConnector instance
+        start_date: Optional backfill start (YYYY-MM-DD)
+        end_date: Optional backfill end (YYYY-MM-DD)
+        platform: Optional platform filter
+        full_refresh: Ignore watermarks and rebuild all refunds rows
+        lookback_days: Max days a settlement can span before its newest row
+
+    Returns:
+        Dict with mode, settlements, rows_affected, bytes_processed
+    """
+    return merge_settlements_to_cash(
+        bq, 'refunds', PIPELINE, refunds_cash_sql,
+        start_date=start_date,
+        end_date=end_date,
+        platform=platform,
+        full_refresh=full_refresh,
+        lookback_days=lookback_days,
+    )
@@ -0,0 +1,279 @@
+"""
+Incremental settlement-level loads into cash_transactions
+
+deposits and refunds share a layout (platform, date_time, settlement_id and
+the settlement amount columns) and are both loaded as one cash event per
+(platform, settlement_id). This module holds the shared machinery:
+
+- payout timing per platform, from the compiled payment-timing rules and
+  the business_calendar date dimension (business days and bank holidays)
+- watermark planning: only rows newer than the per-platform watermark in
+  etl_watermarks are looked at
+- the MERGE: settlements touched by new rows are re-aggregated (so a
+  still-open settlement is refreshed as new lines arrive) and upserted
+"""
+
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import date_literal, timestamp_literal
+from ..timing.rules import timing_rules
+from .cash import merge_cash_transactions_sql, script_dml_rows
+from .watermarks import get_watermarks, reset_watermarks, set_watermarks
+
+
+# How far before the oldest new row a settlement can have started. Amazon
+# settlements run 14 days; the margin covers delayed/extended settlements.
+DEFAULT_LOOKBACK_DAYS = 31
+
+# Date dimension with per-platform payout dates (scripts/build_calendar.py)
+CALENDAR_TABLE = "business_calendar"
+
+
+def payout_lag_days() -> Dict[str, int]:
+    """Days from settlement close to cash in bank, per platform (compiled timing rules)"""
+    return {platform: rule.lag_days for platform, rule in timing_rules().calendar.rules.items()}
+
+
+def payout_date_sql(settlement_end_sql: str, calendar_alias: Optional[str] = None) -> str:
+    """
+    CASE expression turning a settlement end date into its payout date.
+
+    With calendar_alias (a business_calendar row joined on the settlement end,
+    see payout_calendar_join) the calendar's business-day payout date is used;
+    dates outside the calendar fall back to the plain calendar-day lag.
+    """
+    def payout(platform: str, lag: int) -> str:
+        lagged = f"DATE_ADD({settlement_end_sql}, INTERVAL {lag} DAY)"
+        if calendar_alias:
+            return f"IFNULL({calendar_alias}.{platform.lower()}_payout_date, {lagged})"
+        return lagged
+
+    whens = "\n".join(
+        f"          WHEN platform = '{platform}' THEN {payout(platform, lag)}"
+        for platform, lag in payout_lag_days().items()
+    )
+
+    return f"""CASE
+{whens}
+          ELSE {settlement_end_sql}
+        END"""
+
+
+def payout_calendar_join(settlement_end_sql: str, alias: str = "cal") -> str:
+    """LEFT JOIN of the business calendar row for each settlement end date"""
+    return (
+        f"LEFT JOIN `{config.get_bigquery_table(CALENDAR_TABLE)}` {alias} "
+        f"ON {alias}.calendar_date = {settlement_end_sql}"
+    )
+
+
+def settlement_filters(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    platform: Optional[str] = None,
+) -> List[str]:
+    """Build WHERE conditions over a settlement table"""
+    conditions = []
+    if start_date:
+        conditions.append(f"DATE(date_time) >= '{start_date}'")
+    if end_date:
+        conditions.append(f"DATE(date_time) <= '{end_date}'")
+    if platform:
+        conditions.append(f"platform = '{platform}'")
+
+    return conditions
+
+
+def _new_rows_condition(
+    watermarks: Dict[str, pd.Timestamp],
+    platform: Optional[str] = None,
+) -> List[str]:
+    """Conditions selecting rows newer than each platform's watermark"""
+    if platform:
+        wm = watermarks.get(platform)
+        if wm is None:
+            return [f"platform = '{platform}'"]
+        return [
+            f"DATE(date_time) >= {date_literal(wm)}",
+            f"platform = '{platform}'",
+            f"date_time > {timestamp_literal(wm)}",
+        ]
+
+    if not watermarks:
+        return []
+
+    per_platform = [
+        f"(platform = '{p}' AND date_time > {timestamp_literal(wm)})"
+        for p, wm in sorted(watermarks.items())
+    ]
+    known = ", ".join(f"'{p}'" for p in sorted(watermarks))
+    per_platform.append(f"platform NOT IN ({known})")
+
+    # Prune to partitions since the oldest watermark. A platform that appears
+    # later is picked up from there; load its earlier history with
+    # --full-refresh --platform.
+    return [
+        f"DATE(date_time) >= {date_literal(min(watermarks.values()))}",
+        f"({' OR '.join(per_platform)})",
+    ]
+
+
+def plan_settlement_increment(
+    bq,
+    table: str,
+    pipeline: str,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+) -> pd.DataFrame:
+    """
+    Find which platforms have new rows in a settlement table and how far they extend.
+
+    Scans only partitions at or after each platform's watermark.
+
+    Returns:
+        DataFrame with platform, previous_ts, watermark_ts, rows_processed,
+        keys_processed (settlements touched). Empty when nothing is new.
+    """
+    watermarks = {} if full_refresh else get_watermarks(bq, pipeline)
+    conditions = _new_rows_condition(watermarks, platform)
+    where_clause = " AND ".join(conditions) if conditions else "TRUE"
+
+    plan = bq.query(f"""
+    SELECT
+      platform,
+      MAX(date_time) as watermark_ts,
+      COUNT(*) as rows_processed,
+      COUNT(DISTINCT settlement_id) as keys_processed
+    FROM `{config.get_bigquery_table(table)}`
+    WHERE {where_clause}
+    GROUP BY platform
+    """)
+
+    plan['previous_ts'] = plan['platform'].map(watermarks)
+    return plan
+
+
+def _changed_rows_condition(plan: pd.DataFrame) -> List[str]:
+    """Bound the changed rows to exactly the window that was planned"""
+    per_platform = []
+    for _, row in plan.iterrows():
+        cond = f"platform = '{row['platform']}' AND date_time <= {timestamp_literal(row['watermark_ts'])}"
+        if pd.notna(row['previous_ts']):
+            cond += f" AND date_time > {timestamp_literal(row['previous_ts'])}"
+        per_platform.append(f"({cond})")
+
+    conditions = [f"({' OR '.join(per_platform)})"]
+    if plan['previous_ts'].notna().all():
+        conditions.insert(0, f"DATE(date_time) >= {date_literal(plan['previous_ts'].min())}")
+
+    return conditions
+
+
+def merge_settlements_to_cash(
+    bq,
+    table: str,
+    pipeline: str,
+    cash_sql: Callable[..., str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    platform: Optional[str] = None,
+    full_refresh: bool = False,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+) -> Dict[str, object]:
+    """
+    Upsert settlement-level cash events from a settlement table.
+
+    Modes:
+        - Incremental (default): only settlements with rows past the
+          per-platform watermark are re-aggregated; watermarks advance after
+          a successful MERGE.
+        - Backfill (start_date/end_date given): settlements touching the date
+          range are re-aggregated; watermarks are left alone.
+        - Full refresh: existing rows from this table are deleted, all history
+          is rebuilt and watermarks are reset to the latest row.
+
+    Args:
+        bq: BigQueryConnector instance
+        table: Source table (also the cash_transactions source_table)
+        pipeline: Watermark pipeline name
+        cash_sql: Transform builder called as cash_sql(where=..., settlements_sql=...)
+        start_date: Optional backfill start (YYYY-MM-DD)
+        end_date: Optional backfill end (YYYY-MM-DD)
+        platform: Optional platform filter
+        full_refresh: Ignore watermarks and rebuild all rows from this table
+                      (DELETE and MERGE in one transaction)
+        lookback_days: Max days a settlement can span before its newest row
+
+    Returns:
+        Dict with mode, settlements, rows_affected, bytes_processed
+    """
+    backfill = bool(start_date or end_date)
+    source_table = config.get_bigquery_table(table)
+
+    if backfill:
+        changed_where = settlement_filters(start_date, end_date, platform)
+        plan = None
+        scan_start = (pd.Timestamp(start_date) - timedelta(days=lookback_days)) if start_date else None
+    else:
+        plan = plan_settlement_increment(bq, table, pipeline, platform=platform, full_refresh=full_refresh)
+        if plan.empty:
+            return {'mode': 'incremental', 'settlements': 0, 'rows_affected': 0, 'bytes_processed': 0}
+
+        changed_where = _changed_rows_condition(plan)
+        scan_start = (
+            plan['previous_ts'].min() - timedelta(days=lookback_days)
+            if plan['previous_ts'].notna().all() else None
+        )
+
+    changed_sql = f"""
+      SELECT DISTINCT platform, settlement_id
+      FROM `{source_table}`
+      WHERE {' AND '.join(changed_where) if changed_where else 'TRUE'}
+    """
+
+    aggregate_where = []
+    if scan_start is not None:
+        aggregate_where.append(f"DATE(date_time) >= {date_literal(scan_start)}")
+    if end_date:
+        aggregate_where.append(f"DATE(date_time) <= DATE_ADD(DATE('{end_date}'), INTERVAL {lookback_days} DAY)")
+    if platform:
+        aggregate_where.append(f"platform = '{platform}'")
+
+    source_sql = cash_sql(where=aggregate_where, settlements_sql=changed_sql)
+    merge_sql = merge_cash_transactions_sql(
+        source_sql,
+        cash_date_floor=scan_start.strftime('%Y-%m-%d') if scan_start is not None else None,
+    )
+
+    if full_refresh:
+        # Rebuilt rows replace the old ones in one transaction: a failed
+        # MERGE rolls the DELETE back and leaves the watermarks alone
+        platform_filter = f"AND counterparty = '{platform}'" if platform else ""
+        job = bq.execute(f"""
+        BEGIN TRANSACTION;
+        DELETE FROM `{config.get_bigquery_table('cash_transactions')}`
+        WHERE source_table = '{table}'
+          AND is_forecast = FALSE
+          {platform_filter};
+        {merge_sql};
+        COMMIT TRANSACTION;
+        """)
+        reset_watermarks(bq, pipeline, partition_key=platform)
+        rows_affected = script_dml_rows(bq, job, 'MERGE')
+    else:
+        job = bq.execute(merge_sql)
+        rows_affected = job.num_dml_affected_rows or 0
+
+    if plan is not None:
+        set_watermarks(bq, pipeline, plan.rename(columns={'platform': 'partition_key'}))
+
+    return {
+        'mode': 'full_refresh' if full_refresh else ('backfill' if backfill else 'incremental'),
+        'settlements': int(plan['keys_processed'].sum()) if plan is not None else None,
+        'rows_affected': rows_affected,
+        'bytes_processed': job.total_bytes_processed or 0,
+    }
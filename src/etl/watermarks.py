@@ -0,0 +1,99 @@
+"""High-water mark state for incremental ETL pipelines"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+
+from ..config import config
+from ..sql import timestamp_literal
+
+
+WATERMARKS_TABLE = "etl_watermarks"
+
+
+def get_watermarks(bq, pipeline: str) -> Dict[str, pd.Timestamp]:
+    """
+    Load the current watermark per partition key for a pipeline.
+
+    Args:
+        bq: BigQueryConnector instance
+        pipeline: Pipeline name (e.g., "deposits_to_cash")
+
+    Returns:
+        Dict of partition_key -> watermark timestamp (UTC). Empty on first run.
+    """
+    df = bq.query(f"""
+    SELECT partition_key, watermark_ts
+    FROM `{config.get_bigquery_table(WATERMARKS_TABLE)}`
+    WHERE pipeline = '{pipeline}'
+    """)
+
+    return {
+        row['partition_key']: pd.Timestamp(row['watermark_ts'])
+        for _, row in df.iterrows()
+    }
+
+
+def set_watermarks(
+    bq,
+    pipeline: str,
+    marks: pd.DataFrame,
+) -> None:
+    """
+    Upsert watermarks for a pipeline in a single MERGE.
+
+    Watermarks only move forward: an existing mark is never replaced by an
+    older timestamp, so re-running an old backfill cannot rewind state.
+
+    Args:
+        bq: BigQueryConnector instance
+        pipeline: Pipeline name
+        marks: DataFrame with partition_key, watermark_ts, rows_processed,
+               keys_processed columns
+    """
+    if marks.empty:
+        return
+
+    rows = []
+    for _, row in marks.iterrows():
+        rows.append(
+            f"STRUCT('{row['partition_key']}' AS partition_key, "
+            f"{timestamp_literal(row['watermark_ts'])} AS watermark_ts, "
+            f"{int(row.get('rows_processed', 0) or 0)} AS rows_processed, "
+            f"{int(row.get('keys_processed', 0) or 0)} AS keys_processed)"
+        )
+    structs = ",\n      ".join(rows)
+
+    bq.execute(f"""
+    MERGE `{config.get_bigquery_table(WATERMARKS_TABLE)}` T
+    USING UNNEST([
+      {structs}
+    ]) S
+    ON T.pipeline = '{pipeline}' AND T.partition_key = S.partition_key
+    WHEN MATCHED THEN UPDATE SET
+      watermark_ts = GREATEST(T.watermark_ts, S.watermark_ts),
+      rows_processed = S.rows_processed,
+      keys_processed = S.keys_processed,
+      updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT
+      (pipeline, partition_key, watermark_ts, rows_processed, keys_processed, updated_at)
+    VALUES
+      ('{pipeline}', S.partition_key, S.watermark_ts, S.rows_processed, S.keys_processed, CURRENT_TIMESTAMP())
+    """)
+
+
+def reset_watermarks(bq, pipeline: str, partition_key: Optional[str] = None) -> None:
+    """
+    Delete watermarks so the next run reprocesses full history.
+
+    Args:
+        bq: BigQueryConnector instance
+        pipeline: Pipeline name
+        partition_key: Only reset this key (default: all keys for the pipeline)
+    """
+    key_filter = f"AND partition_key = '{partition_key}'" if partition_key else ""
+
+    bq.execute(f"""
+    DELETE FROM `{config.get_bigquery_table(WATERMARKS_TABLE)}`
+    WHERE pipeline = '{pipeline}' {key_filter}
+    """)
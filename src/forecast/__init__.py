@@ -0,0 +1,8 @@
+"""Forecast stages that project future cash flows from warehouse data"""
+
+from .bom import BOMGraph, price_component_needs
+from .commitments import POCommitments
+from .fee_rates import FeeRates
+from .revenue import RevenueProjection
+
+__all__ = ["BOMGraph", "price_component_needs", "POCommitments", "FeeRates", "RevenueProjection"]
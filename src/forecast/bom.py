@@ -0,0 +1,276 @@
+"""
+BOM explosion: SKU demand → component purchases
+
+bundle (output ← input × qty) and bom/bom_item (sku ← component_sku ×
+quantity) form a directed acyclic graph from sellable SKUs down to purchased
+components. BOMGraph sorts it topologically and computes, once per graph,
+the explosion matrix: purchased-component quantity per unit of every SKU.
+Rows are built level by level from the rows of their children (memoized),
+so nested bundles and sub-assemblies are resolved exactly once.
+
+A demand forecast then explodes with one sparse product, demand (month ×
+SKU) @ explosion (SKU × component), kept as COO triplets in pandas:
+
+    >>> graph = BOMGraph.load(bq)
+    >>> needs = graph.explode(demand)  # month, component_sku, qty
+    >>> priced = price_component_needs(needs, pricing, items, vendors)
+
+A SKU with no bundle or BOM is itself a purchased component. A bundle
+definition takes precedence over a BOM for the same SKU, and only the latest
+BOM per SKU is used.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..data.vendors import DEFAULT_PAYMENT_DAYS, VendorMaster
+from ..timing.business_days import to_days
+from .pricing import unit_prices
+from .sources import FORECAST_CACHE_DIR, CachedSource, load_sources
+
+
+def _edges_sql() -> str:
+    return f"""
+    WITH latest_bom AS (
+      SELECT id, sku
+      FROM `{config.get_bigquery_table('bom')}`
+      WHERE sku IS NOT NULL
+      QUALIFY ROW_NUMBER() OVER (PARTITION BY sku ORDER BY id DESC) = 1
+    ),
+
+    bundle_edges AS (
+      SELECT output as parent_sku, input as child_sku, SUM(IFNULL(qty, 1)) as qty, 'bundle' as source
+      FROM `{config.get_bigquery_table('bundle')}`
+      WHERE output IS NOT NULL AND input IS NOT NULL
+      GROUP BY parent_sku, child_sku
+    ),
+
+    bom_edges AS (
+      SELECT b.sku as parent_sku, bi.component_sku as child_sku, SUM(IFNULL(bi.quantity, 1)) as qty, 'bom' as source
+      FROM latest_bom b
+      JOIN `{config.get_bigquery_table('bom_item')}` bi
+        ON bi.bom_id = b.id
+      WHERE bi.component_sku IS NOT NULL
+      GROUP BY parent_sku, child_sku
+    )
+
+    SELECT * FROM bundle_edges
+    UNION ALL
+    SELECT * FROM bom_edges
+    WHERE parent_sku NOT IN (SELECT parent_sku FROM bundle_edges)
+    """
+
+
+def _demand_sql() -> str:
+    return f"""
+    SELECT DATE(month) as month, sku, SUM(forecast_units) as units
+    FROM `{config.get_bigquery_table('forecast')}`
+    WHERE sku IS NOT NULL
+      AND forecast_units > 0
+    GROUP BY month, sku
+    """
+
+
+BOM_EDGES_SOURCE = CachedSource("bom_edges", ("bom", "bom_item", "bundle"), _edges_sql)
+DEMAND_SOURCE = CachedSource("demand", ("forecast",), _demand_sql)
+
+# Explosion matrices by edge-list fingerprint, shared across BOMGraph instances
+_explosions: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def _fingerprint(edges: pd.DataFrame) -> int:
+    """Order-sensitive hash of an edge list (BOMGraph sorts its edges, so equal lists match)"""
+    hashed = pd.util.hash_pandas_object(edges[['parent_sku', 'child_sku', 'qty']], index=False)
+    return hash(hashed.to_numpy().tobytes())
+
+
+class BOMGraph:
+    """
+    Bundle/BOM graph with a memoized explosion matrix.
+
+    Example:
+        >>> graph = BOMGraph(edges)
+        >>> graph.explosion  # sku, component_sku, qty_per
+        >>> graph.explode(demand)  # month, component_sku, qty
+    """
+
+    def __init__(self, edges: pd.DataFrame):
+        """
+        Args:
+            edges: parent_sku, child_sku, qty (units of child per parent)
+
+        Raises:
+            ValueError: If the graph has a cycle (a SKU contains itself)
+        """
+        edges = edges[['parent_sku', 'child_sku', 'qty']].dropna(subset=['parent_sku', 'child_sku'])
+        # Canonical order: SKU codes (and so the memoized explosion) must not
+        # depend on the order BigQuery returned the rows in
+        self.edges = (edges.assign(qty=edges['qty'].fillna(1).astype('float64'))
+                      .sort_values(['parent_sku', 'child_sku', 'qty'], kind='stable', ignore_index=True))
+
+        codes, self.skus = pd.factorize(pd.concat([self.edges['parent_sku'], self.edges['child_sku']]))
+        self._parent = codes[:len(self.edges)]
+        self._child = codes[len(self.edges):]
+        self.depth = self._topological_depth()
+
+    def _topological_depth(self) -> np.ndarray:
+        """Longest path from each SKU down to a purchased component (0 = leaf)"""
+        n = len(self.skus)
+        depth = np.zeros(n, dtype=np.int64)
+        for _ in range(n + 1):
+            updated = depth.copy()
+            np.maximum.at(updated, self._parent, depth[self._child] + 1)
+            if np.array_equal(updated, depth):
+                return depth
+            depth = updated
+
+        cyclic = sorted(self.skus[depth >= n].astype(str))
+        raise ValueError(f"BOM/bundle graph has a cycle through: {', '.join(cyclic[:10])}")
+
+    @classmethod
+    def load(cls, bq=None, cache_dir: Path = FORECAST_CACHE_DIR, refresh: bool = False) -> "BOMGraph":
+        """Graph from bom, bom_item and bundle (local copy refreshed when they change)"""
+        frames, _ = load_sources(bq, [BOM_EDGES_SOURCE], cache_dir, refresh=refresh)
+        return cls(frames['bom_edges'])
+
+    @property
+    def explosion(self) -> pd.DataFrame:
+        """
+        Purchased-component quantity per unit of each SKU in the graph.
+
+        Returns:
+            DataFrame with sku, component_sku, qty_per (COO rows)
+        """
+        rows, cols, vals = self._explosion_coo()
+        return pd.DataFrame({
+            'sku': self.skus[rows],
+            'component_sku': self.skus[cols],
+            'qty_per': vals,
+        })
+
+    def _explosion_coo(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(sku code, component code, qty per unit), memoized per edge list"""
+        key = _fingerprint(self.edges)
+        if key not in _explosions:
+            _explosions[key] = self._explode_graph()
+        return _explosions[key]
+
+    def _explode_graph(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        leaves = np.flatnonzero(self.depth == 0)
+        done = pd.DataFrame({'sku': leaves, 'component': leaves, 'qty_per': 1.0})
+
+        # Children are always on a lower level, so their rows are final
+        edges = pd.DataFrame({'sku': self._parent, 'child': self._child, 'qty': self.edges['qty'].to_numpy()})
+        edge_level = self.depth[self._parent]
+        for level in range(1, int(self.depth.max(initial=0)) + 1):
+            level_rows = edges[edge_level == level].merge(
+                done, left_on='child', right_on='sku', suffixes=('', '_child')
+            )
+            level_rows = (
+                level_rows.assign(qty_per=level_rows['qty'] * level_rows['qty_per'])
+                .groupby(['sku', 'component'], as_index=False)['qty_per'].sum()
+            )
+            done = pd.concat([done, level_rows], ignore_index=True)
+
+        return (
+            done['sku'].to_numpy(dtype=np.int64),
+            done['component'].to_numpy(dtype=np.int64),
+            done['qty_per'].to_numpy(dtype='float64'),
+        )
+
+    def explode(self, demand: pd.DataFrame) -> pd.DataFrame:
+        """
+        Component quantities needed for a SKU demand forecast.
+
+        demand (month × SKU, dense: a year is 12 rows) times the sparse
+        explosion matrix, one weighted bincount per month.
+
+        Args:
+            demand: month, sku, units
+
+        Returns:
+            DataFrame with month, component_sku, qty (one row per month and
+            component). SKUs outside the graph are purchased as-is.
+        """
+        rows, cols, vals = self._explosion_coo()
+        n = len(self.skus)
+
+        month_codes, months = pd.factorize(demand['month'], sort=True)
+        sku_codes = pd.Index(self.skus).get_indexer(demand['sku'])
+        units = demand['units'].to_numpy(dtype='float64')
+        inside = sku_codes >= 0
+
+        matrix = np.zeros((len(months), n))
+        np.add.at(matrix, (month_codes[inside], sku_codes[inside]), units[inside])
+
+        product = np.vstack([
+            np.bincount(cols, weights=matrix[m, rows] * vals, minlength=n) for m in range(len(months))
+        ]) if len(months) else np.zeros((0, n))
+        month_idx, component_idx = np.nonzero(product)
+
+        outside = (
+            demand[~inside]
+            .groupby(['month', 'sku'], as_index=False)['units'].sum()
+            .rename(columns={'sku': 'component_sku', 'units': 'qty'})
+        )
+        needs = pd.concat([
+            pd.DataFrame({
+                'month': np.asarray(months)[month_idx],
+                'component_sku': self.skus[component_idx],
+                'qty': product[month_idx, component_idx],
+            }),
+            outside.astype({'qty': 'float64'}),
+        ], ignore_index=True)
+        return needs.sort_values(['month', 'component_sku'], kind='stable', ignore_index=True)
+
+
+def price_component_needs(
+    needs: pd.DataFrame,
+    pricing: pd.DataFrame,
+    items: pd.DataFrame,
+    vendors: Optional[VendorMaster] = None,
+) -> pd.DataFrame:
+    """
+    Price component needs and date their payments.
+
+    Each component is bought from its item.vendor at the vendor-item-pricing
+    tier for the month's quantity (else item_price / build_cost). Components
+    are delivered by the start of the month they are needed and paid after
+    the vendor's terms.
+
+    Args:
+        needs: Output of BOMGraph.explode
+        pricing: vendor-item-pricing rows
+        items: item rows (sku, vendor, item_price, build_cost)
+        vendors: VendorMaster for vendor ids and payment days (without one,
+                 only item prices are used and payment is Net 30)
+
+    Returns:
+        needs with vendor, unit_price, price_source, amount, payment_date
+    """
+    item_vendor = items.drop_duplicates('sku').set_index('sku')['vendor']
+    vendor_names = needs['component_sku'].map(item_vendor)
+
+    if vendors is not None:
+        terms = vendors.terms(vendor_names)
+        vendor_ids = terms['vendor_id'].to_numpy()
+        payment_days = terms['payment_days'].to_numpy(dtype='int64')
+    else:
+        vendor_ids = np.full(len(needs), pd.NA)
+        payment_days = np.full(len(needs), DEFAULT_PAYMENT_DAYS)
+
+    month_start = to_days(needs['month'])
+    price, source = unit_prices(vendor_ids, needs['component_sku'], needs['qty'].to_numpy(),
+                                month_start, pricing, items)
+
+    return needs.assign(
+        vendor=vendor_names.to_numpy(),
+        unit_price=price,
+        price_source=source,
+        amount=needs['qty'].to_numpy() * price,
+        payment_date=month_start + payment_days.astype('timedelta64[D]'),
+    )
@@ -0,0 +1,286 @@
+"""
+Open purchase-order commitments
+
+Open po_line_item rows are future cash outflows: each outstanding line is
+delivered after the vendor's lead time and paid after the vendor's terms.
+POCommitments pulls the open lines once, keeps a local copy under
+data/processed/forecast_inputs and projects every line in one vectorized
+pass:
+
+    >>> commitments = POCommitments.load(bq)
+    >>> lines = commitments.project(VendorMaster.load(bq))
+    >>> weekly = commitments.weekly(lines, start_date=date.today(), weeks=13)
+
+- delivery: order_date + vendor lead time (purchase_order_timing overrides,
+  else the median PO → first invoice days observed for the vendor, else the
+  default); lines already past due are expected now
+- payment: delivery + vendor payment days (vendors table), or a percentile
+  of the vendor's observed payment lag
+- price: vendor-item-pricing tier for the vendor, SKU, quantity and order
+  date, falling back to item.item_price / build_cost
+
+Each source (open lines, pricing, items, lead times) is re-queried only when
+one of its tables changed in BigQuery. Re-pulled open lines are diffed with
+the previous copy, so a refresh reports the receipts that arrived.
+"""
+
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..data.vendors import VendorMaster
+from ..timing.business_days import to_days
+from ..timing.vendor_lags import PaymentLagModel
+from .pricing import ITEMS_SOURCE, PRICING_SOURCE, unit_prices
+from .sources import FORECAST_CACHE_DIR, CachedSource, load_sources
+
+
+# payment_timing.yaml section with lead-time settings
+PO_TIMING_SECTION = "purchase_order_timing"
+
+# Lead time when neither config nor history gives one (the old SQL assumption)
+DEFAULT_LEAD_TIME_DAYS = 30
+
+# Observed order → invoice gaps outside this range are data errors
+MAX_LEAD_TIME_DAYS = 365
+
+
+def _open_lines_sql() -> str:
+    return f"""
+    SELECT
+      id,
+      po_no,
+      order_date,
+      vendor,
+      sku,
+      qty_ordered,
+      IFNULL(qty_received, 0) as qty_received
+    FROM `{config.get_bigquery_table('po_line_item')}`
+    WHERE status = 'Open'
+      AND qty_ordered - IFNULL(qty_received, 0) > 0
+    """
+
+
+def _lead_times_sql() -> str:
+    return f"""
+    WITH first_invoice AS (
+      SELECT po_number, MIN(invoice_date) as invoice_date
+      FROM `{config.get_bigquery_table('invoices')}`
+      WHERE po_number IS NOT NULL
+      GROUP BY po_number
+    ),
+
+    po_lead_times AS (
+      SELECT po.vendor, DATE_DIFF(f.invoice_date, po.order_date, DAY) as lead_time_days
+      FROM `{config.get_bigquery_table('po')}` po
+      JOIN first_invoice f
+        ON f.po_number = po.po_no
+    )
+
+    SELECT
+      vendor,
+      APPROX_QUANTILES(lead_time_days, 2)[OFFSET(1)] as lead_time_days,
+      COUNT(*) as pos
+    FROM po_lead_times
+    WHERE lead_time_days BETWEEN 0 AND {MAX_LEAD_TIME_DAYS}
+    GROUP BY vendor
+    """
+
+
+COMMITMENT_SOURCES = [
+    CachedSource("open_lines", ("po_line_item",), _open_lines_sql),
+    PRICING_SOURCE,
+    ITEMS_SOURCE,
+    CachedSource("lead_times", ("invoices", "po"), _lead_times_sql),
+]
+
+
+def receipt_changes(previous: Optional[pd.DataFrame], current: pd.DataFrame) -> Dict[str, int]:
+    """
+    What changed between two pulls of the open lines.
+
+    Returns:
+        Dict with new_lines, closed_lines (no longer open: fully received or
+        cancelled), receipts (lines still open with more received) and
+        units_received on those lines
+    """
+    if previous is None:
+        return {'new_lines': len(current), 'closed_lines': 0, 'receipts': 0, 'units_received': 0}
+
+    both = previous[['id', 'qty_received']].merge(
+        current[['id', 'qty_received']], on='id', suffixes=('_before', '')
+    )
+    received = both['qty_received'] - both['qty_received_before']
+    return {
+        'new_lines': int((~current['id'].isin(previous['id'])).sum()),
+        'closed_lines': int((~previous['id'].isin(current['id'])).sum()),
+        'receipts': int((received > 0).sum()),
+        'units_received': int(received.clip(lower=0).sum()),
+    }
+
+
+class POCommitments:
+    """
+    Open PO lines with their pricing, item and lead-time inputs.
+
+    Example:
+        >>> commitments = POCommitments.load(bq)
+        >>> commitments.changes  # receipts since the previous refresh
+        >>> lines = commitments.project(vendors, lags=PaymentLagModel.load(), lag_percentile=75)
+    """
+
+    def __init__(
+        self,
+        open_lines: pd.DataFrame,
+        pricing: pd.DataFrame,
+        items: pd.DataFrame,
+        lead_times: pd.DataFrame,
+        changes: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            open_lines: Open po_line_item rows (id, po_no, order_date, vendor,
+                        sku, qty_ordered, qty_received)
+            pricing: vendor-item-pricing rows
+            items: item rows (sku, item_price, build_cost)
+            lead_times: Observed lead time per vendor (vendor, lead_time_days, pos)
+            changes: receipt_changes() of the refresh that produced open_lines
+        """
+        self.open_lines = open_lines.reset_index(drop=True)
+        self.pricing = pricing
+        self.items = items
+        self.lead_times = lead_times
+        self.changes = changes or {}
+
+    @classmethod
+    def load(cls, bq=None, cache_dir: Path = FORECAST_CACHE_DIR, refresh: bool = False) -> "POCommitments":
+        """
+        Load the inputs, re-querying only those whose tables changed.
+
+        Args:
+            bq: BigQueryConnector; without one the local copy is used as-is
+            cache_dir: Directory of the local copy
+            refresh: Re-query every input even if its tables have not changed
+
+        Raises:
+            FileNotFoundError: No local copy and no connector to build one
+        """
+        frames, replaced = load_sources(bq, COMMITMENT_SOURCES, cache_dir, refresh=refresh)
+
+        changes = None
+        if 'open_lines' in replaced:
+            changes = receipt_changes(replaced['open_lines'], frames['open_lines'])
+
+        return cls(changes=changes, **frames)
+
+    def lead_time_days(self, vendors: pd.Series, po_timing: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Lead time per vendor name: configured override, else observed median
+        (with enough POs), else the default.
+        """
+        po_timing = po_timing if po_timing is not None else (config.payment_timing.get(PO_TIMING_SECTION) or {})
+        default = int(po_timing.get('default_lead_time_days', DEFAULT_LEAD_TIME_DAYS))
+        min_pos = int(po_timing.get('min_observed_pos', 1))
+
+        observed = self.lead_times[self.lead_times['pos'] >= min_pos].drop_duplicates('vendor')
+        observed = observed.set_index('vendor')['lead_time_days']
+        overrides = pd.Series(po_timing.get('vendor_lead_time_days') or {}, dtype='float64')
+
+        vendors = pd.Series(vendors, dtype=object)
+        days = vendors.map(overrides).astype('float64')
+        days = days.fillna(vendors.map(observed).astype('float64'))
+        return days.fillna(default).to_numpy(dtype='int64')
+
+    def unit_prices(self, vendor_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unit price per open line: the vendor's tier for qty_ordered on the
+        order date, else item_price, else build_cost (see pricing.unit_prices).
+
+        Args:
+            vendor_ids: vendors.Id per open line (NA when unmatched)
+        """
+        lines = self.open_lines
+        return unit_prices(
+            vendor_ids, lines['sku'], lines['qty_ordered'].to_numpy(), lines['order_date'],
+            self.pricing, self.items,
+        )
+
+    def project(
+        self,
+        vendors: VendorMaster,
+        as_of: Optional[date] = None,
+        lags: Optional[PaymentLagModel] = None,
+        lag_percentile: int = 50,
+        po_timing: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Delivery date, payment date and amount for every open line.
+
+        Args:
+            vendors: VendorMaster for vendor ids and payment terms
+            as_of: Projection date; past-due deliveries move here (default: today)
+            lags: Optional observed payment lags used instead of stated terms
+            lag_percentile: Percentile of the observed lag (with lags)
+            po_timing: purchase_order_timing settings (default: payment_timing.yaml)
+
+        Returns:
+            open_lines with qty_outstanding, lead_time_days, delivery_date,
+            payment_days, payment_date, unit_price, price_source, amount
+            (positive; the cash outflow)
+        """
+        lines = self.open_lines
+        as_of = np.datetime64(as_of or date.today(), 'D')
+
+        terms = vendors.terms(lines['vendor'])
+        lead = self.lead_time_days(lines['vendor'], po_timing)
+        delivery = np.maximum(to_days(lines['order_date']) + lead.astype('timedelta64[D]'), as_of)
+
+        if lags is not None:
+            payment_days = lags.lag_days(lines['vendor'], lag_percentile)
+        else:
+            payment_days = terms['payment_days'].to_numpy(dtype='int64')
+
+        unit_price, price_source = self.unit_prices(terms['vendor_id'].to_numpy())
+        qty_outstanding = (lines['qty_ordered'] - lines['qty_received']).to_numpy(dtype='int64')
+
+        return lines.assign(
+            qty_outstanding=qty_outstanding,
+            lead_time_days=lead,
+            delivery_date=delivery,
+            payment_days=payment_days,
+            payment_date=delivery + payment_days.astype('timedelta64[D]'),
+            unit_price=unit_price,
+            price_source=price_source,
+            amount=qty_outstanding * unit_price,
+        )
+
+    @staticmethod
+    def weekly(projected: pd.DataFrame, start_date: date, weeks: int) -> pd.DataFrame:
+        """
+        Bucket projected outflows into forecast weeks (week 1 starts on start_date).
+
+        Returns:
+            DataFrame with week_number, amount, lines, pos
+        """
+        days_out = (to_days(projected['payment_date']) - np.datetime64(start_date, 'D')).astype('int64')
+        due = projected.assign(week_number=days_out // 7 + 1)
+        due = due[(days_out >= 0) & (due['week_number'] <= weeks)]
+
+        weekly = due.groupby('week_number').agg(
+            amount=('amount', 'sum'),
+            lines=('id', 'count'),
+            pos=('po_no', 'nunique'),
+        )
+        return weekly.reset_index()
+
+    def status(self) -> Dict[str, object]:
+        """Open line and PO counts plus the last refresh's receipt changes"""
+        return {
+            'open_lines': len(self.open_lines),
+            'open_pos': int(self.open_lines['po_no'].nunique()),
+            **self.changes,
+        }
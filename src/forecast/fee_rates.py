@@ -0,0 +1,406 @@
+"""
+Platform fee and refund rates over rolling 4/13/52-week windows
+
+deposits, refunds and fees share a layout (platform, date_time, sku and the
+settlement amount columns). Rates are built in two server-side steps:
+
+1. platform_fee_daily: product sales, selling/FBA/other fees and refunded
+   sales per day × platform × SKU. Maintained incrementally: only partitions
+   at or after each source table's watermark in etl_watermarks are scanned,
+   and the days they touch are re-aggregated and MERGEd.
+2. The rate table: window aggregates over platform_fee_daily ending on its
+   latest day, per platform × SKU and per platform (sku NULL), for each
+   window length. Fees are net of refund fee reversals and include
+   account-level charges from the fees table.
+
+The rate table is cached locally and re-queried only when
+platform_fee_daily changes; lookups and gross → net conversion are
+vectorized:
+
+    >>> refresh_fee_daily(bq)  # daily, after the source tables load
+    >>> rates = FeeRates.load(bq)
+    >>> rates.net(gross, platforms, skus, window_weeks=13)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..sql import date_literal, timestamp_literal
+from ..etl.watermarks import get_watermarks, reset_watermarks, set_watermarks
+from .sources import FORECAST_CACHE_DIR, CachedSource, load_sources
+
+
+DAILY_TABLE = "platform_fee_daily"
+PIPELINE = "platform_fee_daily"
+SOURCE_TABLES = ("deposits", "refunds", "fees")
+
+WINDOWS = (4, 13, 52)
+DEFAULT_WINDOW_WEEKS = 13
+
+# SKUs with less product sales than this in a window use the platform rate
+DEFAULT_MIN_SKU_SALES = 1000.0
+
+RATE_COLUMNS = ('selling_fee_rate', 'fba_fee_rate', 'other_fee_rate', 'fee_rate', 'refund_rate')
+
+# Daily measures per source table; refunds and fees carry no sales of their own
+_MEASURES = {
+    'deposits': {
+        'units': 'quantity',
+        'product_sales': 'product_sales',
+        'refunded_sales': '0',
+        'refunded_units': '0',
+    },
+    'refunds': {
+        'units': '0',
+        'product_sales': '0',
+        'refunded_sales': 'product_sales',
+        'refunded_units': 'ABS(quantity)',
+    },
+    'fees': {
+        'units': '0',
+        'product_sales': '0',
+        'refunded_sales': '0',
+        'refunded_units': '0',
+    },
+}
+_FEES = {'selling_fees': 'selling_fees', 'fba_fees': 'fba_fees', 'other_fees': 'other_transaction_fees'}
+DAILY_MEASURES = ('units', 'product_sales', 'selling_fees', 'fba_fees', 'other_fees', 'refunded_sales', 'refunded_units')
+
+
+def daily_sql(start_date=None) -> str:
+    """
+    SELECT of platform_fee_daily rows from the source tables.
+
+    Args:
+        start_date: Only aggregate days from this date on (partition pruned)
+    """
+    where = f" WHERE DATE(date_time) >= {date_literal(start_date)}" if start_date is not None else ""
+
+    selects = []
+    for table in SOURCE_TABLES:
+        columns = {**_MEASURES[table], **_FEES}
+        measures = ",\n        ".join(
+            f"IFNULL({columns[m]}, 0) as {m}" if columns[m] != '0' else f"0 as {m}"
+            for m in DAILY_MEASURES
+        )
+        selects.append(f"""
+      SELECT
+        DATE(date_time) as sales_date,
+        platform,
+        sku,
+        {measures}
+      FROM `{config.get_bigquery_table(table)}`{where}""")
+
+    sums = ",\n      ".join(f"SUM({m}) as {m}" for m in DAILY_MEASURES)
+    return f"""
+    SELECT
+      sales_date,
+      platform,
+      sku,
+      {sums},
+      CURRENT_TIMESTAMP() as updated_at
+    FROM ({'\n      UNION ALL'.join(selects)}
+    )
+    WHERE platform IS NOT NULL
+    GROUP BY sales_date, platform, sku
+    """
+
+
+def plan_fee_increment(bq, full_refresh: bool = False) -> pd.DataFrame:
+    """
+    New rows per source table since its watermark (partitions at or after it only).
+
+    Returns:
+        DataFrame with partition_key (table), previous_ts, watermark_ts,
+        rows_processed, keys_processed (days touched). Tables with nothing
+        new are left out.
+    """
+    watermarks = {} if full_refresh else get_watermarks(bq, PIPELINE)
+
+    selects = []
+    for table in SOURCE_TABLES:
+        where = "date_time IS NOT NULL"
+        if table in watermarks:
+            wm = watermarks[table]
+            where = f"DATE(date_time) >= {date_literal(wm)} AND date_time > {timestamp_literal(wm)}"
+        selects.append(f"""
+    SELECT
+      '{table}' as partition_key,
+      MAX(date_time) as watermark_ts,
+      COUNT(*) as rows_processed,
+      COUNT(DISTINCT DATE(date_time)) as keys_processed,
+      MIN(DATE(date_time)) as first_date
+    FROM `{config.get_bigquery_table(table)}`
+    WHERE {where}""")
+
+    plan = bq.query("\n    UNION ALL".join(selects))
+    plan = plan[plan['rows_processed'] > 0].reset_index(drop=True)
+    plan['previous_ts'] = plan['partition_key'].map(watermarks)
+    return plan
+
+
+def refresh_fee_daily(bq, full_refresh: bool = False) -> Dict[str, object]:
+    """
+    Bring platform_fee_daily up to date with one MERGE.
+
+    Every day from the earliest new row on is re-aggregated from all three
+    source tables (so a day's totals stay complete) and replaces what was
+    there; earlier partitions are not read. Watermarks advance after the MERGE.
+
+    Args:
+        bq: BigQueryConnector instance
+        full_refresh: Ignore watermarks and rebuild every day
+
+    Returns:
+        Dict with mode, start_date (None: all history), days, rows_affected,
+        bytes_processed
+    """
+    plan = plan_fee_increment(bq, full_refresh=full_refresh)
+    if plan.empty:
+        return {'mode': 'incremental', 'start_date': None, 'days': 0, 'rows_affected': 0, 'bytes_processed': 0}
+
+    start_date = None if full_refresh else pd.Timestamp(plan['first_date'].min()).date()
+    keep_before = f"AND T.sales_date >= {date_literal(start_date)}" if start_date is not None else ""
+
+    columns = ['sales_date', 'platform', 'sku', *DAILY_MEASURES, 'updated_at']
+    job = bq.execute(f"""
+    MERGE `{config.get_bigquery_table(DAILY_TABLE)}` T
+    USING ({daily_sql(start_date)}) S
+    ON T.sales_date = S.sales_date
+      AND T.platform = S.platform
+      AND IFNULL(T.sku, '') = IFNULL(S.sku, '')
+    WHEN MATCHED THEN UPDATE SET
+      {', '.join(f'{c} = S.{c}' for c in columns[3:])}
+    WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(columns)})
+      VALUES ({', '.join(f'S.{c}' for c in columns)})
+    WHEN NOT MATCHED BY SOURCE {keep_before} THEN DELETE
+    """)
+
+    if full_refresh:
+        reset_watermarks(bq, PIPELINE)
+    set_watermarks(bq, PIPELINE, plan)
+
+    return {
+        'mode': 'full_refresh' if full_refresh else 'incremental',
+        'start_date': start_date,
+        'days': int(plan['keys_processed'].max()),
+        'rows_affected': job.num_dml_affected_rows or 0,
+        'bytes_processed': job.total_bytes_processed or 0,
+    }
+
+
+def _rates_sql() -> str:
+    amounts = ('product_sales', 'units', 'selling_fees', 'fba_fees', 'other_fees', 'refunded_sales')
+    windows = ",\n        ".join(
+        f"SUM({a}) OVER w{weeks} as {a}_{weeks}w" for weeks in WINDOWS for a in amounts
+    )
+    window_defs = ",\n      ".join(
+        f"w{weeks} AS (PARTITION BY platform, sku ORDER BY UNIX_DATE(sales_date) "
+        f"RANGE BETWEEN {weeks * 7 - 1} PRECEDING AND CURRENT ROW)"
+        for weeks in WINDOWS
+    )
+    per_window = ",\n        ".join(
+        f"STRUCT({weeks} as window_weeks, "
+        + ", ".join(f"{a}_{weeks}w as {a}" for a in amounts) + ")"
+        for weeks in WINDOWS
+    )
+    daily = config.get_bigquery_table(DAILY_TABLE)
+
+    return f"""
+    WITH as_of AS (
+      SELECT MAX(sales_date) as as_of_date FROM `{daily}`
+    ),
+
+    recent AS (
+      SELECT d.*
+      FROM `{daily}` d, as_of
+      WHERE d.sales_date > DATE_SUB(as_of.as_of_date, INTERVAL {max(WINDOWS)} WEEK)
+    ),
+
+    keyed AS (
+      -- Per SKU, per platform (sku NULL), and a zero row on the as-of day so
+      -- every key has a window ending there
+      SELECT sales_date, platform, sku, {', '.join(amounts)} FROM recent WHERE sku IS NOT NULL
+      UNION ALL
+      SELECT sales_date, platform, NULL, {', '.join(f'SUM({a})' for a in amounts)}
+      FROM recent GROUP BY sales_date, platform
+      UNION ALL
+      SELECT DISTINCT as_of.as_of_date, platform, sku, {', '.join('0' for _ in amounts)}
+      FROM recent, as_of
+      UNION ALL
+      SELECT DISTINCT as_of.as_of_date, platform, NULL, {', '.join('0' for _ in amounts)}
+      FROM recent, as_of
+    ),
+
+    daily AS (
+      SELECT sales_date, platform, sku, {', '.join(f'SUM({a}) as {a}' for a in amounts)}
+      FROM keyed
+      GROUP BY sales_date, platform, sku
+    ),
+
+    windowed AS (
+      SELECT
+        sales_date,
+        platform,
+        sku,
+        {windows}
+      FROM daily
+      WINDOW
+      {window_defs}
+    )
+
+    SELECT
+      w.platform,
+      w.sku,
+      r.window_weeks,
+      w.sales_date as as_of_date,
+      r.product_sales,
+      r.units,
+      SAFE_DIVIDE(-r.selling_fees, r.product_sales) as selling_fee_rate,
+      SAFE_DIVIDE(-r.fba_fees, r.product_sales) as fba_fee_rate,
+      SAFE_DIVIDE(-r.other_fees, r.product_sales) as other_fee_rate,
+      SAFE_DIVIDE(-(r.selling_fees + r.fba_fees + r.other_fees), r.product_sales) as fee_rate,
+      SAFE_DIVIDE(-r.refunded_sales, r.product_sales) as refund_rate
+    FROM windowed w, as_of, UNNEST([
+        {per_window}
+    ]) r
+    WHERE w.sales_date = as_of.as_of_date
+    """
+
+
+RATES_SOURCE = CachedSource("fee_rates", (DAILY_TABLE,), _rates_sql)
+
+
+def _codes(values: np.ndarray, index: pd.Index) -> np.ndarray:
+    """Position of each value in index (-1 if absent), hashing only distinct values"""
+    codes, uniques = pd.factorize(values)
+    positions = np.append(index.get_indexer(uniques), -1)
+    return positions[codes]  # code -1 (missing value) picks the trailing -1
+
+
+def rate_lookup(rates: pd.DataFrame, platforms: Iterable, skus: Iterable, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Rates per row: the SKU's rate on that platform if present, else the
+    platform-wide rate (sku NULL), else 0.
+
+    Args:
+        rates: platform, optional sku, and the rate columns
+        platforms: Platform per row
+        skus: SKU per row
+        columns: Rate columns to look up (missing ones are 0)
+
+    Returns:
+        DataFrame with one float64 column per rate column
+    """
+    platforms = np.asarray(platforms, dtype=object)
+    n = len(platforms)
+    platform_index = pd.Index(rates['platform'].dropna().unique())
+    platform_codes = _codes(platforms, platform_index)
+
+    # Row of each input in the SKU table and in the platform table (-1: none)
+    by_sku = rates.iloc[:0]
+    sku_rows = np.full(n, -1)
+    if 'sku' in rates:
+        by_sku = rates[rates['sku'].notna() & rates['platform'].notna()].drop_duplicates(['platform', 'sku'])
+        sku_index = pd.Index(by_sku['sku'].unique())
+        sku_codes = _codes(np.asarray(skus, dtype=object), sku_index)
+
+        # (platform, sku) → one integer key, searched in the sorted table keys
+        width = len(sku_index) + 1
+        table_keys = platform_index.get_indexer(by_sku['platform']) * width + sku_index.get_indexer(by_sku['sku'])
+        order = np.argsort(table_keys)
+        keys = np.where((platform_codes >= 0) & (sku_codes >= 0), platform_codes * width + sku_codes, -1)
+        at = np.searchsorted(table_keys[order], keys).clip(max=max(len(order) - 1, 0))
+        if len(order):
+            sku_rows = np.where(table_keys[order][at] == keys, order[at], -1)
+        rates = rates[rates['sku'].isna()]
+
+    by_platform = rates.drop_duplicates('platform').set_index('platform').reindex(platform_index)
+
+    looked_up = {}
+    for column in columns:
+        if column not in by_platform:
+            looked_up[column] = np.zeros(n)
+            continue
+        # -1 picks the trailing NaN
+        rate = np.append(by_sku[column].to_numpy(dtype='float64', na_value=np.nan), np.nan)[sku_rows]
+        platform_rate = np.append(by_platform[column].to_numpy(dtype='float64', na_value=np.nan), np.nan)[platform_codes]
+        looked_up[column] = np.nan_to_num(np.where(np.isnan(rate), platform_rate, rate))
+
+    return pd.DataFrame(looked_up)
+
+
+class FeeRates:
+    """
+    Rolling fee and refund rates per platform and SKU.
+
+    Example:
+        >>> rates = FeeRates.load(bq)
+        >>> rates.rates(window_weeks=13)  # platform, sku, fee_rate, refund_rate, ...
+        >>> rates.net(gross, platforms, skus)
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        """
+        Args:
+            table: Rate table (platform, sku, window_weeks, product_sales and
+                   the RATE_COLUMNS; sku NULL for platform-wide rates)
+        """
+        self.table = table
+
+    @classmethod
+    def load(cls, bq=None, cache_dir: Path = FORECAST_CACHE_DIR, refresh: bool = False) -> "FeeRates":
+        """Rate table from the local copy, re-queried when platform_fee_daily changes"""
+        frames, _ = load_sources(bq, [RATES_SOURCE], cache_dir, refresh=refresh)
+        return cls(frames['fee_rates'])
+
+    @property
+    def as_of_date(self) -> Optional[pd.Timestamp]:
+        """Last day of sales behind the rates"""
+        return pd.Timestamp(self.table['as_of_date'].max()) if len(self.table) else None
+
+    def rates(
+        self,
+        window_weeks: int = DEFAULT_WINDOW_WEEKS,
+        min_sku_sales: float = DEFAULT_MIN_SKU_SALES,
+    ) -> pd.DataFrame:
+        """
+        Rates for one window; SKUs with too little sales in it are left to the
+        platform-wide rate.
+
+        Returns:
+            DataFrame with platform, sku, product_sales and the RATE_COLUMNS
+        """
+        if window_weeks not in WINDOWS:
+            raise ValueError(f"window_weeks must be one of {WINDOWS}, got {window_weeks}")
+
+        table = self.table[self.table['window_weeks'] == window_weeks]
+        table = table[table['sku'].isna() | (table['product_sales'] >= min_sku_sales)]
+        return table[['platform', 'sku', 'product_sales', *RATE_COLUMNS]].reset_index(drop=True)
+
+    def lookup(
+        self,
+        platforms: Iterable,
+        skus: Iterable,
+        window_weeks: int = DEFAULT_WINDOW_WEEKS,
+        min_sku_sales: float = DEFAULT_MIN_SKU_SALES,
+    ) -> pd.DataFrame:
+        """Rate columns per (platform, sku) row, SKU-specific where available"""
+        return rate_lookup(self.rates(window_weeks, min_sku_sales), platforms, skus, RATE_COLUMNS)
+
+    def net(
+        self,
+        gross: Iterable,
+        platforms: Iterable,
+        skus: Iterable,
+        window_weeks: int = DEFAULT_WINDOW_WEEKS,
+        min_sku_sales: float = DEFAULT_MIN_SKU_SALES,
+    ) -> np.ndarray:
+        """Gross sales → net of fees and refunds, per row"""
+        rates = rate_lookup(self.rates(window_weeks, min_sku_sales), platforms, skus, ('fee_rate', 'refund_rate'))
+        gross = np.asarray(gross, dtype='float64')
+        return gross * (1 - rates['fee_rate'].to_numpy() - rates['refund_rate'].to_numpy())
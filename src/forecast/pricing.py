@@ -0,0 +1,109 @@
+"""
+Unit prices from vendor-item-pricing
+
+Shared by the PO commitment and BOM stages: each request row (vendor, SKU,
+quantity, date) gets the vendor's price tier whose quantity range contains
+the quantity and that was in effect on the date, falling back to the item
+table's item_price, then build_cost.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..timing.business_days import to_days
+from .sources import CachedSource
+
+
+PRICE_SOURCES = ('vendor_pricing', 'item_price', 'build_cost', 'unpriced')
+
+
+def _pricing_sql() -> str:
+    return f"""
+    SELECT vendor_id, sku, min_qty, max_qty, unit_price, effective_date, expiration_date
+    FROM `{config.get_bigquery_table('vendor-item-pricing')}`
+    WHERE unit_price IS NOT NULL
+    """
+
+
+def _items_sql() -> str:
+    return f"""
+    SELECT sku, product, color, vendor, sell_price, item_price, build_cost
+    FROM `{config.get_bigquery_table('item')}`
+    WHERE sku IS NOT NULL
+    """
+
+
+PRICING_SOURCE = CachedSource("pricing", ("vendor-item-pricing",), _pricing_sql)
+ITEMS_SOURCE = CachedSource("items", ("item",), _items_sql)
+
+
+def unit_prices(
+    vendor_ids: Iterable,
+    skus: Iterable[str],
+    quantities: Iterable,
+    dates: Iterable,
+    pricing: pd.DataFrame,
+    items: pd.DataFrame,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unit price per request row (vectorized tier lookup).
+
+    Args:
+        vendor_ids: vendors.Id per row (NA when unknown)
+        skus: SKU per row
+        quantities: Quantity per row, matched against min_qty/max_qty
+        dates: Price date per row, matched against effective/expiration dates
+        pricing: vendor-item-pricing rows
+        items: item rows (sku, item_price, build_cost)
+
+    Returns:
+        (unit_price, price_source): price 0 with source 'unpriced' when
+        nothing matches. On overlapping tiers the latest effective_date wins.
+    """
+    df = pd.DataFrame({
+        'vendor_id': pd.to_numeric(pd.Series(vendor_ids), errors='coerce').astype('Int64'),
+        'sku': pd.Series(skus, dtype=object),
+        'qty': np.asarray(quantities),
+        'date': to_days(pd.Series(dates)),
+    })
+    n = len(df)
+    df['row'] = np.arange(n)
+
+    pricing = pricing.assign(
+        vendor_id=pd.to_numeric(pricing['vendor_id'], errors='coerce').astype('Int64'),
+        sku=pricing['sku'].astype(object),
+        min_qty=pd.to_numeric(pricing['min_qty'], errors='coerce'),
+        max_qty=pd.to_numeric(pricing['max_qty'], errors='coerce'),
+        effective_date=to_days(pricing['effective_date']),
+        expiration_date=to_days(pricing['expiration_date']),
+    )
+
+    cand = df.merge(pricing, on=['vendor_id', 'sku'])
+    in_tier = (
+        (cand['min_qty'].isna() | (cand['qty'] >= cand['min_qty']))
+        & (cand['max_qty'].isna() | (cand['qty'] <= cand['max_qty']))
+        & (cand['effective_date'].isna() | (cand['effective_date'] <= cand['date']))
+        & (cand['expiration_date'].isna() | (cand['expiration_date'] >= cand['date']))
+    )
+    best = (
+        cand[in_tier]
+        .sort_values(['row', 'effective_date'], na_position='first', kind='stable')
+        .drop_duplicates('row', keep='last')
+    )
+
+    price = np.full(n, np.nan)
+    price[best['row'].to_numpy()] = best['unit_price'].to_numpy(dtype='float64')
+    source = np.where(~np.isnan(price), 'vendor_pricing', None).astype(object)
+
+    items = items.drop_duplicates('sku').set_index('sku')
+    for column in ('item_price', 'build_cost'):
+        fallback = df['sku'].map(items[column]).to_numpy(dtype='float64', na_value=np.nan)
+        take = np.isnan(price) & ~np.isnan(fallback)
+        price[take] = fallback[take]
+        source[take] = column
+
+    source[np.isnan(price)] = 'unpriced'
+    return np.nan_to_num(price), source
@@ -0,0 +1,313 @@
+"""
+SKU demand forecast → weekly net revenue inflows
+
+The forecast table holds units per month × SKU × platform. RevenueProjection
+turns it into the cash the platforms will pay out, in one vectorized pass:
+
+1. units: forecast_units with forecast_override applied
+2. gross: units × item.sell_price (else the forecast's own revenue per unit)
+3. net: gross × (1 - fee rate - refund rate) for the platform (and SKU)
+4. daily: each month's net spread evenly over its days
+5. cash: every day's sales mapped to its payout date (payment-timing rules, src/timing/rules.py)
+6. weekly: payouts bucketed into forecast weeks by payout date, so sales
+   before the start still count when they are paid out inside the horizon
+
+    >>> projection = RevenueProjection.load(bq)
+    >>> weekly = projection.weekly(start_date=date.today(), weeks=13)
+
+forecast_override rows match on SKU, or on Product (+ Color) when SKU is
+empty, and on Platform unless it is empty. override_type says what is
+overridden ('units', the default, or 'price'); override_calc how:
+'replace' (the default), 'add', 'multiply' or 'percent' (+/- percent). More
+specific overrides win (SKU over product, platform over all platforms).
+
+Fee and refund rates default to the rolling 13-week rates of FeeRates
+(fee_rates.py): per SKU where it has enough sales, else per platform. Pass
+a rate table with platform, optional sku, fee_rate and refund_rate columns
+to use others.
+"""
+
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+from ..timing.business_days import PLATFORM_TIMING_KEYS, to_days
+from ..timing.rules import TimingRules, timing_rules
+from .fee_rates import DEFAULT_WINDOW_WEEKS, FeeRates, rate_lookup
+from .pricing import ITEMS_SOURCE
+from .sources import FORECAST_CACHE_DIR, CachedSource, load_sources
+
+
+OVERRIDE_TYPES = ('units', 'price')
+OVERRIDE_CALCS = ('replace', 'add', 'multiply', 'percent')
+
+
+def _forecast_sql() -> str:
+    return f"""
+    SELECT
+      DATE(month) as month,
+      sku,
+      platform,
+      product,
+      color,
+      forecast_units,
+      forecast_revenue
+    FROM `{config.get_bigquery_table('forecast')}`
+    WHERE month IS NOT NULL
+      AND sku IS NOT NULL
+    """
+
+
+def _overrides_sql() -> str:
+    return f"""
+    SELECT
+      SKU as sku,
+      Product as product,
+      Color as color,
+      Platform as platform,
+      override_value,
+      LOWER(IFNULL(override_type, 'units')) as override_type,
+      LOWER(IFNULL(override_calc, 'replace')) as override_calc
+    FROM `{config.get_bigquery_table('forecast_override')}`
+    WHERE override_value IS NOT NULL
+    """
+
+
+FORECAST_SOURCE = CachedSource("forecast", ("forecast",), _forecast_sql)
+OVERRIDES_SOURCE = CachedSource("forecast_overrides", ("forecast_override",), _overrides_sql)
+
+
+def apply_overrides(forecast: pd.DataFrame, overrides: pd.DataFrame) -> pd.DataFrame:
+    """
+    Forecast rows with overrides applied (vectorized).
+
+    Args:
+        forecast: month, sku, platform, product, color, units, unit_price
+        overrides: sku, product, color, platform, override_value,
+                   override_type, override_calc
+
+    Returns:
+        forecast with units and unit_price overridden, plus an overridden
+        flag. Overrides with an unknown type or calc are ignored.
+    """
+    rows = forecast.assign(row=np.arange(len(forecast)), overridden=False)
+    valid = overrides[overrides['override_type'].isin(OVERRIDE_TYPES) & overrides['override_calc'].isin(OVERRIDE_CALCS)]
+    if valid.empty or rows.empty:
+        return rows.drop(columns='row')
+
+    keys = rows[['row', 'sku', 'platform', 'product', 'color']]
+    by_sku = valid[valid['sku'].notna()].merge(keys, on='sku', suffixes=('', '_row'))
+    by_sku['specificity'] = 2
+    by_product = valid[valid['sku'].isna() & valid['product'].notna()].merge(keys, on='product', suffixes=('', '_row'))
+    by_product = by_product[by_product['color'].isna() | (by_product['color'] == by_product['color_row'])]
+    by_product['specificity'] = 1
+
+    matched = pd.concat([by_sku, by_product], ignore_index=True)
+    matched = matched[matched['platform'].isna() | (matched['platform'] == matched['platform_row'])]
+    matched['specificity'] = matched['specificity'] * 2 + matched['platform'].notna()
+
+    # Most specific override per row and type wins
+    matched = (
+        matched.sort_values(['row', 'override_type', 'specificity'], kind='stable')
+        .drop_duplicates(['row', 'override_type'], keep='last')
+    )
+
+    for override_type, column in (('units', 'units'), ('price', 'unit_price')):
+        o = matched[matched['override_type'] == override_type]
+        idx = o['row'].to_numpy()
+        current = rows[column].to_numpy(dtype='float64')[idx]
+        value = o['override_value'].to_numpy(dtype='float64')
+        calc = o['override_calc'].to_numpy()
+
+        updated = np.select(
+            [calc == 'add', calc == 'multiply', calc == 'percent'],
+            [current + value, current * value, current * (1 + value / 100)],
+            default=value,
+        )
+        values = rows[column].to_numpy(dtype='float64', copy=True)
+        values[idx] = updated
+        rows[column] = values
+        rows.loc[idx, 'overridden'] = True
+
+    return rows.drop(columns='row')
+
+
+class RevenueProjection:
+    """
+    Forecast, overrides, item prices and fee rates for the revenue projection.
+
+    Example:
+        >>> projection = RevenueProjection.load(bq)
+        >>> projection.monthly()  # month × sku × platform units, gross, net
+        >>> projection.weekly(start_date=date.today(), weeks=13)
+    """
+
+    def __init__(
+        self,
+        forecast: pd.DataFrame,
+        overrides: pd.DataFrame,
+        items: pd.DataFrame,
+        rates: pd.DataFrame,
+        timing: Optional[TimingRules] = None,
+    ):
+        """
+        Args:
+            forecast: forecast rows (month, sku, platform, product, color,
+                      forecast_units, forecast_revenue)
+            overrides: forecast_override rows (see apply_overrides)
+            items: item rows (sku, sell_price)
+            rates: platform, optional sku, fee_rate, optional refund_rate
+            timing: Payment-timing rules for payout dates (default: timing_rules())
+        """
+        self.forecast = forecast
+        self.overrides = overrides
+        self.items = items
+        self.rates = rates
+        self.timing = timing or timing_rules()
+        self._monthly: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def load(
+        cls,
+        bq=None,
+        rates: Optional[pd.DataFrame] = None,
+        window_weeks: int = DEFAULT_WINDOW_WEEKS,
+        cache_dir: Path = FORECAST_CACHE_DIR,
+        refresh: bool = False,
+    ) -> "RevenueProjection":
+        """
+        Load inputs from the local cache, re-querying those whose tables changed.
+
+        Args:
+            bq: BigQueryConnector; without one the local copies are used as-is
+            rates: Fee/refund rate table (default: FeeRates for window_weeks)
+            window_weeks: Rolling window of the default rates (4, 13 or 52)
+            cache_dir: Directory of the local copies
+            refresh: Re-query every input even if its tables have not changed
+        """
+        frames, _ = load_sources(bq, [FORECAST_SOURCE, OVERRIDES_SOURCE, ITEMS_SOURCE], cache_dir, refresh=refresh)
+        if rates is None:
+            rates = FeeRates.load(bq, cache_dir, refresh=refresh).rates(window_weeks)
+
+        return cls(frames['forecast'], frames['forecast_overrides'], frames['items'], rates)
+
+    def monthly(self) -> pd.DataFrame:
+        """
+        Units, gross and net revenue per month × SKU × platform (memoized).
+
+        Returns:
+            DataFrame with month, sku, platform, units, unit_price, overridden,
+            gross, fees, refunds, net
+        """
+        if self._monthly is not None:
+            return self._monthly
+
+        f = self.forecast
+        units = pd.to_numeric(f['forecast_units'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        revenue = pd.to_numeric(f['forecast_revenue'], errors='coerce').to_numpy(dtype='float64')
+
+        sell_price = f['sku'].map(self.items.drop_duplicates('sku').set_index('sku')['sell_price'])
+        implied = np.divide(revenue, units, out=np.full(len(f), np.nan), where=units > 0)
+        unit_price = sell_price.to_numpy(dtype='float64', na_value=np.nan)
+        unit_price = np.where(np.isnan(unit_price), implied, unit_price)
+
+        rows = pd.DataFrame({
+            'month': to_days(f['month']).astype('datetime64[M]').astype('datetime64[D]'),
+            'sku': f['sku'].to_numpy(),
+            'platform': f['platform'].to_numpy(),
+            'product': f['product'].to_numpy(),
+            'color': f['color'].to_numpy(),
+            'units': units,
+            'unit_price': np.nan_to_num(unit_price),
+        })
+        rows = apply_overrides(rows, self.overrides)
+
+        gross = rows['units'].to_numpy() * rows['unit_price'].to_numpy()
+        rates = rate_lookup(self.rates, rows['platform'], rows['sku'], ('fee_rate', 'refund_rate'))
+        fees = gross * rates['fee_rate'].to_numpy()
+        refunds = gross * rates['refund_rate'].to_numpy()
+
+        self._monthly = rows.drop(columns=['product', 'color']).assign(
+            gross=gross,
+            fees=fees,
+            refunds=refunds,
+            net=gross - fees - refunds,
+        )
+        return self._monthly
+
+    def daily(self, start_date: Optional[date] = None) -> pd.DataFrame:
+        """
+        Each platform's monthly revenue spread evenly over the month's days,
+        with the payout date of every sales day.
+
+        Args:
+            start_date: Drop sales days before this date
+
+        Returns:
+            DataFrame with sales_date, platform, gross, fees, refunds, net, cash_date
+        """
+        amounts = ['gross', 'fees', 'refunds', 'net']
+        by_month = self.monthly().groupby(['month', 'platform'], as_index=False)[amounts].sum()
+
+        months = by_month['month'].to_numpy(dtype='datetime64[D]')
+        month_len = (
+            (months.astype('datetime64[M]') + 1).astype('datetime64[D]') - months
+        ).astype('int64')
+
+        # One row per month × platform × day
+        rep = np.repeat(np.arange(len(by_month)), month_len)
+        day_offset = np.arange(len(rep)) - np.repeat(np.cumsum(month_len) - month_len, month_len)
+        daily = pd.DataFrame({
+            'sales_date': months[rep] + day_offset.astype('timedelta64[D]'),
+            'platform': by_month['platform'].to_numpy()[rep],
+        })
+        for column in amounts:
+            daily[column] = by_month[column].to_numpy()[rep] / month_len[rep]
+
+        if start_date is not None:
+            daily = daily[daily['sales_date'] >= np.datetime64(start_date, 'D')].reset_index(drop=True)
+
+        daily['cash_date'] = self._cash_dates(daily['platform'], daily['sales_date'].to_numpy())
+        return daily
+
+    def _cash_dates(self, platforms: pd.Series, days: np.ndarray) -> np.ndarray:
+        """Payout date per sales day and platform (platform payout terms in payment_timing.yaml)"""
+        terms = platforms.map(PLATFORM_TIMING_KEYS)
+        cash = days.copy()
+        known = terms.notna().to_numpy()
+        if known.any():
+            cash[known] = self.timing.apply(terms[known], days[known])
+        return cash
+
+    def weekly(self, start_date: date, weeks: int) -> pd.DataFrame:
+        """
+        Net revenue inflows per forecast week and platform (week 1 starts on start_date).
+
+        Every payout landing in the horizon is counted, including those for
+        sales made before start_date that are still pending on it (the
+        current Amazon settlement, the Shopify payouts in transit).
+
+        Returns:
+            DataFrame with week_number, platform, gross, fees, refunds, net
+        """
+        daily = self.daily()
+        days_out = (daily['cash_date'].to_numpy(dtype='datetime64[D]') - np.datetime64(start_date, 'D')).astype('int64')
+        daily['week_number'] = days_out // 7 + 1
+        daily = daily[(days_out >= 0) & (daily['week_number'] <= weeks)]
+
+        return daily.groupby(['week_number', 'platform'], as_index=False)[['gross', 'fees', 'refunds', 'net']].sum()
+
+    def status(self) -> Dict[str, object]:
+        """Forecast coverage: months (and the first), SKUs, overridden rows and rows with no price"""
+        monthly = self.monthly()
+        return {
+            'months': int(monthly['month'].nunique()),
+            'first_month': monthly['month'].min().date() if len(monthly) else None,
+            'skus': int(monthly['sku'].nunique()),
+            'overridden_rows': int(monthly['overridden'].sum()),
+            'unpriced_rows': int(((monthly['unit_price'] == 0) & (monthly['units'] > 0)).sum()),
+        }
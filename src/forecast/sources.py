@@ -0,0 +1,100 @@
+"""
+Locally cached warehouse inputs for the forecast stages
+
+Forecast stages read small reference tables (open PO lines, pricing, items,
+BOMs, the demand forecast) on every run. Each input is a query plus the
+tables it reads; the result is kept as Parquet under
+data/processed/forecast_inputs and re-queried only when one of those tables'
+last-modified time in BigQuery (or the query itself) changes.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from ..config import PROCESSED_DATA_DIR
+from ..data.files import atomic_write, cache_lock
+
+
+FORECAST_CACHE_DIR = PROCESSED_DATA_DIR / "forecast_inputs"
+MANIFEST_FILE = "_manifest.json"
+
+
+@dataclass
+class CachedSource:
+    """A forecast input and the tables it is read from"""
+
+    name: str
+    tables: Tuple[str, ...]
+    sql: Callable[[], str]
+
+
+def _save(cache_dir: Path, name: str, df: pd.DataFrame, modified: Dict[str, str]) -> Dict[str, Any]:
+    atomic_write(cache_dir / f"{name}.parquet", lambda path: df.to_parquet(path, index=False))
+    return {
+        "modified": modified,
+        "rows": len(df),
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def load_sources(
+    bq,
+    sources: Iterable[CachedSource],
+    cache_dir: Path = FORECAST_CACHE_DIR,
+    refresh: bool = False,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Optional[pd.DataFrame]]]:
+    """
+    Load inputs, re-querying only those whose tables changed.
+
+    Args:
+        bq: BigQueryConnector; without one the local copies are used as-is
+        sources: Inputs to load
+        cache_dir: Directory of the local copies
+        refresh: Re-query every input even if its tables have not changed
+
+    Returns:
+        (frames, replaced): data per input name, and for each input that was
+        re-queried the previous local copy (None on first load), for diffing
+
+    Raises:
+        FileNotFoundError: An input has no local copy and there is no connector
+    """
+    cache_dir = Path(cache_dir)
+    manifest_path = cache_dir / MANIFEST_FILE
+    frames: Dict[str, pd.DataFrame] = {}
+    replaced: Dict[str, Optional[pd.DataFrame]] = {}
+
+    # Concurrent forecast runs share the cache: the manifest is read and
+    # written under one lock, so one run re-queries a stale input and the
+    # others wait and reuse its copy
+    with cache_lock(cache_dir):
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+        for source in sources:
+            path = cache_dir / f"{source.name}.parquet"
+            cached = pd.read_parquet(path) if path.exists() else None
+
+            if bq is not None:
+                sql = source.sql()
+                modified = {t: bq.get_table_modified(t).isoformat() for t in source.tables}
+                modified["query"] = hashlib.md5(sql.encode()).hexdigest()
+                if refresh or cached is None or manifest.get(source.name, {}).get("modified") != modified:
+                    frames[source.name] = bq.query(sql)
+                    replaced[source.name] = cached
+                    manifest[source.name] = _save(cache_dir, source.name, frames[source.name], modified)
+                    continue
+
+            if cached is None:
+                raise FileNotFoundError(f"No {source.name} cache at {cache_dir}; load once with a BigQuery connector")
+            frames[source.name] = cached
+
+        if replaced:
+            atomic_write(manifest_path, lambda p: p.write_text(json.dumps(manifest, indent=2)))
+
+    return frames, replaced
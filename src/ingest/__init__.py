@@ -0,0 +1,21 @@
+"""Ingesters for platform settlement and payout reports"""
+
+from .amazon_settlement import (
+    SettlementHeader,
+    iter_settlement_batches,
+    read_settlement_header,
+    summarize_settlement,
+)
+from .schemas import DEPOSITS_SCHEMA
+from .shopify_payouts import aggregate_payouts, payouts_to_cash_transactions, read_payout_reports
+
+__all__ = [
+    "DEPOSITS_SCHEMA",
+    "SettlementHeader",
+    "aggregate_payouts",
+    "iter_settlement_batches",
+    "payouts_to_cash_transactions",
+    "read_payout_reports",
+    "read_settlement_header",
+    "summarize_settlement",
+]
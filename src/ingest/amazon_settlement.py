@@ -0,0 +1,288 @@
+"""
+Amazon settlement flat file parser
+
+Amazon's V2 settlement report is a tab-separated file: a header row with
+the settlement totals (settlement-id, start/end/deposit dates, total-amount)
+followed by one row per amount line item. The file is read in fixed-size
+byte blocks cut at the last newline (the partial line is carried into the
+next block), each block is parsed with Arrow's CSV reader and mapped to the
+`deposits` schema with Arrow compute kernels, so memory stays bounded by the
+block size whatever the size of the report.
+
+Each line item becomes one deposits row with its amount placed in the
+matching column (product_sales, selling_fees, ...) and repeated in `total`,
+so SUM() over a settlement reproduces the deposited amount.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as csv
+
+from .schemas import DEPOSIT_AMOUNT_COLUMNS, DEPOSITS_SCHEMA
+
+
+# Bytes per parsed block (upper bound on rows held in memory at once)
+DEFAULT_BLOCK_SIZE = 16 * 1024**2
+
+# Every column is typed up front: the streaming reader would otherwise infer
+# types from the first block and fail on later blocks (e.g. adjustment-id is
+# empty until the first reimbursement).
+_COLUMN_TYPES = {
+    "settlement-id": pa.int64(),
+    "settlement-start-date": pa.timestamp("s"),
+    "settlement-end-date": pa.timestamp("s"),
+    "deposit-date": pa.timestamp("s"),
+    "total-amount": pa.float64(),
+    "currency": pa.string(),
+    "transaction-type": pa.string(),
+    "order-id": pa.string(),
+    "merchant-order-id": pa.string(),
+    "adjustment-id": pa.string(),
+    "shipment-id": pa.string(),
+    "marketplace-name": pa.string(),
+    "amount-type": pa.string(),
+    "amount-description": pa.string(),
+    "amount": pa.float64(),
+    "fulfillment-id": pa.string(),
+    "posted-date": pa.date32(),
+    "posted-date-time": pa.timestamp("s"),
+    "order-item-code": pa.string(),
+    "merchant-order-item-id": pa.string(),
+    "merchant-adjustment-item-id": pa.string(),
+    "sku": pa.string(),
+    "quantity-purchased": pa.int64(),
+    "promotion-id": pa.string(),
+}
+
+# Amazon writes "2026-02-21 06:26:19 UTC"; older reports use ISO 8601
+_TIMESTAMP_PARSERS = ["%Y-%m-%d %H:%M:%S UTC", csv.ISO8601]
+
+# (deposits column, amount-type, amount-descriptions or None for any).
+# First match wins; anything unmatched lands in `other`.
+AMOUNT_COLUMN_RULES: List[Tuple[str, str, Optional[List[str]]]] = [
+    ("product_sales", "ItemPrice", ["Principal"]),
+    ("product_sales_tax", "ItemPrice", ["Tax"]),
+    ("shipping_credits", "ItemPrice", ["Shipping"]),
+    ("shipping_credits_tax", "ItemPrice", ["ShippingTax"]),
+    ("gift_wrap_credits", "ItemPrice", ["GiftWrap"]),
+    ("gift_wrap_credits_tax", "ItemPrice", ["GiftWrapTax"]),
+    ("regulatory_fee", "ItemPrice", ["RegulatoryFee"]),
+    ("regulatory_fee_tax", "ItemPrice", ["RegulatoryFeeTax"]),
+    ("promotional_rebate_tax", "Promotion", ["TaxDiscount"]),
+    ("promotional_rebates", "Promotion", None),
+    ("marketplace_tax", "ItemWithheldTax", None),
+    ("selling_fees", "ItemFees", ["Commission", "RefundCommission", "VariableClosingFee", "FixedClosingFee"]),
+    ("fba_fees", "ItemFees", ["FBAPerUnitFulfillmentFee", "FBAPerOrderFulfillmentFee", "FBAWeightBasedFee"]),
+    ("other_transaction_fees", "ItemFees", None),
+]
+
+# Settlement transaction-type → deposits.type (as in the date range report)
+TRANSACTION_TYPES = {
+    "Order": "Order",
+    "Refund": "Refund",
+    "ServiceFee": "Service Fee",
+    "other-transaction": "Adjustment",
+}
+
+FULFILLMENT_CHANNELS = {
+    "AFN": "Amazon",
+    "MFN": "Seller",
+}
+
+
+@dataclass
+class SettlementHeader:
+    """Totals row at the top of a settlement report"""
+
+    settlement_id: int
+    start_date: datetime
+    end_date: datetime
+    deposit_date: datetime
+    total_amount: float
+    currency: str
+
+
+def _parse_block(data: bytes, column_names: List[str]) -> pa.Table:
+    """Parse a block of whole lines with every column typed"""
+    return csv.read_csv(
+        pa.py_buffer(data),
+        read_options=csv.ReadOptions(column_names=column_names),
+        # Flat files are unquoted; descriptions may contain stray quotes
+        parse_options=csv.ParseOptions(delimiter="\t", quote_char=False),
+        convert_options=csv.ConvertOptions(
+            column_types=_COLUMN_TYPES,
+            timestamp_parsers=_TIMESTAMP_PARSERS,
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def _open_report(path: Union[str, Path], block_size: int) -> Iterator[pa.RecordBatch]:
+    """
+    Raw typed batches from a report, block_size bytes of whole lines at a time.
+
+    Blocks are cut here rather than by Arrow's streaming reader, which reads
+    ahead without bound and buffers most of a large file before the first
+    batch is consumed.
+    """
+    with open(path, "rb") as f:
+        column_names = f.readline().decode("utf-8").rstrip("\r\n").split("\t")
+        carry = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            data = carry + block
+            cut = data.rfind(b"\n") + 1
+            data, carry = data[:cut], data[cut:]
+            if data:
+                yield from _parse_block(data, column_names).to_batches()
+        if carry.strip():
+            yield from _parse_block(carry, column_names).to_batches()
+
+
+def _utc(value) -> Optional[datetime]:
+    return value.replace(tzinfo=timezone.utc) if value is not None else None
+
+
+def read_settlement_header(path: Union[str, Path]) -> SettlementHeader:
+    """
+    Read only the settlement totals row (the first rows of the file).
+
+    Raises:
+        ValueError: If the file has no settlement header row
+    """
+    for batch in _open_report(path, block_size=64 * 1024):
+        header_rows = batch.filter(pc.is_valid(batch.column("total-amount")))
+        if header_rows.num_rows:
+            row = header_rows.slice(0, 1).to_pylist()[0]
+            return SettlementHeader(
+                settlement_id=row["settlement-id"],
+                start_date=_utc(row["settlement-start-date"]),
+                end_date=_utc(row["settlement-end-date"]),
+                deposit_date=_utc(row["deposit-date"]),
+                total_amount=row["total-amount"],
+                currency=row["currency"],
+            )
+
+    raise ValueError(f"No settlement header row in {path}")
+
+
+def _map_values(values: pa.Array, mapping: Dict[str, str]) -> pa.Array:
+    """Vectorized dict lookup; values without a mapping pass through"""
+    index = pc.index_in(values, value_set=pa.array(list(mapping)))
+    return pc.coalesce(pa.array(list(mapping.values())).take(index), values)
+
+
+def _to_deposits(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """Map one block of settlement line items to the deposits schema"""
+    amount = pc.fill_null(batch.column("amount"), 0.0)
+    amount_type = batch.column("amount-type")
+    description = batch.column("amount-description")
+
+    amounts = {}
+    assigned = pa.array([False] * batch.num_rows)
+    for column, type_value, descriptions in AMOUNT_COLUMN_RULES:
+        mask = pc.equal(amount_type, type_value)
+        if descriptions is not None:
+            mask = pc.and_(mask, pc.is_in(description, value_set=pa.array(descriptions)))
+        mask = pc.and_not(pc.fill_null(mask, False), assigned)
+        amounts[column] = pc.if_else(mask, amount, 0.0)
+        assigned = pc.or_(assigned, mask)
+    amounts["other"] = pc.if_else(assigned, 0.0, amount)
+    amounts["total"] = amount
+
+    # Quantity repeats on every line of an order item; count it once
+    is_principal = pc.fill_null(
+        pc.and_(pc.equal(amount_type, "ItemPrice"), pc.equal(description, "Principal")), False
+    )
+
+    # Fall back to posted-date (midnight UTC) when there is no time
+    date_time = pc.coalesce(
+        batch.column("posted-date-time").cast(pa.timestamp("us", tz="UTC")),
+        batch.column("posted-date").cast(pa.timestamp("us")).cast(pa.timestamp("us", tz="UTC")),
+    )
+
+    n = batch.num_rows
+    null_strings = pa.nulls(n, pa.string())
+    columns = {
+        "platform": pa.array(["Amazon"] * n, pa.string()),
+        "date_time": date_time,
+        "settlement_id": batch.column("settlement-id"),
+        "type": _map_values(batch.column("transaction-type"), TRANSACTION_TYPES),
+        "order_id": batch.column("order-id"),
+        "sku": batch.column("sku"),
+        "description": description,
+        "quantity": pc.if_else(is_principal, batch.column("quantity-purchased"), pa.nulls(n, pa.int64())),
+        "marketplace": batch.column("marketplace-name"),
+        "account_type": null_strings,
+        "fulfillment": _map_values(batch.column("fulfillment-id"), FULFILLMENT_CHANNELS),
+        "order_city": null_strings,
+        "order_state": null_strings,
+        "order_postal": null_strings,
+        "tax_collection_model": null_strings,
+        **{name: amounts[name] for name in DEPOSIT_AMOUNT_COLUMNS},
+    }
+
+    return pa.RecordBatch.from_arrays(
+        [columns[field.name] for field in DEPOSITS_SCHEMA],
+        schema=DEPOSITS_SCHEMA,
+    )
+
+
+def iter_settlement_batches(
+    path: Union[str, Path],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Stream a settlement report as deposits-shaped record batches.
+
+    Args:
+        path: Settlement flat file (tab-separated .txt)
+        block_size: Bytes parsed per batch
+
+    Yields:
+        pa.RecordBatch with DEPOSITS_SCHEMA, one row per line item
+        (the settlement header row is excluded)
+    """
+    for batch in _open_report(path, block_size):
+        line_items = batch.filter(pc.is_valid(batch.column("transaction-type")))
+        if line_items.num_rows:
+            yield _to_deposits(line_items)
+
+
+def summarize_settlement(
+    path: Union[str, Path],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Dict:
+    """
+    Stream a report once and reconcile line items to the header total.
+
+    Returns:
+        Dict with header, rows, line_item_total, difference and
+        totals by deposits type
+    """
+    header = read_settlement_header(path)
+
+    rows = 0
+    line_item_total = 0.0
+    by_type: Dict[str, float] = {}
+    for batch in iter_settlement_batches(path, block_size):
+        rows += batch.num_rows
+        line_item_total += pc.sum(batch.column("total")).as_py() or 0.0
+        grouped = pa.table(batch).group_by("type").aggregate([("total", "sum")])
+        for type_value, amount in zip(grouped.column("type").to_pylist(), grouped.column("total_sum").to_pylist()):
+            by_type[type_value] = by_type.get(type_value, 0.0) + amount
+
+    return {
+        'header': header,
+        'rows': rows,
+        'line_item_total': round(line_item_total, 2),
+        'difference': round(header.total_amount - line_item_total, 2) + 0.0,  # no -0.0
+        'by_type': {k: round(v, 2) for k, v in by_type.items()},
+    }
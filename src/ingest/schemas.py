@@ -0,0 +1,50 @@
+"""
+Arrow schemas for source tables produced by the ingesters
+
+Kept in step with database/bigquery_entity_map.csv so batches can be loaded
+into BigQuery (or written to Parquet) without a cast.
+"""
+
+import pyarrow as pa
+
+
+# Settlement amount columns of `deposits`, in table order
+DEPOSIT_AMOUNT_COLUMNS = [
+    "product_sales",
+    "product_sales_tax",
+    "shipping_credits",
+    "shipping_credits_tax",
+    "gift_wrap_credits",
+    "gift_wrap_credits_tax",
+    "regulatory_fee",
+    "regulatory_fee_tax",
+    "promotional_rebates",
+    "promotional_rebate_tax",
+    "marketplace_tax",
+    "selling_fees",
+    "fba_fees",
+    "other_transaction_fees",
+    "other",
+    "total",
+]
+
+DEPOSITS_SCHEMA = pa.schema(
+    [
+        ("platform", pa.string()),
+        ("date_time", pa.timestamp("us", tz="UTC")),
+        ("settlement_id", pa.int64()),
+        ("type", pa.string()),
+        ("order_id", pa.string()),
+        ("sku", pa.string()),
+        ("description", pa.string()),
+        ("quantity", pa.int64()),
+        ("marketplace", pa.string()),
+        ("account_type", pa.string()),
+        ("fulfillment", pa.string()),
+        ("order_city", pa.string()),
+        ("order_state", pa.string()),
+        ("order_postal", pa.string()),
+        ("tax_collection_model", pa.string()),
+    ]
+    + [(name, pa.float64()) for name in DEPOSIT_AMOUNT_COLUMNS]
+)
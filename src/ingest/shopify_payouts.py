@@ -0,0 +1,211 @@
+"""
+Shopify payout report ingester
+
+Shopify's payout export has one row per charge, refund or adjustment with
+its Payout ID and Payout Date. Files are parsed in chunks (one process per
+file), reduced to the few columns needed, de-duplicated across overlapping
+exports and aggregated to one cash event per payout, which maps directly
+onto a cash_transactions row.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..etl.cash import CASH_TRANSACTION_COLUMNS
+from ..etl.deposits import SHOPIFY_PAYOUTS_TABLE
+
+
+SOURCE_TABLE = SHOPIFY_PAYOUTS_TABLE
+
+# Rows parsed per chunk
+DEFAULT_CHUNKSIZE = 250_000
+
+_USECOLS = [
+    "Transaction Date", "Type", "Order", "Checkout", "Payout Status",
+    "Payout Date", "Payout ID", "Amount", "Fee", "Net", "Currency",
+]
+
+_DTYPES = {
+    "Transaction Date": "string",
+    "Type": "string",
+    "Order": "string",
+    "Checkout": "string",
+    "Payout Status": "string",
+    "Payout Date": "string",
+    "Payout ID": "string",  # Numeric but too wide to trust as a float
+    "Amount": "float64",
+    "Fee": "float64",
+    "Net": "float64",
+    "Currency": "string",
+}
+
+# Columns that identify one report row, used to drop rows repeated in
+# overlapping exports
+_ROW_KEY = ["Transaction Date", "Type", "Order", "Checkout", "Amount", "Fee"]
+
+# Payout statuses from most to least final. A row repeated across exports
+# keeps its most final copy (an older export still says in_transit for a
+# payout a newer one shows as paid).
+PAYOUT_STATUS_RANK = {"paid": 0, "in_transit": 1, "scheduled": 2}
+
+
+def _read_transactions(path: Union[str, Path], chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """Parse one payout export into a compact, UTC-normalized transaction frame"""
+    parts = []
+    for chunk in pd.read_csv(path, usecols=_USECOLS, dtype=_DTYPES, chunksize=chunksize):
+        # Charges not yet assigned to a payout have no cash event yet
+        chunk = chunk[chunk["Payout ID"].notna()]
+        if chunk.empty:
+            continue
+
+        parts.append(pd.DataFrame({
+            "row_hash": pd.util.hash_pandas_object(chunk[_ROW_KEY], index=False).to_numpy(),
+            "payout_id": chunk["Payout ID"].to_numpy(),
+            "payout_date": pd.to_datetime(chunk["Payout Date"], format="%Y-%m-%d").to_numpy(),
+            "payout_status": chunk["Payout Status"].to_numpy(),
+            "transaction_ts": pd.to_datetime(chunk["Transaction Date"], format="%Y-%m-%d %H:%M:%S %z", utc=True),
+            "type": chunk["Type"].to_numpy(),
+            "currency": chunk["Currency"].to_numpy(),
+            "amount": chunk["Amount"].to_numpy(),
+            "fee": chunk["Fee"].to_numpy(),
+            "net": chunk["Net"].to_numpy(),
+        }))
+
+    if not parts:
+        return pd.DataFrame(columns=["row_hash", "payout_id", "payout_date", "payout_status",
+                                     "transaction_ts", "type", "currency", "amount", "fee", "net"])
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def aggregate_payouts(transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate per-transaction rows to one row per payout.
+
+    Returns:
+        DataFrame with payout_id, payout_date, payout_status, currency,
+        transactions, charges, refunds, gross, refund_amount, fees, net,
+        first_transaction_ts, last_transaction_ts
+    """
+    tx = transactions.assign(
+        is_charge=(transactions["type"] == "charge").astype(int),
+        is_refund=(transactions["type"] == "refund").astype(int),
+        refund_amount=np.where(transactions["type"] == "refund", transactions["amount"], 0.0),
+    )
+
+    payouts = tx.groupby(["payout_id", "payout_date"], as_index=False, sort=False).agg(
+        payout_status=("payout_status", "last"),
+        currency=("currency", "first"),
+        transactions=("row_hash", "size"),
+        charges=("is_charge", "sum"),
+        refunds=("is_refund", "sum"),
+        gross=("amount", "sum"),
+        refund_amount=("refund_amount", "sum"),
+        fees=("fee", "sum"),
+        net=("net", "sum"),
+        first_transaction_ts=("transaction_ts", "min"),
+        last_transaction_ts=("transaction_ts", "max"),
+    )
+
+    for col in ["gross", "refund_amount", "fees", "net"]:
+        payouts[col] = payouts[col].round(2)
+
+    return payouts.sort_values("payout_date", ignore_index=True)
+
+
+def read_payout_reports(
+    paths: Iterable[Union[str, Path]],
+    include_pending: bool = False,
+    max_workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """
+    Parse payout exports in parallel and aggregate them to payouts.
+
+    Args:
+        paths: Payout report CSVs (overlapping date ranges are fine)
+        include_pending: Also include payouts not yet paid (scheduled payout date)
+        max_workers: Processes to parse with (default: one per file, up to CPU count)
+        chunksize: Rows per parsed chunk
+
+    Returns:
+        DataFrame from aggregate_payouts()
+    """
+    paths = [Path(p) for p in paths]
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_read_transactions, paths, repeat(chunksize)))
+    else:
+        frames = [_read_transactions(p, chunksize) for p in paths]
+
+    transactions = pd.concat(frames, ignore_index=True)
+    rank = transactions["payout_status"].map(PAYOUT_STATUS_RANK).fillna(len(PAYOUT_STATUS_RANK))
+    transactions = (transactions.iloc[np.argsort(rank.to_numpy(), kind="stable")]
+                    .drop_duplicates("row_hash"))
+    if not include_pending:
+        transactions = transactions[transactions["payout_status"] == "paid"]
+
+    return aggregate_payouts(transactions)
+
+
+def payouts_to_cash_transactions(payouts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map payouts to cash_transactions rows (one net inflow per payout).
+
+    transaction_id is MD5('shopify_payouts:' || payout_id), the same
+    deterministic scheme the SQL pipelines use, so reloading a payout updates
+    it in place.
+    """
+    now = pd.Timestamp.now(tz="UTC")
+    payout_id = payouts["payout_id"].astype(str)
+    cash_date = pd.to_datetime(payouts["payout_date"]).dt.date
+    is_paid = payouts["payout_status"] == "paid"
+
+    rows = pd.DataFrame({
+        "transaction_id": [hashlib.md5(f"{SOURCE_TABLE}:{pid}".encode()).hexdigest() for pid in payout_id],
+        "transaction_date": payouts["last_transaction_ts"].dt.date,
+        "cash_date": cash_date,
+        "value_date": cash_date,
+        "source_system": "shopify",
+        "source_id": payout_id,
+        "source_table": SOURCE_TABLE,
+        "bank_account_id": "frost_checking",
+        "bank_account_name": "VoChill Checking",
+        "cash_flow_section": "Operating",
+        "cash_flow_category": "Revenue - Shopify",
+        "cash_flow_subcategory": "Ecommerce Revenue",
+        "amount": payouts["net"],
+        "currency": payouts["currency"].fillna("USD"),
+        "counterparty": "Shopify",
+        "counterparty_type": "Platform",
+        "description": (
+            "Shopify Payout " + payout_id
+            + " (" + payouts["charges"].astype(str) + " charges, "
+            + payouts["refunds"].astype(str) + " refunds)"
+            + np.where(is_paid, "", " [" + payouts["payout_status"].astype(str) + "]")
+        ),
+        "notes": (
+            "Gross: $" + payouts["gross"].map("{:.2f}".format)
+            + ", Fees: $" + payouts["fees"].abs().map("{:.2f}".format)
+            + ", Net: $" + payouts["net"].map("{:.2f}".format)
+        ),
+        "is_forecast": False,
+        "is_recurring": False,
+        "recurring_id": None,
+        "scenario_id": None,
+        "tags": [["Shopify", "ecommerce", "revenue"] for _ in range(len(payouts))],
+        "created_at": now,
+        "updated_at": now,
+        "created_by": "ingest_shopify_payouts",
+    })
+
+    return rows[CASH_TRANSACTION_COLUMNS]
@@ -18,7 +18,14 @@ WITH fee_details AS (
   SELECT
     platform,
     DATE(date_time) as transaction_date,
-    DATE_ADD(DATE(date_time), INTERVAL 2 DAY) as estimated_cash_date,
+    COALESCE(
+      CASE platform
+        WHEN 'Amazon' THEN cal.amazon_payout_date
+        WHEN 'Shopify' THEN cal.shopify_payout_date
+        WHEN 'TikTok' THEN cal.tiktok_payout_date
+      END,
+      DATE_ADD(DATE(date_time), INTERVAL 2 DAY)  -- Outside the calendar range
+    ) as estimated_cash_date,
     settlement_id,
     order_id,
     sku,
@@ -36,6 +43,7 @@ WITH fee_details AS (
     ABS(selling_fees) + ABS(fba_fees) + ABS(other_transaction_fees) as total_fees
 
   FROM `{project_id}.{dataset}.fees`
+  LEFT JOIN `{project_id}.{dataset}.business_calendar` cal ON cal.calendar_date = DATE(date_time)
   WHERE DATE(date_time) BETWEEN '{start_date}' AND '{end_date}'
 ),
 
@@ -18,7 +18,14 @@ WITH
 -- Operating Inflows: Revenue from deposits (net proceeds)
 operating_inflows AS (
   SELECT
-    DATE_ADD(DATE(date_time), INTERVAL 2 DAY) as cash_date,
+    COALESCE(
+      CASE platform
+        WHEN 'Amazon' THEN cal.amazon_payout_date
+        WHEN 'Shopify' THEN cal.shopify_payout_date
+        WHEN 'TikTok' THEN cal.tiktok_payout_date
+      END,
+      DATE_ADD(DATE(date_time), INTERVAL 2 DAY)  -- Outside the calendar range
+    ) as cash_date,
     platform,
     'Operating Inflows' as cash_flow_section,
     CASE
@@ -29,6 +36,7 @@ operating_inflows AS (
     END as cash_flow_category,
     SUM(total) as cash_amount
   FROM `{project_id}.{dataset}.deposits`
+  LEFT JOIN `{project_id}.{dataset}.business_calendar` cal ON cal.calendar_date = DATE(date_time)
   WHERE DATE(date_time) BETWEEN '{start_date}' AND '{end_date}'
   GROUP BY cash_date, platform
 ),
@@ -36,12 +44,20 @@ operating_inflows AS (
 -- Operating Outflows: Refunds (reduce revenue)
 refunds AS (
   SELECT
-    DATE_ADD(DATE(date_time), INTERVAL 2 DAY) as cash_date,
+    COALESCE(
+      CASE platform
+        WHEN 'Amazon' THEN cal.amazon_payout_date
+        WHEN 'Shopify' THEN cal.shopify_payout_date
+        WHEN 'TikTok' THEN cal.tiktok_payout_date
+      END,
+      DATE_ADD(DATE(date_time), INTERVAL 2 DAY)  -- Outside the calendar range
+    ) as cash_date,
     platform,
     'Operating Inflows' as cash_flow_section,
     'Refunds' as cash_flow_category,
     SUM(total) as cash_amount  -- Typically negative
   FROM `{project_id}.{dataset}.refunds`
+  LEFT JOIN `{project_id}.{dataset}.business_calendar` cal ON cal.calendar_date = DATE(date_time)
   WHERE DATE(date_time) BETWEEN '{start_date}' AND '{end_date}'
   GROUP BY cash_date, platform
 ),
@@ -3,7 +3,10 @@
 -- This query identifies open purchase orders that represent
 -- future cash outflow commitments.
 --
--- Used for forward-looking cash planning.
+-- Used for forward-looking cash planning. The forecast itself projects open
+-- PO lines with vendor lead times and tiered vendor pricing in
+-- src/forecast/commitments.py; this query keeps the flat 30-day assumption
+-- for ad-hoc review.
 --
 -- Parameters to replace:
 --   {start_date} - Start date filter (YYYY-MM-DD)
@@ -11,7 +11,14 @@ WITH refund_details AS (
   SELECT
     platform,
     DATE(date_time) as transaction_date,
-    DATE_ADD(DATE(date_time), INTERVAL 2 DAY) as estimated_cash_date,
+    COALESCE(
+      CASE platform
+        WHEN 'Amazon' THEN cal.amazon_payout_date
+        WHEN 'Shopify' THEN cal.shopify_payout_date
+        WHEN 'TikTok' THEN cal.tiktok_payout_date
+      END,
+      DATE_ADD(DATE(date_time), INTERVAL 2 DAY)  -- Outside the calendar range
+    ) as estimated_cash_date,
     settlement_id,
     order_id,
     sku,
@@ -32,6 +39,7 @@ WITH refund_details AS (
     total as net_refund_impact
 
   FROM `{project_id}.{dataset}.refunds`
+  LEFT JOIN `{project_id}.{dataset}.business_calendar` cal ON cal.calendar_date = DATE(date_time)
   WHERE DATE(date_time) BETWEEN '{start_date}' AND '{end_date}'
 ),
 
@@ -17,7 +17,14 @@ WITH deposits_with_dates AS (
     -- For Amazon: use settlement_id pattern to infer deposit date
     -- For Shopify: date_time is already close to payout date
     -- TODO: Join to actual payout/settlement tables for precise dates
-    DATE_ADD(DATE(date_time), INTERVAL 2 DAY) as estimated_cash_date,
+    COALESCE(
+      CASE platform
+        WHEN 'Amazon' THEN cal.amazon_payout_date
+        WHEN 'Shopify' THEN cal.shopify_payout_date
+        WHEN 'TikTok' THEN cal.tiktok_payout_date
+      END,
+      DATE_ADD(DATE(date_time), INTERVAL 2 DAY)  -- Outside the calendar range
+    ) as estimated_cash_date,
     order_id,
     sku,
     description,
@@ -47,6 +54,7 @@ WITH deposits_with_dates AS (
     total as net_proceeds
 
   FROM `{project_id}.{dataset}.deposits`
+  LEFT JOIN `{project_id}.{dataset}.business_calendar` cal ON cal.calendar_date = DATE(date_time)
   WHERE DATE(date_time) BETWEEN '{start_date}' AND '{end_date}'
 ),
 
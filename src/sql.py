@@ -0,0 +1,26 @@
+"""Small helpers for building BigQuery SQL literals"""
+
+from datetime import date
+from typing import Union
+
+import pandas as pd
+
+
+def string_literal(value: str) -> str:
+    """Render a value as a quoted BigQuery STRING literal"""
+    escaped = str(value).replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n')
+    return f"'{escaped}'"
+
+
+def timestamp_literal(value: Union[str, pd.Timestamp]) -> str:
+    """Render a value as a UTC BigQuery TIMESTAMP literal (naive values are treated as UTC)"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+
+    return f"TIMESTAMP('{ts.tz_convert('UTC').strftime('%Y-%m-%d %H:%M:%S.%f')}+00')"
+
+
+def date_literal(value: Union[str, date, pd.Timestamp]) -> str:
+    """Render a value as a BigQuery DATE literal"""
+    return f"DATE('{pd.Timestamp(value).strftime('%Y-%m-%d')}')"
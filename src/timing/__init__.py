@@ -0,0 +1,7 @@
+"""Cash timing rules: business days, holidays, payout calendars and vendor payment lags"""
+
+from .business_days import BusinessCalendar, payout_rules, us_bank_holidays
+from .rules import TimingRules, timing_rules
+from .vendor_lags import PaymentLagModel
+
+__all__ = ["BusinessCalendar", "payout_rules", "us_bank_holidays", "TimingRules", "timing_rules", "PaymentLagModel"]
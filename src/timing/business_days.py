@@ -0,0 +1,331 @@
+"""
+Business-day calendar for cash timing
+
+Payout timing from payment_timing.yaml and the US bank (Federal Reserve)
+holiday schedule are compiled once into numpy business-day calendars, so
+cash dates for millions of rows are computed with np.busday_offset instead
+of per-row date loops:
+
+    >>> cal = BusinessCalendar()
+    >>> cal.cash_dates("Shopify", orders["order_date"])
+
+The same rules are exported as the business_calendar date dimension
+(date_dimension), which the SQL transforms join to for payout dates.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import config
+
+
+# payment_timing.yaml revenue_timing entry for each platform
+PLATFORM_TIMING_KEYS = {
+    'Amazon': 'amazon_settlement',
+    'Shopify': 'shopify_payout',
+    'TikTok': 'tiktok_payout',
+}
+
+# Used for a known platform whose payout lag is not documented yet
+DEFAULT_PAYOUT_LAG_DAYS = 2
+
+# Monday-Friday, in numpy weekmask order
+BUSINESS_WEEKMASK = "1111100"
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Federal Reserve holidays: (name, month, day) for fixed dates,
+# (name, month, weekday, n) for the nth weekday of a month (n=-1: last)
+FIXED_HOLIDAYS = [
+    ("New Year's Day", 1, 1),
+    ("Juneteenth", 6, 19),
+    ("Independence Day", 7, 4),
+    ("Veterans Day", 11, 11),
+    ("Christmas Day", 12, 25),
+]
+FLOATING_HOLIDAYS = [
+    ("Martin Luther King Jr. Day", 1, "Mon", 3),
+    ("Presidents Day", 2, "Mon", 3),
+    ("Memorial Day", 5, "Mon", -1),
+    ("Labor Day", 9, "Mon", 1),
+    ("Columbus Day", 10, "Mon", 2),
+    ("Thanksgiving Day", 11, "Thu", 4),
+]
+
+# Juneteenth became a Federal Reserve holiday in 2022
+JUNETEENTH_FIRST_YEAR = 2022
+
+DateLike = Union[str, date, np.datetime64, pd.Timestamp]
+Dates = Union[DateLike, Iterable[DateLike], pd.Series, np.ndarray]
+
+
+def to_days(dates: Dates) -> np.ndarray:
+    """Any scalar/array/Series of dates as a datetime64[D] array (NaT kept)"""
+    if isinstance(dates, (pd.Series, pd.Index)):
+        values = pd.DatetimeIndex(dates)
+        if values.tz is not None:
+            values = values.tz_localize(None)
+        return values.to_numpy(dtype="datetime64[D]")
+
+    return np.atleast_1d(np.asarray(dates, dtype="datetime64[D]"))
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    """Monday=0 … Sunday=6 for a datetime64[D] array"""
+    # 1970-01-01 was a Thursday
+    return (days.astype("int64") + 3) % 7
+
+
+def us_bank_holidays(start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Federal Reserve holidays (observed dates) for a range of years.
+
+    A holiday on a Sunday is observed the following Monday. One on a
+    Saturday is not moved - banks stay open the Friday before.
+
+    Returns:
+        DataFrame with holiday_date (datetime64), holiday_name, sorted by date
+    """
+    years = np.arange(start_year, end_year + 1)
+    # January of each year, as months since the epoch
+    months = (years - 1970) * 12
+    frames = []
+
+    for name, month, day in FIXED_HOLIDAYS:
+        if name == "Juneteenth":
+            keep = years >= JUNETEENTH_FIRST_YEAR
+        else:
+            keep = np.ones(len(years), dtype=bool)
+        days = (months[keep] + month - 1).astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+        days = days + (_weekday(days) == 6)  # Sunday → Monday
+        frames.append(pd.DataFrame({"holiday_date": days, "holiday_name": name}))
+
+    for name, month, weekday, n in FLOATING_HOLIDAYS:
+        if n > 0:
+            first = (months + month - 1).astype("datetime64[M]").astype("datetime64[D]")
+            days = np.busday_offset(first, n - 1, roll="forward", weekmask=weekday)
+        else:
+            following = (months + month).astype("datetime64[M]").astype("datetime64[D]")
+            days = np.busday_offset(following, n, roll="forward", weekmask=weekday)
+        frames.append(pd.DataFrame({"holiday_date": days, "holiday_name": name}))
+
+    holidays = pd.concat(frames, ignore_index=True)
+    holidays["holiday_date"] = pd.to_datetime(holidays["holiday_date"])
+    return holidays.sort_values("holiday_date").reset_index(drop=True)
+
+
+@dataclass
+class PayoutRule:
+    """When a platform's settlement turns into cash in the bank"""
+
+    platform: str
+    timing_key: str
+    lag_days: int  # Calendar days from settlement close to payout
+    payout_weekmask: Optional[str] = None  # Days payouts land on; None = any day
+    cycle_days: Optional[int] = None  # Fixed settlement period (Amazon: 14)
+    anchor_date: Optional[np.datetime64] = None  # Start of any known settlement
+
+
+def _weekmask(day_names: Iterable[str]) -> str:
+    names = {d.strip().lower() for d in day_names}
+    unknown = names - {d.lower() for d in WEEKDAYS}
+    if unknown:
+        raise ValueError(f"Unknown payout days in payment_timing.yaml: {sorted(unknown)}")
+    return "".join("1" if d.lower() in names else "0" for d in WEEKDAYS)
+
+
+def payout_rules(payment_timing: Optional[Dict[str, Any]] = None) -> Dict[str, PayoutRule]:
+    """
+    Compile revenue_timing from payment_timing.yaml into one rule per platform.
+
+    - payout_lag_days: calendar days after settlement close (default 2)
+    - payout_days / weekend_handling: next_business_day: payouts only land on
+      those weekdays (default Monday-Friday) and never on a bank holiday
+    - settlement_period_days + settlement_anchor_date: fixed settlement cycle
+    """
+    timing = config.payment_timing if payment_timing is None else payment_timing
+    revenue_timing = timing.get('revenue_timing', {})
+
+    rules = {}
+    for platform, key in PLATFORM_TIMING_KEYS.items():
+        entry = revenue_timing.get(key) or {}
+        lag = entry.get('payout_lag_days')
+
+        weekmask = None
+        if entry.get('payout_days'):
+            weekmask = _weekmask(entry['payout_days'])
+        elif entry.get('weekend_handling') == 'next_business_day':
+            weekmask = BUSINESS_WEEKMASK
+
+        anchor = entry.get('settlement_anchor_date')
+        rules[platform] = PayoutRule(
+            platform=platform,
+            timing_key=key,
+            lag_days=int(lag) if lag is not None else DEFAULT_PAYOUT_LAG_DAYS,
+            payout_weekmask=weekmask,
+            cycle_days=entry.get('settlement_period_days'),
+            anchor_date=np.datetime64(str(anchor), "D") if anchor else None,
+        )
+
+    return rules
+
+
+class BusinessCalendar:
+    """
+    Vectorized business-day arithmetic over the US bank holiday calendar.
+
+    Example:
+        >>> cal = BusinessCalendar(2024, 2027)
+        >>> cal.add_business_days(["2026-12-24"], 1)
+        array(['2026-12-28'], dtype='datetime64[D]')
+        >>> cal.payout_dates(df["platform"], df["settlement_end"])
+    """
+
+    def __init__(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        payment_timing: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            start_year: First year with holidays (default: 5 years back)
+            end_year: Last year with holidays (default: 5 years ahead)
+            payment_timing: payment_timing.yaml contents (default: config)
+        """
+        this_year = date.today().year
+        self.start_year = start_year or this_year - 5
+        self.end_year = end_year or this_year + 5
+
+        self.holidays = us_bank_holidays(self.start_year, self.end_year)
+        self.holiday_dates = self.holidays["holiday_date"].to_numpy(dtype="datetime64[D]")
+        self.rules = payout_rules(payment_timing)
+
+        self._calendars: Dict[str, np.busdaycalendar] = {}
+        self.calendar = self.busdaycalendar(BUSINESS_WEEKMASK)
+
+    def busdaycalendar(self, weekmask: str) -> np.busdaycalendar:
+        """numpy calendar for a weekmask with the bank holidays (cached)"""
+        if weekmask not in self._calendars:
+            self._calendars[weekmask] = np.busdaycalendar(weekmask=weekmask, holidays=self.holiday_dates)
+        return self._calendars[weekmask]
+
+    def is_business_day(self, dates: Dates) -> np.ndarray:
+        """True for weekdays that are not bank holidays (False for NaT)"""
+        return np.is_busday(to_days(dates), busdaycal=self.calendar)
+
+    def next_business_day(self, dates: Dates) -> np.ndarray:
+        """The date itself if it is a business day, otherwise the next one"""
+        return np.busday_offset(to_days(dates), 0, roll="forward", busdaycal=self.calendar)
+
+    def add_business_days(self, dates: Dates, days: Union[int, np.ndarray]) -> np.ndarray:
+        """Move by N business days (days may be an array), rolling forward first"""
+        return np.busday_offset(to_days(dates), days, roll="forward", busdaycal=self.calendar)
+
+    def settlement_end_dates(self, platform: str, dates: Dates) -> np.ndarray:
+        """
+        Close of the settlement each transaction date falls into.
+
+        Platforms with a fixed cycle (Amazon: 14 days) need
+        settlement_anchor_date in payment_timing.yaml; platforms paid out
+        daily settle on the transaction date itself.
+        """
+        days = to_days(dates)
+        rule = self.rules.get(platform)
+        if rule is None or not rule.cycle_days:
+            return days
+        if rule.anchor_date is None:
+            raise ValueError(
+                f"{rule.timing_key} has a {rule.cycle_days}-day settlement cycle but no "
+                f"settlement_anchor_date in payment_timing.yaml"
+            )
+
+        offset = (days - rule.anchor_date).astype("int64")
+        cycle_end = (offset // rule.cycle_days + 1) * rule.cycle_days - 1
+        ends = rule.anchor_date + cycle_end.astype("timedelta64[D]")
+        return np.where(np.isnat(days), np.datetime64("NaT"), ends).astype("datetime64[D]")
+
+    def payout_dates(self, platforms: Union[str, Iterable[str]], settlement_ends: Dates) -> np.ndarray:
+        """
+        Date each settlement's payout reaches the bank.
+
+        Args:
+            platforms: One platform for all rows, or one per row
+            settlement_ends: Settlement close dates
+
+        Returns:
+            datetime64[D] array; unknown platforms pay out on the close date
+        """
+        ends = to_days(settlement_ends)
+        if isinstance(platforms, str):
+            return self._payout_dates(platforms, ends)
+
+        codes, uniques = pd.factorize(np.asarray(platforms, dtype=object))
+        payouts = ends.copy()
+        for code, platform in enumerate(uniques):
+            mask = codes == code
+            payouts[mask] = self._payout_dates(platform, ends[mask])
+        return payouts
+
+    def _payout_dates(self, platform: str, ends: np.ndarray) -> np.ndarray:
+        rule = self.rules.get(platform)
+        if rule is None:
+            return ends
+
+        payouts = ends + np.timedelta64(rule.lag_days, "D")
+        if rule.payout_weekmask:
+            payouts = np.busday_offset(
+                payouts, 0, roll="forward", busdaycal=self.busdaycalendar(rule.payout_weekmask)
+            )
+        return payouts
+
+    def cash_dates(self, platform: str, transaction_dates: Dates) -> np.ndarray:
+        """Transaction date → settlement close → payout date, for one platform"""
+        return self._payout_dates(platform, self.settlement_end_dates(platform, transaction_dates))
+
+    def date_dimension(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """
+        One row per calendar day, matching the business_calendar table.
+
+        Per platform, <platform>_payout_date is when a settlement closing
+        on that day pays out; <platform>_settlement_end is the close of the
+        fixed-cycle settlement the day falls in (NULL without an anchor).
+        business_day_number counts business days from the first row, so
+        "N business days later" is a self-join on number + N.
+        """
+        days = np.arange(np.datetime64(str(start), "D"), np.datetime64(str(end), "D") + 1)
+        weekday = _weekday(days)
+        is_business_day = self.is_business_day(days)
+
+        names = self.holidays.drop_duplicates("holiday_date").set_index("holiday_date")["holiday_name"]
+        holiday_name = pd.Series(pd.to_datetime(days)).map(names)
+
+        dim = pd.DataFrame({
+            "calendar_date": pd.to_datetime(days),
+            "day_of_week": weekday + 1,  # ISO: Monday=1
+            "week_start": pd.to_datetime(days - weekday.astype("timedelta64[D]")),
+            "is_weekend": weekday >= 5,
+            "is_bank_holiday": holiday_name.notna().to_numpy(),
+            "holiday_name": holiday_name.to_numpy(),
+            "is_business_day": is_business_day,
+            "previous_business_day": pd.to_datetime(
+                np.busday_offset(days - 1, 0, roll="backward", busdaycal=self.calendar)),
+            "next_business_day": pd.to_datetime(
+                np.busday_offset(days + 1, 0, roll="forward", busdaycal=self.calendar)),
+            "business_day_number": np.cumsum(is_business_day).astype("int64"),
+        })
+
+        for platform, rule in self.rules.items():
+            column = platform.lower()
+            dim[f"{column}_payout_date"] = pd.to_datetime(self._payout_dates(platform, days))
+            if rule.cycle_days:
+                dim[f"{column}_settlement_end"] = (
+                    pd.to_datetime(self.settlement_end_dates(platform, days))
+                    if rule.anchor_date is not None else pd.NaT
+                )
+
+        return dim
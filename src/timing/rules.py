@@ -0,0 +1,258 @@
+"""
+Payment-timing rule engine
+
+revenue_timing and expense_timing in payment_timing.yaml are compiled once
+into a table of rules keyed by term id (the YAML entry name, e.g.
+shopify_payout, vendor_net30, credit_card). Each rule is an offset
+function from an event date to the date cash moves:
+
+    - payout:        platform settlement → payout (business calendar); a
+                     fixed cycle without settlement_anchor_date waits half
+                     a cycle for the settlement to close
+    - days:          fixed number of days, rolled forward to a business day
+    - days_of_month: next listed day of the month (payroll, monthly charges)
+
+A whole DataFrame is classified with one vectorized pass per distinct
+term, so millions of rows (deposits, invoices, card spend) take seconds:
+
+    >>> rules = timing_rules()
+    >>> df["cash_date"] = rules.apply(df["term_id"], df["invoice_date"])
+
+Server-side loads (the invoice MERGE) use days_sql(), the same day-count
+rule as SQL over the business_calendar table, and the settlement loads take
+their payout lags from the compiled calendar. The compiled rules are cached
+and rebuilt only when payment_timing.yaml changes on disk.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import CONFIG_DIR, config
+from .business_days import PLATFORM_TIMING_KEYS, BusinessCalendar, Dates, to_days
+
+
+PAYMENT_TIMING_FILE = CONFIG_DIR / "payment_timing.yaml"
+
+# Sections of payment_timing.yaml compiled into rules
+TIMING_SECTIONS = {
+    'revenue': 'revenue_timing',
+    'expense': 'expense_timing',
+}
+
+# Day-count fields, in order of preference (observed behaviour over contract)
+DAYS_FIELDS = ['actual_payment_days', 'typical_payment_days', 'payment_delay_days']
+
+# payment_timing values meaning "deducted from the platform payout"
+WITH_PAYOUT = {'with_settlement', 'with_payout'}
+
+
+@dataclass
+class TimingRule:
+    """How one payment term turns an event date into a cash date"""
+
+    term_id: str
+    section: str  # revenue or expense
+    kind: str  # payout, days or days_of_month
+    offset_days: int = 0
+    platform: Optional[str] = None  # payout rules
+    days_of_month: Tuple[int, ...] = ()  # days_of_month rules
+    description: str = ""
+
+
+def _platform_for(term_id: str) -> Optional[str]:
+    """Platform whose payout a term rides on (amazon_settlement_fees → Amazon)"""
+    for platform, key in PLATFORM_TIMING_KEYS.items():
+        if term_id == key or term_id.startswith(f"{platform.lower()}_"):
+            return platform
+    return None
+
+
+def _compile_rule(term_id: str, section: str, entry: Dict[str, Any]) -> Optional[TimingRule]:
+    """One YAML entry → rule (None when the entry carries no timing)"""
+    description = entry.get('description', '')
+    platform = _platform_for(term_id)
+
+    if term_id in PLATFORM_TIMING_KEYS.values() or (platform and entry.get('payment_timing') in WITH_PAYOUT):
+        return TimingRule(term_id, section, 'payout', platform=platform, description=description)
+
+    for field_name in DAYS_FIELDS:
+        if entry.get(field_name) is not None:
+            return TimingRule(term_id, section, 'days', offset_days=int(entry[field_name]),
+                              description=description)
+
+    if entry.get('payment_timing') == 'immediate':
+        return TimingRule(term_id, section, 'days', description=description)
+
+    days = entry.get('payment_days', entry.get('payment_day'))
+    if days is not None:
+        days = days if isinstance(days, list) else [days]
+        return TimingRule(term_id, section, 'days_of_month',
+                          days_of_month=tuple(sorted(int(d) for d in days)), description=description)
+
+    return None
+
+
+def _next_day_of_month(days: np.ndarray, days_of_month: Tuple[int, ...]) -> np.ndarray:
+    """First listed day of the month on or after each date (clipped to month end)"""
+    months = days.astype("datetime64[M]")
+    result = np.full(days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    # Candidates this month, then the first listed day of next month
+    for month_offset, candidates in ((0, days_of_month), (1, days_of_month[:1])):
+        month = months + month_offset
+        month_start = month.astype("datetime64[D]")
+        month_len = ((month + 1).astype("datetime64[D]") - month_start).astype("int64")
+        for day in candidates:
+            candidate = month_start + (np.minimum(day, month_len) - 1).astype("timedelta64[D]")
+            take = np.isnat(result) & (candidate >= days)
+            result[take] = candidate[take]
+
+    result[np.isnat(days)] = np.datetime64("NaT")
+    return result
+
+
+class TimingRules:
+    """
+    Compiled payment-timing rules.
+
+    Example:
+        >>> rules = TimingRules(config.payment_timing)
+        >>> rules.table  # one row per term id
+        >>> rules.cash_dates("credit_card", card_spend["transaction_date"])
+        >>> rules.apply(invoices["term_id"], invoices["invoice_date"])
+    """
+
+    def __init__(self, payment_timing: Dict[str, Any], calendar: Optional[BusinessCalendar] = None):
+        """
+        Args:
+            payment_timing: payment_timing.yaml contents
+            calendar: Business calendar for payouts and rolls (default: built
+                      from payment_timing)
+        """
+        self.calendar = calendar or BusinessCalendar(payment_timing=payment_timing)
+
+        self.rules: Dict[str, TimingRule] = {}
+        for section, key in TIMING_SECTIONS.items():
+            for term_id, entry in (payment_timing.get(key) or {}).items():
+                rule = _compile_rule(term_id, section, entry or {})
+                if rule is not None:
+                    self.rules[term_id] = rule
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Rule table, one row per term id"""
+        return pd.DataFrame([vars(rule) for rule in self.rules.values()]).set_index('term_id')
+
+    def offset(self, term_id: str, settled: bool = False) -> Callable[[Dates], np.ndarray]:
+        """
+        Offset function for a term: event dates → cash dates.
+
+        Args:
+            term_id: Entry name in payment_timing.yaml
+            settled: For payout terms, the dates are settlement close dates
+                     (deposits/refunds rows already carry their settlement)
+        """
+        if term_id not in self.rules:
+            raise ValueError(f"Unknown payment term: {term_id} (known: {', '.join(self.rules)})")
+
+        rule = self.rules[term_id]
+        calendar = self.calendar
+
+        if rule.kind == 'payout':
+            if settled:
+                return lambda dates: calendar.payout_dates(rule.platform, dates)
+            payout = calendar.rules.get(rule.platform)
+            if payout is not None and payout.cycle_days and payout.anchor_date is None:
+                # No settlement_anchor_date: assume the average wait for the cycle to close
+                wait = np.timedelta64(payout.cycle_days // 2, "D")
+                return lambda dates: calendar.payout_dates(rule.platform, to_days(dates) + wait)
+            return lambda dates: calendar.cash_dates(rule.platform, dates)
+
+        if rule.kind == 'days':
+            lag = np.timedelta64(rule.offset_days, "D")
+            return lambda dates: calendar.next_business_day(to_days(dates) + lag)
+
+        return lambda dates: _next_day_of_month(to_days(dates), rule.days_of_month)
+
+    def days_sql(self, date_sql: str, days_sql: str, calendar_alias: Optional[str] = None) -> str:
+        """
+        SQL form of a day-count rule for server-side loads: date + days,
+        rolled forward to a business day.
+
+        Args:
+            date_sql: Event date expression
+            days_sql: Day-count expression (a vendor's payment days, or a
+                      term's offset_days)
+            calendar_alias: business_calendar row joined on the lagged date
+                            (calendar_date = DATE_ADD(date, INTERVAL days DAY));
+                            without it, or outside the calendar's range, the
+                            date is not rolled
+        """
+        lagged = f"DATE_ADD({date_sql}, INTERVAL {days_sql} DAY)"
+        if not calendar_alias:
+            return lagged
+        rolled = f"IF({calendar_alias}.is_business_day, {calendar_alias}.calendar_date, {calendar_alias}.next_business_day)"
+        return f"IFNULL({rolled}, {lagged})"
+
+    def cash_dates(self, term_id: str, dates: Dates, settled: bool = False) -> np.ndarray:
+        """Cash dates for a column of event dates under one term"""
+        return self.offset(term_id, settled=settled)(dates)
+
+    def apply(
+        self,
+        terms: Union[str, Iterable[str], pd.Series],
+        dates: Dates,
+        settled: bool = False,
+    ) -> np.ndarray:
+        """
+        Cash dates for rows with their own term ids (vectorized join).
+
+        Rows are grouped by term, each group goes through its offset
+        function in one call. Rows with a null term get NaT.
+
+        Args:
+            terms: One term for all rows, or a term id per row
+            dates: Event dates (invoice, charge, transaction or settlement date)
+            settled: See offset()
+
+        Returns:
+            datetime64[D] array aligned with dates
+
+        Raises:
+            ValueError: If any term id is not in payment_timing.yaml
+        """
+        days = to_days(dates)
+        if isinstance(terms, str):
+            return self.cash_dates(terms, days, settled=settled)
+
+        codes, uniques = pd.factorize(np.asarray(terms, dtype=object))
+        unknown = [t for t in uniques if t not in self.rules]
+        if unknown:
+            raise ValueError(f"Unknown payment terms: {unknown} (known: {', '.join(self.rules)})")
+
+        result = np.full(days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        for code, term_id in enumerate(uniques):
+            mask = codes == code
+            result[mask] = self.cash_dates(term_id, days[mask], settled=settled)
+        return result
+
+    def platform_term(self, platform: str) -> str:
+        """Term id of a platform's payouts (Amazon → amazon_settlement)"""
+        return PLATFORM_TIMING_KEYS[platform]
+
+
+# (payment_timing.yaml mtime, compiled rules)
+_compiled: Optional[Tuple[Optional[float], TimingRules]] = None
+
+
+def timing_rules() -> TimingRules:
+    """Rules compiled from payment_timing.yaml, recompiled only when the file changes"""
+    global _compiled
+    mtime = config.file_mtime(PAYMENT_TIMING_FILE)
+    if _compiled is None or _compiled[0] != mtime:
+        _compiled = (mtime, TimingRules(config.load_yaml(PAYMENT_TIMING_FILE)))
+
+    return _compiled[1]
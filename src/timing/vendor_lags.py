@@ -0,0 +1,311 @@
+"""
+Empirical vendor payment lags
+
+The invoice ETL dates each invoice with the vendor's stated terms
+(Actual Days / Request Days / 30). This module measures how long invoices
+really took to be paid and turns that into a lookup table of lag
+percentiles per vendor:
+
+1. match: every invoice is paired with the first actual vendor outflow in
+   cash_transactions on or after its invoice date (pd.merge_asof) - first
+   on vendor + exact amount, then on vendor alone for invoices settled in
+   batch payments
+2. fit: one groupby computes lag percentiles per vendor, per payment_terms
+   bucket and overall
+3. lookup: each vendor gets its own distribution when it has enough paid
+   invoices, otherwise its terms bucket's, otherwise the overall one
+
+The table is stored locally (Parquet) and in BigQuery as
+vendor_payment_lags, which the invoice ETL can join for percentile-based
+cash dates.
+"""
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config import PROCESSED_DATA_DIR, config
+from ..data.vendors import DEFAULT_PAYMENT_DAYS, VendorMaster, normalize_vendor_names
+from .rules import timing_rules
+
+
+LAG_TABLE = "vendor_payment_lags"
+LAG_CACHE_PATH = PROCESSED_DATA_DIR / f"{LAG_TABLE}.parquet"
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Fewer paid invoices than this and a vendor uses its terms bucket instead
+DEFAULT_MIN_INVOICES = 5
+
+# Payments more than this long after an invoice are not considered its payment
+DEFAULT_MAX_LAG_DAYS = 180
+
+UNKNOWN_TERMS = "Unknown"
+
+
+def percentile_column(percentile: int) -> str:
+    """Lookup table column for a percentile, e.g. p75_days"""
+    if percentile not in PERCENTILES:
+        raise ValueError(f"Percentile must be one of {PERCENTILES}, got {percentile}")
+    return f"p{percentile}_days"
+
+
+def load_payment_history(bq, since: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Invoices and actual vendor outflows, one query each.
+
+    Actual outflows are non-forecast cash_transactions to vendors that did
+    not come from the invoice ETL itself (those are estimates).
+
+    Returns:
+        Dict with invoices (invoice_id, vendor, invoice_date, total) and
+        payments (vendor, payment_date, amount)
+    """
+    since_invoice = f"AND invoice_date >= '{since}'" if since else ""
+    since_cash = f"AND cash_date >= '{since}'" if since else ""
+
+    invoices = bq.query(f"""
+    SELECT invoice_id, vendor, invoice_date, total
+    FROM `{config.get_bigquery_table('invoices')}`
+    WHERE total > 0
+      AND invoice_date IS NOT NULL
+      AND vendor IS NOT NULL
+      {since_invoice}
+    """)
+
+    payments = bq.query(f"""
+    SELECT counterparty as vendor, cash_date as payment_date, -amount as amount
+    FROM `{config.get_bigquery_table('cash_transactions')}`
+    WHERE is_forecast = FALSE
+      AND amount < 0
+      AND counterparty_type = 'Vendor'
+      AND IFNULL(source_table, '') != 'invoices'
+      {since_cash}
+    """)
+
+    return {'invoices': invoices, 'payments': payments}
+
+
+def _vendor_keys(names: pd.Series, vendors: Optional[VendorMaster]) -> pd.Series:
+    """Matching key per name: the master vendor's normalized name when it resolves"""
+    # Normalize each distinct name once; histories repeat a few hundred names
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+    keys = normalize_vendor_names(uniques).to_numpy(dtype=object, copy=True)
+    if vendors is not None:
+        pos, _ = vendors.resolve(uniques)
+        resolved = pos >= 0
+        keys[resolved] = vendors.normalized.astype(object).to_numpy()[pos[resolved]]
+    keys = np.append(keys, None)  # code -1 (null name) → None
+    return pd.Series(keys[codes], index=getattr(names, 'index', None), dtype=object)
+
+
+def match_invoice_payments(
+    invoices: pd.DataFrame,
+    payments: pd.DataFrame,
+    vendors: Optional[VendorMaster] = None,
+    max_lag_days: int = DEFAULT_MAX_LAG_DAYS,
+) -> pd.DataFrame:
+    """
+    Pair each invoice with the payment that settled it (vectorized as-of joins).
+
+    Pass 1 matches vendor + exact amount; if one payment matches several
+    invoices only the latest invoice keeps it. Pass 2 matches the remaining
+    invoices to the vendor's next unclaimed payment of any amount (batch
+    payments, which several invoices may share).
+
+    Args:
+        invoices: invoice_id, vendor, invoice_date, total
+        payments: vendor, payment_date, amount (positive)
+        vendors: Optional VendorMaster to unify name variants
+        max_lag_days: Ignore payments later than this after the invoice
+
+    Returns:
+        invoices with vendor_key, payment_date, lag_days and matched_on
+        ('amount', 'vendor' or None)
+    """
+    tolerance = pd.Timedelta(days=max_lag_days)
+
+    inv = invoices.copy()
+    inv['invoice_date'] = pd.to_datetime(inv['invoice_date'])
+    inv['vendor_key'] = _vendor_keys(inv['vendor'], vendors).astype(object)
+    inv['amount_cents'] = (inv['total'] * 100).round().astype('int64')
+
+    pay = payments.copy()
+    pay['payment_date'] = pd.to_datetime(pay['payment_date'])
+    pay['vendor_key'] = _vendor_keys(pay['vendor'], vendors).astype(object)
+    pay['amount_cents'] = (pay['amount'] * 100).round().astype('int64')
+    pay = pay.dropna(subset=['vendor_key', 'payment_date']).reset_index(drop=True)
+    pay['payment_id'] = np.arange(len(pay))
+
+    inv = inv.dropna(subset=['vendor_key']).sort_values('invoice_date', kind='stable')
+    pay = pay.sort_values('payment_date', kind='stable')
+
+    # Pass 1: vendor + exact amount
+    exact = pd.merge_asof(
+        inv, pay[['payment_date', 'vendor_key', 'amount_cents', 'payment_id']],
+        left_on='invoice_date', right_on='payment_date',
+        by=['vendor_key', 'amount_cents'], direction='forward', tolerance=tolerance,
+    )
+    # One payment settles one invoice: the closest (latest) one keeps it
+    exact.loc[exact['payment_id'].notna() & exact.duplicated('payment_id', keep='last'),
+              ['payment_date', 'payment_id']] = [pd.NaT, np.nan]
+    exact['matched_on'] = np.where(exact['payment_id'].notna(), 'amount', None)
+
+    # Pass 2: vendor's next payment of any amount not already claimed in pass 1
+    pending = exact[exact['payment_id'].isna()].drop(columns=['payment_date', 'payment_id', 'matched_on'])
+    unclaimed = pay[~pay['payment_id'].isin(exact['payment_id'].dropna())]
+    batch = pd.merge_asof(
+        pending, unclaimed[['payment_date', 'vendor_key', 'payment_id']],
+        left_on='invoice_date', right_on='payment_date',
+        by='vendor_key', direction='forward', tolerance=tolerance,
+    )
+    batch['matched_on'] = np.where(batch['payment_id'].notna(), 'vendor', None)
+
+    matched = pd.concat([exact[exact['payment_id'].notna()], batch], ignore_index=True)
+    matched['lag_days'] = (matched['payment_date'] - matched['invoice_date']).dt.days
+    return matched.drop(columns=['amount_cents', 'payment_id'])
+
+
+def fit_lag_distributions(
+    matched: pd.DataFrame,
+    vendors: Optional[VendorMaster] = None,
+    min_invoices: int = DEFAULT_MIN_INVOICES,
+) -> pd.DataFrame:
+    """
+    Lookup table of lag percentiles, one row per vendor name seen on invoices.
+
+    Args:
+        matched: Output of match_invoice_payments
+        vendors: Optional VendorMaster supplying payment_terms buckets
+        min_invoices: Paid invoices a vendor needs for its own distribution
+
+    Returns:
+        DataFrame with vendor, vendor_key, payment_terms, basis
+        ('vendor', 'terms', 'all' or 'none'), invoices (sample size),
+        p10_days … p90_days, mean_days, fitted_at
+    """
+    df = matched.copy()
+    if vendors is not None:
+        df['payment_terms'] = vendors.terms(df['vendor'])['payment_terms'].to_numpy()
+    else:
+        df['payment_terms'] = None
+    df['payment_terms'] = df['payment_terms'].fillna(UNKNOWN_TERMS)
+
+    paid = df[df['lag_days'].notna()]
+    quantiles = [p / 100 for p in PERCENTILES]
+    stat_columns = [percentile_column(p) for p in PERCENTILES]
+
+    def distribution(keys: Sequence[str]) -> pd.DataFrame:
+        grouped = paid.groupby(list(keys))['lag_days']
+        stats = grouped.quantile(quantiles).unstack()
+        stats.columns = stat_columns
+        stats['mean_days'] = grouped.mean()
+        stats['invoices'] = grouped.size()
+        return stats
+
+    by_vendor = distribution(['vendor_key'])
+    by_terms = distribution(['payment_terms'])
+    overall = None
+    if len(paid):
+        overall = (paid['lag_days'].quantile(quantiles).to_numpy(), paid['lag_days'].mean(), len(paid))
+
+    lookup = df.drop_duplicates('vendor')[['vendor', 'vendor_key', 'payment_terms']].reset_index(drop=True)
+    lookup[stat_columns + ['mean_days']] = np.nan
+    lookup['invoices'] = 0
+    lookup['basis'] = 'none'
+
+    # Most specific distribution with enough data wins
+    levels = [
+        ('vendor', by_vendor, 'vendor_key'),
+        ('terms', by_terms, 'payment_terms'),
+    ]
+    for basis, stats, key in levels:
+        eligible = stats[stats['invoices'] >= min_invoices]
+        take = (lookup['basis'] == 'none') & lookup[key].isin(eligible.index)
+        rows = eligible.loc[lookup.loc[take, key]]
+        lookup.loc[take, stat_columns + ['mean_days', 'invoices']] = rows[stat_columns + ['mean_days', 'invoices']].to_numpy()
+        lookup.loc[take, 'basis'] = basis
+
+    if overall is not None:
+        take = lookup['basis'] == 'none'
+        lookup.loc[take, stat_columns] = overall[0]
+        lookup.loc[take, 'mean_days'] = overall[1]
+        lookup.loc[take, 'invoices'] = overall[2]
+        lookup.loc[take, 'basis'] = 'all'
+
+    lookup[stat_columns] = lookup[stat_columns].round().astype('Int64')
+    lookup['invoices'] = lookup['invoices'].astype('int64')
+    lookup['fitted_at'] = pd.Timestamp(datetime.now(timezone.utc))
+    return lookup[['vendor', 'vendor_key', 'payment_terms', 'basis', 'invoices',
+                   *stat_columns, 'mean_days', 'fitted_at']]
+
+
+class PaymentLagModel:
+    """
+    Percentile-based invoice → payment lags.
+
+    Example:
+        >>> model = PaymentLagModel.load()
+        >>> model.cash_dates(invoices["vendor"], invoices["invoice_date"], percentile=75)
+    """
+
+    def __init__(self, lookup: pd.DataFrame, vendors: Optional[VendorMaster] = None):
+        """
+        Args:
+            lookup: Output of fit_lag_distributions
+            vendors: VendorMaster for static terms of vendors never invoiced
+        """
+        self.lookup = lookup
+        self.vendors = vendors
+        self._by_name = lookup.drop_duplicates('vendor').set_index('vendor')
+        self._by_key = lookup.drop_duplicates('vendor_key').set_index('vendor_key')
+
+    @classmethod
+    def load(cls, path: Path = LAG_CACHE_PATH, vendors: Optional[VendorMaster] = None) -> "PaymentLagModel":
+        """Model from the local lookup table (see save)"""
+        if not Path(path).exists():
+            raise FileNotFoundError(f"No vendor lag table at {path}; run scripts/fit_vendor_lags.py")
+        return cls(pd.read_parquet(path), vendors)
+
+    def save(self, path: Path = LAG_CACHE_PATH) -> None:
+        """Write the lookup table locally (atomic)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        self.lookup.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    def lag_days(self, names: Iterable[str], percentile: int = 50) -> np.ndarray:
+        """
+        Lag in days per vendor name at a percentile.
+
+        Names not on any past invoice are looked up by normalized name;
+        failing that they get their static vendor terms (or Net 30).
+        """
+        column = percentile_column(percentile)
+        names = pd.Series(names, dtype=object)
+
+        lags = names.map(self._by_name[column]).astype('Float64')
+        missing = lags.isna()
+        if missing.any():
+            keys = normalize_vendor_names(names[missing]).astype(object)
+            lags[missing] = keys.map(self._by_key[column]).astype('Float64')
+
+        missing = lags.isna()
+        if missing.any():
+            static = (
+                self.vendors.payment_days(names[missing]) if self.vendors is not None
+                else np.full(int(missing.sum()), DEFAULT_PAYMENT_DAYS)
+            )
+            lags[missing] = static
+
+        return lags.to_numpy(dtype='int64')
+
+    def cash_dates(self, names: Iterable[str], invoice_dates: Iterable, percentile: int = 50) -> np.ndarray:
+        """invoice_date + lag percentile, rolled to a business day (as the invoice ETL does), as datetime64[D]"""
+        days = np.asarray(pd.to_datetime(pd.Series(invoice_dates)), dtype='datetime64[D]')
+        return timing_rules().calendar.next_business_day(days + self.lag_days(names, percentile).astype('timedelta64[D]'))